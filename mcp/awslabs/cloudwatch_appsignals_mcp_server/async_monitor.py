@@ -5,11 +5,29 @@ import boto3
 import os
 import aiohttp
 import json
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Dict, List, Optional, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from loguru import logger
+from .attribute_codec import decode_item, encode_item
+from .clock import SystemClock, VirtualClock, VirtualScheduler
+from .job_archive import JobArchive
+from .llm_resilience import CircuitOpenError, ResilientCaller
+from .llm_router import LLMRouter, LLMTier
+from .token_accounting import (
+    BUDGET_COMPACT,
+    BUDGET_DEFER,
+    BUDGET_STOP,
+    LLM_CALLS_ATTR,
+    PROMPT_TOKENS_ATTR,
+    RESPONSE_TOKENS_ATTR,
+    TokenBudget,
+    aggregate_token_usage,
+    compact_prompt,
+    estimate_tokens,
+)
 
 
 def convert_floats_to_decimal(obj):
@@ -26,19 +44,93 @@ def convert_floats_to_decimal(obj):
 class AsyncTaskMonitor:
     """Manages background async monitoring tasks."""
 
-    def __init__(self, region: str = 'us-east-1', table_name: str = 'appsignals-async-jobs'):
-        """Initialize the async task monitor."""
+    # Polling intervals for the scheduled jobs, in seconds
+    INVESTIGATION_POLL_SECONDS = 60
+    DEPLOYMENT_POLL_SECONDS = 10
+
+    # Completed jobs whose deployment classification is remembered, most recent kept
+    DEPLOYMENT_CLASSIFICATION_SIZE = 10000
+
+    # How long stop() waits for in-flight work before releasing it, in seconds
+    DRAIN_TIMEOUT_SECONDS = 30
+
+    # Completed jobs older than this move to the archive; the hot-table copy
+    # expires via DynamoDB TTL (attribute expires_at) after the grace period
+    ARCHIVE_POLL_SECONDS = 3600
+    ARCHIVE_AFTER = timedelta(days=7)
+    ARCHIVE_TTL_GRACE = timedelta(days=1)
+    ARCHIVE_SEGMENT_SIZE = 1000
+
+    # Status of items holding precomputed results (e.g. SLI snapshots); the
+    # pollers only look at open and complete jobs, so they never claim these
+    SNAPSHOT_STATUS = 'snapshot'
+
+    def __init__(
+        self,
+        region: str = 'us-east-1',
+        table_name: str = 'appsignals-async-jobs',
+        clock: Optional[Union[SystemClock, VirtualClock]] = None,
+        table: Optional[Any] = None,
+        archive: Optional[JobArchive] = None,
+        llm_router: Optional[LLMRouter] = None,
+        token_budget: Optional[TokenBudget] = None,
+        job_polling: bool = True,
+    ):
+        """Initialize the async task monitor.
+
+        Args:
+            region: AWS region of the DynamoDB job table
+            table_name: Name of the DynamoDB job table
+            clock: Time source; pass a VirtualClock to run the scheduler on simulated time
+            table: Optional pre-built table object (e.g. an in-memory table for simulations)
+            archive: Cold storage for completed jobs; defaults to JOB_ARCHIVE_LOCATION if set
+            llm_router: Chooses the LLM tier per iteration; defaults to LLM_* env configuration
+            token_budget: Per-job and global token budgets; defaults to LLM_*_TOKEN_* env vars
+            job_polling: Run the investigation, deployment and archive pollers; when False
+                only jobs added with add_periodic_job() run
+        """
         self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.thread: Optional[threading.Thread] = None
-        self.scheduler: Optional[AsyncIOScheduler] = None
+        self.scheduler: Optional[Union[AsyncIOScheduler, VirtualScheduler]] = None
+        self.clock = clock or SystemClock()
+        self.job_polling = job_polling
+
+        # Extra interval jobs: id -> (coroutine function, seconds, run at start)
+        self._periodic_jobs: Dict[str, Tuple[Callable[[], Awaitable[Any]], float, bool]] = {}
 
         # DynamoDB setup
-        self.dynamodb = boto3.resource('dynamodb', region_name=region)
-        self.table = self.dynamodb.Table(table_name)
+        if table is not None:
+            self.dynamodb = None
+            self.table = table
+        else:
+            self.dynamodb = boto3.resource('dynamodb', region_name=region)
+            self.table = self.dynamodb.Table(table_name)
+
+        # Cold storage for completed jobs (optional)
+        archive_location = os.environ.get('JOB_ARCHIVE_LOCATION')
+        if archive is None and archive_location:
+            archive = JobArchive(archive_location)
+        self.archive = archive
+
+        # Fast/strong LLM tier selection for real LLM calls
+        self.llm_router = llm_router or LLMRouter.from_env()
+        # Deadline/hedging/circuit-breaker state per tier, created on first use
+        self._llm_callers: Dict[str, ResilientCaller] = {}
+        self.token_budget = token_budget or TokenBudget.from_env(self.clock)
 
         # In-memory cache of active tasks for quick access
         self.active_tasks: Dict[str, Dict[str, Any]] = {}
 
+        # Whether each recently seen completed job is a deployment job, so the
+        # deployment poller decodes a prompt once instead of on every poll
+        self._deployment_jobs: 'OrderedDict[str, bool]' = OrderedDict()
+        self._notified_jobs: Set[str] = set()
+
+        # Work in progress, tracked so a drain can wait for it
+        self._draining = False
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._pending_notifications: Set[asyncio.Task] = set()
+
         logger.info(f'AsyncTaskMonitor initialized with table {table_name} in region {region}')
 
     def start(self):
@@ -56,9 +148,24 @@ class AsyncTaskMonitor:
 
         logger.info('AsyncTaskMonitor started')
 
-    def stop(self):
-        """Stop the background monitoring thread."""
+    def stop(self, drain: bool = True, timeout: Optional[float] = None):
+        """Stop the background monitoring thread.
+
+        Args:
+            drain: Wait for in-flight investigations and notifications before stopping
+            timeout: Drain deadline in seconds (defaults to DRAIN_TIMEOUT_SECONDS)
+        """
+        if timeout is None:
+            timeout = self.DRAIN_TIMEOUT_SECONDS
+
         if self.loop and self.loop.is_running():
+            if drain:
+                future = asyncio.run_coroutine_threadsafe(self.drain(timeout), self.loop)
+                try:
+                    future.result(timeout=timeout + 5)
+                except Exception as e:
+                    logger.error(f'Error draining AsyncTaskMonitor: {e}')
+
             asyncio.run_coroutine_threadsafe(self._stop_loop(), self.loop)
 
         if self.thread:
@@ -78,41 +185,177 @@ class AsyncTaskMonitor:
         finally:
             self.loop.close()
 
+    def _create_scheduler(self) -> Union[AsyncIOScheduler, VirtualScheduler]:
+        """Create a scheduler that runs on the monitor's time source."""
+        if isinstance(self.clock, VirtualClock):
+            return VirtualScheduler(self.clock)
+        return AsyncIOScheduler()
+
     async def _init_scheduler(self):
         """Initialize the scheduler in the event loop."""
-        self.scheduler = AsyncIOScheduler()
-
-        # Master polling job that runs every 60 seconds
-        self.scheduler.add_job(
-            self._poll_active_investigations,
-            'interval',
-            seconds=60,
-            id='master_poller',
-            replace_existing=True,
-        )
-        
-        # Deployment status polling job that runs every 10 seconds
-        self.scheduler.add_job(
-            self._poll_deployment_status,
-            'interval',
-            seconds=10,
-            id='deployment_poller',
-            replace_existing=True,
-        )
+        self.scheduler = self._create_scheduler()
+
+        if self.job_polling:
+            # Master polling job that runs every 60 seconds
+            self.scheduler.add_job(
+                self._poll_active_investigations,
+                'interval',
+                seconds=self.INVESTIGATION_POLL_SECONDS,
+                id='master_poller',
+                replace_existing=True,
+            )
+
+            # Deployment status polling job that runs every 10 seconds
+            self.scheduler.add_job(
+                self._poll_deployment_status,
+                'interval',
+                seconds=self.DEPLOYMENT_POLL_SECONDS,
+                id='deployment_poller',
+                replace_existing=True,
+            )
+
+            # Archive completed jobs out of the hot table
+            if self.archive is not None:
+                self.scheduler.add_job(
+                    self.archive_completed_jobs,
+                    'interval',
+                    seconds=self.ARCHIVE_POLL_SECONDS,
+                    id='archiver',
+                    replace_existing=True,
+                )
 
         self.scheduler.start()
-        logger.debug('Scheduler initialized with master polling job and deployment poller')
+        for job_id, (func, seconds, run_now) in self._periodic_jobs.items():
+            self._schedule_periodic_job(job_id, func, seconds, run_now)
+        logger.debug(
+            f'Scheduler initialized with job polling {"on" if self.job_polling else "off"} '
+            f'and {len(self._periodic_jobs)} periodic job(s)'
+        )
+
+    def add_periodic_job(
+        self,
+        job_id: str,
+        func: Callable[[], Awaitable[Any]],
+        seconds: float,
+        run_now: bool = False,
+    ):
+        """Run ``func`` every ``seconds`` on the monitor's scheduler.
+
+        Jobs added before start() are scheduled when the scheduler starts;
+        later ones are scheduled on the running loop.
+
+        Args:
+            job_id: Scheduler job id; adding the same id again replaces the job
+            func: Coroutine function to run
+            seconds: Interval between runs
+            run_now: Also run once as soon as the job is scheduled
+        """
+        self._periodic_jobs[job_id] = (func, seconds, run_now)
+        if self.scheduler is not None and self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(
+                self._schedule_periodic_job, job_id, func, seconds, run_now
+            )
+
+    def _schedule_periodic_job(
+        self, job_id: str, func: Callable[[], Awaitable[Any]], seconds: float, run_now: bool
+    ):
+        """Add a periodic job to the running scheduler."""
+        self.scheduler.add_job(func, 'interval', seconds=seconds, id=job_id, replace_existing=True)
+        if run_now:
+            asyncio.ensure_future(func())
 
     async def _stop_loop(self):
         """Stop the event loop gracefully."""
-        if self.scheduler:
+        if self.scheduler and self.scheduler.running:
             self.scheduler.shutdown()
 
         self.loop.stop()
 
+    async def drain(self, timeout: Optional[float] = None) -> Dict[str, int]:
+        """Stop claiming new work and let in-flight work finish.
+
+        Shuts the scheduler down so no new polls start, waits up to ``timeout``
+        seconds for in-flight investigation iterations to write their results,
+        then releases whatever is still running. A released iteration has not
+        written anything yet, so its job stays open for the next monitor to pick
+        up. Finally flushes any queued Slack notifications.
+
+        Args:
+            timeout: Drain deadline in seconds (defaults to DRAIN_TIMEOUT_SECONDS)
+
+        Returns:
+            Counts of completed and released iterations and flushed notifications
+        """
+        if timeout is None:
+            timeout = self.DRAIN_TIMEOUT_SECONDS
+        deadline = self.clock.monotonic() + timeout
+
+        self._draining = True
+        if self.scheduler and self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+
+        in_flight = dict(self._in_flight)
+        logger.info(f'Draining AsyncTaskMonitor: {len(in_flight)} investigation(s) in flight')
+
+        pending = await self._wait_until(set(in_flight.values()), deadline)
+        released = [job_id for job_id, task in in_flight.items() if task in pending]
+        for job_id in released:
+            in_flight[job_id].cancel()
+            logger.info(f'Released investigation {job_id} unfinished; it stays open')
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        notifications = set(self._pending_notifications)
+        unsent = await self._wait_until(notifications, max(deadline, self.clock.monotonic() + 5))
+        for task in unsent:
+            task.cancel()
+        if unsent:
+            logger.warning(f'Dropped {len(unsent)} Slack notification(s) at drain deadline')
+
+        summary = {
+            'completed': len(in_flight) - len(released),
+            'released': len(released),
+            'notifications_flushed': len(notifications) - len(unsent),
+        }
+        logger.info(f'AsyncTaskMonitor drained: {summary}')
+        return summary
+
+    async def _wait_until(self, tasks: Set[asyncio.Task], deadline: float) -> Set[asyncio.Task]:
+        """Wait for ``tasks`` until the monitor clock reaches ``deadline``; return the unfinished."""
+        if not tasks:
+            return set()
+
+        timer = asyncio.ensure_future(self.clock.sleep(max(deadline - self.clock.monotonic(), 0)))
+        waiter = asyncio.ensure_future(asyncio.wait(tasks))
+        try:
+            await asyncio.wait({timer, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            timer.cancel()
+            waiter.cancel()
+        return {task for task in tasks if not task.done()}
+
+    async def simulate(self, seconds: float) -> Dict[str, Dict[str, float]]:
+        """Run the scheduler on the virtual clock for ``seconds`` of simulated time.
+
+        Runs in the caller's event loop instead of the background thread, so
+        tests and benchmarks can drive a full polling schedule without waiting
+        in real time.
+
+        Returns:
+            Per-job run counts, skipped runs and simulated busy time
+        """
+        if not isinstance(self.clock, VirtualClock):
+            raise RuntimeError('simulate() requires the monitor to be built with a VirtualClock')
+
+        if self.scheduler is None:
+            await self._init_scheduler()
+
+        await self.clock.run_for(seconds)
+        return self.scheduler.job_stats()
+
     async def _poll_active_investigations(self):
         """Master polling job that checks all active investigations."""
-        logger.info(f'Master poller running at {datetime.now()}')
+        logger.info(f'Master poller running at {self.clock.now()}')
 
         # Scan DynamoDB for all active jobs
         try:
@@ -122,20 +365,34 @@ class AsyncTaskMonitor:
                 ExpressionAttributeValues={':open': 'open'},
             )
 
-            open_jobs = response.get('Items', [])
+            open_jobs = [decode_item(item) for item in response.get('Items', [])]
             logger.info(f'Found {len(open_jobs)} open investigations')
 
             # Process each open job
             for job in open_jobs:
-                job_id = job['job_id']
-                await self._process_investigation(job_id, job)
+                if self._draining:
+                    logger.info('Monitor draining, not claiming further investigations')
+                    break
 
+                job_id = job['job_id']
+                if job_id in self._in_flight:
+                    continue
+
+                # Shielded so the iteration outlives a cancelled poller and a
+                # drain can still wait for it to write its result
+                task = asyncio.ensure_future(self._process_investigation(job_id, job))
+                self._in_flight[job_id] = task
+                task.add_done_callback(lambda _, job_id=job_id: self._in_flight.pop(job_id, None))
+                await asyncio.shield(task)
+
+        except asyncio.CancelledError:
+            logger.info('Master poller stopped with an investigation released')
         except Exception as e:
             logger.error(f'Error in master polling: {e}')
     
     async def _poll_deployment_status(self):
         """Poll for completed deployment jobs and send notifications."""
-        logger.debug(f'Deployment poller running at {datetime.now()}')
+        logger.debug(f'Deployment poller running at {self.clock.now()}')
         
         try:
             # Scan for completed jobs
@@ -160,28 +417,37 @@ class AsyncTaskMonitor:
             # Check for deployment-related jobs
             for item in items:
                 job_id = item.get('job_id', '')
-                
+                notified_key = f'notified_{job_id}'
+
+                # Notified jobs are done with, and archived ones have no prompt left
+                if notified_key in self._notified_jobs or 'archived_at' in item:
+                    continue
+
                 # Check if this is a deployment job (has deployment_id in context or prompt)
-                prompt = item.get('prompt', '')
-                is_deployment = False
-                
-                if isinstance(prompt, str):
-                    # Check if this is a deployment-related job
-                    is_deployment = any(term in prompt.lower() for term in ['deployment', 'deploy', 'alarm'])
-                
+                is_deployment = self._deployment_jobs.get(job_id)
+                if is_deployment is None:
+                    prompt = decode_item(item).get('prompt', '')
+                    is_deployment = False
+
+                    if isinstance(prompt, str):
+                        # Check if this is a deployment-related job
+                        is_deployment = any(term in prompt.lower() for term in ['deployment', 'deploy', 'alarm'])
+
+                    self._deployment_jobs[job_id] = is_deployment
+                    if len(self._deployment_jobs) > self.DEPLOYMENT_CLASSIFICATION_SIZE:
+                        self._deployment_jobs.popitem(last=False)
+                else:
+                    self._deployment_jobs.move_to_end(job_id)
+
                 if is_deployment:
                     # Check if we've already notified for this job
-                    notified_key = f'notified_{job_id}'
-                    if not hasattr(self, '_notified_jobs'):
-                        self._notified_jobs = set()
-                    
                     if notified_key not in self._notified_jobs:
                         # Send Slack notification
                         message = (
                             "🎉 *Deployment Successful!* 🎉\n\n"
                             "The deployment was successful and your memory usage has decreased back to normal levels."
                         )
-                        await self.send_slack_notification(message, job_id)
+                        self._queue_notification(message, job_id)
                         
                         # Mark as notified
                         self._notified_jobs.add(notified_key)
@@ -191,14 +457,21 @@ class AsyncTaskMonitor:
             logger.error(f'Error in deployment polling: {e}')
 
     def create_investigation(
-        self, question: str, initial_context: Dict[str, Any], job_id: Optional[str] = None
+        self,
+        question: str,
+        initial_context: Dict[str, Any],
+        job_id: Optional[str] = None,
+        investigation_type: str = 'investigation',
     ) -> str:
-        """Create a new investigation task for LLM-driven analysis."""
+        """Create a new investigation task for LLM-driven analysis.
+
+        ``investigation_type`` groups the job's token usage in ``token_report``.
+        """
         if not job_id:
             job_id = f'investigation-{uuid.uuid4()}'
 
         # Simplified schema - context is just a string
-        context_text = f"Question: {question}\n\nCreated: {datetime.utcnow().isoformat()}\n\nInitial Context:\n"
+        context_text = f"Question: {question}\n\nCreated: {self.clock.utcnow().isoformat()}\n\nInitial Context:\n"
         for key, value in initial_context.items():
             context_text += f"- {key}: {value}\n"
         context_text += "\nInvestigation Log:\n"
@@ -207,11 +480,12 @@ class AsyncTaskMonitor:
             'job_id': job_id,
             'status': 'open',
             'prompt': context_text,
-            'updated_at': datetime.utcnow().isoformat(),
+            'investigation_type': investigation_type,
+            'updated_at': self.clock.utcnow().isoformat(),
         }
 
-        # Convert floats to Decimal for DynamoDB
-        item_for_db = convert_floats_to_decimal(item)
+        # Compress large text and convert floats to Decimal for DynamoDB
+        item_for_db = convert_floats_to_decimal(encode_item(item))
         self.table.put_item(Item=item_for_db)
 
         # Also store in memory for quick access
@@ -221,14 +495,26 @@ class AsyncTaskMonitor:
         return job_id
 
     def get_task(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve a task using minimal schema."""
+        """Retrieve a task using minimal schema.
+
+        Archived jobs are read back from the archive once their hot-table copy
+        has been stripped or has expired.
+        """
         try:
             response = self.table.get_item(Key={'job_id': job_id})
-            if 'Item' in response:
+            item = response.get('Item')
+            if item is not None:
+                decode_item(item)
+            if item is not None and 'archived_at' not in item:
                 # Update memory cache
-                self.active_tasks[job_id] = response['Item']
-                return response['Item']
-            return None
+                self.active_tasks[job_id] = item
+                return item
+
+            if self.archive is not None:
+                archived = self.archive.get(job_id)
+                if archived is not None:
+                    return archived
+            return item
         except Exception as e:
             logger.error(f'Error retrieving job {job_id}: {e}')
             return None
@@ -247,12 +533,21 @@ class AsyncTaskMonitor:
             
             if 'prompt' in updates:
                 task['prompt'] = updates['prompt']  # Replace entire prompt string
+
+            # Cumulative LLM usage
+            for field in (PROMPT_TOKENS_ATTR, RESPONSE_TOKENS_ATTR, LLM_CALLS_ATTR):
+                if field in updates:
+                    task[field] = updates[field]
             
             # Always update the timestamp
-            task['updated_at'] = datetime.utcnow().isoformat()
+            task['updated_at'] = self.clock.utcnow().isoformat()
+
+            # Updating an archived job brings it back into the hot table for good
+            task.pop('archived_at', None)
+            task.pop('expires_at', None)
 
-            # Save to DynamoDB (convert floats to Decimal)
-            task_for_db = convert_floats_to_decimal(task)
+            # Save to DynamoDB (compress large text, convert floats to Decimal)
+            task_for_db = convert_floats_to_decimal(encode_item(task))
             self.table.put_item(Item=task_for_db)
 
             # Update memory cache
@@ -263,6 +558,94 @@ class AsyncTaskMonitor:
             logger.error(f'Error updating job {job_id}: {e}')
             return False
 
+    async def archive_completed_jobs(self, older_than: Optional[timedelta] = None) -> int:
+        """Move completed jobs older than ``older_than`` into the archive.
+
+        Each archived item keeps its key, status and timestamps in the hot
+        table, loses its prompt, and gets an ``expires_at`` TTL so DynamoDB
+        deletes it after ARCHIVE_TTL_GRACE. get_task() serves it from the
+        archive from then on.
+
+        Returns:
+            Number of jobs archived
+        """
+        if self.archive is None:
+            return 0
+        if older_than is None:
+            older_than = self.ARCHIVE_AFTER
+
+        now = self.clock.utcnow()
+        cutoff = (now - older_than).isoformat()
+        expires_at = int((now + self.ARCHIVE_TTL_GRACE).replace(tzinfo=timezone.utc).timestamp())
+
+        try:
+            scan_kwargs = {
+                'FilterExpression': '#s = :complete AND #u < :cutoff AND attribute_not_exists(archived_at)',
+                'ExpressionAttributeNames': {'#s': 'status', '#u': 'updated_at'},
+                'ExpressionAttributeValues': {':complete': 'complete', ':cutoff': cutoff},
+            }
+            response = self.table.scan(**scan_kwargs)
+            items = response.get('Items', [])
+            while 'LastEvaluatedKey' in response:
+                response = self.table.scan(
+                    ExclusiveStartKey=response['LastEvaluatedKey'], **scan_kwargs
+                )
+                items.extend(response.get('Items', []))
+            # The archive compresses whole segments, so store prompts as plain text
+            items = [decode_item(item) for item in items]
+        except Exception as e:
+            logger.error(f'Error scanning for jobs to archive: {e}')
+            return 0
+
+        archived = 0
+        for start in range(0, len(items), self.ARCHIVE_SEGMENT_SIZE):
+            batch = items[start : start + self.ARCHIVE_SEGMENT_SIZE]
+            try:
+                self.archive.write_segment(batch)
+            except Exception as e:
+                logger.error(f'Error writing archive segment: {e}')
+                continue
+
+            for item in batch:
+                try:
+                    # Only strip the original if nobody updated it since we read it
+                    self.table.update_item(
+                        Key={'job_id': item['job_id']},
+                        UpdateExpression='SET archived_at = :now, expires_at = :ttl REMOVE prompt',
+                        ConditionExpression='updated_at = :updated',
+                        ExpressionAttributeValues={
+                            ':now': now.isoformat(),
+                            ':ttl': expires_at,
+                            ':updated': item.get('updated_at', ''),
+                        },
+                    )
+                    self.active_tasks.pop(item['job_id'], None)
+                    archived += 1
+                except Exception as e:
+                    logger.warning(f'Left job {item["job_id"]} in the hot table: {e}')
+
+        if archived:
+            logger.info(f'Archived {archived} completed job(s) older than {older_than}')
+        return archived
+
+    def put_snapshot(self, job_id: str, content: str):
+        """Store precomputed ``content`` under ``job_id`` with the snapshot status."""
+        item = {
+            'job_id': job_id,
+            'status': self.SNAPSHOT_STATUS,
+            'prompt': content,
+            'updated_at': self.clock.utcnow().isoformat(),
+        }
+        self.table.put_item(Item=encode_item(item))
+
+    def get_snapshot(self, job_id: str) -> Optional[str]:
+        """Return the content stored with put_snapshot(), or None if there is none."""
+        response = self.table.get_item(Key={'job_id': job_id})
+        item = response.get('Item')
+        if item is None or item.get('status') != self.SNAPSHOT_STATUS:
+            return None
+        return decode_item(item).get('prompt')
+
     def get_active_tasks(self) -> List[Dict[str, Any]]:
         """Get all active tasks from memory cache (for performance).
 
@@ -275,6 +658,13 @@ class AsyncTaskMonitor:
         """Stop monitoring a specific task."""
         return self.update_task(job_id, {'status': 'complete'})
     
+    def _queue_notification(self, message: str, job_id: Optional[str] = None) -> asyncio.Task:
+        """Send a Slack notification in the background, tracked so a drain can flush it."""
+        task = asyncio.ensure_future(self.send_slack_notification(message, job_id))
+        self._pending_notifications.add(task)
+        task.add_done_callback(self._pending_notifications.discard)
+        return task
+
     async def send_slack_notification(self, message: str, job_id: str = None):
         """Send notification to Slack webhook."""
         webhook_url = os.environ.get('SLACK_WEBHOOK_URL')
@@ -323,19 +713,82 @@ class AsyncTaskMonitor:
 
             # Get the current prompt (which is just a string)
             current_prompt = job_data.get('prompt', '')
+            iteration = self._count_iterations(current_prompt)
 
             # Build prompt by adding instructions to the current prompt
             prompt = self._build_investigation_prompt(current_prompt)
 
+            # Enforce token budgets before spending on the next iteration
+            decision = self.token_budget.check(job_data, prompt)
+            if decision == BUDGET_DEFER:
+                logger.warning(f'Global token budget spent, deferring investigation {job_id}')
+                return
+            if decision == BUDGET_STOP:
+                self._stop_for_budget(job_id, current_prompt)
+                return
+            if decision == BUDGET_COMPACT:
+                logger.info(f'Compacting investigation {job_id} to stay within its token budget')
+                current_prompt = compact_prompt(
+                    current_prompt, self.token_budget.compact_keep_entries
+                )
+                prompt = self._build_investigation_prompt(current_prompt)
+
             # Call LLM
-            llm_response = await self._simulate_llm_investigation(job_id, prompt, 0)
+            llm_response = await self._simulate_llm_investigation(
+                job_id, prompt, iteration, context=current_prompt
+            )
+
+            # Account for the tokens the iteration used
+            usage = llm_response.pop('usage', None) or {
+                PROMPT_TOKENS_ATTR: estimate_tokens(prompt),
+                RESPONSE_TOKENS_ATTR: 0,
+                LLM_CALLS_ATTR: 1,
+            }
+            self.token_budget.record(usage[PROMPT_TOKENS_ATTR] + usage[RESPONSE_TOKENS_ATTR])
 
             # Update investigation with LLM response
-            await self._update_investigation(job_id, llm_response, current_prompt)
+            await self._update_investigation(job_id, llm_response, current_prompt, usage)
 
         except Exception as e:
             logger.error(f'Error processing investigation {job_id}: {e}')
 
+    def _stop_for_budget(self, job_id: str, current_prompt: str):
+        """Close an investigation whose next iteration would overrun its token budget."""
+        logger.warning(f'Investigation {job_id} exhausted its token budget, stopping')
+        new_context = current_prompt + f"\n\n--- {self.clock.utcnow().isoformat()} ---\n"
+        new_context += "Status: stopped\n"
+        new_context += (
+            f"Action: Stopped after exhausting the {self.token_budget.job_budget} token budget\n"
+        )
+        self.update_task(job_id, {'status': 'complete', 'prompt': new_context})
+
+    def token_report(self) -> List[Dict[str, Any]]:
+        """Aggregate recorded token usage by investigation type, most expensive first."""
+        projection = {
+            'ProjectionExpression': '#t, #p, #r, #c',
+            'FilterExpression': '#s <> :snapshot',
+            'ExpressionAttributeNames': {
+                '#t': 'investigation_type',
+                '#p': PROMPT_TOKENS_ATTR,
+                '#r': RESPONSE_TOKENS_ATTR,
+                '#c': LLM_CALLS_ATTR,
+                '#s': 'status',
+            },
+            'ExpressionAttributeValues': {':snapshot': self.SNAPSHOT_STATUS},
+        }
+        jobs = []
+        response = self.table.scan(**projection)
+        jobs.extend(response.get('Items', []))
+        while 'LastEvaluatedKey' in response:
+            response = self.table.scan(ExclusiveStartKey=response['LastEvaluatedKey'], **projection)
+            jobs.extend(response.get('Items', []))
+        return aggregate_token_usage(jobs)
+
+    @staticmethod
+    def _count_iterations(prompt: str) -> int:
+        """Return how many iterations have been logged to an investigation prompt."""
+        return prompt.count('\n\n--- ')
+
     def _build_investigation_prompt(self, current_context: str) -> str:
         """Build a prompt for the LLM using the current context string."""
         prompt = current_context + "\n\n" + """
@@ -352,15 +805,19 @@ Be specific and actionable in your response. Focus on practical troubleshooting
         return prompt
 
     async def _simulate_llm_investigation(
-        self, job_id: str, prompt: str, iteration: int
+        self, job_id: str, prompt: str, iteration: int, context: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Call LLM for investigation or use simulation."""
+        """Call LLM for investigation or use simulation.
+
+        ``context`` is the investigation log without the instructions appended
+        by _build_investigation_prompt; routing looks at it instead of ``prompt``.
+        """
         # Check if we should use real LLM
         use_real_llm = os.environ.get('USE_REAL_LLM', 'false').lower() == 'true'
         
         if use_real_llm:
             try:
-                return await self._call_llm_cli(prompt)
+                return await self._routed_llm_call(prompt, iteration, context)
             except Exception as e:
                 logger.error(f"LLM call failed: {e}. Falling back to simulation.")
         
@@ -384,24 +841,109 @@ Based on the current findings, I need to continue gathering more data to identif
 
 The investigation has identified that service X is experiencing high latency under load."""
         
-        return self._parse_llm_response(simulated_response)
+        result = self._parse_llm_response(simulated_response)
+        result['usage'] = {
+            PROMPT_TOKENS_ATTR: estimate_tokens(prompt),
+            RESPONSE_TOKENS_ATTR: estimate_tokens(simulated_response),
+            LLM_CALLS_ATTR: 1,
+        }
+        return result
     
-    async def _call_llm_cli(self, prompt: str) -> Dict[str, Any]:
+    async def _routed_llm_call(
+        self, prompt: str, iteration: int, context: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Send one iteration to the tier chosen by the router, escalating unsure fast answers."""
+        router = self.llm_router
+        # The instructions always mention the root cause, so only the log is classified
+        expect_conclusion = router.expects_conclusion(context if context is not None else prompt)
+        tier = router.select(iteration, len(prompt), expect_conclusion)
+
+        prompt_tokens = estimate_tokens(prompt)
+        response_text = await self._timed_llm_call(prompt, tier)
+        result = self._parse_llm_response(response_text)
+        usage = {
+            PROMPT_TOKENS_ATTR: prompt_tokens,
+            RESPONSE_TOKENS_ATTR: estimate_tokens(response_text),
+            LLM_CALLS_ATTR: 1,
+        }
+
+        if router.should_escalate(tier, result, response_text):
+            logger.info(f"Escalating iteration {iteration} from {tier.name} tier to strong")
+            router.record_escalation(tier)
+            try:
+                response_text = await self._timed_llm_call(prompt, router.strong)
+                result = self._parse_llm_response(response_text)
+                usage[PROMPT_TOKENS_ATTR] += prompt_tokens
+                usage[RESPONSE_TOKENS_ATTR] += estimate_tokens(response_text)
+                usage[LLM_CALLS_ATTR] += 1
+            except Exception as e:
+                logger.warning(f"Escalation failed, keeping {tier.name} tier answer: {e}")
+
+        result['usage'] = usage
+        return result
+
+    def _llm_caller(self, tier: LLMTier) -> ResilientCaller:
+        """Return the resilient caller guarding LLM calls to ``tier``."""
+        caller = self._llm_callers.get(tier.name)
+        if caller is None:
+            caller = self._llm_callers[tier.name] = ResilientCaller.from_env(self.clock)
+        return caller
+
+    def llm_stats(self) -> Dict[str, Any]:
+        """Return per-tier routing stats and call deadline/hedging/breaker counters."""
+        return {
+            'tiers': self.llm_router.stats(),
+            'resilience': {name: caller.stats() for name, caller in self._llm_callers.items()},
+        }
+
+    async def _timed_llm_call(self, prompt: str, tier: LLMTier) -> str:
+        """Run the LLM CLI for ``tier`` and record its latency and cost with the router.
+
+        The call is bounded by a deadline, optionally hedged and shed while the
+        tier's circuit breaker is open (raising CircuitOpenError).
+        """
+        started = self.clock.monotonic()
+        try:
+            response_text = await self._llm_caller(tier).call(
+                lambda: self._run_llm_cli(prompt, tier)
+            )
+        except CircuitOpenError:
+            raise
+        except Exception:
+            self.llm_router.record(
+                tier, self.clock.monotonic() - started, estimate_tokens(prompt), ok=False
+            )
+            raise
+        self.llm_router.record(
+            tier,
+            self.clock.monotonic() - started,
+            estimate_tokens(prompt),
+            estimate_tokens(response_text),
+        )
+        return response_text
+
+    async def _call_llm_cli(self, prompt: str, tier: Optional[LLMTier] = None) -> Dict[str, Any]:
         """Call Amazon Q or other LLM CLI and parse response."""
+        return self._parse_llm_response(await self._run_llm_cli(prompt, tier))
+
+    async def _run_llm_cli(self, prompt: str, tier: Optional[LLMTier] = None) -> str:
+        """Run an LLM CLI (the strong tier unless ``tier`` is given) and return its output."""
         import subprocess
         
-        # Determine which CLI to use
-        llm_cli = os.environ.get('LLM_CLI', 'q')
+        # Determine which CLI and model to use
+        tier = tier or self.llm_router.strong
+        llm_cli = tier.cli
+        model_args = ['--model', tier.model] if tier.model else []
         
         # Build command based on CLI type
         if llm_cli == 'q':
             # Amazon Q CLI - pass prompt as direct argument
-            cmd = ['q', 'chat', prompt]
+            cmd = ['q', 'chat', *model_args, prompt]
         else:
             # Generic CLI fallback
-            cmd = [llm_cli, prompt]
+            cmd = [llm_cli, *model_args, prompt]
         
-        logger.info(f"Calling LLM CLI: {llm_cli}")
+        logger.info(f"Calling LLM CLI: {llm_cli} ({tier.name} tier)")
         
         try:
             # Run the command
@@ -411,17 +953,19 @@ The investigation has identified that service X is experiencing high latency und
                 stderr=subprocess.PIPE
             )
             
-            stdout, stderr = await result.communicate()
+            try:
+                stdout, stderr = await result.communicate()
+            except asyncio.CancelledError:
+                # Don't leave the CLI running when the iteration is released
+                result.kill()
+                await result.wait()
+                raise
             
             if result.returncode != 0:
                 error_msg = stderr.decode() if stderr else 'Unknown error'
                 raise Exception(f"LLM CLI failed: {error_msg}")
             
-            # Get the response
-            response_text = stdout.decode().strip()
-            
-            # Parse the response using our token-based approach
-            return self._parse_llm_response(response_text)
+            return stdout.decode().strip()
             
         except Exception as e:
             logger.error(f"Error calling LLM CLI: {e}")
@@ -526,10 +1070,14 @@ The investigation has identified that service X is experiencing high latency und
         return result
 
     async def _update_investigation(
-        self, job_id: str, llm_response: Dict[str, Any], current_prompt: str
+        self,
+        job_id: str,
+        llm_response: Dict[str, Any],
+        current_prompt: str,
+        usage: Optional[Dict[str, int]] = None,
     ):
-        """Update investigation based on LLM response."""
-        timestamp = datetime.utcnow().isoformat()
+        """Update investigation based on LLM response, adding ``usage`` to its token counts."""
+        timestamp = self.clock.utcnow().isoformat()
 
         # Get current task
         task = self.get_task(job_id)
@@ -559,4 +1107,7 @@ The investigation has identified that service X is experiencing high latency und
             logger.info(f'Investigation {job_id} completed')
 
         # Save updates
-        self.update_task(job_id, {'status': new_status, 'prompt': new_context})
+        updates = {'status': new_status, 'prompt': new_context}
+        for field, value in (usage or {}).items():
+            updates[field] = int(task.get(field, 0)) + value
+        self.update_task(job_id, updates)
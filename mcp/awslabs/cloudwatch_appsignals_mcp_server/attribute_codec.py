@@ -0,0 +1,109 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Transparent compression of large text attributes stored in DynamoDB.
+
+Text attributes above a size threshold are stored as DynamoDB Binary values
+made of a small versioned header followed by the compressed UTF-8 payload:
+
+    magic (4 bytes) | version (1 byte) | codec (1 byte) | payload
+
+Values below the threshold stay plain strings, and decoding a string is a
+no-op, so existing uncompressed items keep working.
+"""
+
+import os
+import zlib
+from typing import Any, Dict, Union
+
+
+CODEC_MAGIC = b'\x00OSZ'
+CODEC_VERSION = 1
+CODEC_ZLIB = 1
+HEADER_SIZE = len(CODEC_MAGIC) + 2
+
+# Attributes of async job items that may hold large text
+COMPRESSED_ATTRIBUTES = ('prompt',)
+
+# Text below this many UTF-8 bytes is stored as-is
+COMPRESSION_THRESHOLD_BYTES = int(os.environ.get('MCP_PROMPT_COMPRESSION_THRESHOLD', '4096'))
+
+
+def encode_text(text: str, threshold: int = COMPRESSION_THRESHOLD_BYTES) -> Union[str, bytes]:
+    """Compress ``text`` into a Binary-ready value if it is at least ``threshold`` bytes.
+
+    Args:
+        text: Text to encode
+        threshold: Minimum UTF-8 size in bytes before compression is attempted
+
+    Returns:
+        The original string, or header-prefixed compressed bytes when that is smaller
+    """
+    raw = text.encode('utf-8')
+    if len(raw) < threshold:
+        return text
+
+    compressed = zlib.compress(raw, 6)
+    if len(compressed) + HEADER_SIZE >= len(raw):
+        return text
+    return CODEC_MAGIC + bytes((CODEC_VERSION, CODEC_ZLIB)) + compressed
+
+
+def decode_text(value: Any) -> str:
+    """Decode a value produced by ``encode_text``.
+
+    Accepts plain strings (returned unchanged), raw bytes, and boto3's
+    ``Binary`` wrapper as returned by the DynamoDB resource API.
+
+    Raises:
+        ValueError: If the binary header is missing or uses an unknown version or codec
+    """
+    if isinstance(value, str):
+        return value
+
+    data = getattr(value, 'value', value)
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        raise ValueError(f'Cannot decode attribute of type {type(value).__name__}')
+
+    data = bytes(data)
+    if not data.startswith(CODEC_MAGIC):
+        raise ValueError('Binary attribute is missing the codec header')
+
+    version, codec = data[len(CODEC_MAGIC)], data[len(CODEC_MAGIC) + 1]
+    if version != CODEC_VERSION:
+        raise ValueError(f'Unsupported codec version {version}')
+    if codec != CODEC_ZLIB:
+        raise ValueError(f'Unsupported codec {codec}')
+
+    return zlib.decompress(data[HEADER_SIZE:]).decode('utf-8')
+
+
+def encode_item(
+    item: Dict[str, Any], threshold: int = COMPRESSION_THRESHOLD_BYTES
+) -> Dict[str, Any]:
+    """Return a copy of ``item`` with its large text attributes compressed."""
+    encoded = dict(item)
+    for name in COMPRESSED_ATTRIBUTES:
+        if isinstance(encoded.get(name), str):
+            encoded[name] = encode_text(encoded[name], threshold)
+    return encoded
+
+
+def decode_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode compressed text attributes of ``item`` in place and return it."""
+    for name in COMPRESSED_ATTRIBUTES:
+        value = item.get(name)
+        if value is not None and not isinstance(value, str):
+            item[name] = decode_text(value)
+    return item
@@ -0,0 +1,82 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Non-blocking access to synchronous AWS SDK calls from async MCP tools.
+
+boto3 clients are thread-safe but blocking. ``run_sync`` runs a call on a
+dedicated thread pool so a slow AWS request does not stall the event loop.
+The pool and the botocore HTTP connection pool share one size
+(``MCP_AWS_MAX_CONCURRENCY``), so every worker thread can hold a connection.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+
+T = TypeVar('T')
+
+# Worker threads for AWS calls and HTTP connections per boto3 client
+AWS_MAX_CONCURRENCY = int(os.environ.get('MCP_AWS_MAX_CONCURRENCY', '32'))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def client_config(**kwargs: Any) -> Config:
+    """Return a botocore Config whose connection pool matches the AWS thread pool."""
+    return Config(max_pool_connections=AWS_MAX_CONCURRENCY, **kwargs)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared thread pool for AWS calls, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=AWS_MAX_CONCURRENCY, thread_name_prefix='aws-call'
+                )
+    return _executor
+
+
+async def run_sync(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on the AWS thread pool and await its result.
+
+    Args:
+        func: Blocking callable, typically a boto3 client method
+        *args: Positional arguments for ``func``
+        **kwargs: Keyword arguments for ``func``
+
+    Returns:
+        Whatever ``func`` returns; exceptions it raises propagate to the caller
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), call)
+
+
+def shutdown_executor(wait: bool = True):
+    """Shut down the shared thread pool; a later call creates a new one."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
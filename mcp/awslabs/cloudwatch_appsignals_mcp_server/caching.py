@@ -0,0 +1,177 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Keyed async TTL cache with single-flight loading and background refresh.
+
+Entries younger than ``ttl`` are served from memory. Entries older than that
+but younger than ``stale_ttl`` are served immediately while one background
+task reloads them. Anything older (or missing) is loaded inline, and
+concurrent callers asking for the same key share one load.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from loguru import logger
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+
+V = TypeVar('V')
+
+
+@dataclass
+class _Entry(Generic[V]):
+    value: V
+    fetched_at: float
+
+
+class AsyncTTLCache(Generic[V]):
+    """Keyed TTL cache for values produced by async loaders."""
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        name: str = 'cache',
+    ):
+        """Initialize the cache.
+
+        Args:
+            ttl: Age in seconds up to which an entry is served without reloading
+            stale_ttl: Age up to which an expired entry is served while it reloads in the
+                background; defaults to ``ttl`` (no stale serving)
+            max_entries: Maximum number of keys kept, least recently used evicted first
+            clock: Monotonic time source in seconds
+            name: Name used in log messages
+        """
+        self.ttl = ttl
+        self.stale_ttl = max(ttl, stale_ttl if stale_ttl is not None else ttl)
+        self.max_entries = max_entries
+        self.clock = clock
+        self.name = name
+        self._entries: 'OrderedDict[Hashable, _Entry[V]]' = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'errors': 0}
+
+    async def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[V]],
+        max_staleness: Optional[float] = None,
+    ) -> V:
+        """Return the value for ``key``, loading it with ``loader`` when needed.
+
+        Args:
+            key: Cache key
+            loader: Coroutine function producing a fresh value
+            max_staleness: Largest age in seconds the caller accepts; overrides the TTL and
+                disables stale serving for this call (0 forces a reload)
+
+        Raises:
+            Exception: Whatever ``loader`` raises when no usable entry exists
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self.clock() - entry.fetched_at
+            fresh_for = self.ttl if max_staleness is None else max_staleness
+            if age <= fresh_for:
+                self._stats['hits'] += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            if max_staleness is None and age <= self.stale_ttl:
+                self._stats['stale_hits'] += 1
+                self._entries.move_to_end(key)
+                self._refresh_in_background(key, loader)
+                return entry.value
+
+        self._stats['misses'] += 1
+        return await self._load(key, loader)
+
+    def peek(self, key: Hashable) -> Optional[V]:
+        """Return the cached value for ``key`` regardless of age, without loading."""
+        entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def set(self, key: Hashable, value: V):
+        """Store ``value`` for ``key`` as freshly loaded."""
+        self._entries[key] = _Entry(value, self.clock())
+        self._entries.move_to_end(key)
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop ``key``, or every entry when no key is given.
+
+        Loads already in flight still return their value to their callers but
+        no longer populate the cache.
+        """
+        if key is None:
+            self._entries.clear()
+            self._inflight.clear()
+        else:
+            self._entries.pop(key, None)
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the number of cached keys."""
+        lookups = self._stats['hits'] + self._stats['stale_hits'] + self._stats['misses']
+        hit_rate = (self._stats['hits'] + self._stats['stale_hits']) / lookups if lookups else 0.0
+        return dict(self._stats, entries=len(self._entries), hit_rate=hit_rate)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[V]]) -> V:
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except Exception as e:
+            self._stats['errors'] += 1
+            future.set_exception(e)
+            # Waiters get the error; nobody else needs to retrieve it
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            if self._inflight.get(key) is future:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _refresh_in_background(self, key: Hashable, loader: Callable[[], Awaitable[V]]):
+        if key in self._inflight or key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self._load(key, loader)
+                self._stats['refreshes'] += 1
+            except Exception as e:
+                logger.warning(f'Background refresh of {self.name} entry {key!r} failed: {e}')
+
+        task = asyncio.ensure_future(refresh())
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
@@ -0,0 +1,100 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cached registry of account-level capabilities such as Transaction Search.
+
+Settings like the X-Ray trace segment destination change rarely but are
+consulted by several tools on every call. Each capability is checked once,
+kept for ``ttl`` seconds, then served stale while one background task
+re-checks it. Checks that fail raise, so an error is never cached.
+
+A check may take arguments such as a region; results are kept per
+capability and arguments.
+"""
+
+import asyncio
+import os
+from .aws_async import run_sync
+from .caching import AsyncTTLCache
+from loguru import logger
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+
+class CapabilityRegistry:
+    """TTL-cached results of blocking account-level capability checks."""
+
+    def __init__(self, ttl: Optional[float] = None, stale_ttl: Optional[float] = None):
+        """Initialize the registry.
+
+        Args:
+            ttl: Seconds a check result is served without re-checking; defaults to
+                MCP_CAPABILITY_TTL or 3600
+            stale_ttl: Seconds an expired result may still be served while it is
+                re-checked in the background; defaults to 24x ``ttl``
+        """
+        ttl = ttl if ttl is not None else float(os.environ.get('MCP_CAPABILITY_TTL', '3600'))
+        self._cache: AsyncTTLCache[Any] = AsyncTTLCache(
+            ttl=ttl,
+            stale_ttl=stale_ttl if stale_ttl is not None else ttl * 24,
+            name='capabilities',
+        )
+        self._checks: Dict[str, Callable[..., Any]] = {}
+        self._keys: Dict[str, Set[Tuple[Hashable, ...]]] = {}
+
+    def register(self, name: str, check: Callable[..., Any]):
+        """Register the blocking ``check`` producing capability ``name``; it raises on failure."""
+        self._checks[name] = check
+        self.invalidate(name)
+
+    async def get(self, name: str, *args: Hashable, max_staleness: Optional[float] = None) -> Any:
+        """Return the cached result of capability ``name``, checking it when needed.
+
+        Args:
+            name: Registered capability name
+            *args: Arguments passed to the check, cached separately per value
+            max_staleness: Largest result age in seconds the caller accepts
+                (0 forces a re-check)
+
+        Raises:
+            KeyError: If no check is registered under ``name``
+            Exception: Whatever the check raises when no usable result is cached
+        """
+        check = self._checks[name]
+        key = (name, *args)
+        self._keys.setdefault(name, set()).add(key)
+        return await self._cache.get(
+            key, lambda: run_sync(check, *args), max_staleness=max_staleness
+        )
+
+    async def warm(self):
+        """Check every registered capability, logging instead of raising failures."""
+        results = await asyncio.gather(
+            *(self.get(name) for name in self._checks), return_exceptions=True
+        )
+        for name, result in zip(self._checks, results):
+            if isinstance(result, Exception):
+                logger.warning(f'Capability {name} could not be checked at startup: {result}')
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drop the cached results of ``name``, or of every capability."""
+        if name is None:
+            self._keys.clear()
+            self._cache.invalidate()
+            return
+        for key in self._keys.pop(name, ()):
+            self._cache.invalidate(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache hit/miss counters."""
+        return self._cache.stats()
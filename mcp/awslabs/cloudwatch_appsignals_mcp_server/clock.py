@@ -0,0 +1,273 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Time sources and timers used by the async task monitor.
+
+``SystemClock`` is the production time source. ``VirtualClock`` together with
+``VirtualScheduler`` lets the whole monitor run on simulated time, so a day of
+polling completes in however long the work itself takes.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from loguru import logger
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+
+class SystemClock:
+    """Time source backed by the host clock and the running event loop."""
+
+    def now(self) -> datetime:
+        """Return the current local time."""
+        return datetime.now()
+
+    def utcnow(self) -> datetime:
+        """Return the current UTC time as a naive datetime."""
+        return datetime.utcnow()
+
+    def monotonic(self) -> float:
+        """Return seconds from a monotonic reference point."""
+        return time.monotonic()
+
+    async def sleep(self, seconds: float):
+        """Suspend the caller for the given number of seconds."""
+        await asyncio.sleep(seconds)
+
+
+@dataclass(order=True)
+class _Timer:
+    when: float
+    seq: int
+    callback: Callable[[], None] = field(compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class VirtualClock:
+    """Simulated time source that only moves forward when it is run.
+
+    Timers and sleeps are kept in a heap. ``run_for`` pops them in order, jumps
+    the clock to each deadline and lets the woken coroutines run until every
+    task it tracks is either finished or sleeping on the clock again.
+    """
+
+    def __init__(self, start: Optional[datetime] = None):
+        """Initialize the clock at ``start`` (defaults to 2025-01-01 00:00)."""
+        self._start = start or datetime(2025, 1, 1)
+        self._now = 0.0
+        self._timers: List[_Timer] = []
+        self._seq = itertools.count()
+        self._tasks: Set[asyncio.Task] = set()
+        self._sleeping = 0
+
+    def now(self) -> datetime:
+        """Return the simulated local time."""
+        return self._start + timedelta(seconds=self._now)
+
+    def utcnow(self) -> datetime:
+        """Return the simulated UTC time (the virtual clock has no timezone)."""
+        return self.now()
+
+    def monotonic(self) -> float:
+        """Return simulated seconds elapsed since the clock was created."""
+        return self._now
+
+    def call_at(self, when: float, callback: Callable[[], None]) -> _Timer:
+        """Schedule ``callback`` to run once the clock reaches ``when``."""
+        timer = _Timer(when=when, seq=next(self._seq), callback=callback)
+        heapq.heappush(self._timers, timer)
+        return timer
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> _Timer:
+        """Schedule ``callback`` to run ``delay`` simulated seconds from now."""
+        return self.call_at(self._now + max(delay, 0.0), callback)
+
+    def spawn(self, coro: Awaitable[Any]) -> asyncio.Task:
+        """Run ``coro`` as a task whose progress the clock waits for."""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        return task
+
+    async def sleep(self, seconds: float):
+        """Suspend the caller until the clock has advanced by ``seconds``."""
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+
+        def wake():
+            # Count the sleeper as runnable as soon as its timer fires, so
+            # _settle waits for it to resume instead of returning early.
+            if not future.done():
+                self._sleeping -= 1
+                future.set_result(None)
+
+        timer = self.call_later(seconds, wake)
+        self._sleeping += 1
+        try:
+            await future
+        finally:
+            if not future.done():
+                self._sleeping -= 1
+                future.cancel()
+            timer.cancel()
+
+    async def run_for(self, seconds: float):
+        """Advance the clock by ``seconds``, firing every timer that falls due."""
+        await self.run_until(self._now + seconds)
+
+    async def run_until(self, deadline: float):
+        """Advance the clock to ``deadline``, firing every timer that falls due."""
+        await self._settle()
+        while self._timers and self._timers[0].when <= deadline:
+            timer = heapq.heappop(self._timers)
+            if timer.cancelled:
+                continue
+            self._now = max(self._now, timer.when)
+            timer.callback()
+            await self._settle()
+        self._now = max(self._now, deadline)
+
+    async def _settle(self):
+        """Yield to the loop until tracked tasks are done or waiting on the clock."""
+        while True:
+            self._tasks = {task for task in self._tasks if not task.done()}
+            if len(self._tasks) <= self._sleeping:
+                return
+            await asyncio.sleep(0)
+
+
+@dataclass
+class _IntervalJob:
+    id: str
+    func: Callable[..., Awaitable[Any]]
+    seconds: float
+    timer: Optional[_Timer] = None
+    running: bool = False
+    runs: int = 0
+    skipped: int = 0
+    busy_seconds: float = 0.0
+
+
+class VirtualScheduler:
+    """Interval scheduler driven by a ``VirtualClock``.
+
+    Implements the subset of ``AsyncIOScheduler`` that ``AsyncTaskMonitor``
+    relies on (``add_job`` with an interval trigger, ``remove_job``, ``start``
+    and ``shutdown``). As with APScheduler's defaults, a job never overlaps
+    itself: a run that falls due while the previous one is still going is
+    skipped and counted.
+    """
+
+    def __init__(self, clock: VirtualClock):
+        """Initialize the scheduler on top of ``clock``."""
+        self.clock = clock
+        self.running = False
+        self._jobs: Dict[str, _IntervalJob] = {}
+
+    def add_job(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        trigger: str = 'interval',
+        seconds: float = 0,
+        id: Optional[str] = None,
+        replace_existing: bool = False,
+        **kwargs: Any,
+    ):
+        """Register ``func`` to run every ``seconds`` simulated seconds."""
+        if trigger != 'interval':
+            raise ValueError(f'VirtualScheduler only supports interval triggers, got {trigger}')
+        if seconds <= 0:
+            raise ValueError('Interval must be positive')
+
+        job_id = id or getattr(func, '__name__', f'job-{len(self._jobs)}')
+        if job_id in self._jobs:
+            if not replace_existing:
+                raise ValueError(f'Job {job_id} already exists')
+            self.remove_job(job_id)
+
+        job = _IntervalJob(id=job_id, func=func, seconds=seconds)
+        self._jobs[job_id] = job
+        if self.running:
+            self._arm(job)
+        return job
+
+    def remove_job(self, job_id: str):
+        """Remove a job so it no longer fires."""
+        job = self._jobs.pop(job_id)
+        if job.timer:
+            job.timer.cancel()
+
+    def get_jobs(self) -> List[_IntervalJob]:
+        """Return all registered jobs."""
+        return list(self._jobs.values())
+
+    def start(self):
+        """Arm every job for its first run one interval from now."""
+        self.running = True
+        for job in self._jobs.values():
+            self._arm(job)
+
+    def shutdown(self, wait: bool = True):
+        """Stop firing jobs."""
+        self.running = False
+        for job in self._jobs.values():
+            if job.timer:
+                job.timer.cancel()
+                job.timer = None
+
+    def job_stats(self) -> Dict[str, Dict[str, float]]:
+        """Return run counts, skipped runs and simulated busy time per job."""
+        return {
+            job.id: {
+                'runs': job.runs,
+                'skipped': job.skipped,
+                'busy_seconds': job.busy_seconds,
+            }
+            for job in self._jobs.values()
+        }
+
+    def _arm(self, job: _IntervalJob):
+        job.timer = self.clock.call_later(job.seconds, lambda: self._fire(job))
+
+    def _fire(self, job: _IntervalJob):
+        if not self.running:
+            return
+        self._arm(job)
+
+        if job.running:
+            job.skipped += 1
+            logger.debug(f'Skipping run of {job.id}: previous run still in progress')
+            return
+
+        self.clock.spawn(self._run(job))
+
+    async def _run(self, job: _IntervalJob):
+        job.running = True
+        started = self.clock.monotonic()
+        try:
+            await job.func()
+        except Exception as e:
+            logger.error(f'Simulated job {job.id} raised: {e}')
+        finally:
+            job.running = False
+            job.runs += 1
+            job.busy_seconds += self.clock.monotonic() - started
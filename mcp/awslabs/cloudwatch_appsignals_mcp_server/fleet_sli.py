@@ -0,0 +1,249 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fleet-wide SLI evaluation with batched requests.
+
+SLO summaries of every service come from the SLO inventory. Two engines
+then decide which SLOs are breached, many SLOs per request:
+
+- ``FleetSLIEvaluator`` ("metrics") packs the ``BreachedCount`` queries of all
+  SLOs into as few ``GetMetricData`` requests as the 500-query limit allows.
+  An SLO is breached when its most recent ``BreachedCount`` maximum over the
+  requested window is above zero.
+- ``BudgetReportSLIEvaluator`` ("budget_report") asks
+  ``BatchGetServiceLevelObjectiveBudgetReport`` for up to 50 SLOs per call.
+  An SLO is breached when its budget status is ``BREACHED``, which reflects
+  the SLO's own interval rather than the requested window.
+"""
+
+import asyncio
+from .aws_async import run_sync
+from .metric_query_engine import MetricQuery, MetricQueryEngine, query_id
+from .sli_report_client import SLIReport
+from .slo_inventory import SLOInventory
+from datetime import datetime, timedelta, timezone
+from loguru import logger
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+# SLI reports cover at most one day, like AWSConfig.period_in_hours
+MAX_PERIOD_HOURS = 24
+
+# Engine names accepted by list_slis
+ENGINE_METRICS = 'metrics'
+ENGINE_BUDGET_REPORT = 'budget_report'
+
+
+def _build_reports(
+    slo_names: List[List[str]],
+    breached: Dict[int, List[str]],
+    failed: Set[int],
+    start_time: datetime,
+    end_time: datetime,
+) -> List[Optional[SLIReport]]:
+    """Build one report per service from the breached SLOs of each service index."""
+    reports: List[Optional[SLIReport]] = []
+    for index, names in enumerate(slo_names):
+        if index in failed:
+            reports.append(None)
+            continue
+        breached_names = breached.get(index, [])
+        reports.append(
+            SLIReport(
+                start_time=start_time,
+                end_time=end_time,
+                sli_status='CRITICAL' if breached_names else 'OK',
+                total_slo_count=len(names),
+                ok_slo_count=len(names) - len(breached_names),
+                breached_slo_count=len(breached_names),
+                breached_slo_names=breached_names,
+            )
+        )
+    return reports
+
+
+class FleetSLIEvaluator:
+    """Evaluates the SLI status of many services with batched metric queries."""
+
+    def __init__(
+        self,
+        slo_inventory: SLOInventory,
+        metric_engine: MetricQueryEngine,
+    ):
+        """Initialize the evaluator.
+
+        Args:
+            slo_inventory: Source of the SLO summaries of every service
+            metric_engine: Engine used for the batched GetMetricData requests
+        """
+        self.slo_inventory = slo_inventory
+        self.metric_engine = metric_engine
+
+    async def evaluate(
+        self, services: List[Dict[str, Any]], hours: int
+    ) -> List[Optional[SLIReport]]:
+        """Return the SLI report of every service over the last ``hours`` hours.
+
+        Args:
+            services: Service summaries holding ``KeyAttributes``
+            hours: Reporting period, capped at 24 hours
+
+        Returns:
+            One report per service, in the order given; None where the status
+            could not be determined
+        """
+        hours = min(hours, MAX_PERIOD_HOURS)
+        end_time = datetime.now(timezone.utc)
+        start_time = end_time - timedelta(hours=hours)
+
+        try:
+            snapshot = await self.slo_inventory.snapshot()
+        except Exception as e:
+            logger.error(f'Failed to list SLOs: {e}')
+            return [None] * len(services)
+        slo_names = [
+            [slo.name for slo in snapshot.for_service(service['KeyAttributes'])]
+            for service in services
+        ]
+
+        # One BreachedCount query per SLO of every service
+        queries: List[MetricQuery] = []
+        owners: List[Tuple[int, str]] = []
+        for index, names in enumerate(slo_names):
+            for name in names:
+                queries.append(
+                    MetricQuery(
+                        id=query_id(len(queries)),
+                        namespace='AWS/ApplicationSignals',
+                        metric_name='BreachedCount',
+                        stat='Maximum',
+                        period=hours * 60 * 60,
+                        dimensions=({'Name': 'SloName', 'Value': name},),
+                    )
+                )
+                owners.append((index, name))
+
+        breached: Dict[int, List[str]] = {}
+        failed: Set[int] = set()
+        requests_before = self.metric_engine.requests_made
+        if queries:
+            try:
+                series = await self.metric_engine.fetch(queries, start_time, end_time)
+            except Exception as e:
+                logger.error(f'Failed to get BreachedCount for {len(queries)} SLOs: {e}')
+                return [None] * len(services)
+            for query, (index, name) in zip(queries, owners):
+                result = series[query.id]
+                if result.status in ('InternalError', 'Forbidden'):
+                    failed.add(index)
+                elif result.latest is not None and result.latest > 0:
+                    breached.setdefault(index, []).append(name)
+
+        logger.debug(
+            f'Evaluated {len(queries)} SLOs of {len(services)} services with '
+            f'{self.metric_engine.requests_made - requests_before} GetMetricData requests'
+        )
+
+        return _build_reports(slo_names, breached, failed, start_time, end_time)
+
+
+class BudgetReportSLIEvaluator:
+    """Evaluates the SLI status of many services with batched SLO budget reports."""
+
+    BATCH_SIZE = 50
+
+    def __init__(
+        self,
+        slo_inventory: SLOInventory,
+        batch_get_budget_report: Callable[..., Dict[str, Any]],
+    ):
+        """Initialize the evaluator.
+
+        Args:
+            slo_inventory: Source of the SLO summaries of every service
+            batch_get_budget_report: Blocking
+                ``BatchGetServiceLevelObjectiveBudgetReport`` call
+        """
+        self.slo_inventory = slo_inventory
+        self._batch_get_budget_report = batch_get_budget_report
+        self.requests_made = 0
+
+    async def evaluate(
+        self, services: List[Dict[str, Any]], hours: int
+    ) -> List[Optional[SLIReport]]:
+        """Return the SLI report of every service as of now.
+
+        Args:
+            services: Service summaries holding ``KeyAttributes``
+            hours: Reporting period, capped at 24 hours; only used for the
+                report's time range, budget status follows each SLO's interval
+
+        Returns:
+            One report per service, in the order given; None where the status
+            could not be determined
+        """
+        hours = min(hours, MAX_PERIOD_HOURS)
+        end_time = datetime.now(timezone.utc)
+        start_time = end_time - timedelta(hours=hours)
+
+        try:
+            snapshot = await self.slo_inventory.snapshot()
+        except Exception as e:
+            logger.error(f'Failed to list SLOs: {e}')
+            return [None] * len(services)
+        service_slos = [snapshot.for_service(service['KeyAttributes']) for service in services]
+        slo_names = [[slo.name for slo in slos] for slos in service_slos]
+
+        # Budget reports are requested by ARN (or name) and matched back the same way
+        owners: Dict[str, Tuple[int, str]] = {}
+        for index, slos in enumerate(service_slos):
+            for slo in slos:
+                owners[slo.arn or slo.name] = (index, slo.name)
+        slo_ids = list(owners)
+        batches = [
+            slo_ids[i : i + self.BATCH_SIZE] for i in range(0, len(slo_ids), self.BATCH_SIZE)
+        ]
+
+        try:
+            responses = await asyncio.gather(
+                *(
+                    run_sync(self._batch_get_budget_report, Timestamp=end_time, SloIds=batch)
+                    for batch in batches
+                )
+            )
+        except Exception as e:
+            logger.error(f'Failed to get budget reports for {len(slo_ids)} SLOs: {e}')
+            return [None] * len(services)
+        self.requests_made += len(batches)
+
+        breached: Dict[int, List[str]] = {}
+        failed: Set[int] = set()
+        for response in responses:
+            for report in response.get('Reports', []):
+                owner = owners.get(report.get('Arn')) or owners.get(report.get('Name'))
+                if owner is not None and report.get('BudgetStatus') == 'BREACHED':
+                    breached.setdefault(owner[0], []).append(owner[1])
+            for error in response.get('Errors', []):
+                owner = owners.get(error.get('Arn')) or owners.get(error.get('Name'))
+                logger.warning(
+                    f'No budget report for SLO {error.get("Name")}: {error.get("ErrorMessage")}'
+                )
+                if owner is not None:
+                    failed.add(owner[0])
+
+        logger.debug(
+            f'Evaluated {len(slo_ids)} SLOs of {len(services)} services with '
+            f'{len(batches)} budget report requests'
+        )
+        return _build_reports(slo_names, breached, failed, start_time, end_time)
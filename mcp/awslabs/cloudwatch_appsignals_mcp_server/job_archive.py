@@ -0,0 +1,206 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compressed cold storage for completed async jobs.
+
+Completed items are written as gzip-compressed JSONL segments, each with a
+small sidecar index mapping job_id to its line in the segment. Segments live
+either in a local directory or under an ``s3://bucket/prefix`` location (any
+S3-compatible endpoint configured for boto3 works).
+"""
+
+import boto3
+import gzip
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from decimal import Decimal
+from loguru import logger
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+SEGMENT_SUFFIX = '.jsonl.gz'
+INDEX_SUFFIX = '.idx.json'
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize DynamoDB-specific types that json doesn't handle."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class _LocalSegmentStore:
+    """Segment storage in a local directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, name: str, data: bytes):
+        path = os.path.join(self.directory, name)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, name: str) -> bytes:
+        with open(os.path.join(self.directory, name), 'rb') as f:
+            return f.read()
+
+    def list(self, suffix: str) -> List[str]:
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(suffix))
+
+
+class _S3SegmentStore:
+    """Segment storage under an S3 (or S3-compatible) bucket prefix."""
+
+    def __init__(self, bucket: str, prefix: str, client: Optional[Any] = None):
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.client = client or boto3.client('s3')
+
+    def _key(self, name: str) -> str:
+        return f'{self.prefix}/{name}' if self.prefix else name
+
+    def put(self, name: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self._key(name), Body=data)
+
+    def get(self, name: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(name))['Body'].read()
+
+    def list(self, suffix: str) -> List[str]:
+        names = []
+        kwargs = {'Bucket': self.bucket, 'Prefix': f'{self.prefix}/' if self.prefix else ''}
+        while True:
+            response = self.client.list_objects_v2(**kwargs)
+            for obj in response.get('Contents', []):
+                name = obj['Key'][len(kwargs['Prefix']) :]
+                if name.endswith(suffix):
+                    names.append(name)
+            if not response.get('IsTruncated'):
+                break
+            kwargs['ContinuationToken'] = response['NextContinuationToken']
+        return sorted(names)
+
+
+class JobArchive:
+    """Append-only archive of completed jobs, indexed by job_id."""
+
+    def __init__(self, location: str, s3_client: Optional[Any] = None, cached_segments: int = 4):
+        """Initialize the archive.
+
+        Args:
+            location: Local directory path or ``s3://bucket/prefix``
+            s3_client: Optional boto3 S3 client for S3 locations
+            cached_segments: Number of decompressed segments kept in memory for reads
+        """
+        self.location = location
+        if location.startswith('s3://'):
+            bucket, _, prefix = location[len('s3://') :].partition('/')
+            self.store = _S3SegmentStore(bucket, prefix, s3_client)
+        else:
+            self.store = _LocalSegmentStore(location)
+
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Tuple[str, int]]] = None
+        self._loaded_indexes: set = set()
+        self._segment_cache: 'OrderedDict[str, List[bytes]]' = OrderedDict()
+        self._cached_segments = cached_segments
+
+    def write_segment(self, items: Iterable[Dict[str, Any]]) -> Optional[str]:
+        """Write ``items`` to a new compressed segment and index them.
+
+        Returns:
+            The segment name, or None if there was nothing to write
+        """
+        lines = []
+        index = {}
+        for item in items:
+            index[item['job_id']] = len(lines)
+            lines.append(json.dumps(item, default=_json_default, separators=(',', ':')))
+        if not lines:
+            return None
+
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        segment = f'segment-{timestamp}-{uuid.uuid4().hex[:8]}'
+        data = gzip.compress(('\n'.join(lines) + '\n').encode('utf-8'))
+
+        # Segment first, then its index: a reader never sees an index without data
+        self.store.put(segment + SEGMENT_SUFFIX, data)
+        self.store.put(segment + INDEX_SUFFIX, json.dumps(index).encode('utf-8'))
+
+        with self._lock:
+            if self._index is not None:
+                for job_id, line in index.items():
+                    self._index[job_id] = (segment, line)
+                self._loaded_indexes.add(segment + INDEX_SUFFIX)
+
+        logger.info(f'Archived {len(lines)} job(s) to {segment} ({len(data)} bytes compressed)')
+        return segment
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the archived item for ``job_id``, or None if it isn't archived."""
+        location = self._lookup(job_id)
+        if location is None:
+            return None
+
+        segment, line = location
+        lines = self._read_segment(segment)
+        return json.loads(lines[line])
+
+    def __contains__(self, job_id: str) -> bool:
+        """Return whether ``job_id`` has been archived."""
+        return self._lookup(job_id) is not None
+
+    def _lookup(self, job_id: str) -> Optional[Tuple[str, int]]:
+        with self._lock:
+            if self._index is None:
+                self._index = {}
+                self._load_new_indexes()
+            location = self._index.get(job_id)
+            if location is None:
+                # Another process may have archived it since we last looked
+                self._load_new_indexes()
+                location = self._index.get(job_id)
+            return location
+
+    def _load_new_indexes(self):
+        for name in self.store.list(INDEX_SUFFIX):
+            if name in self._loaded_indexes:
+                continue
+            segment = name[: -len(INDEX_SUFFIX)]
+            for job_id, line in json.loads(self.store.get(name)).items():
+                self._index[job_id] = (segment, line)
+            self._loaded_indexes.add(name)
+
+    def _read_segment(self, segment: str) -> List[bytes]:
+        with self._lock:
+            lines = self._segment_cache.get(segment)
+            if lines is not None:
+                self._segment_cache.move_to_end(segment)
+                return lines
+
+        lines = gzip.decompress(self.store.get(segment + SEGMENT_SUFFIX)).splitlines()
+
+        with self._lock:
+            self._segment_cache[segment] = lines
+            while len(self._segment_cache) > self._cached_segments:
+                self._segment_cache.popitem(last=False)
+        return lines
@@ -0,0 +1,275 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deadlines, hedged requests and circuit breaking for LLM CLI calls.
+
+All waiting goes through the monitor's clock, so the same code runs on the
+host clock and on a ``VirtualClock`` in simulations.
+"""
+
+import asyncio
+import os
+from collections import deque
+from loguru import logger
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, TypeVar
+
+
+T = TypeVar('T')
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is shed because the circuit breaker is open."""
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies."""
+
+    def __init__(self, window: int = 100, min_samples: int = 10):
+        """Initialize the tracker.
+
+        Args:
+            window: Number of most recent latencies kept
+            min_samples: Samples needed before percentiles are reported
+        """
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, latency: float):
+        """Record one latency in seconds."""
+        self._samples.append(latency)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the ``pct`` percentile of the window, or None with too few samples."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker over a sliding window of call outcomes.
+
+    The breaker opens when at least ``min_calls`` outcomes are in the window
+    and the failure ratio reaches ``error_rate``. After ``reset_seconds`` it
+    lets one trial call through (half-open); success closes it, failure
+    re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        clock: Any,
+        error_rate: float = 0.5,
+        min_calls: int = 5,
+        window: int = 20,
+        reset_seconds: float = 60.0,
+    ):
+        """Initialize the breaker.
+
+        Args:
+            clock: Time source providing ``monotonic()``
+            error_rate: Failure ratio at which the breaker opens
+            min_calls: Outcomes needed in the window before the breaker can open
+            window: Number of most recent outcomes considered
+            reset_seconds: Time the breaker stays open before a trial call
+        """
+        self.clock = clock
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Return whether a call may proceed now."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if self.clock.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        """Record a successful call."""
+        if self.state == self.HALF_OPEN:
+            logger.info('LLM circuit breaker closed after successful trial call')
+            self.state = self.CLOSED
+            self._outcomes.clear()
+        self._outcomes.append(True)
+
+    def record_failure(self):
+        """Record a failed call, opening the breaker if the error rate is too high."""
+        if self.state == self.HALF_OPEN:
+            self._open()
+            return
+        self._outcomes.append(False)
+        if len(self._outcomes) >= self.min_calls:
+            failures = self._outcomes.count(False)
+            if failures / len(self._outcomes) >= self.error_rate:
+                self._open()
+
+    def release_trial(self):
+        """Let another trial through after one ended without an outcome, e.g. cancelled."""
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = False
+
+    def _open(self):
+        logger.warning(f'LLM circuit breaker opened for {self.reset_seconds:.0f}s')
+        self.state = self.OPEN
+        self._opened_at = self.clock.monotonic()
+        self._trial_in_flight = False
+
+
+class ResilientCaller:
+    """Runs async calls with a deadline, optional hedging and a circuit breaker."""
+
+    def __init__(
+        self,
+        clock: Any,
+        timeout: float = 300.0,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """Initialize the caller.
+
+        Args:
+            clock: Time source providing ``monotonic()`` and async ``sleep()``
+            timeout: Deadline for a call, including any hedged attempt, in seconds
+            hedge: Whether to start a second attempt once the first exceeds the latency percentile
+            hedge_percentile: Latency percentile after which a hedged attempt is started
+            breaker: Circuit breaker; defaults to one with standard settings
+        """
+        self.clock = clock
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or CircuitBreaker(clock)
+        self.latency = LatencyTracker()
+        self.counters: Dict[str, int] = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'shed': 0,
+            'hedged': 0,
+            'hedge_wins': 0,
+        }
+
+    @classmethod
+    def from_env(cls, clock: Any) -> 'ResilientCaller':
+        """Build a caller from LLM_TIMEOUT_SECONDS, LLM_HEDGE and LLM_BREAKER_* env vars."""
+        breaker = CircuitBreaker(
+            clock,
+            error_rate=float(os.environ.get('LLM_BREAKER_ERROR_RATE', '0.5')),
+            reset_seconds=float(os.environ.get('LLM_BREAKER_RESET_SECONDS', '60')),
+        )
+        return cls(
+            clock,
+            timeout=float(os.environ.get('LLM_TIMEOUT_SECONDS', '300')),
+            hedge=os.environ.get('LLM_HEDGE', 'false').lower() == 'true',
+            breaker=breaker,
+        )
+
+    async def call(self, factory: Callable[[], Awaitable[T]]) -> T:
+        """Run ``factory()`` under the deadline, hedging and breaker policy.
+
+        Args:
+            factory: Creates a fresh awaitable per attempt
+
+        Raises:
+            CircuitOpenError: If the breaker is shedding calls
+            asyncio.TimeoutError: If no attempt finished before the deadline
+        """
+        if not self.breaker.allow():
+            self.counters['shed'] += 1
+            raise CircuitOpenError('LLM circuit breaker is open')
+        trial = self.breaker.state == CircuitBreaker.HALF_OPEN
+
+        self.counters['calls'] += 1
+        started = self.clock.monotonic()
+        hedge_delay = self.latency.percentile(self.hedge_percentile) if self.hedge else None
+
+        attempts: Set[asyncio.Task] = {asyncio.ensure_future(factory())}
+        primary = next(iter(attempts))
+        deadline = asyncio.ensure_future(self.clock.sleep(self.timeout))
+        hedge_timer = None
+        if hedge_delay is not None and hedge_delay < self.timeout:
+            hedge_timer = asyncio.ensure_future(self.clock.sleep(hedge_delay))
+
+        last_error: Optional[BaseException] = None
+        try:
+            while attempts:
+                waiting = attempts | {deadline} | ({hedge_timer} if hedge_timer else set())
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done & attempts:
+                    attempts.discard(task)
+                    if task.exception() is None:
+                        self._record_success(started)
+                        if task is not primary:
+                            self.counters['hedge_wins'] += 1
+                        return task.result()
+                    last_error = task.exception()
+
+                if deadline in done:
+                    self.counters['timeouts'] += 1
+                    self._record_failure()
+                    raise asyncio.TimeoutError(f'LLM call exceeded {self.timeout:.0f}s deadline')
+
+                if hedge_timer is not None and hedge_timer in done:
+                    hedge_timer = None
+                    if attempts:
+                        logger.info(f'Hedging LLM call after {hedge_delay:.1f}s')
+                        self.counters['hedged'] += 1
+                        attempts.add(asyncio.ensure_future(factory()))
+
+            self._record_failure()
+            if last_error is None:
+                raise RuntimeError('LLM call ended without a result or an error')
+            raise last_error
+        finally:
+            for task in attempts | {deadline} | ({hedge_timer} if hedge_timer else set()):
+                task.cancel()
+            if trial:
+                # A cancelled trial records no outcome; without this the breaker never closes
+                self.breaker.release_trial()
+
+    def _record_success(self, started: float):
+        self.counters['successes'] += 1
+        self.latency.add(self.clock.monotonic() - started)
+        self.breaker.record_success()
+
+    def _record_failure(self):
+        self.counters['failures'] += 1
+        self.breaker.record_failure()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call counters, breaker state and the current latency percentile."""
+        return dict(
+            self.counters,
+            breaker_state=self.breaker.state,
+            latency_p95=self.latency.percentile(95),
+        )
@@ -0,0 +1,218 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-iteration routing of investigation prompts between LLM tiers.
+
+Intermediate "gather more data" iterations go to a fast, cheap tier; late
+iterations, very large prompts and iterations expected to conclude go to the
+strong tier. A fast-tier answer that concludes or sounds unsure is escalated
+to the strong tier. Latency and estimated cost are recorded per tier.
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from loguru import logger
+from typing import Any, Dict, Optional
+
+
+# Phrases in a fast-tier response that signal it should be escalated
+UNSURE_PHRASES = (
+    'not sure',
+    'unsure',
+    'unclear',
+    'cannot determine',
+    "can't determine",
+    'insufficient information',
+    'not enough information',
+    'unable to',
+)
+
+
+@dataclass
+class LLMTier:
+    """An LLM CLI (and optional model) that investigation prompts can be sent to."""
+
+    name: str
+    cli: str
+    model: Optional[str] = None
+    cost_per_1k_tokens: float = 0.0
+
+
+@dataclass
+class TierStats:
+    """Latency and cost counters for one tier."""
+
+    calls: int = 0
+    failures: int = 0
+    escalations: int = 0
+    total_latency: float = 0.0
+    total_tokens: int = 0
+    total_cost: float = 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        """Average latency of calls to this tier, in seconds."""
+        return self.total_latency / self.calls if self.calls else 0.0
+
+
+class LLMRouter:
+    """Chooses an LLM tier per investigation iteration and records per-tier stats."""
+
+    def __init__(
+        self,
+        strong: LLMTier,
+        fast: Optional[LLMTier] = None,
+        conclusion_iteration: int = 3,
+        large_prompt_chars: int = 40000,
+        min_confidence: float = 60.0,
+    ):
+        """Initialize the router.
+
+        Args:
+            strong: Tier used for conclusions and escalations
+            fast: Optional cheaper tier for intermediate iterations; without it every call goes to strong
+            conclusion_iteration: Iteration number from which the strong tier is always used
+            large_prompt_chars: Prompt size from which the strong tier is always used
+            min_confidence: Fast-tier responses reporting a lower confidence (%) are escalated
+        """
+        self.strong = strong
+        self.fast = fast
+        self.conclusion_iteration = conclusion_iteration
+        self.large_prompt_chars = large_prompt_chars
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self._stats: Dict[str, TierStats] = {}
+
+    @classmethod
+    def from_env(cls) -> 'LLMRouter':
+        """Build a router from LLM_* environment variables.
+
+        ``LLM_CLI``/``LLM_MODEL`` configure the strong tier (the CLI defaults to
+        ``q``). Setting ``LLM_FAST_CLI`` or ``LLM_FAST_MODEL`` enables the fast
+        tier; its CLI defaults to the strong tier's.
+        """
+        strong = LLMTier(
+            name='strong',
+            cli=os.environ.get('LLM_CLI', 'q'),
+            model=os.environ.get('LLM_MODEL') or None,
+            cost_per_1k_tokens=float(os.environ.get('LLM_COST_PER_1K_TOKENS', '0')),
+        )
+        fast = None
+        if os.environ.get('LLM_FAST_CLI') or os.environ.get('LLM_FAST_MODEL'):
+            fast = LLMTier(
+                name='fast',
+                cli=os.environ.get('LLM_FAST_CLI', strong.cli),
+                model=os.environ.get('LLM_FAST_MODEL') or None,
+                cost_per_1k_tokens=float(os.environ.get('LLM_FAST_COST_PER_1K_TOKENS', '0')),
+            )
+        return cls(
+            strong=strong,
+            fast=fast,
+            conclusion_iteration=int(os.environ.get('LLM_CONCLUSION_ITERATION', '3')),
+        )
+
+    def select(self, iteration: int, prompt_chars: int, expect_conclusion: bool) -> LLMTier:
+        """Pick the tier for one iteration.
+
+        Args:
+            iteration: Zero-based iteration number of the investigation
+            prompt_chars: Size of the prompt in characters
+            expect_conclusion: Whether this iteration is expected to conclude
+        """
+        if self.fast is None:
+            return self.strong
+        if expect_conclusion or iteration >= self.conclusion_iteration:
+            return self.strong
+        if prompt_chars >= self.large_prompt_chars:
+            return self.strong
+        return self.fast
+
+    @staticmethod
+    def expects_conclusion(prompt: str) -> bool:
+        """Return whether the latest log entry in ``prompt`` suggests the next step concludes."""
+        marker = prompt.rfind('\n--- ')
+        if marker < 0:
+            return False
+        last_entry = prompt[marker:].lower()
+        return any(term in last_entry for term in ('root_cause', 'root cause', 'answer:'))
+
+    def should_escalate(self, tier: LLMTier, response: Dict[str, Any], text: str = '') -> bool:
+        """Return whether a response from ``tier`` should be redone on the strong tier.
+
+        Fast-tier conclusions are always escalated, as are responses with no
+        findings, a reported confidence below ``min_confidence``, or hedging
+        language.
+        """
+        if tier is self.strong:
+            return False
+        if response.get('status') == 'complete':
+            return True
+        findings = response.get('findings') or {}
+        if not findings:
+            return True
+
+        confidence = findings.get('confidence')
+        if confidence is not None:
+            match = re.search(r'\d+(?:\.\d+)?', str(confidence))
+            if match and float(match.group()) < self.min_confidence:
+                return True
+
+        lowered = text.lower()
+        return any(phrase in lowered for phrase in UNSURE_PHRASES)
+
+    def record(
+        self,
+        tier: LLMTier,
+        latency: float,
+        prompt_tokens: int,
+        response_tokens: int = 0,
+        ok: bool = True,
+    ):
+        """Record latency and estimated cost of one call to ``tier``."""
+        tokens = prompt_tokens + response_tokens
+        cost = tokens / 1000 * tier.cost_per_1k_tokens
+        with self._lock:
+            stats = self._stats.setdefault(tier.name, TierStats())
+            stats.calls += 1
+            stats.total_latency += latency
+            stats.total_tokens += tokens
+            stats.total_cost += cost
+            if not ok:
+                stats.failures += 1
+        logger.info(
+            f'LLM tier {tier.name} call took {latency:.2f}s, ~{tokens} tokens, cost {cost:.4f}'
+            + ('' if ok else ' (failed)')
+        )
+
+    def record_escalation(self, tier: LLMTier):
+        """Record that a response from ``tier`` was escalated."""
+        with self._lock:
+            self._stats.setdefault(tier.name, TierStats()).escalations += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return per-tier call counts, failures, escalations, latency and cost."""
+        with self._lock:
+            return {
+                name: {
+                    'calls': s.calls,
+                    'failures': s.failures,
+                    'escalations': s.escalations,
+                    'avg_latency': s.avg_latency,
+                    'total_tokens': s.total_tokens,
+                    'total_cost': s.total_cost,
+                }
+                for name, s in self._stats.items()
+            }
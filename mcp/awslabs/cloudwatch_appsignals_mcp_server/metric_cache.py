@@ -0,0 +1,211 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Incremental datapoint cache for sliding "last N hours" metric windows.
+
+Datapoints are cached per metric identity and period together with the time
+ranges they cover. A request for a window only fetches the parts that are
+not covered yet, which for a repeated query is the newest tail. Buckets near
+"now" are still being aggregated by CloudWatch, so coverage always stops
+``settle_seconds`` before the time of the fetch and that tail is refetched.
+
+Window bounds are rounded up to whole periods before anything is fetched,
+so every fetched range starts on a bucket boundary and a window sliding by
+a fraction of a period never adds buckets offset from the cached ones.
+"""
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+Range = Tuple[datetime, datetime]
+Fetcher = Callable[[datetime, datetime], Awaitable[List[Dict[str, Any]]]]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _floor(timestamp: datetime, period: int) -> datetime:
+    seconds = int(timestamp.timestamp())
+    return datetime.fromtimestamp(seconds - seconds % period, timezone.utc)
+
+
+def _ceil(timestamp: datetime, period: int) -> datetime:
+    floored = _floor(timestamp, period)
+    return floored if floored == timestamp else floored + timedelta(seconds=period)
+
+
+def subtract_ranges(start: datetime, end: datetime, covered: List[Range]) -> List[Range]:
+    """Return the parts of ``start``..``end`` not covered by the sorted, disjoint ``covered``."""
+    missing = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+def merge_ranges(ranges: List[Range]) -> List[Range]:
+    """Merge overlapping or touching ranges into a sorted, disjoint list."""
+    merged: List[Range] = []
+    for range_start, range_end in sorted(ranges):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+
+class _Series:
+    def __init__(self):
+        self.datapoints: Dict[datetime, Dict[str, Any]] = {}
+        self.covered: List[Range] = []
+        self.lock = asyncio.Lock()
+
+
+class MetricWindowCache:
+    """Caches datapoints per metric and period and fetches only what is missing."""
+
+    def __init__(
+        self,
+        max_age: timedelta = timedelta(hours=169),
+        settle_seconds: int = 300,
+        max_series: int = 256,
+        clock: Callable[[], datetime] = _utcnow,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_age: Datapoints older than this are evicted
+            settle_seconds: Age below which buckets are considered incomplete and refetched
+            max_series: Maximum number of metric series kept, least recently used evicted first
+            clock: Source of the current UTC time
+        """
+        self.max_age = max_age
+        self.settle_seconds = settle_seconds
+        self.max_series = max_series
+        self.clock = clock
+        self._series: 'OrderedDict[Hashable, _Series]' = OrderedDict()
+        self._stats = {'hits': 0, 'partial_hits': 0, 'misses': 0, 'ranges_fetched': 0}
+
+    async def get(
+        self,
+        key: Hashable,
+        period: int,
+        start_time: datetime,
+        end_time: datetime,
+        fetch: Fetcher,
+    ) -> List[Dict[str, Any]]:
+        """Return the datapoints of ``start_time``..``end_time``, fetching only uncovered ranges.
+
+        Both bounds are rounded up to a multiple of ``period``, so the window
+        starts on a bucket boundary, keeps its number of buckets and still
+        ends with the bucket containing ``end_time``.
+
+        Args:
+            key: Metric identity (namespace, name, dimensions, statistics); the
+                period is added to it
+            period: Datapoint period in seconds
+            start_time: Start of the window
+            end_time: End of the window (exclusive)
+            fetch: Coroutine function returning the datapoints of a ``(start, end)`` range
+
+        Returns:
+            Datapoints in the aligned window, sorted by ascending timestamp
+        """
+        start_time = _ceil(start_time, period)
+        end_time = _ceil(end_time, period)
+        series_key = (key, period)
+        series = self._series.get(series_key)
+        if series is None:
+            series = self._series[series_key] = _Series()
+        self._series.move_to_end(series_key)
+        while len(self._series) > self.max_series:
+            self._series.popitem(last=False)
+
+        async with series.lock:
+            missing = subtract_ranges(start_time, end_time, series.covered)
+            if not missing:
+                self._stats['hits'] += 1
+            elif missing == [(start_time, end_time)]:
+                self._stats['misses'] += 1
+            else:
+                self._stats['partial_hits'] += 1
+
+            if missing:
+                now = self.clock()
+                results = await asyncio.gather(
+                    *(fetch(range_start, range_end) for range_start, range_end in missing)
+                )
+                self._stats['ranges_fetched'] += len(missing)
+                for datapoints in results:
+                    for datapoint in datapoints:
+                        if 'Timestamp' in datapoint:
+                            series.datapoints[datapoint['Timestamp']] = datapoint
+
+                # Only buckets that have settled count as covered
+                settled = _floor(now - timedelta(seconds=self.settle_seconds), period)
+                covered = [
+                    (range_start, min(range_end, settled))
+                    for range_start, range_end in missing
+                    if range_start < settled
+                ]
+                series.covered = merge_ranges(series.covered + covered)
+
+            self._evict(series, period)
+            return [
+                series.datapoints[timestamp]
+                for timestamp in sorted(series.datapoints)
+                if start_time <= timestamp < end_time
+            ]
+
+    def invalidate(self):
+        """Drop every cached series."""
+        self._series.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the number of cached series."""
+        return dict(self._stats, series=len(self._series))
+
+    def _evict(self, series: _Series, period: int):
+        # Coverage keeps starting on a bucket boundary
+        cutoff = _ceil(self.clock() - self.max_age, period)
+        for timestamp in [t for t in series.datapoints if t < cutoff]:
+            del series.datapoints[timestamp]
+        series.covered = [
+            (max(range_start, cutoff), range_end)
+            for range_start, range_end in series.covered
+            if range_end > cutoff
+        ]
+
+
+def metric_key(
+    namespace: str,
+    metric_name: str,
+    dimensions: Optional[List[Dict[str, str]]],
+    statistics: Tuple[str, ...],
+) -> Tuple[Any, ...]:
+    """Return the cache key identifying one metric and the statistics fetched for it."""
+    dimension_key = tuple(sorted((d['Name'], d['Value']) for d in dimensions or []))
+    return (namespace, metric_name, dimension_key, statistics)
@@ -0,0 +1,368 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Batched CloudWatch metric retrieval built on GetMetricData.
+
+Any number of metric/statistic queries, across metrics and services, are
+split into requests of at most 500 queries, sent concurrently, and each
+request is paged through ``NextToken`` until its results are complete.
+
+GetMetricData pages long windows itself, so they are requested whole at
+the requested period. Only GetMetricStatistics, which returns at most 1440
+datapoints per call, is split into consecutive sub-windows that are fetched
+concurrently and stitched back together in time order.
+
+QueryBatcher lets independent callers, such as per-metric cache loaders,
+share one batched fetch per time range.
+
+A fleet evaluation holds one series per SLO, so queries are slotted and
+series keep their datapoints in compact arrays rather than lists of objects.
+"""
+
+import asyncio
+from .aws_async import run_sync
+from .metric_series import pack_timestamps, unpack_timestamps
+from array import array
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from loguru import logger
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# GetMetricData accepts at most this many MetricDataQueries per request
+MAX_QUERIES_PER_REQUEST = 500
+
+# GetMetricStatistics returns at most this many datapoints per request
+MAX_DATAPOINTS_PER_REQUEST = 1440
+
+
+@dataclass(frozen=True, slots=True)
+class MetricQuery:
+    """One metric and statistic to retrieve."""
+
+    id: str
+    namespace: str
+    metric_name: str
+    stat: str
+    period: int
+    dimensions: Sequence[Dict[str, str]] = ()
+    label: Optional[str] = None
+
+    def to_request(self) -> Dict[str, Any]:
+        """Return the MetricDataQuery structure for this query."""
+        query: Dict[str, Any] = {
+            'Id': self.id,
+            'MetricStat': {
+                'Metric': {
+                    'Namespace': self.namespace,
+                    'MetricName': self.metric_name,
+                    'Dimensions': list(self.dimensions),
+                },
+                'Period': self.period,
+                'Stat': self.stat,
+            },
+            'ReturnData': True,
+        }
+        if self.label:
+            query['Label'] = self.label
+        return query
+
+
+class MetricSeries:
+    """Datapoints returned for one query, in ascending time order.
+
+    Timestamps are stored as integer microseconds since the epoch and values as
+    doubles in compact arrays; the properties rebuild lists on access.
+    """
+
+    __slots__ = ('query', 'status', '_timestamps', '_values', '_tzinfo')
+
+    def __init__(
+        self,
+        query: MetricQuery,
+        timestamps: Sequence[datetime] = (),
+        values: Sequence[float] = (),
+        status: str = 'Complete',
+    ):
+        """Initialize the series.
+
+        Args:
+            query: Query the datapoints belong to
+            timestamps: Timestamps of the datapoints
+            values: Corresponding values
+            status: GetMetricData status code of the query
+        """
+        self.query = query
+        self.status = status
+        self._timestamps, self._tzinfo = pack_timestamps(timestamps)
+        self._values = array('d', values)
+
+    @property
+    def timestamps(self) -> List[datetime]:
+        """Timestamps of the datapoints."""
+        return unpack_timestamps(self._timestamps, self._tzinfo)
+
+    @property
+    def values(self) -> List[float]:
+        """Corresponding values."""
+        return self._values.tolist()
+
+    @property
+    def latest(self) -> Optional[float]:
+        """Most recent value, or None if there are no datapoints."""
+        return self._values[-1] if self._values else None
+
+    def extend(self, timestamps: Sequence[datetime], values: Sequence[float]):
+        """Append datapoints; call sort() once all of them are in."""
+        packed, tz = pack_timestamps(timestamps)
+        if not self._timestamps:
+            self._tzinfo = tz
+        self._timestamps.extend(packed)
+        self._values.extend(values)
+
+    def sort(self):
+        """Order the datapoints by time, keeping the last value seen per timestamp."""
+        ordered = dict(zip(self._timestamps, self._values))
+        self._timestamps = array('q', sorted(ordered))
+        self._values = array('d', [ordered[timestamp] for timestamp in self._timestamps])
+
+    def __len__(self) -> int:
+        """Return the number of datapoints."""
+        return len(self._values)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare query, status and datapoints with another series."""
+        if not isinstance(other, MetricSeries):
+            return NotImplemented
+        return (
+            self.query == other.query
+            and self.status == other.status
+            and self.timestamps == other.timestamps
+            and self._values == other._values
+        )
+
+    def __repr__(self) -> str:
+        """Return a representation listing the datapoints."""
+        return (
+            f'MetricSeries(query={self.query!r}, timestamps={self.timestamps!r}, '
+            f'values={self.values!r}, status={self.status!r})'
+        )
+
+
+def query_id(index: int) -> str:
+    """Return a GetMetricData-compatible query Id for the ``index``-th query."""
+    return f'm{index}'
+
+
+def split_time_range(
+    start_time: datetime,
+    end_time: datetime,
+    period: int,
+    max_datapoints: int = MAX_DATAPOINTS_PER_REQUEST,
+) -> List[Tuple[datetime, datetime]]:
+    """Split ``start_time``..``end_time`` into windows of at most ``max_datapoints`` periods.
+
+    Windows are consecutive and half-open (CloudWatch treats EndTime as
+    exclusive), so no datapoint falls into two of them.
+    """
+    span = timedelta(seconds=period * max_datapoints)
+    windows = []
+    window_start = start_time
+    while window_start < end_time:
+        window_end = min(window_start + span, end_time)
+        windows.append((window_start, window_end))
+        window_start = window_end
+    return windows or [(start_time, end_time)]
+
+
+async def get_metric_statistics_chunked(
+    get_metric_statistics: Callable[..., Dict[str, Any]],
+    start_time: datetime,
+    end_time: datetime,
+    period: int,
+    **kwargs: Any,
+) -> List[Dict[str, Any]]:
+    """Call ``GetMetricStatistics`` over any window length.
+
+    Args:
+        get_metric_statistics: Blocking ``GetMetricStatistics`` call
+        start_time: Start of the time range
+        end_time: End of the time range
+        period: Period in seconds
+        **kwargs: Remaining request parameters (Namespace, MetricName, Statistics, ...)
+
+    Returns:
+        Datapoints of every sub-window, one per timestamp, sorted by ascending timestamp
+    """
+    windows = split_time_range(start_time, end_time, period)
+    responses = await asyncio.gather(
+        *(
+            run_sync(
+                get_metric_statistics,
+                StartTime=window_start,
+                EndTime=window_end,
+                Period=period,
+                **kwargs,
+            )
+            for window_start, window_end in windows
+        )
+    )
+    if len(windows) > 1:
+        logger.debug(f'GetMetricStatistics split into {len(windows)} windows of period {period}s')
+
+    by_timestamp: Dict[Any, Dict[str, Any]] = {}
+    for response in responses:
+        for datapoint in response.get('Datapoints', []):
+            by_timestamp[datapoint.get('Timestamp', datetime.min)] = datapoint
+    return [by_timestamp[timestamp] for timestamp in sorted(by_timestamp)]
+
+
+class MetricQueryEngine:
+    """Runs batches of metric queries through GetMetricData."""
+
+    def __init__(
+        self,
+        get_metric_data: Callable[..., Dict[str, Any]],
+        max_queries_per_request: int = MAX_QUERIES_PER_REQUEST,
+    ):
+        """Initialize the engine.
+
+        Args:
+            get_metric_data: Blocking ``GetMetricData`` call (e.g. a boto3 client method)
+            max_queries_per_request: Queries sent per request, at most 500
+        """
+        self._get_metric_data = get_metric_data
+        self.max_queries_per_request = min(max_queries_per_request, MAX_QUERIES_PER_REQUEST)
+        self.requests_made = 0
+
+    async def fetch(
+        self,
+        queries: Sequence[MetricQuery],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> Dict[str, MetricSeries]:
+        """Retrieve every query over ``start_time``..``end_time``.
+
+        Args:
+            queries: Queries with unique Ids
+            start_time: Start of the time range
+            end_time: End of the time range
+
+        Returns:
+            Series keyed by query Id, each sorted by ascending timestamp
+        """
+        ids = [query.id for query in queries]
+        if len(set(ids)) != len(ids):
+            raise ValueError('Metric query Ids must be unique')
+
+        series = {query.id: MetricSeries(query) for query in queries}
+        chunks = [
+            list(queries[i : i + self.max_queries_per_request])
+            for i in range(0, len(queries), self.max_queries_per_request)
+        ]
+        await asyncio.gather(
+            *(self._fetch_chunk(chunk, start_time, end_time, series) for chunk in chunks)
+        )
+
+        for result in series.values():
+            if len(result):
+                # One value per timestamp, in ascending order
+                result.sort()
+        return series
+
+    async def _fetch_chunk(
+        self,
+        chunk: List[MetricQuery],
+        start_time: datetime,
+        end_time: datetime,
+        series: Dict[str, MetricSeries],
+    ):
+        kwargs: Dict[str, Any] = {
+            'MetricDataQueries': [query.to_request() for query in chunk],
+            'StartTime': start_time,
+            'EndTime': end_time,
+            'ScanBy': 'TimestampAscending',
+        }
+        while True:
+            response = await run_sync(self._get_metric_data, **kwargs)
+            self.requests_made += 1
+
+            for result in response.get('MetricDataResults', []):
+                target = series.get(result.get('Id'))
+                if target is None:
+                    continue
+                target.extend(result.get('Timestamps', []), result.get('Values', []))
+                target.status = result.get('StatusCode', target.status)
+
+            for message in response.get('Messages', []):
+                logger.warning(f'GetMetricData: {message.get("Code")}: {message.get("Value")}')
+
+            next_token = response.get('NextToken')
+            if not next_token:
+                break
+            kwargs['NextToken'] = next_token
+
+
+class QueryBatcher:
+    """Coalesces queries of concurrent callers into one engine fetch per time range.
+
+    Queries passed to fetch() in the same event loop iteration for the same
+    range are sent together. Each caller gets its series keyed by its own
+    query Ids.
+    """
+
+    def __init__(self, engine: MetricQueryEngine):
+        """Initialize the batcher.
+
+        Args:
+            engine: Engine running the combined queries
+        """
+        self.engine = engine
+        self._pending: Dict[Tuple[datetime, datetime], List[Tuple[List[MetricQuery], Any]]] = {}
+
+    async def fetch(
+        self, queries: Sequence[MetricQuery], start_time: datetime, end_time: datetime
+    ) -> Dict[str, MetricSeries]:
+        """Retrieve ``queries`` over ``start_time``..``end_time`` as part of a shared batch."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (start_time, end_time)
+        callers = self._pending.setdefault(key, [])
+        if not callers:
+            loop.call_soon(lambda: asyncio.ensure_future(self._flush(key)))
+        callers.append((list(queries), future))
+        return await future
+
+    async def _flush(self, key: Tuple[datetime, datetime]):
+        callers = self._pending.pop(key)
+        batched: List[MetricQuery] = []
+        owners: List[Tuple[int, str]] = []
+        for index, (queries, _future) in enumerate(callers):
+            for query in queries:
+                batched.append(replace(query, id=query_id(len(batched))))
+                owners.append((index, query.id))
+        try:
+            series = await self.engine.fetch(batched, *key)
+        except Exception as e:
+            for _queries, future in callers:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        results: List[Dict[str, MetricSeries]] = [{} for _ in callers]
+        for query, (index, original_id) in zip(batched, owners):
+            results[index][original_id] = series[query.id]
+        for (_queries, future), result in zip(callers, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,194 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Summary statistics and shape-preserving downsampling for metric series.
+
+Computation is array-backed with NumPy when it is installed and falls back
+to plain Python otherwise; both paths return the same results.
+Downsampling uses Largest-Triangle-Three-Buckets (LTTB), which keeps the
+points that shape the curve (spikes and dips) instead of averaging them away.
+Series held in memory pack their timestamps into int64 arrays with
+pack_timestamps().
+"""
+
+import math
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import List, Optional, Sequence, Tuple
+
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is not installed
+    np = None
+
+
+@dataclass
+class SeriesSummary:
+    """Summary statistics of one metric series."""
+
+    count: int
+    latest: float
+    mean: float
+    minimum: float
+    maximum: float
+    p50: float
+    p90: float
+    p99: float
+    slope_per_hour: float
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def pack_timestamps(timestamps: Sequence[datetime]) -> Tuple[array, Optional[tzinfo]]:
+    """Return ``timestamps`` as int64 microseconds since the epoch, and their timezone.
+
+    The timezone of the first timestamp is returned; naive timestamps are
+    counted from the naive epoch and return None.
+    """
+    tz = timestamps[0].tzinfo if timestamps else None
+    epoch = _EPOCH if tz is not None else _NAIVE_EPOCH
+    return array('q', [(t - epoch) // _MICROSECOND for t in timestamps]), tz
+
+
+def unpack_timestamps(packed: Sequence[int], tz: Optional[tzinfo]) -> List[datetime]:
+    """Rebuild the datetimes packed by pack_timestamps()."""
+    if tz is None:
+        return [_NAIVE_EPOCH + timedelta(microseconds=t) for t in packed]
+    return [(_EPOCH + timedelta(microseconds=t)).astimezone(tz) for t in packed]
+
+
+def _epoch_seconds(timestamps: Sequence[datetime]) -> List[float]:
+    return [timestamp.timestamp() for timestamp in timestamps]
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Linearly interpolated percentile of sorted values, matching NumPy's default."""
+    position = (len(ordered) - 1) * q / 100.0
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _slope(x: Sequence[float], y: Sequence[float]) -> float:
+    """Least-squares slope of ``y`` over ``x``."""
+    n = len(x)
+    mean_x = sum(x) / n
+    mean_y = sum(y) / n
+    denominator = sum((xi - mean_x) ** 2 for xi in x)
+    if not denominator:
+        return 0.0
+    return sum((xi - mean_x) * (yi - mean_y) for xi, yi in zip(x, y)) / denominator
+
+
+def summarize(timestamps: Sequence[datetime], values: Sequence[float]) -> Optional[SeriesSummary]:
+    """Return summary statistics of a series sorted by timestamp, or None when empty.
+
+    The trend is the least-squares slope of the values, in units per hour.
+    """
+    if not values:
+        return None
+    x = _epoch_seconds(timestamps)
+
+    if np is not None:
+        values_np = np.asarray(values, dtype=float)
+        p50, p90, p99 = np.percentile(values_np, [50, 90, 99])
+        slope = 0.0
+        if len(values_np) > 1 and np.ptp(x) > 0:
+            slope = float(np.polyfit(np.asarray(x, dtype=float), values_np, 1)[0])
+        return SeriesSummary(
+            count=int(values_np.size),
+            latest=float(values_np[-1]),
+            mean=float(values_np.mean()),
+            minimum=float(values_np.min()),
+            maximum=float(values_np.max()),
+            p50=float(p50),
+            p90=float(p90),
+            p99=float(p99),
+            slope_per_hour=slope * 3600,
+        )
+
+    ordered = sorted(values)
+    return SeriesSummary(
+        count=len(values),
+        latest=float(values[-1]),
+        mean=sum(values) / len(values),
+        minimum=ordered[0],
+        maximum=ordered[-1],
+        p50=percentile(ordered, 50),
+        p90=percentile(ordered, 90),
+        p99=percentile(ordered, 99),
+        slope_per_hour=_slope(x, values) * 3600 if len(values) > 1 else 0.0,
+    )
+
+
+def lttb_indices(x: Sequence[float], y: Sequence[float], threshold: int) -> List[int]:
+    """Return the indices of the points kept when downsampling to ``threshold`` points.
+
+    The first and last points are always kept. Each bucket in between keeps
+    the point forming the largest triangle with the previously kept point
+    and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold < 3:
+        raise ValueError('LTTB needs a threshold of at least 3 points')
+    if threshold >= n:
+        return list(range(n))
+
+    buckets = threshold - 2
+    indices = [0]
+    previous = 0
+    for bucket in range(buckets):
+        # Bucket boundaries over the inner points 1..n-2, in integer arithmetic
+        start = bucket * (n - 2) // buckets + 1
+        end = (bucket + 1) * (n - 2) // buckets + 1
+        next_end = min((bucket + 2) * (n - 2) // buckets + 1, n)
+
+        # Average of the next bucket (the last point for the final bucket)
+        if end < next_end:
+            next_x = sum(x[end:next_end]) / (next_end - end)
+            next_y = sum(y[end:next_end]) / (next_end - end)
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+
+        px, py = x[previous], y[previous]
+        if np is not None:
+            bx = np.asarray(x[start:end], dtype=float)
+            by = np.asarray(y[start:end], dtype=float)
+            areas = np.abs((px - next_x) * (by - py) - (px - bx) * (next_y - py))
+            chosen = start + int(areas.argmax())
+        else:
+            chosen, largest = start, -1.0
+            for i in range(start, end):
+                area = abs((px - next_x) * (y[i] - py) - (px - x[i]) * (next_y - py))
+                if area > largest:
+                    chosen, largest = i, area
+
+        indices.append(chosen)
+        previous = chosen
+
+    indices.append(n - 1)
+    return indices
+
+
+def downsample(
+    timestamps: Sequence[datetime], values: Sequence[float], max_points: int
+) -> Tuple[List[datetime], List[float]]:
+    """Downsample a series sorted by timestamp to at most ``max_points`` (>= 3) points with LTTB."""
+    indices = lttb_indices(_epoch_seconds(timestamps), values, max_points)
+    return [timestamps[i] for i in indices], [values[i] for i in indices]
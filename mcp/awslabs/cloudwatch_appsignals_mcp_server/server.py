@@ -19,18 +19,42 @@ import boto3
 import json
 import os
 import sys
+import threading
 import requests
 from . import __version__
-from .sli_report_client import AWSConfig, SLIReportClient
 from .async_monitor import AsyncTaskMonitor
-from botocore.config import Config
+from .attribute_codec import decode_text, encode_text
+from .aws_async import client_config, run_sync
+from .capabilities import CapabilityRegistry
+from .fleet_sli import (
+    ENGINE_BUDGET_REPORT,
+    ENGINE_METRICS,
+    BudgetReportSLIEvaluator,
+    FleetSLIEvaluator,
+)
+from .metric_cache import MetricWindowCache, metric_key
+from .metric_query_engine import (
+    MetricQuery,
+    MetricQueryEngine,
+    QueryBatcher,
+    get_metric_statistics_chunked,
+    query_id,
+)
+from .metric_series import downsample, summarize
+from .service_catalog import ServiceCatalog, ServiceDetailCache
+from .sli_report_client import SLIReport
+from .sli_snapshot import SLISnapshot, SLISnapshotStore, diff_snapshots
+from .slo_inventory import SLOInventory
+from .trace_aggregation import aggregate_traces
+from .trace_cache import TraceCache
+from .trace_retrieval import TraceDetailFetcher, iter_trace_summaries, summarize_trace
 from botocore.exceptions import ClientError
 from datetime import datetime, timedelta, timezone
 from loguru import logger
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 from pydantic import Field
 from time import perf_counter as timer
-from typing import Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
 
 
 # Initialize FastMCP server
@@ -48,7 +72,9 @@ logger.debug(f'Using AWS region: {AWS_REGION}')
 
 # Initialize AWS clients with logging
 try:
-    config = Config(user_agent_extra=f'awslabs.cloudwatch-appsignals-mcp-server/{__version__}')
+    config = client_config(
+        user_agent_extra=f'awslabs.cloudwatch-appsignals-mcp-server/{__version__}'
+    )
     logs_client = boto3.client('logs', region_name=AWS_REGION, config=config)
     appsignals_client = boto3.client('application-signals', region_name=AWS_REGION, config=config)
     cloudwatch_client = boto3.client('cloudwatch', region_name=AWS_REGION, config=config)
@@ -59,6 +85,107 @@ except Exception as e:
     logger.error(f'Failed to initialize AWS clients: {str(e)}')
     raise
 
+# Paginated, cached service list and service details shared by the tools; they
+# resolve the client at call time so they always use the module-level client
+service_catalog = ServiceCatalog(lambda **kwargs: appsignals_client.list_services(**kwargs))
+service_detail_cache = ServiceDetailCache(lambda **kwargs: appsignals_client.get_service(**kwargs))
+metric_engine = MetricQueryEngine(lambda **kwargs: cloudwatch_client.get_metric_data(**kwargs))
+metric_window_cache = MetricWindowCache()
+
+
+def _make_slo_inventory() -> SLOInventory:
+    return SLOInventory(
+        lambda **kwargs: appsignals_client.list_service_level_objectives(**kwargs)
+    )
+
+
+def _make_sli_evaluators(inventory: SLOInventory) -> Dict[str, Any]:
+    return {
+        ENGINE_METRICS: FleetSLIEvaluator(inventory, metric_engine),
+        ENGINE_BUDGET_REPORT: BudgetReportSLIEvaluator(
+            inventory,
+            lambda **kwargs: appsignals_client.batch_get_service_level_objective_budget_report(
+                **kwargs
+            ),
+        ),
+    }
+
+
+slo_inventory = _make_slo_inventory()
+sli_evaluators = _make_sli_evaluators(slo_inventory)
+
+# Full traces for query_sampled_traces, cached on disk once complete
+trace_details = TraceDetailFetcher(
+    lambda **kwargs: xray_client.batch_get_traces(**kwargs), TraceCache()
+)
+
+# Most traces query_sampled_traces enriches with segment details
+MAX_DETAIL_TRACES = 20
+
+# query_sampled_traces output modes, and trace groups returned when aggregating
+TRACE_OUTPUT_AGGREGATE = 'aggregate'
+TRACE_OUTPUT_RAW = 'raw'
+TOP_TRACE_GROUPS = 10
+
+# Engine list_slis uses to decide which SLOs are breached
+SLI_ENGINE = os.environ.get('MCP_SLI_ENGINE', ENGINE_METRICS).lower()
+if SLI_ENGINE not in sli_evaluators:
+    logger.warning(f'Unknown MCP_SLI_ENGINE {SLI_ENGINE!r}, using {ENGINE_METRICS!r}')
+    SLI_ENGINE = ENGINE_METRICS
+
+
+def _sli_snapshot_compute(
+    catalog: ServiceCatalog, evaluators: Dict[str, Any]
+) -> Callable[[int], Awaitable[SLISnapshot]]:
+    """Return a coroutine function evaluating the fleet with ``catalog`` and ``evaluators``."""
+
+    async def compute(hours: int) -> SLISnapshot:
+        """Evaluate the SLI status of every service over the last ``hours`` hours."""
+        end_time = datetime.now(timezone.utc)
+        start_time = end_time - timedelta(hours=hours)
+        logger.debug(f'Time range: {start_time} to {end_time}')
+
+        services = await catalog.services(lookback_hours=hours)  # type: ignore
+        reports = []
+        if services:
+            # Evaluate all services' SLOs with batched requests of the configured engine
+            logger.debug(f'Generating SLI reports for {len(services)} services with {SLI_ENGINE}')
+            sli_reports = await evaluators[SLI_ENGINE].evaluate(services, hours)
+            reports = [
+                _sli_report_entry(service, sli_report, start_time, end_time)
+                for service, sli_report in zip(services, sli_reports)
+            ]
+        return SLISnapshot(
+            hours=hours,
+            generated_at=datetime.now(timezone.utc),
+            start_time=start_time,
+            end_time=end_time,
+            reports=reports,
+        )
+
+    return compute
+
+
+def _background_sli_snapshot_compute() -> Callable[[int], Awaitable[SLISnapshot]]:
+    """Return a fleet evaluation with its own service catalog and SLO inventory.
+
+    Scheduled refreshes run on the AsyncTaskMonitor thread's event loop; the
+    async caches the tools share belong to the server loop, so the background
+    job gets caches of its own.
+    """
+    inventory = _make_slo_inventory()
+    return _sli_snapshot_compute(
+        ServiceCatalog(lambda **kwargs: appsignals_client.list_services(**kwargs)),
+        _make_sli_evaluators(inventory),
+    )
+
+
+_compute_sli_snapshot = _sli_snapshot_compute(service_catalog, sli_evaluators)
+
+
+# Fleet SLI status precomputed in the background and served by list_slis
+sli_snapshots = SLISnapshotStore(_compute_sli_snapshot)
+
 
 def remove_null_values(data: dict) -> dict:
     """Remove keys with None values from a dictionary.
@@ -99,10 +226,7 @@ async def list_monitored_services() -> str:
 
         # Get all services
         logger.debug(f'Querying services for time range: {start_time} to {end_time}')
-        response = appsignals_client.list_services(
-            StartTime=start_time, EndTime=end_time, MaxResults=100
-        )
-        services = response.get('ServiceSummaries', [])
+        services = await service_catalog.services(lookback_hours=24)
         logger.debug(f'Retrieved {len(services)} services from Application Signals')
 
         if not services:
@@ -170,22 +294,8 @@ async def get_service_detail(
     logger.debug(f'Starting get_service_healthy_detail request for service: {service_name}')
 
     try:
-        # Calculate time range (last 24 hours)
-        end_time = datetime.now(timezone.utc)
-        start_time = end_time - timedelta(hours=24)
-
-        # First, get all services to find the one we want
-        services_response = appsignals_client.list_services(
-            StartTime=start_time, EndTime=end_time, MaxResults=100
-        )
-
         # Find the service with matching name
-        target_service = None
-        for service in services_response.get('ServiceSummaries', []):
-            key_attrs = service.get('KeyAttributes', {})
-            if key_attrs.get('Name') == service_name:
-                target_service = service
-                break
+        target_service = await service_catalog.find(service_name, lookback_hours=24)
 
         if not target_service:
             logger.warning(f"Service '{service_name}' not found in Application Signals")
@@ -193,8 +303,8 @@ async def get_service_detail(
 
         # Get detailed service information
         logger.debug(f'Getting detailed information for service: {service_name}')
-        service_response = appsignals_client.get_service(
-            StartTime=start_time, EndTime=end_time, KeyAttributes=target_service['KeyAttributes']
+        service_response = await service_detail_cache.get(
+            target_service['KeyAttributes'], lookback_hours=24
         )
 
         service_details = service_response['Service']
@@ -268,7 +378,7 @@ async def query_service_metrics(
     ),
     metric_name: str = Field(
         ...,
-        description='Specific metric name (e.g., Latency, Error, Fault). Leave empty to list available metrics',
+        description='Specific metric name (e.g., Latency, Error, Fault), or several comma-separated names (e.g., "Latency,Error,Fault") to fetch them in one batched request. Leave empty to list available metrics',
     ),
     statistic: str = Field(
         default='Average',
@@ -280,6 +390,14 @@ async def query_service_metrics(
     hours: int = Field(
         default=1, description='Number of hours to look back (default 1, max 168 for 1 week)'
     ),
+    period: Optional[int] = Field(
+        default=None,
+        description='Datapoint period in seconds (multiple of 60). Leave empty to choose one from the time range',
+    ),
+    max_points: Optional[int] = Field(
+        default=None,
+        description='Show the whole series downsampled to at most this many points (3 or more), keeping spikes. Leave empty to show only the 10 most recent values',
+    ),
 ) -> str:
     """Get CloudWatch metrics for a specific Application Signals service.
 
@@ -294,15 +412,23 @@ async def query_service_metrics(
     - 'Error': Percentage of failed requests
     - 'Fault': Percentage of server errors (5xx)
 
+    Pass several comma-separated names (e.g. 'Latency,Error,Fault') to get all of
+    them from a single batched GetMetricData request instead of one call each.
+
     Returns:
-    - Summary statistics (latest, average, min, max)
-    - Recent data points with timestamps
+    - Summary statistics (latest, average, min, max, median, p90, trend per hour)
+    - Recent data points with timestamps, or with max_points the whole series
+      downsampled (Largest-Triangle-Three-Buckets) so spikes remain visible
     - Both standard and percentile values when available
 
-    The tool automatically adjusts the granularity based on time range:
+    Unless a period is given, the tool adjusts the granularity based on time range:
     - Up to 3 hours: 1-minute resolution
     - Up to 24 hours: 5-minute resolution
     - Over 24 hours: 1-hour resolution
+
+    Windows longer than 1440 periods (e.g. a week at 1-minute resolution) are
+    fetched as concurrent sub-windows and stitched together, at the requested period.
+    Datapoints are cached, so repeating a query only fetches the newest minutes.
     """
     start_time_perf = timer()
     logger.info(
@@ -314,26 +440,16 @@ async def query_service_metrics(
         end_time = datetime.now(timezone.utc)
         start_time = end_time - timedelta(hours=hours)
 
-        # Get service details to find metrics
-        services_response = appsignals_client.list_services(
-            StartTime=start_time, EndTime=end_time, MaxResults=100
-        )
-
         # Find the target service
-        target_service = None
-        for service in services_response.get('ServiceSummaries', []):
-            key_attrs = service.get('KeyAttributes', {})
-            if key_attrs.get('Name') == service_name:
-                target_service = service
-                break
+        target_service = await service_catalog.find(service_name, lookback_hours=hours)
 
         if not target_service:
             logger.warning(f"Service '{service_name}' not found in Application Signals")
             return f"Service '{service_name}' not found in Application Signals."
 
         # Get detailed service info for metric references
-        service_response = appsignals_client.get_service(
-            StartTime=start_time, EndTime=end_time, KeyAttributes=target_service['KeyAttributes']
+        service_response = await service_detail_cache.get(
+            target_service['KeyAttributes'], lookback_hours=hours
         )
 
         metric_refs = service_response['Service'].get('MetricReferences', [])
@@ -352,6 +468,36 @@ async def query_service_metrics(
                 result += '\n'
             return result
 
+        if max_points is not None and max_points < 3:
+            return f'Invalid max_points {max_points}: must be at least 3.'
+
+        # Calculate appropriate period based on time range
+        if period:
+            if period < 60 or period % 60:
+                return f'Invalid period {period}: must be a positive multiple of 60 seconds.'
+        elif hours <= 3:
+            period = 60  # 1 minute
+        elif hours <= 24:
+            period = 300  # 5 minutes
+        else:
+            period = 3600  # 1 hour
+
+        # Several metrics requested: fetch them all in one batched request
+        metric_names = [name.strip() for name in metric_name.split(',') if name.strip()]
+        if len(metric_names) > 1:
+            return await _query_multiple_service_metrics(
+                service_name,
+                metric_names,
+                metric_refs,
+                statistic,
+                extended_statistic,
+                hours,
+                period,
+                start_time,
+                end_time,
+                max_points,
+            )
+
         # Find the specific metric
         target_metric = None
         for metric in metric_refs:
@@ -363,91 +509,51 @@ async def query_service_metrics(
             available = [m.get('MetricName', 'Unknown') for m in metric_refs]
             return f"Metric '{metric_name}' not found for service '{service_name}'. Available: {', '.join(available)}"
 
-        # Calculate appropriate period based on time range
-        if hours <= 3:
-            period = 60  # 1 minute
-        elif hours <= 24:
-            period = 300  # 5 minutes
-        else:
-            period = 3600  # 1 hour
+        # Get both standard and extended statistics, one call per 1440-datapoint window
+        # Only the parts of the window not fetched by earlier calls are requested
+        async def fetch(window_start: datetime, window_end: datetime) -> list:
+            return await get_metric_statistics_chunked(
+                cloudwatch_client.get_metric_statistics,
+                window_start,
+                window_end,
+                period,
+                Namespace=target_metric['Namespace'],
+                MetricName=target_metric['MetricName'],
+                Dimensions=target_metric.get('Dimensions', []),
+                Statistics=[statistic],  # type: ignore
+                ExtendedStatistics=[extended_statistic],
+            )
 
-        # Get both standard and extended statistics in a single call
-        response = cloudwatch_client.get_metric_statistics(
-            Namespace=target_metric['Namespace'],
-            MetricName=target_metric['MetricName'],
-            Dimensions=target_metric.get('Dimensions', []),
-            StartTime=start_time,
-            EndTime=end_time,
-            Period=period,
-            Statistics=[statistic],  # type: ignore
-            ExtendedStatistics=[extended_statistic],
+        datapoints = await metric_window_cache.get(
+            metric_key(
+                target_metric['Namespace'],
+                target_metric['MetricName'],
+                target_metric.get('Dimensions', []),
+                (statistic, extended_statistic),
+            ),
+            period,
+            start_time,
+            end_time,
+            fetch,
         )
 
-        datapoints = response.get('Datapoints', [])
-
         if not datapoints:
             logger.warning(
                 f"No data points found for metric '{metric_name}' on service '{service_name}' in the last {hours} hour(s)"
             )
             return f"No data points found for metric '{metric_name}' on service '{service_name}' in the last {hours} hour(s)."
 
-        # Sort by timestamp
-        datapoints.sort(key=lambda x: x.get('Timestamp', datetime.min))  # type: ignore
-
         # Build response
-        result = f'Metrics for {service_name} - {metric_name}\n'
-        result += f'Time Range: Last {hours} hour(s)\n'
-        result += f'Period: {period} seconds\n\n'
-
-        # Calculate summary statistics for both standard and extended statistics
-        standard_values = [dp.get(statistic) for dp in datapoints if dp.get(statistic) is not None]
-        extended_values = [
-            dp.get(extended_statistic)
-            for dp in datapoints
-            if dp.get(extended_statistic) is not None
-        ]
-
-        result += 'Summary:\n'
-
-        if standard_values:
-            latest_standard = datapoints[-1].get(statistic)
-            avg_of_standard = sum(standard_values) / len(standard_values)  # type: ignore
-            max_standard = max(standard_values)  # type: ignore
-            min_standard = min(standard_values)  # type: ignore
-
-            result += f'{statistic} Statistics:\n'
-            result += f'• Latest: {latest_standard:.2f}\n'
-            result += f'• Average: {avg_of_standard:.2f}\n'
-            result += f'• Maximum: {max_standard:.2f}\n'
-            result += f'• Minimum: {min_standard:.2f}\n\n'
-
-        if extended_values:
-            latest_extended = datapoints[-1].get(extended_statistic)
-            avg_extended = sum(extended_values) / len(extended_values)  # type: ignore
-            max_extended = max(extended_values)  # type: ignore
-            min_extended = min(extended_values)  # type: ignore
-
-            result += f'{extended_statistic} Statistics:\n'
-            result += f'• Latest: {latest_extended:.2f}\n'
-            result += f'• Average: {avg_extended:.2f}\n'
-            result += f'• Maximum: {max_extended:.2f}\n'
-            result += f'• Minimum: {min_extended:.2f}\n\n'
-
-        result += f'• Data Points: {len(datapoints)}\n\n'
-
-        # Show recent values (last 10) with both metrics
-        result += 'Recent Values:\n'
-        for dp in datapoints[-10:]:
-            timestamp = dp.get('Timestamp', datetime.min).strftime('%m/%d %H:%M')  # type: ignore
-            unit = dp.get('Unit', '')
-
-            values_str = []
-            if dp.get(statistic) is not None:
-                values_str.append(f'{statistic}: {dp[statistic]:.2f}')
-            if dp.get(extended_statistic) is not None:
-                values_str.append(f'{extended_statistic}: {dp[extended_statistic]:.2f}')
-
-            result += f'• {timestamp}: {", ".join(values_str)} {unit}\n'
+        result = _format_metric_datapoints(
+            service_name,
+            metric_name,
+            hours,
+            period,
+            datapoints,
+            statistic,
+            extended_statistic,
+            max_points,
+        )
 
         elapsed_time = timer() - start_time_perf
         logger.info(
@@ -470,6 +576,214 @@ async def query_service_metrics(
         return f'Error: {str(e)}'
 
 
+def _format_metric_datapoints(
+    service_name: str,
+    metric_name: str,
+    hours: int,
+    period: int,
+    datapoints: list,
+    statistic: str,
+    extended_statistic: str,
+    max_points: Optional[int] = None,
+) -> str:
+    """Format sorted datapoints of one metric as summary statistics and recent values.
+
+    With ``max_points``, the whole series is shown downsampled to that many
+    points instead of only the most recent values.
+    """
+    result = f'Metrics for {service_name} - {metric_name}\n'
+    result += f'Time Range: Last {hours} hour(s)\n'
+    result += f'Period: {period} seconds\n\n'
+
+    # Split datapoints into one series per statistic
+    series = {}
+    for stat in (statistic, extended_statistic):
+        points = [
+            (dp['Timestamp'], dp[stat])
+            for dp in datapoints
+            if dp.get(stat) is not None and 'Timestamp' in dp
+        ]
+        series[stat] = ([t for t, _ in points], [v for _, v in points])
+
+    result += 'Summary:\n'
+
+    for stat in (statistic, extended_statistic):
+        summary = summarize(*series[stat])
+        if summary is None:
+            continue
+        result += f'{stat} Statistics:\n'
+        result += f'• Latest: {summary.latest:.2f}\n'
+        result += f'• Average: {summary.mean:.2f}\n'
+        result += f'• Maximum: {summary.maximum:.2f}\n'
+        result += f'• Minimum: {summary.minimum:.2f}\n'
+        result += f'• Median: {summary.p50:.2f}, p90: {summary.p90:.2f}\n'
+        result += f'• Trend: {summary.slope_per_hour:+.2f} per hour\n\n'
+
+    result += f'• Data Points: {len(datapoints)}\n\n'
+
+    if max_points and len(datapoints) > max_points:
+        # Downsample the whole series, keeping the shape of the primary statistic
+        stat = statistic if series[statistic][1] else extended_statistic
+        timestamps, values = downsample(*series[stat], max_points)
+        result += (
+            f'Series ({len(timestamps)} of {len(series[stat][1])} points, shape-preserving):\n'
+        )
+        for timestamp, value in zip(timestamps, values):
+            result += f'• {timestamp.strftime("%m/%d %H:%M")}: {stat}: {value:.2f}\n'
+        return result
+
+    # Show recent values (last 10) with both metrics
+    result += 'Recent Values:\n'
+    for dp in datapoints[-10:]:
+        timestamp = dp.get('Timestamp', datetime.min).strftime('%m/%d %H:%M')  # type: ignore
+        unit = dp.get('Unit', '')
+
+        values_str = []
+        if dp.get(statistic) is not None:
+            values_str.append(f'{statistic}: {dp[statistic]:.2f}')
+        if dp.get(extended_statistic) is not None:
+            values_str.append(f'{extended_statistic}: {dp[extended_statistic]:.2f}')
+
+        result += f'• {timestamp}: {", ".join(values_str)} {unit}\n'
+
+    return result
+
+
+async def _query_multiple_service_metrics(
+    service_name: str,
+    metric_names: list,
+    metric_refs: list,
+    statistic: str,
+    extended_statistic: str,
+    hours: int,
+    period: int,
+    start_time: datetime,
+    end_time: datetime,
+    max_points: Optional[int] = None,
+) -> str:
+    """Fetch several metrics of one service with a single batched GetMetricData request."""
+    refs_by_name = {ref.get('MetricName'): ref for ref in metric_refs}
+    missing = [name for name in metric_names if name not in refs_by_name]
+    found = [name for name in metric_names if name in refs_by_name]
+    if not found:
+        available = [m.get('MetricName', 'Unknown') for m in metric_refs]
+        return (
+            f"Metrics {', '.join(metric_names)} not found for service '{service_name}'. "
+            f'Available: {", ".join(available)}'
+        )
+
+    # Each metric is loaded through the window cache; the ranges missing for all
+    # of them in one pass are fetched with a single batched GetMetricData request
+    batcher = QueryBatcher(metric_engine)
+    queries_made = 0
+
+    async def load(name: str) -> list:
+        ref = refs_by_name[name]
+        queries = [
+            MetricQuery(
+                id=query_id(index),
+                namespace=ref['Namespace'],
+                metric_name=ref['MetricName'],
+                stat=stat,
+                period=period,
+                dimensions=tuple(ref.get('Dimensions', [])),
+                label=f'{name} {stat}',
+            )
+            for index, stat in enumerate((statistic, extended_statistic))
+        ]
+
+        async def fetch(window_start: datetime, window_end: datetime) -> list:
+            nonlocal queries_made
+            queries_made += len(queries)
+            series = await batcher.fetch(queries, window_start, window_end)
+            # Merge the metric's statistics into datapoints keyed by timestamp
+            by_timestamp: Dict[datetime, Dict] = {}
+            for query in queries:
+                result = series[query.id]
+                for timestamp, value in zip(result.timestamps, result.values):
+                    by_timestamp.setdefault(timestamp, {'Timestamp': timestamp})[query.stat] = (
+                        value
+                    )
+            return [by_timestamp[timestamp] for timestamp in sorted(by_timestamp)]
+
+        # GetMetricData datapoints are flat, unlike GetMetricStatistics ones, so
+        # they are cached apart from the single-metric path
+        return await metric_window_cache.get(
+            metric_key(
+                ref['Namespace'],
+                ref['MetricName'],
+                ref.get('Dimensions', []),
+                (statistic, extended_statistic),
+            )
+            + ('GetMetricData',),
+            period,
+            start_time,
+            end_time,
+            fetch,
+        )
+
+    loaded = await asyncio.gather(*(load(name) for name in found))
+
+    sections = []
+    for name, datapoints in zip(found, loaded):
+        if not datapoints:
+            sections.append(
+                f"No data points found for metric '{name}' on service '{service_name}' in the last {hours} hour(s).\n"
+            )
+            continue
+        sections.append(
+            _format_metric_datapoints(
+                service_name,
+                name,
+                hours,
+                period,
+                datapoints,
+                statistic,
+                extended_statistic,
+                max_points,
+            )
+        )
+
+    result = '\n'.join(sections)
+    if missing:
+        result += f"\nMetrics not found for service '{service_name}': {', '.join(missing)}\n"
+    logger.info(
+        f"query_service_metrics fetched {len(found)} metrics for '{service_name}' "
+        f'with {queries_made} uncached queries'
+    )
+    return result
+
+
+def get_trace_summaries_page(
+    xray_client, start_time, end_time, filter_expression, next_token: Optional[str] = None
+) -> tuple[list, Optional[str]]:
+    """Get one page of trace summaries.
+
+    Args:
+        xray_client: Boto3 X-Ray client
+        start_time: Start time for trace query
+        end_time: End time for trace query
+        filter_expression: X-Ray filter expression
+        next_token: NextToken of the page to get, None for the first one
+
+    Returns:
+        Tuple of the trace summaries of the page and the NextToken of the following
+        page, None after the last one
+    """
+    kwargs = {
+        'StartTime': start_time,
+        'EndTime': end_time,
+        'FilterExpression': filter_expression,
+        'Sampling': True,
+        'TimeRangeType': 'Service',
+    }
+    if next_token:
+        kwargs['NextToken'] = next_token
+
+    response = xray_client.get_trace_summaries(**kwargs)
+    return response.get('TraceSummaries', []), response.get('NextToken')
+
+
 def get_trace_summaries_paginated(
     xray_client, start_time, end_time, filter_expression, max_traces: int = 100
 ) -> list:
@@ -493,30 +807,16 @@ def get_trace_summaries_paginated(
 
     try:
         while len(all_traces) < max_traces:
-            # Build request parameters
-            kwargs = {
-                'StartTime': start_time,
-                'EndTime': end_time,
-                'FilterExpression': filter_expression,
-                'Sampling': True,
-                'TimeRangeType': 'Service',
-            }
-
-            if next_token:
-                kwargs['NextToken'] = next_token
-
-            # Make request
-            response = xray_client.get_trace_summaries(**kwargs)
-
             # Add traces from this page
-            traces = response.get('TraceSummaries', [])
+            traces, next_token = get_trace_summaries_page(
+                xray_client, start_time, end_time, filter_expression, next_token
+            )
             all_traces.extend(traces)
             logger.debug(
                 f'Retrieved {len(traces)} traces in this page, total so far: {len(all_traces)}'
             )
 
             # Check if we have more pages
-            next_token = response.get('NextToken')
             if not next_token:
                 break
 
@@ -568,7 +868,7 @@ async def get_slo(
     logger.info(f'Starting get_service_level_objective request for SLO: {slo_id}')
 
     try:
-        response = appsignals_client.get_service_level_objective(Id=slo_id)
+        response = await run_sync(appsignals_client.get_service_level_objective, Id=slo_id)
         slo = response.get('Slo', {})
 
         if not slo:
@@ -833,8 +1133,10 @@ async def search_transaction_spans(
     )
     logger.debug(f'Query string: {query_string}')
 
-    # Check if transaction search is enabled
-    is_enabled, destination, status = check_transaction_search_enabled(AWS_REGION)
+    # Check if transaction search is enabled; re-check a cached "disabled" before refusing
+    is_enabled, destination, status = await transaction_search_status()
+    if not is_enabled:
+        is_enabled, destination, status = await transaction_search_status(max_staleness=0)
 
     if not is_enabled:
         logger.warning(
@@ -874,14 +1176,14 @@ async def search_transaction_spans(
         }
 
         logger.debug(f'Starting CloudWatch Logs query with limit: {limit}')
-        start_response = logs_client.start_query(**remove_null_values(kwargs))
+        start_response = await run_sync(logs_client.start_query, **remove_null_values(kwargs))
         query_id = start_response['queryId']
         logger.info(f'Started CloudWatch Logs query with ID: {query_id}')
 
         # Seconds
         poll_start = timer()
         while poll_start + max_timeout > timer():
-            response = logs_client.get_query_results(queryId=query_id)
+            response = await run_sync(logs_client.get_query_results, queryId=query_id)
             status = response['status']
 
             if status in {'Complete', 'Failed', 'Cancelled'}:
@@ -927,12 +1229,91 @@ async def search_transaction_spans(
         raise
 
 
+def _sli_report_entry(
+    service: Dict, sli_report: Optional[SLIReport], start_time: datetime, end_time: datetime
+) -> Dict:
+    """Convert a service's SLI report to the list_slis report format."""
+    if sli_report is None:
+        # Status could not be determined
+        return {
+            'BreachedSloCount': 0,
+            'BreachedSloNames': [],
+            'EndTime': end_time.timestamp(),
+            'OkSloCount': 0,
+            'ReferenceId': {'KeyAttributes': service['KeyAttributes']},
+            'SliStatus': 'INSUFFICIENT_DATA',
+            'StartTime': start_time.timestamp(),
+            'TotalSloCount': 0,
+        }
+    return {
+        'BreachedSloCount': sli_report.breached_slo_count,
+        'BreachedSloNames': sli_report.breached_slo_names,
+        'EndTime': sli_report.end_time.timestamp(),
+        'OkSloCount': sli_report.ok_slo_count,
+        'ReferenceId': {'KeyAttributes': service['KeyAttributes']},
+        'SliStatus': 'BREACHED' if sli_report.sli_status == 'CRITICAL' else sli_report.sli_status,
+        'StartTime': sli_report.start_time.timestamp(),
+        'TotalSloCount': sli_report.total_slo_count,
+    }
+
+
+def _session_key(ctx: Optional[Context]) -> Optional[Hashable]:
+    """Return a key identifying the MCP session of a tool call, if there is one."""
+    try:
+        return id(ctx.session) if ctx is not None else None
+    except Exception:
+        # Not called within a request
+        return None
+
+
+def _format_sli_diff(baseline: SLISnapshot, snapshot: SLISnapshot) -> str:
+    """Render only the services whose SLI status or breached SLOs changed since ``baseline``."""
+    changes = diff_snapshots(baseline, snapshot)
+    statuses = [report['SliStatus'] for report in snapshot.reports]
+
+    result = f'SLI Changes - Last {snapshot.hours} hours\n'
+    result += f'Generation: {snapshot.generation} (changes since {baseline.generation}, '
+    result += f'{(snapshot.generated_at - baseline.generated_at).total_seconds():.0f}s earlier)\n'
+    result += (
+        f'Services: {len(statuses)} total, {statuses.count("BREACHED")} breached, '
+        f'{statuses.count("OK")} OK, {statuses.count("INSUFFICIENT_DATA")} insufficient data\n\n'
+    )
+    if not changes:
+        return result + 'No SLI changes.\n'
+
+    result += f'{len(changes)} service(s) changed:\n'
+    for change in changes:
+        name = change.key_attributes.get('Name')
+        env = change.key_attributes.get('Environment')
+        before = change.before['SliStatus'] if change.before else 'NEW'
+        after = change.after['SliStatus'] if change.after else 'NO LONGER REPORTED'
+        result += f'• {name} ({env}): {before} → {after}\n'
+        if change.newly_breached:
+            result += f'  Newly breached SLOs: {", ".join(change.newly_breached)}\n'
+        if change.recovered:
+            result += f'  Recovered SLOs: {", ".join(change.recovered)}\n'
+    return result
+
+
 @mcp.tool()
 async def list_slis(
     hours: int = Field(
         default=24,
         description='Number of hours to look back (default 24, typically use 24 for daily checks)',
     ),
+    force_refresh: bool = Field(
+        default=False,
+        description='Evaluate every service now instead of returning the latest precomputed snapshot',
+    ),
+    diff: bool = Field(
+        default=False,
+        description='Return only services whose SLI status or breached SLOs changed since the last report this session received',
+    ),
+    since_generation: Optional[int] = Field(
+        default=None,
+        description='Return only services that changed since this report generation (shown in every report); implies diff',
+    ),
+    ctx: Context = None,  # type: ignore[assignment]
 ) -> str:
     """Get SLI (Service Level Indicator) status and SLO compliance for all services.
 
@@ -952,6 +1333,14 @@ async def list_slis(
     - List of healthy services
     - Services with insufficient data
 
+    The report usually comes from a snapshot refreshed in the background every few
+    minutes; its generation time is shown. Use force_refresh=True for a live evaluation,
+    e.g. to confirm a recovery right after a fix.
+
+    When checking repeatedly (e.g. during an incident), pass diff=True to get only the
+    services whose status or breached SLOs changed since the last report this session
+    received, or since_generation=<Generation of an earlier report>.
+
     This is the primary tool for health monitoring and should be used:
     - At the start of each day
     - During incident response
@@ -980,82 +1369,57 @@ async def list_slis(
     logger.info(f'Starting get_sli_status request for last {hours} hours')
 
     try:
-        # Calculate time range
-        end_time = datetime.now(timezone.utc)
-        start_time = end_time - timedelta(hours=hours)
-        logger.debug(f'Time range: {start_time} to {end_time}')
-
-        # Get all services
-        services_response = appsignals_client.list_services(
-            StartTime=start_time,  # type: ignore
-            EndTime=end_time,  # type: ignore
-            MaxResults=100,
-        )
-        services = services_response.get('ServiceSummaries', [])
-
-        if not services:
+        # Serve the latest background snapshot unless a live evaluation is asked for
+        snapshot = None if force_refresh else await sli_snapshots.latest(hours)
+        from_snapshot = snapshot is not None
+        if snapshot is None:
+            snapshot = await sli_snapshots.refresh(hours)
+
+        reports = snapshot.reports
+        start_time, end_time = snapshot.start_time, snapshot.end_time
+        if not reports:
             logger.warning('No services found in Application Signals')
             return 'No services found in Application Signals.'
 
-        # Get SLI reports for each service
-        reports = []
-        logger.debug(f'Generating SLI reports for {len(services)} services')
-        for service in services:
-            service_name = service['KeyAttributes'].get('Name', 'Unknown')
-            try:
-                # Create custom config with the service's key attributes
-                config = AWSConfig(
-                    region='us-east-1',
-                    period_in_hours=hours,
-                    service_name=service_name,
-                    key_attributes=service['KeyAttributes'],
-                )
-
-                # Generate SLI report
-                client = SLIReportClient(config)
-                sli_report = client.generate_sli_report()
-
-                # Convert to expected format
-                report = {
-                    'BreachedSloCount': sli_report.breached_slo_count,
-                    'BreachedSloNames': sli_report.breached_slo_names,
-                    'EndTime': sli_report.end_time.timestamp(),
-                    'OkSloCount': sli_report.ok_slo_count,
-                    'ReferenceId': {'KeyAttributes': service['KeyAttributes']},
-                    'SliStatus': 'BREACHED'
-                    if sli_report.sli_status == 'CRITICAL'
-                    else sli_report.sli_status,
-                    'StartTime': sli_report.start_time.timestamp(),
-                    'TotalSloCount': sli_report.total_slo_count,
-                }
-                reports.append(report)
-
-            except Exception as e:
-                # Log error but continue with other services
-                logger.error(
-                    f'Failed to get SLI report for service {service_name}: {str(e)}', exc_info=True
-                )
-                # Add a report with insufficient data status
-                report = {
-                    'BreachedSloCount': 0,
-                    'BreachedSloNames': [],
-                    'EndTime': end_time.timestamp(),
-                    'OkSloCount': 0,
-                    'ReferenceId': {'KeyAttributes': service['KeyAttributes']},
-                    'SliStatus': 'INSUFFICIENT_DATA',
-                    'StartTime': start_time.timestamp(),
-                    'TotalSloCount': 0,
-                }
-                reports.append(report)
+        # Diff mode: only what changed since a generation the caller has seen
+        session = _session_key(ctx)
+        diff_note = ''
+        if diff or since_generation is not None:
+            baseline_generation = (
+                since_generation
+                if since_generation is not None
+                else sli_snapshots.last_seen(session, hours)
+            )
+            baseline = (
+                sli_snapshots.generation(hours, baseline_generation)
+                if baseline_generation is not None
+                else None
+            )
+            if baseline is not None:
+                sli_snapshots.mark_seen(session, snapshot)
+                elapsed_time = timer() - start_time_perf
+                logger.info(f'get_sli_status diff completed in {elapsed_time:.3f}s')
+                return _format_sli_diff(baseline, snapshot)
+            diff_note = (
+                f'Generation {baseline_generation} is no longer available; full report follows\n'
+                if baseline_generation is not None
+                else 'No earlier report in this session to compare with; full report follows\n'
+            )
 
         # Check transaction search status
-        is_tx_search_enabled, tx_destination, tx_status = check_transaction_search_enabled(
-            AWS_REGION
-        )
+        is_tx_search_enabled, tx_destination, tx_status = await transaction_search_status()
 
         # Build response
-        result = f'SLI Status Report - Last {hours} hours\n'
-        result += f'Time Range: {start_time.strftime("%Y-%m-%d %H:%M")} - {end_time.strftime("%Y-%m-%d %H:%M")}\n\n'
+        result = diff_note
+        result += f'SLI Status Report - Last {hours} hours\n'
+        result += f'Generation: {snapshot.generation}\n'
+        result += f'Time Range: {start_time.strftime("%Y-%m-%d %H:%M")} - {end_time.strftime("%Y-%m-%d %H:%M")}\n'
+        if from_snapshot:
+            result += (
+                f'Snapshot generated {snapshot.generated_at.strftime("%Y-%m-%d %H:%M:%S")} UTC '
+                f'({snapshot.age():.0f}s ago); use force_refresh=True for a live evaluation\n'
+            )
+        result += '\n'
 
         # Add transaction search status
         if is_tx_search_enabled:
@@ -1117,9 +1481,10 @@ async def list_slis(
 
         # Remove the auto-investigation feature
 
+        sli_snapshots.mark_seen(session, snapshot)
         elapsed_time = timer() - start_time_perf
         logger.info(
-            f'get_sli_status completed in {elapsed_time:.3f}s - Total: {len(reports)}, Breached: {status_counts["BREACHED"]}, OK: {status_counts["OK"]}'
+            f'get_sli_status completed in {elapsed_time:.3f}s (snapshot: {from_snapshot}) - Total: {len(reports)}, Breached: {status_counts["BREACHED"]}, OK: {status_counts["OK"]}'
         )
         return result
 
@@ -1128,14 +1493,32 @@ async def list_slis(
         return f'Error getting SLI status: {str(e)}'
 
 
+# X-Ray clients of regions other than AWS_REGION, created on first use
+_regional_xray_clients: Dict[str, Any] = {}
+
+
+def _xray_client_for(region: str) -> Any:
+    """Return the X-Ray client of ``region``."""
+    if region == AWS_REGION:
+        return xray_client
+    client = _regional_xray_clients.get(region)
+    if client is None:
+        client = boto3.client('xray', region_name=region, config=config)
+        _regional_xray_clients[region] = client
+    return client
+
+
 def check_transaction_search_enabled(region: str = 'us-east-1') -> tuple[bool, str, str]:
     """Internal function to check if AWS X-Ray Transaction Search is enabled.
 
+    Args:
+        region: AWS region whose trace segment destination is checked
+
     Returns:
         tuple: (is_enabled: bool, destination: str, status: str)
     """
     try:
-        response = xray_client.get_trace_segment_destination()
+        response = _xray_client_for(region).get_trace_segment_destination()
 
         destination = response.get('Destination', 'Unknown')
         status = response.get('Status', 'Unknown')
@@ -1152,6 +1535,67 @@ def check_transaction_search_enabled(region: str = 'us-east-1') -> tuple[bool, s
         return False, 'Unknown', 'Error'
 
 
+CAPABILITY_TRANSACTION_SEARCH = 'transaction_search'
+
+
+def _check_transaction_search_capability(region: str = AWS_REGION) -> tuple[bool, str, str]:
+    """Check Transaction Search for the capability registry, raising so errors are not cached."""
+    result = check_transaction_search_enabled(region)
+    if result[2] == 'Error':
+        raise RuntimeError('Transaction Search status could not be determined')
+    return result
+
+
+# Account-level settings consulted on every call of several tools, checked once per TTL
+capabilities = CapabilityRegistry()
+capabilities.register(CAPABILITY_TRANSACTION_SEARCH, _check_transaction_search_capability)
+
+
+async def transaction_search_status(
+    max_staleness: Optional[float] = None,
+    region: str = AWS_REGION,
+) -> tuple[bool, str, str]:
+    """Return the cached Transaction Search status of ``region``.
+
+    Args:
+        max_staleness: Largest age in seconds of the cached status the caller accepts
+        region: AWS region to check; the server region shares the status warmed at startup
+
+    Returns:
+        tuple: (is_enabled: bool, destination: str, status: str)
+    """
+    args = () if region == AWS_REGION else (region,)
+    try:
+        return await capabilities.get(
+            CAPABILITY_TRANSACTION_SEARCH, *args, max_staleness=max_staleness
+        )
+    except Exception as e:
+        logger.error(f'Error checking transaction search status: {str(e)}')
+        return False, 'Unknown', 'Error'
+
+
+async def _add_trace_details(trace_summaries: list, count: int):
+    """Add a Details entry from the full trace to the ``count`` most relevant summaries."""
+    ranked = sorted(
+        trace_summaries,
+        key=lambda t: (
+            not t.get('HasFault'),
+            not t.get('HasError'),
+            not t.get('HasThrottle'),
+            -(t.get('Duration') or 0),
+        ),
+    )[:count]
+    try:
+        traces = await trace_details.fetch([t['Id'] for t in ranked if t.get('Id')])
+    except Exception as e:
+        logger.warning(f'Failed to fetch trace details: {e}')
+        return
+    for trace_data in ranked:
+        trace = traces.get(trace_data.get('Id'))
+        if trace is not None:
+            trace_data['Details'] = summarize_trace(trace)
+
+
 @mcp.tool()
 async def query_sampled_traces(
     start_time: Optional[str] = Field(
@@ -1167,6 +1611,14 @@ async def query_sampled_traces(
         description='X-Ray filter expression to narrow results (e.g., service("service-name"){fault = true})',
     ),
     region: str = Field(default='us-east-1', description='AWS region (default: us-east-1)'),
+    detail_traces: int = Field(
+        default=0,
+        description=f'Number of traces (faults, errors and slowest first, at most {MAX_DETAIL_TRACES}) to enrich with segment timings and exception stacks from the full trace',
+    ),
+    output: str = Field(
+        default=TRACE_OUTPUT_AGGREGATE,
+        description=f'"{TRACE_OUTPUT_AGGREGATE}" (default) returns trace groups with counts, duration percentiles and exemplar trace ids; "{TRACE_OUTPUT_RAW}" returns every trace summary',
+    ),
 ) -> str:
     """Query AWS X-Ray traces (5% sampled data) to investigate errors and performance issues.
 
@@ -1193,7 +1645,12 @@ async def query_sampled_traces(
     IMPORTANT: When investigating SLO breaches, use annotation filters with the specific dimension values
     from the breached metric (e.g., Operation, RemoteOperation) to find traces for that exact operation.
 
-    Returns JSON with trace summaries including:
+    By default traces are aggregated into groups by operation, outcome (fault/error/throttle/ok),
+    HTTP status, root-cause service and exception type. Each group has its trace count, duration
+    p50/p90/p99/max and the slowest trace ids as exemplars; faults, errors and throttles come first.
+    Use output="raw" for the individual trace summaries.
+
+    With output="raw", returns JSON with trace summaries including:
     - Trace ID for detailed investigation
     - Duration and response time
     - Error/fault/throttle status
@@ -1201,6 +1658,8 @@ async def query_sampled_traces(
     - Service interactions
     - User information if available
     - Exception root causes (ErrorRootCauses, FaultRootCauses, ResponseTimeRootCauses)
+    - With detail_traces > 0, a Details entry on the most relevant traces holding segment
+      timings and exception types, messages and top stack frames
 
     Best practices:
     - Start with recent time windows (last 1-3 hours)
@@ -1208,11 +1667,18 @@ async def query_sampled_traces(
     - Look for patterns in errors or very slow requests
 
     Returns:
-        JSON string containing trace summaries with error status, duration, and service details
+        JSON string containing trace groups, or trace summaries with error status, duration,
+        and service details
     """
     start_time_perf = timer()
     logger.info(f'Starting query_sampled_traces - region: {region}, filter: {filter_expression}')
 
+    if output not in (TRACE_OUTPUT_AGGREGATE, TRACE_OUTPUT_RAW):
+        return json.dumps(
+            {'error': f'Unknown output {output!r}, use {TRACE_OUTPUT_AGGREGATE!r} or {TRACE_OUTPUT_RAW!r}.'},
+            indent=2,
+        )
+
     try:
         logger.debug('Using X-Ray client')
 
@@ -1242,14 +1708,18 @@ async def query_sampled_traces(
                 indent=2,
             )
 
-        # Use pagination helper with a reasonable limit
-        traces = get_trace_summaries_paginated(
-            xray_client,
-            start_datetime,
-            end_datetime,
-            filter_expression or '',
-            max_traces=100,  # Limit to prevent response size issues
-        )
+        # Page through time slices concurrently so the sample covers the whole window
+        traces = [
+            trace
+            async for trace in iter_trace_summaries(
+                lambda slice_start, slice_end, next_token: get_trace_summaries_page(
+                    xray_client, slice_start, slice_end, filter_expression or '', next_token
+                ),
+                start_datetime,
+                end_datetime,
+                max_traces=100,  # Limit to prevent response size issues
+            )
+        ]
 
         # Convert response to JSON-serializable format
         def convert_datetime(obj):
@@ -1304,11 +1774,15 @@ async def query_sampled_traces(
                 trace_data[key] = convert_datetime(value)
             trace_summaries.append(trace_data)
 
+        if detail_traces and trace_summaries:
+            await _add_trace_details(trace_summaries, min(detail_traces, MAX_DETAIL_TRACES))
+
         # Check transaction search status
-        is_tx_search_enabled, tx_destination, tx_status = check_transaction_search_enabled(region)
+        is_tx_search_enabled, tx_destination, tx_status = await transaction_search_status(
+            region=region
+        )
 
         result_data = {
-            'TraceSummaries': trace_summaries,
             'TraceCount': len(trace_summaries),
             'Message': f'Retrieved {len(trace_summaries)} traces (limited to prevent size issues)',
             'SamplingNote': "⚠️ This data is from X-Ray's 5% sampling. Results may not show all errors or issues.",
@@ -1322,11 +1796,22 @@ async def query_sampled_traces(
             },
         }
 
+        if output == TRACE_OUTPUT_RAW:
+            result_data = {'TraceSummaries': trace_summaries, **result_data}
+        else:
+            result_data.update(aggregate_traces(traces, top_n=TOP_TRACE_GROUPS))
+            details = [trace['Details'] for trace in trace_summaries if 'Details' in trace]
+            if details:
+                result_data['TraceDetails'] = details
+
         elapsed_time = timer() - start_time_perf
         logger.info(
             f'query_sampled_traces completed in {elapsed_time:.3f}s - retrieved {len(trace_summaries)} traces'
         )
-        return json.dumps(result_data, indent=2)
+        if output == TRACE_OUTPUT_RAW:
+            return json.dumps(result_data, indent=2)
+        # Groups are meant to be compact, so skip the indentation as well
+        return json.dumps(result_data, separators=(',', ':'))
 
     except Exception as e:
         logger.error(f'Error in query_sampled_traces: {str(e)}', exc_info=True)
@@ -1364,7 +1849,7 @@ async def deploy_watcher(
         
         # Make request to GitHub API
         logger.debug(f'Requesting workflow data from GitHub API: {api_url}')
-        response = requests.get(api_url)
+        response = await run_sync(requests.get, api_url)
         
         if response.status_code != 200:
             error_message = f"GitHub API error: {response.status_code} - {response.text}"
@@ -1397,7 +1882,8 @@ async def deploy_watcher(
         logger.debug('Workflow complete, checking CloudWatch alarms')
         
         # Get all alarms in ALARM state
-        alarm_response = cloudwatch_client.describe_alarms(
+        alarm_response = await run_sync(
+            cloudwatch_client.describe_alarms,
             StateValue='ALARM',
             MaxRecords=100
         )
@@ -1473,7 +1959,8 @@ async def deploy_helper(
             import subprocess
             
             # Check if we're on the right branch
-            branch_check = subprocess.run(
+            branch_check = await run_sync(
+                subprocess.run,
                 ['git', 'rev-parse', '--abbrev-ref', 'HEAD'],
                 capture_output=True,
                 text=True,
@@ -1486,7 +1973,8 @@ async def deploy_helper(
                 result += f'⚠️ Warning: Currently on branch {current_branch}, not {branch}\n'
             
             # Get current commit SHA
-            sha_result = subprocess.run(
+            sha_result = await run_sync(
+                subprocess.run,
                 ['git', 'rev-parse', 'HEAD'],
                 capture_output=True,
                 text=True,
@@ -1496,7 +1984,8 @@ async def deploy_helper(
             
             # Push to remote
             logger.debug(f'Pushing to remote {remote} branch {current_branch}')
-            push_result = subprocess.run(
+            push_result = await run_sync(
+                subprocess.run,
                 ['git', 'push', remote, current_branch],
                 capture_output=True,
                 text=True
@@ -1577,16 +2066,22 @@ async def register_event(
             # Create the DynamoDB item
             # Use provided ID if available, otherwise use timestamp
             job_id = id[:8] if id else f'job_{int(datetime.now(timezone.utc).timestamp())}'
+
+            # Large prompts are stored compressed as Binary
+            encoded_prompt = encode_text(prompt)
             
             item = {
                 'job_id': {'S': job_id},
                 'status': {'S': "open"},
-                'prompt': {'S': prompt},
+                'prompt': {'B': encoded_prompt}
+                if isinstance(encoded_prompt, bytes)
+                else {'S': encoded_prompt},
                 'updated_at': {'S': timestamp}
             }
             
             # Put the item in the DynamoDB table
-            dynamodb_client.put_item(
+            await run_sync(
+                dynamodb_client.put_item,
                 TableName=table_name,
                 Item=item
             )
@@ -1664,14 +2159,18 @@ async def list_events(
                 'Limit': limit
             }
             
-            # Add status filter if provided
+            # Skip SLI snapshots stored in the same table; add status filter if provided
+            scan_params['FilterExpression'] = '#status <> :snapshot_val'
+            scan_params['ExpressionAttributeNames'] = {'#status': 'status'}
+            scan_params['ExpressionAttributeValues'] = {
+                ':snapshot_val': {'S': AsyncTaskMonitor.SNAPSHOT_STATUS}
+            }
             if status:
-                scan_params['FilterExpression'] = '#status = :status_val'
-                scan_params['ExpressionAttributeNames'] = {'#status': 'status'}
-                scan_params['ExpressionAttributeValues'] = {':status_val': {'S': status}}
+                scan_params['FilterExpression'] += ' AND #status = :status_val'
+                scan_params['ExpressionAttributeValues'][':status_val'] = {'S': status}
             
             # Scan the table
-            response = dynamodb_client.scan(**scan_params)
+            response = await run_sync(dynamodb_client.scan, **scan_params)
             
             items = response.get('Items', [])
             
@@ -1692,7 +2191,14 @@ async def list_events(
                     job_id = item.get('job_id', {}).get('S', 'Unknown')
                     item_status = item.get('status', {}).get('S', 'Unknown')
                     updated_at = item.get('updated_at', {}).get('S', 'Unknown')
-                    prompt = item.get('prompt', {}).get('S', '')
+                    prompt_attr = item.get('prompt', {})
+                    prompt = (
+                        decode_text(prompt_attr['B'])
+                        if 'B' in prompt_attr
+                        else prompt_attr.get('S', '')
+                    )
+                    if 'archived_at' in item:
+                        prompt = f"(archived {item['archived_at'].get('S', '')})"
                     
                     # Truncate prompt if too long
                     if len(prompt) > 100:
@@ -1762,7 +2268,8 @@ async def delete_event(
         
         try:
             # First check if the item exists
-            get_response = dynamodb_client.get_item(
+            get_response = await run_sync(
+                dynamodb_client.get_item,
                 TableName=table_name,
                 Key={'job_id': {'S': job_id}}
             )
@@ -1773,7 +2280,8 @@ async def delete_event(
                 return result
             
             # Delete the item
-            dynamodb_client.delete_item(
+            await run_sync(
+                dynamodb_client.delete_item,
                 TableName=table_name,
                 Key={'job_id': {'S': job_id}}
             )
@@ -1843,12 +2351,12 @@ async def update_event(
     
     try:
         # Initialize the async task monitor
-        monitor = AsyncTaskMonitor(region=AWS_REGION)
+        monitor = await run_sync(AsyncTaskMonitor, region=AWS_REGION)
         
         # Determine what to do based on the deployment status
         if workflow_status == "COMPLETE" and alarm_status == "SUCCESS":
             # Deployment successful - mark job as complete
-            success = monitor.update_task(job_id, {"status": "complete"})
+            success = await run_sync(monitor.update_task, job_id, {"status": "complete"})
             
             if success:
                 result = (
@@ -1894,6 +2402,24 @@ async def update_event(
 def main():
     """Run the MCP server."""
     logger.debug('Starting CloudWatch AppSignals MCP server')
+
+    # Check account-level capabilities off the request path
+    threading.Thread(
+        target=lambda: asyncio.run(capabilities.warm()), name='capability-warmup', daemon=True
+    ).start()
+
+    # Refresh the fleet SLI snapshot in the background; this monitor only runs
+    # periodic jobs, investigations are left to the job workers
+    snapshot_monitor = None
+    if sli_snapshots.enabled:
+        try:
+            snapshot_monitor = AsyncTaskMonitor(region=AWS_REGION, job_polling=False)
+            sli_snapshots.schedule(snapshot_monitor, compute=_background_sli_snapshot_compute())
+            snapshot_monitor.start()
+        except Exception as e:
+            logger.warning(f'SLI snapshots disabled, failed to start the scheduler: {e}')
+            snapshot_monitor = None
+
     try:
         mcp.run(transport='stdio')
     except KeyboardInterrupt:
@@ -1901,6 +2427,9 @@ def main():
     except Exception as e:
         logger.error(f'Server error: {e}', exc_info=True)
         raise
+    finally:
+        if snapshot_monitor is not None:
+            snapshot_monitor.stop(drain=False)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,216 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Shared, paginated and cached catalog of Application Signals services and their details."""
+
+import os
+from .aws_async import run_sync
+from .caching import AsyncTTLCache
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from loguru import logger
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class CatalogSnapshot:
+    """All services seen in one lookback window, with a name index."""
+
+    services: List[Dict[str, Any]]
+    start_time: datetime
+    end_time: datetime
+    by_name: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        """Build the name index; the first service listed wins on duplicate names."""
+        for service in self.services:
+            name = service.get('KeyAttributes', {}).get('Name')
+            if name is not None:
+                self.by_name.setdefault(name, service)
+
+    def find(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the service summary named ``name``, or None."""
+        return self.by_name.get(name)
+
+    def key_attributes(self, name: str) -> Optional[Dict[str, str]]:
+        """Return the KeyAttributes of the service named ``name``, or None."""
+        service = self.by_name.get(name)
+        return service['KeyAttributes'] if service is not None else None
+
+
+class ServiceCatalog:
+    """Pages through ``ListServices`` and caches the result per lookback window.
+
+    Snapshots are cached for ``ttl`` seconds and then served for up to
+    ``stale_ttl`` seconds while a background task refreshes them.
+    """
+
+    PAGE_SIZE = 100
+
+    def __init__(
+        self,
+        list_services: Callable[..., Dict[str, Any]],
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+    ):
+        """Initialize the catalog.
+
+        Args:
+            list_services: Blocking ``ListServices`` call (e.g. a boto3 client method)
+            ttl: Seconds a snapshot is served without refreshing; defaults to
+                MCP_SERVICE_CATALOG_TTL or 300
+            stale_ttl: Seconds an expired snapshot may still be served while it refreshes;
+                defaults to 4x ``ttl``
+        """
+        ttl = ttl if ttl is not None else float(os.environ.get('MCP_SERVICE_CATALOG_TTL', '300'))
+        self._list_services = list_services
+        self._cache: AsyncTTLCache[CatalogSnapshot] = AsyncTTLCache(
+            ttl=ttl,
+            stale_ttl=stale_ttl if stale_ttl is not None else ttl * 4,
+            name='service catalog',
+        )
+
+    async def snapshot(
+        self, lookback_hours: int = 24, max_staleness: Optional[float] = None
+    ) -> CatalogSnapshot:
+        """Return the services seen over the last ``lookback_hours`` hours.
+
+        Args:
+            lookback_hours: Length of the ListServices time window
+            max_staleness: Largest snapshot age in seconds the caller accepts
+        """
+        return await self._cache.get(
+            int(lookback_hours),
+            lambda: self._fetch(int(lookback_hours)),
+            max_staleness=max_staleness,
+        )
+
+    async def services(self, lookback_hours: int = 24) -> List[Dict[str, Any]]:
+        """Return every service summary seen over the last ``lookback_hours`` hours."""
+        return (await self.snapshot(lookback_hours)).services
+
+    async def find(self, name: str, lookback_hours: int = 24) -> Optional[Dict[str, Any]]:
+        """Return the service summary named ``name``, or None."""
+        return (await self.snapshot(lookback_hours)).find(name)
+
+    def invalidate(self):
+        """Drop every cached snapshot."""
+        self._cache.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache hit/miss counters."""
+        return self._cache.stats()
+
+    async def _fetch(self, lookback_hours: int) -> CatalogSnapshot:
+        end_time = datetime.now(timezone.utc)
+        start_time = end_time - timedelta(hours=lookback_hours)
+
+        services: List[Dict[str, Any]] = []
+        seen_tokens = set()
+        next_token = None
+        pages = 0
+        while True:
+            kwargs: Dict[str, Any] = {
+                'StartTime': start_time,
+                'EndTime': end_time,
+                'MaxResults': self.PAGE_SIZE,
+            }
+            if next_token:
+                kwargs['NextToken'] = next_token
+
+            response = await run_sync(self._list_services, **kwargs)
+            services.extend(response.get('ServiceSummaries', []))
+            pages += 1
+
+            next_token = response.get('NextToken')
+            if not next_token or next_token in seen_tokens:
+                break
+            seen_tokens.add(next_token)
+
+        logger.debug(
+            f'Service catalog loaded {len(services)} services in {pages} pages '
+            f'for the last {lookback_hours}h'
+        )
+        return CatalogSnapshot(services, start_time, end_time)
+
+
+class ServiceDetailCache:
+    """Caches ``GetService`` responses (metric and log group references) per service.
+
+    Lookback windows shorter than ``MIN_LOOKBACK_HOURS`` are widened to it, so
+    tools asking about the last hour and the last day share one entry.
+    """
+
+    MIN_LOOKBACK_HOURS = 24
+
+    def __init__(
+        self,
+        get_service: Callable[..., Dict[str, Any]],
+        ttl: Optional[float] = None,
+        max_entries: int = 512,
+    ):
+        """Initialize the cache.
+
+        Args:
+            get_service: Blocking ``GetService`` call (e.g. a boto3 client method)
+            ttl: Seconds a response is served from cache; defaults to
+                MCP_SERVICE_DETAIL_TTL or 900
+            max_entries: Maximum number of services kept, least recently used evicted first
+        """
+        ttl = ttl if ttl is not None else float(os.environ.get('MCP_SERVICE_DETAIL_TTL', '900'))
+        self._get_service = get_service
+        self._cache: AsyncTTLCache[Dict[str, Any]] = AsyncTTLCache(
+            ttl=ttl, max_entries=max_entries, name='service detail'
+        )
+
+    @staticmethod
+    def _key(key_attributes: Dict[str, str], lookback_hours: int) -> Tuple[Any, ...]:
+        return (tuple(sorted(key_attributes.items())), lookback_hours)
+
+    async def get(
+        self,
+        key_attributes: Dict[str, str],
+        lookback_hours: int = 24,
+        max_staleness: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Return the ``GetService`` response for the service with ``key_attributes``.
+
+        Args:
+            key_attributes: KeyAttributes identifying the service
+            lookback_hours: Length of the GetService time window
+            max_staleness: Largest response age in seconds the caller accepts (0 forces a call)
+        """
+        lookback_hours = max(int(lookback_hours), self.MIN_LOOKBACK_HOURS)
+
+        async def load() -> Dict[str, Any]:
+            end_time = datetime.now(timezone.utc)
+            start_time = end_time - timedelta(hours=lookback_hours)
+            return await run_sync(
+                self._get_service,
+                StartTime=start_time,
+                EndTime=end_time,
+                KeyAttributes=key_attributes,
+            )
+
+        return await self._cache.get(
+            self._key(key_attributes, lookback_hours), load, max_staleness=max_staleness
+        )
+
+    def invalidate(self):
+        """Drop every cached response."""
+        self._cache.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache hit/miss counters."""
+        return self._cache.stats()
@@ -16,10 +16,12 @@
 
 import boto3
 import logging
+from .metric_series import pack_timestamps, unpack_timestamps
+from array import array
 from botocore.exceptions import ClientError
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 
 # Initialize module logger
@@ -70,7 +72,7 @@ class AWSConfig:
             }
 
 
-@dataclass
+@dataclass(slots=True)
 class SLOSummary:
     """Data class representing a Service Level Objective summary.
 
@@ -89,17 +91,48 @@ class SLOSummary:
     created_time: datetime
 
 
-@dataclass
 class MetricDataResult:
-    """Data class holding CloudWatch metric data results.
+    """Class holding CloudWatch metric data results.
 
-    Attributes:
-        timestamps (List[datetime]): Timestamps of metric data points
-        values (List[float]): Corresponding metric values
+    Timestamps are stored as integer microseconds since the epoch and values as
+    doubles in compact arrays; the properties rebuild lists on access.
     """
 
-    timestamps: List[datetime]
-    values: List[float]
+    __slots__ = ('_timestamps', '_values', '_tzinfo')
+
+    def __init__(self, timestamps: Sequence[datetime], values: Sequence[float]):
+        """Initialize MetricDataResult with datapoint timestamps and values.
+
+        Args:
+            timestamps: Timestamps of metric data points
+            values: Corresponding metric values
+        """
+        self._timestamps, self._tzinfo = pack_timestamps(timestamps)
+        self._values = array('d', values)
+
+    @property
+    def timestamps(self) -> List[datetime]:
+        """Timestamps of metric data points."""
+        return unpack_timestamps(self._timestamps, self._tzinfo)
+
+    @property
+    def values(self) -> List[float]:
+        """Corresponding metric values."""
+        return self._values.tolist()
+
+    def __len__(self) -> int:
+        """Return the number of datapoints."""
+        return len(self._values)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare datapoints with another result."""
+        if not isinstance(other, MetricDataResult):
+            return NotImplemented
+        return self.timestamps == other.timestamps and self._values == other._values
+
+    def __repr__(self) -> str:
+        """Return a representation listing the datapoints."""
+        return f'MetricDataResult(timestamps={self.timestamps!r}, values={self.values!r})'
 
 
 class SLIReport:
@@ -109,6 +142,16 @@ class SLIReport:
     SLI status, and counts of total, successful, and breached SLOs.
     """
 
+    __slots__ = (
+        '_start_time',
+        '_end_time',
+        '_sli_status',
+        '_total_slo_count',
+        '_ok_slo_count',
+        '_breached_slo_count',
+        '_breached_slo_names',
+    )
+
     def __init__(
         self,
         start_time: datetime,
@@ -136,7 +179,7 @@ class SLIReport:
         self._total_slo_count = total_slo_count
         self._ok_slo_count = ok_slo_count
         self._breached_slo_count = breached_slo_count
-        self._breached_slo_names = breached_slo_names
+        self._breached_slo_names = tuple(breached_slo_names)
 
     # Property getters for all attributes
     @property
@@ -172,7 +215,7 @@ class SLIReport:
     @property
     def breached_slo_names(self) -> List[str]:
         """Names of SLOs that failed to meet their objectives."""
-        return self._breached_slo_names.copy()
+        return list(self._breached_slo_names)
 
 
 class SLIReportClient:
@@ -181,11 +224,18 @@ class SLIReportClient:
     Handles interaction with AWS services to collect and analyze SLO data.
     """
 
-    def __init__(self, config: AWSConfig):
+    def __init__(
+        self,
+        config: AWSConfig,
+        signals_client: Optional[Any] = None,
+        cloudwatch_client: Optional[Any] = None,
+    ):
         """Initialize SLIReportClient with AWS configuration.
 
         Args:
             config: AWSConfig instance containing region, period, and service settings
+            signals_client: Existing Application Signals client to use instead of creating one
+            cloudwatch_client: Existing CloudWatch client to use instead of creating one
 
         Raises:
             Exception: If AWS clients fail to initialize
@@ -196,9 +246,13 @@ class SLIReportClient:
         )
 
         try:
-            # Initialize AWS service clients
-            self.signals_client = boto3.client('application-signals', region_name=config.region)
-            self.cloudwatch_client = boto3.client('cloudwatch', region_name=config.region)
+            # Reuse the given AWS service clients, creating only the missing ones
+            self.signals_client = signals_client or boto3.client(
+                'application-signals', region_name=config.region
+            )
+            self.cloudwatch_client = cloudwatch_client or boto3.client(
+                'cloudwatch', region_name=config.region
+            )
             logger.debug('AWS clients initialized successfully')
         except Exception as e:
             logger.error(f'Failed to initialize AWS clients: {str(e)}', exc_info=True)
@@ -209,12 +263,20 @@ class SLIReportClient:
         logger.debug(f'Fetching SLO summaries for {self.config.service_name}')
 
         try:
-            response = self.signals_client.list_service_level_objectives(
-                KeyAttributes=self.config.key_attributes,
-                MetricSourceTypes=['ServiceOperation'],
-                IncludeLinkedAccounts=True,
-            )
-            logger.info(f'Retrieved {len(response.get("SloSummaries", []))} SLO summaries')
+            slo_summaries = []
+            kwargs: Dict[str, Any] = {
+                'KeyAttributes': self.config.key_attributes,
+                'MetricSourceTypes': ['ServiceOperation'],
+                'IncludeLinkedAccounts': True,
+            }
+            # Follow NextToken so services with many SLOs are not truncated
+            while True:
+                response = self.signals_client.list_service_level_objectives(**kwargs)
+                slo_summaries.extend(response['SloSummaries'])
+                if not response.get('NextToken'):
+                    break
+                kwargs['NextToken'] = response['NextToken']
+            logger.info(f'Retrieved {len(slo_summaries)} SLO summaries')
         except ClientError as e:
             error_msg = e.response.get('Error', {}).get('Message', 'Unknown error')
             error_code = e.response.get('Error', {}).get('Code', 'Unknown')
@@ -232,7 +294,7 @@ class SLIReportClient:
                 operation_name=slo.get('OperationName', 'N/A'),
                 created_time=slo.get('CreatedTime', datetime.now(timezone.utc)),
             )
-            for slo in response['SloSummaries']
+            for slo in slo_summaries
         ]
 
     def create_metric_queries(self, slo_summaries: List[SLOSummary]) -> List[Dict[str, Any]]:
@@ -321,7 +383,7 @@ class SLIReportClient:
 
         for i, result in enumerate(metric_results):
             # Check if we have any values and if the SLO is breached
-            if result.values and len(result.values) > 0 and result.values[0] > 0:
+            if len(result) > 0 and result.values[0] > 0:
                 breaching_slos.append(slo_summaries[i].name)
             else:
                 healthy_slos.append(slo_summaries[i].name)
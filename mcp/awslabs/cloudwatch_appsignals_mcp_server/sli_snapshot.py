@@ -0,0 +1,288 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Precomputed fleet SLI snapshots served by list_slis.
+
+A periodic job on the AsyncTaskMonitor scheduler evaluates the SLI status of
+the whole fleet and keeps the result in memory and in the job table, so
+list_slis answers from the latest snapshot instead of evaluating every
+service on each call. The job table copy lets a restarted server answer
+before its first refresh has finished.
+
+Each snapshot has a generation number. Recent generations are kept, along
+with the generation each session last received, so a repeated check can be
+answered with only the services that changed since then.
+"""
+
+import json
+import os
+from .async_monitor import AsyncTaskMonitor
+from .aws_async import run_sync
+from .slo_inventory import ServiceKey, service_key
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from loguru import logger
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+@dataclass
+class SLISnapshot:
+    """SLI report entries of every service, as of ``generated_at``."""
+
+    hours: int
+    generated_at: datetime
+    start_time: datetime
+    end_time: datetime
+    reports: List[Dict[str, Any]]
+
+    @property
+    def generation(self) -> int:
+        """Generation number: the generation time in epoch milliseconds."""
+        return int(self.generated_at.timestamp() * 1000)
+
+    def age(self, now: Optional[datetime] = None) -> float:
+        """Return the snapshot age in seconds."""
+        return ((now or datetime.now(timezone.utc)) - self.generated_at).total_seconds()
+
+    def to_json(self) -> str:
+        """Serialize the snapshot for the job table."""
+        data = asdict(self)
+        for name in ('generated_at', 'start_time', 'end_time'):
+            data[name] = data[name].isoformat()
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, text: str) -> 'SLISnapshot':
+        """Deserialize a snapshot written by to_json()."""
+        data = json.loads(text)
+        for name in ('generated_at', 'start_time', 'end_time'):
+            data[name] = datetime.fromisoformat(data[name])
+        return cls(**data)
+
+
+@dataclass
+class SLIChange:
+    """Change of one service's SLI status between two snapshots."""
+
+    key_attributes: Dict[str, str]
+    before: Optional[Dict[str, Any]]
+    after: Optional[Dict[str, Any]]
+
+    @property
+    def newly_breached(self) -> List[str]:
+        """SLOs breached now that were not breached before."""
+        before = set(self.before['BreachedSloNames']) if self.before else set()
+        return [
+            name for name in (self.after or {}).get('BreachedSloNames', []) if name not in before
+        ]
+
+    @property
+    def recovered(self) -> List[str]:
+        """SLOs breached before that are not breached now."""
+        after = set(self.after['BreachedSloNames']) if self.after else set()
+        return [
+            name for name in (self.before or {}).get('BreachedSloNames', []) if name not in after
+        ]
+
+
+def _by_service(snapshot: SLISnapshot) -> 'OrderedDict[ServiceKey, Dict[str, Any]]':
+    return OrderedDict(
+        (service_key(report['ReferenceId']['KeyAttributes']), report)
+        for report in snapshot.reports
+    )
+
+
+def diff_snapshots(before: SLISnapshot, after: SLISnapshot) -> List[SLIChange]:
+    """Return the services whose status or breached SLO set differs between two snapshots.
+
+    Services that appeared or disappeared are included with ``before`` or
+    ``after`` set to None.
+    """
+    old, new = _by_service(before), _by_service(after)
+    changes = []
+    for key, report in new.items():
+        previous = old.get(key)
+        if (
+            previous is None
+            or previous['SliStatus'] != report['SliStatus']
+            or set(previous['BreachedSloNames']) != set(report['BreachedSloNames'])
+        ):
+            changes.append(SLIChange(report['ReferenceId']['KeyAttributes'], previous, report))
+    for key, previous in old.items():
+        if key not in new:
+            changes.append(SLIChange(previous['ReferenceId']['KeyAttributes'], previous, None))
+    return changes
+
+
+class SLISnapshotStore:
+    """Keeps the latest fleet SLI snapshot and refreshes it on a schedule."""
+
+    JOB_ID_PREFIX = 'sli-snapshot-'
+
+    # Generations kept per look-back period for diffs, and sessions remembered
+    HISTORY_SIZE = 32
+    MAX_SESSIONS = 1024
+
+    def __init__(
+        self,
+        compute: Callable[[int], Awaitable[SLISnapshot]],
+        hours: Optional[int] = None,
+        interval: Optional[float] = None,
+        max_age: Optional[float] = None,
+    ):
+        """Initialize the store.
+
+        Args:
+            compute: Coroutine function evaluating the fleet over the given hours
+            hours: Look-back period of the scheduled snapshot; defaults to
+                MCP_SLI_SNAPSHOT_HOURS or 24
+            interval: Seconds between scheduled refreshes; defaults to
+                MCP_SLI_SNAPSHOT_INTERVAL or 300, 0 disables snapshots
+            max_age: Oldest snapshot in seconds that is still served; defaults to
+                twice the interval
+        """
+        self._compute = compute
+        self.hours = (
+            hours if hours is not None else int(os.environ.get('MCP_SLI_SNAPSHOT_HOURS', '24'))
+        )
+        self.interval = (
+            interval
+            if interval is not None
+            else float(os.environ.get('MCP_SLI_SNAPSHOT_INTERVAL', '300'))
+        )
+        self.max_age = max_age if max_age is not None else 2 * self.interval
+        self.monitor: Optional[AsyncTaskMonitor] = None
+        self._scheduled_compute: Optional[Callable[[int], Awaitable[SLISnapshot]]] = None
+        self._snapshots: Dict[int, SLISnapshot] = {}
+        self._history: Dict[int, 'OrderedDict[int, SLISnapshot]'] = {}
+        self._seen: 'OrderedDict[Hashable, Dict[int, int]]' = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether snapshots are refreshed and served at all."""
+        return self.interval > 0
+
+    async def latest(self, hours: int) -> Optional[SLISnapshot]:
+        """Return the newest snapshot over ``hours`` hours if it is recent enough to serve."""
+        if not self.enabled:
+            return None
+        snapshot = self._snapshots.get(hours)
+        if snapshot is None and self.monitor is not None and hours == self.hours:
+            snapshot = await self._load(hours)
+        if snapshot is None or snapshot.age() > self.max_age:
+            return None
+        return snapshot
+
+    def put(self, snapshot: SLISnapshot):
+        """Keep ``snapshot`` in the history, and as the latest if it is newer than the one held."""
+        current = self._snapshots.get(snapshot.hours)
+        if current is None or snapshot.generated_at >= current.generated_at:
+            self._snapshots[snapshot.hours] = snapshot
+
+        history = self._history.setdefault(snapshot.hours, OrderedDict())
+        history[snapshot.generation] = snapshot
+        while len(history) > self.HISTORY_SIZE:
+            history.popitem(last=False)
+
+    def generation(self, hours: int, generation: int) -> Optional[SLISnapshot]:
+        """Return a kept snapshot over ``hours`` hours by generation number."""
+        return self._history.get(hours, {}).get(generation)
+
+    def last_seen(self, session: Optional[Hashable], hours: int) -> Optional[int]:
+        """Return the generation over ``hours`` hours that ``session`` last received."""
+        if session is None:
+            return None
+        return self._seen.get(session, {}).get(hours)
+
+    def mark_seen(self, session: Optional[Hashable], snapshot: SLISnapshot):
+        """Remember that ``session`` received ``snapshot``."""
+        if session is None:
+            return
+        self._seen.setdefault(session, {})[snapshot.hours] = snapshot.generation
+        self._seen.move_to_end(session)
+        while len(self._seen) > self.MAX_SESSIONS:
+            self._seen.popitem(last=False)
+
+    async def refresh(
+        self,
+        hours: Optional[int] = None,
+        compute: Optional[Callable[[int], Awaitable[SLISnapshot]]] = None,
+    ) -> SLISnapshot:
+        """Evaluate the fleet now, keep the snapshot and write it to the job table.
+
+        Args:
+            hours: Look-back period; defaults to the scheduled period
+            compute: Fleet evaluation to use instead of the store's own
+        """
+        hours = hours if hours is not None else self.hours
+        snapshot = await (compute or self._compute)(hours)
+        latest = self._snapshots.get(hours)
+        if latest is not None and snapshot.generation <= latest.generation:
+            # Generations are epoch milliseconds; keep them unique for back-to-back refreshes
+            snapshot.generated_at = latest.generated_at + timedelta(milliseconds=1)
+        self.put(snapshot)
+        if self.monitor is not None:
+            try:
+                await run_sync(self.monitor.put_snapshot, self._job_id(hours), snapshot.to_json())
+            except Exception as e:
+                logger.warning(f'Failed to store SLI snapshot in the job table: {e}')
+        logger.info(f'SLI snapshot over {hours}h refreshed with {len(snapshot.reports)} services')
+        return snapshot
+
+    def schedule(
+        self,
+        monitor: AsyncTaskMonitor,
+        compute: Optional[Callable[[int], Awaitable[SLISnapshot]]] = None,
+    ):
+        """Refresh the snapshot on ``monitor``'s scheduler, starting right away.
+
+        Args:
+            monitor: Monitor whose scheduler runs the refreshes
+            compute: Fleet evaluation used by the scheduled refreshes; they run on
+                the monitor's event loop, so pass one that does not share async
+                caches with the server loop. Defaults to the store's own.
+        """
+        self.monitor = monitor
+        self._scheduled_compute = compute
+        monitor.add_periodic_job(
+            'sli_snapshot', self._scheduled_refresh, self.interval, run_now=True
+        )
+
+    def invalidate(self):
+        """Drop every snapshot and session held in memory."""
+        self._snapshots.clear()
+        self._history.clear()
+        self._seen.clear()
+
+    async def _scheduled_refresh(self):
+        try:
+            await self.refresh(compute=self._scheduled_compute)
+        except Exception as e:
+            logger.error(f'Scheduled SLI snapshot refresh failed: {e}')
+
+    async def _load(self, hours: int) -> Optional[SLISnapshot]:
+        try:
+            content = await run_sync(self.monitor.get_snapshot, self._job_id(hours))
+        except Exception as e:
+            logger.warning(f'Failed to read SLI snapshot from the job table: {e}')
+            return None
+        if content is None:
+            return None
+        snapshot = SLISnapshot.from_json(content)
+        self.put(snapshot)
+        return snapshot
+
+    def _job_id(self, hours: int) -> str:
+        return f'{self.JOB_ID_PREFIX}{hours}h'
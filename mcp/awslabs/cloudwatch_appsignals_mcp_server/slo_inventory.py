@@ -0,0 +1,175 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cached inventory of every service level objective in the account.
+
+One paged ``ListServiceLevelObjectives`` sweep replaces a filtered call per
+service; the summaries are grouped locally by the KeyAttributes of the
+service they belong to, so per-service lookups are in memory. Only the name
+and ARN of each SLO are kept, as slotted records; the raw summaries are
+dropped page by page.
+"""
+
+import os
+from .aws_async import run_sync
+from .caching import AsyncTTLCache
+from dataclasses import dataclass
+from loguru import logger
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Type, Name, Environment and AwsAccountId of a service
+ServiceKey = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+
+
+def service_key(key_attributes: Dict[str, str]) -> ServiceKey:
+    """Return the index key of the service identified by ``key_attributes``.
+
+    The account is part of the key so that services of the same name and
+    environment in different linked accounts stay apart.
+    """
+    return (
+        key_attributes.get('Type'),
+        key_attributes.get('Name'),
+        key_attributes.get('Environment'),
+        key_attributes.get('AwsAccountId'),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class SLOEntry:
+    """Name and ARN of one SLO."""
+
+    name: str
+    arn: Optional[str] = None
+
+
+class SLOSnapshot:
+    """All SLOs from one sweep, indexed by service and then by account."""
+
+    __slots__ = ('count', 'by_service')
+
+    def __init__(self, slos: Iterable[Dict[str, Any]] = ()):
+        """Initialize the snapshot.
+
+        Args:
+            slos: SLO summaries as returned by ListServiceLevelObjectives
+        """
+        self.count = 0
+        self.by_service: Dict[Tuple[Optional[str], ...], Dict[Optional[str], List[SLOEntry]]] = {}
+        self.add(slos)
+
+    def add(self, slos: Iterable[Dict[str, Any]]):
+        """Index SLO summaries by the KeyAttributes of their service."""
+        for slo in slos:
+            self.count += 1
+            key_attributes = slo.get('KeyAttributes')
+            if key_attributes:
+                *service, account = service_key(key_attributes)
+                accounts = self.by_service.setdefault(tuple(service), {})
+                accounts.setdefault(account, []).append(SLOEntry(slo['Name'], slo.get('Arn')))
+
+    def for_service(self, key_attributes: Dict[str, str]) -> List[SLOEntry]:
+        """Return the SLOs of the service identified by ``key_attributes``.
+
+        With an AwsAccountId, only that account's SLOs and those recorded
+        without an account match; without one, the service cannot be told
+        apart by account and the SLOs of every account match.
+        """
+        *service, account = service_key(key_attributes)
+        accounts = self.by_service.get(tuple(service))
+        if not accounts:
+            return []
+        if account is None:
+            return [slo for slos in accounts.values() for slo in slos]
+        return accounts.get(account, []) + accounts.get(None, [])
+
+
+class SLOInventory:
+    """Pages through ``ListServiceLevelObjectives`` once and caches the result."""
+
+    PAGE_SIZE = 50
+    _KEY = 'slos'
+
+    def __init__(
+        self,
+        list_service_level_objectives: Callable[..., Dict[str, Any]],
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+    ):
+        """Initialize the inventory.
+
+        Args:
+            list_service_level_objectives: Blocking ``ListServiceLevelObjectives`` call
+            ttl: Seconds a sweep is served without refreshing; defaults to
+                MCP_SLO_INVENTORY_TTL or 300
+            stale_ttl: Seconds an expired sweep may still be served while it refreshes;
+                defaults to 4x ``ttl``
+        """
+        ttl = ttl if ttl is not None else float(os.environ.get('MCP_SLO_INVENTORY_TTL', '300'))
+        self._list_service_level_objectives = list_service_level_objectives
+        self._cache: AsyncTTLCache[SLOSnapshot] = AsyncTTLCache(
+            ttl=ttl,
+            stale_ttl=stale_ttl if stale_ttl is not None else ttl * 4,
+            name='SLO inventory',
+        )
+
+    async def snapshot(self, max_staleness: Optional[float] = None) -> SLOSnapshot:
+        """Return every SLO summary in the account.
+
+        Args:
+            max_staleness: Largest snapshot age in seconds the caller accepts
+        """
+        return await self._cache.get(self._KEY, self._fetch, max_staleness=max_staleness)
+
+    async def for_service(self, key_attributes: Dict[str, str]) -> List[SLOEntry]:
+        """Return the SLOs of the service identified by ``key_attributes``."""
+        return (await self.snapshot()).for_service(key_attributes)
+
+    def invalidate(self):
+        """Drop the cached sweep."""
+        self._cache.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache hit/miss counters."""
+        return self._cache.stats()
+
+    async def _fetch(self) -> SLOSnapshot:
+        snapshot = SLOSnapshot()
+        seen_tokens = set()
+        next_token = None
+        pages = 0
+        while True:
+            kwargs: Dict[str, Any] = {
+                'MetricSourceTypes': ['ServiceOperation'],
+                'IncludeLinkedAccounts': True,
+                'MaxResults': self.PAGE_SIZE,
+            }
+            if next_token:
+                kwargs['NextToken'] = next_token
+
+            response = await run_sync(self._list_service_level_objectives, **kwargs)
+            snapshot.add(response.get('SloSummaries', []))
+            pages += 1
+
+            next_token = response.get('NextToken')
+            if not next_token or next_token in seen_tokens:
+                break
+            seen_tokens.add(next_token)
+
+        logger.debug(
+            f'SLO inventory loaded {snapshot.count} SLOs of {len(snapshot.by_service)} services '
+            f'in {pages} pages'
+        )
+        return snapshot
@@ -0,0 +1,214 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Token estimates, budgets and usage reports for LLM investigations.
+
+Token counts are estimates (about four ASCII characters per token, one token
+per non-ASCII character); they are meant for budgeting and comparison, not
+billing.
+"""
+
+import os
+import re
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+
+# Job attributes holding cumulative usage
+PROMPT_TOKENS_ATTR = 'prompt_tokens'
+RESPONSE_TOKENS_ATTR = 'response_tokens'
+LLM_CALLS_ATTR = 'llm_calls'
+
+# Type recorded for jobs created without one (e.g. via register_event)
+DEFAULT_INVESTIGATION_TYPE = 'event'
+
+# Budget decisions
+BUDGET_OK = 'ok'
+BUDGET_COMPACT = 'compact'
+BUDGET_STOP = 'stop'
+BUDGET_DEFER = 'defer'
+
+_ENTRY_MARKER = '\n\n--- '
+_LOG_HEADER = 'Investigation Log:\n'
+_FINDING_RE = re.compile(r'^- ([^:\n]+): (.*)$', re.MULTILINE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in ``text``."""
+    if not text:
+        return 0
+    non_ascii = len(text) - len(text.encode('ascii', 'ignore'))
+    return (len(text) - non_ascii + 3) // 4 + non_ascii
+
+
+def compact_prompt(prompt: str, keep_entries: int = 2) -> str:
+    """Collapse all but the last ``keep_entries`` log entries of an investigation prompt.
+
+    The question and initial context are kept verbatim. Older entries are
+    replaced by a single summary holding the latest value of each finding
+    they reported, so the investigation keeps its facts but not its history.
+    """
+    header_end = prompt.find(_LOG_HEADER)
+    if header_end < 0:
+        return prompt
+    header_end += len(_LOG_HEADER)
+    header, log = prompt[:header_end], prompt[header_end:]
+
+    entries = log.split(_ENTRY_MARKER)
+    preamble, entries = entries[0], [_ENTRY_MARKER + entry for entry in entries[1:]]
+    if len(entries) <= keep_entries:
+        return prompt
+
+    older, recent = entries[: len(entries) - keep_entries], entries[len(entries) - keep_entries :]
+    findings: Dict[str, str] = {}
+    for entry in older:
+        for key, value in _FINDING_RE.findall(entry):
+            findings[key.strip()] = value.strip()
+
+    summary = f'\n\n--- compacted {len(older)} earlier iterations ---\n'
+    if findings:
+        summary += 'Findings:\n' + ''.join(f'- {k}: {v}\n' for k, v in findings.items())
+    return header + preamble + summary + ''.join(recent)
+
+
+class TokenBudget:
+    """Per-job and rolling global token budgets for investigations.
+
+    A job whose next iteration would overrun its budget first has its prompt
+    compacted; if it still does not fit, the job is stopped. When the global
+    budget for the rolling window is spent, iterations are deferred until
+    usage ages out of the window.
+    """
+
+    def __init__(
+        self,
+        clock: Any,
+        job_budget: int = 0,
+        global_budget: int = 0,
+        window_seconds: float = 86400.0,
+        compact_keep_entries: int = 2,
+    ):
+        """Initialize the budget.
+
+        Args:
+            clock: Time source providing ``monotonic()``
+            job_budget: Maximum tokens per investigation (0 for unlimited)
+            global_budget: Maximum tokens across investigations per window (0 for unlimited)
+            window_seconds: Length of the rolling global window
+            compact_keep_entries: Log entries kept verbatim when compacting a prompt
+        """
+        self.clock = clock
+        self.job_budget = job_budget
+        self.global_budget = global_budget
+        self.window_seconds = window_seconds
+        self.compact_keep_entries = compact_keep_entries
+        self._lock = threading.Lock()
+        self._usage: Deque[Tuple[float, int]] = deque()
+        self._window_total = 0
+
+    @classmethod
+    def from_env(cls, clock: Any) -> 'TokenBudget':
+        """Build a budget from LLM_JOB_TOKEN_BUDGET and LLM_GLOBAL_TOKEN_* env vars."""
+        return cls(
+            clock,
+            job_budget=int(os.environ.get('LLM_JOB_TOKEN_BUDGET', '0')),
+            global_budget=int(os.environ.get('LLM_GLOBAL_TOKEN_BUDGET', '0')),
+            window_seconds=float(os.environ.get('LLM_GLOBAL_TOKEN_WINDOW_SECONDS', '86400')),
+        )
+
+    def check(self, job: Dict[str, Any], prompt: str) -> str:
+        """Decide whether the next iteration of ``job`` with ``prompt`` may run.
+
+        Returns:
+            BUDGET_OK, BUDGET_COMPACT (prompt should be compacted first),
+            BUDGET_STOP (job budget exhausted) or BUDGET_DEFER (global budget spent)
+        """
+        if self.global_budget and self.window_usage() >= self.global_budget:
+            return BUDGET_DEFER
+        if not self.job_budget:
+            return BUDGET_OK
+
+        used = job_tokens(job)
+        needed = estimate_tokens(prompt)
+        if used + needed <= self.job_budget:
+            return BUDGET_OK
+        compacted = compact_prompt(prompt, self.compact_keep_entries)
+        if compacted != prompt and used + estimate_tokens(compacted) <= self.job_budget:
+            return BUDGET_COMPACT
+        return BUDGET_STOP
+
+    def record(self, tokens: int):
+        """Add ``tokens`` to the rolling global usage."""
+        with self._lock:
+            self._usage.append((self.clock.monotonic(), tokens))
+            self._window_total += tokens
+
+    def window_usage(self) -> int:
+        """Return tokens used within the rolling window."""
+        cutoff = self.clock.monotonic() - self.window_seconds
+        with self._lock:
+            while self._usage and self._usage[0][0] < cutoff:
+                self._window_total -= self._usage.popleft()[1]
+            return self._window_total
+
+
+def job_tokens(job: Dict[str, Any]) -> int:
+    """Return the cumulative prompt and response tokens recorded on ``job``."""
+    return int(job.get(PROMPT_TOKENS_ATTR, 0)) + int(job.get(RESPONSE_TOKENS_ATTR, 0))
+
+
+def aggregate_token_usage(jobs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate recorded token usage by investigation type, most expensive first."""
+    by_type: Dict[str, Dict[str, Any]] = {}
+    for job in jobs:
+        inv_type = job.get('investigation_type') or DEFAULT_INVESTIGATION_TYPE
+        row = by_type.setdefault(
+            inv_type,
+            {
+                'investigation_type': inv_type,
+                'jobs': 0,
+                'llm_calls': 0,
+                'prompt_tokens': 0,
+                'response_tokens': 0,
+                'max_job_tokens': 0,
+            },
+        )
+        row['jobs'] += 1
+        row['llm_calls'] += int(job.get(LLM_CALLS_ATTR, 0))
+        row['prompt_tokens'] += int(job.get(PROMPT_TOKENS_ATTR, 0))
+        row['response_tokens'] += int(job.get(RESPONSE_TOKENS_ATTR, 0))
+        row['max_job_tokens'] = max(row['max_job_tokens'], job_tokens(job))
+
+    rows = list(by_type.values())
+    for row in rows:
+        row['total_tokens'] = row['prompt_tokens'] + row['response_tokens']
+        row['avg_job_tokens'] = row['total_tokens'] // row['jobs']
+    rows.sort(key=lambda row: row['total_tokens'], reverse=True)
+    return rows
+
+
+def format_token_report(rows: List[Dict[str, Any]], top: Optional[int] = None) -> str:
+    """Render rows from ``aggregate_token_usage`` as a text table."""
+    lines = [
+        f'{"type":<24} {"jobs":>6} {"calls":>7} {"prompt":>11} {"response":>10} '
+        f'{"total":>11} {"avg/job":>9} {"max/job":>9}'
+    ]
+    for row in rows[:top] if top else rows:
+        lines.append(
+            f'{row["investigation_type"][:24]:<24} {row["jobs"]:>6} {row["llm_calls"]:>7} '
+            f'{row["prompt_tokens"]:>11} {row["response_tokens"]:>10} {row["total_tokens"]:>11} '
+            f'{row["avg_job_tokens"]:>9} {row["max_job_tokens"]:>9}'
+        )
+    return '\n'.join(lines)
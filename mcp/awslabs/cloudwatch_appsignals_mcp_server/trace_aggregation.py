@@ -0,0 +1,150 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local aggregation of X-Ray trace summaries.
+
+A hundred individual trace summaries mostly repeat the same few failure
+modes. Traces are grouped by operation, outcome, HTTP status, root-cause
+service and exception type; each group reports its count, duration
+percentiles and a few exemplar trace ids to investigate further.
+"""
+
+from .metric_series import percentile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Root cause lists of a trace summary, in the order they are consulted
+ROOT_CAUSE_KEYS = ('FaultRootCauses', 'ErrorRootCauses', 'ThrottleRootCauses')
+
+
+@dataclass
+class TraceGroup:
+    """Traces sharing the same operation, outcome, status and root cause."""
+
+    operation: Optional[str]
+    outcome: str
+    http_status: Optional[int]
+    root_cause_service: Optional[str]
+    exception_type: Optional[str]
+    durations: List[float] = field(default_factory=list)
+    trace_ids: List[Tuple[float, str]] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        """Number of traces in the group."""
+        return len(self.trace_ids)
+
+    def to_dict(self, exemplars: int = 3) -> Dict[str, Any]:
+        """Return the group as JSON-serializable data, with the slowest traces as exemplars."""
+        data: Dict[str, Any] = {
+            'Operation': self.operation,
+            'Outcome': self.outcome,
+            'HttpStatus': self.http_status,
+            'RootCauseService': self.root_cause_service,
+            'ExceptionType': self.exception_type,
+            'Count': self.count,
+        }
+        if self.durations:
+            ordered = sorted(self.durations)
+            data['Duration'] = {
+                'p50': round(percentile(ordered, 50), 3),
+                'p90': round(percentile(ordered, 90), 3),
+                'p99': round(percentile(ordered, 99), 3),
+                'max': round(ordered[-1], 3),
+            }
+        slowest = sorted(self.trace_ids, key=lambda item: -item[0])
+        data['ExemplarTraceIds'] = [trace_id for _duration, trace_id in slowest[:exemplars]]
+        return {key: value for key, value in data.items() if value is not None}
+
+
+def _operation(trace: Dict[str, Any]) -> Optional[str]:
+    annotations = trace.get('Annotations') or {}
+    for key in ('aws.local.operation', 'aws.remote.operation'):
+        values = annotations.get(key)
+        if values:
+            # GetTraceSummaries returns each annotation as a list of values
+            value = values[0] if isinstance(values, list) else values
+            if isinstance(value, dict):
+                value = value.get('AnnotationValue', {}).get('StringValue')
+            if value:
+                return value
+    entry_point = trace.get('EntryPoint') or {}
+    return entry_point.get('Name')
+
+
+def _outcome(trace: Dict[str, Any]) -> str:
+    if trace.get('HasFault'):
+        return 'fault'
+    if trace.get('HasError'):
+        return 'error'
+    if trace.get('HasThrottle'):
+        return 'throttle'
+    return 'ok'
+
+
+def _root_cause(trace: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """Return the root-cause service and exception type of the first root cause found."""
+    for key in ROOT_CAUSE_KEYS:
+        for root_cause in trace.get(key) or []:
+            services = root_cause.get('Services') or []
+            for service in services:
+                for entity in service.get('EntityPath') or []:
+                    for exception in entity.get('Exceptions') or []:
+                        return service.get('Name'), exception.get('Name')
+            if services:
+                return services[-1].get('Name'), None
+    return None, None
+
+
+def group_key(trace: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Return the (operation, outcome, HTTP status, root-cause service, exception type) of a trace."""
+    root_cause_service, exception_type = _root_cause(trace)
+    http_status = (trace.get('Http') or {}).get('HttpStatus')
+    return _operation(trace), _outcome(trace), http_status, root_cause_service, exception_type
+
+
+def aggregate_traces(
+    traces: List[Dict[str, Any]], top_n: int = 10, exemplars: int = 3
+) -> Dict[str, Any]:
+    """Group trace summaries and return the largest groups.
+
+    Args:
+        traces: Trace summaries as returned by GetTraceSummaries
+        top_n: Maximum number of groups returned; faults, errors and throttles
+            rank before successful traces, then larger groups first
+        exemplars: Trace ids returned per group, slowest first
+
+    Returns:
+        Dictionary with the returned ``Groups``, the total ``GroupCount`` and
+        the number of traces in groups left out (``OtherTraceCount``)
+    """
+    groups: Dict[Tuple[Any, ...], TraceGroup] = {}
+    for trace in traces:
+        key = group_key(trace)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = TraceGroup(*key)
+        duration = trace.get('Duration')
+        if duration is not None:
+            group.durations.append(duration)
+        group.trace_ids.append((duration or 0.0, trace.get('Id')))
+
+    ranked = sorted(groups.values(), key=lambda g: (g.outcome == 'ok', -g.count))
+    shown, hidden = ranked[:top_n], ranked[top_n:]
+    return {
+        'Groups': [group.to_dict(exemplars) for group in shown],
+        'GroupCount': len(groups),
+        'OtherTraceCount': sum(group.count for group in hidden),
+    }
@@ -0,0 +1,157 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent cache of complete X-Ray traces.
+
+A trace no longer changes once all of its segments are complete, so it is
+fetched once and kept on local disk across server restarts. Each trace is a
+gzip-compressed JSON file named after the SHA-256 of its trace id. The
+cache is bounded in bytes and evicts the least recently read traces first;
+file modification times carry the recency across restarts.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from loguru import logger
+from typing import Any, Dict, Optional
+
+
+TRACE_SUFFIX = '.json.gz'
+
+
+def _default_directory() -> str:
+    return os.path.join(os.path.expanduser('~'), '.cache', 'appsignals-mcp', 'traces')
+
+
+class TraceCache:
+    """Size-bounded, least-recently-used cache of traces on local disk."""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        """Initialize the cache; nothing is read or created until first use.
+
+        Args:
+            directory: Cache directory; defaults to MCP_TRACE_CACHE_DIR or
+                ``~/.cache/appsignals-mcp/traces``
+            max_bytes: Largest total size of the cached files; defaults to
+                MCP_TRACE_CACHE_MAX_MB or 256 MiB
+        """
+        self.directory = directory or os.environ.get('MCP_TRACE_CACHE_DIR') or _default_directory()
+        self.max_bytes = (
+            max_bytes
+            if max_bytes is not None
+            else int(float(os.environ.get('MCP_TRACE_CACHE_MAX_MB', '256')) * 2**20)
+        )
+        self._lock = threading.Lock()
+        # File name -> size in bytes, least recently used first
+        self._entries: Optional['OrderedDict[str, int]'] = None
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """Return the cached trace ``trace_id``, or None if it is not cached."""
+        name = self._name(trace_id)
+        with self._lock:
+            entries = self._index()
+            if name not in entries:
+                self._misses += 1
+                return None
+            path = self._path(name)
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    trace = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f'Dropping unreadable cached trace {trace_id}: {e}')
+                self._remove(name)
+                self._misses += 1
+                return None
+            entries.move_to_end(name)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self._hits += 1
+            return trace
+
+    def put(self, trace_id: str, trace: Dict[str, Any]):
+        """Store ``trace`` under ``trace_id``, evicting the least recently used traces."""
+        data = gzip.compress(json.dumps(trace, separators=(',', ':')).encode('utf-8'))
+        if len(data) > self.max_bytes:
+            return
+        name = self._name(trace_id)
+        path = self._path(name)
+        with self._lock:
+            entries = self._index()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._size += len(data) - entries.pop(name, 0)
+            entries[name] = len(data)
+            while self._size > self.max_bytes and entries:
+                self._remove(next(iter(entries)))
+
+    def __contains__(self, trace_id: str) -> bool:
+        """Whether ``trace_id`` is cached."""
+        with self._lock:
+            return self._name(trace_id) in self._index()
+
+    def clear(self):
+        """Delete every cached trace."""
+        with self._lock:
+            for name in list(self._index()):
+                self._remove(name)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            entries = self._index()
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'traces': len(entries),
+                'bytes': self._size,
+            }
+
+    def _name(self, trace_id: str) -> str:
+        return hashlib.sha256(trace_id.encode('utf-8')).hexdigest() + TRACE_SUFFIX
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name[:2], name)
+
+    def _index(self) -> 'OrderedDict[str, int]':
+        """Return the entries, scanning the directory on first use."""
+        if self._entries is None:
+            found = []
+            for root, _dirs, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith(TRACE_SUFFIX):
+                        stat = os.stat(os.path.join(root, name))
+                        found.append((stat.st_mtime, name, stat.st_size))
+            found.sort()
+            self._entries = OrderedDict((name, size) for _mtime, name, size in found)
+            self._size = sum(self._entries.values())
+        return self._entries
+
+    def _remove(self, name: str):
+        self._size -= self._entries.pop(name, 0)
+        try:
+            os.remove(self._path(name))
+        except OSError:
+            pass
@@ -0,0 +1,348 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Concurrent, time-sliced retrieval of X-Ray trace summaries.
+
+Paging through ``GetTraceSummaries`` for a whole window and stopping at a
+trace limit returns only the traces of the window's first minutes. Instead
+the window is split into slices, each slice gets an equal share of the
+limit and the slices are paged through concurrently with bounded
+parallelism. Share left unused by sparse slices goes to the slices that
+filled theirs, which continue from the page they stopped at. Traces
+spanning two slices are returned once. A slice is handed to the caller as
+soon as it and every earlier slice can no longer grow.
+
+Full traces are fetched with ``BatchGetTraces``, five ids per request and
+several requests at once. Complete traces never change, so they are kept in
+a TraceCache and never fetched twice.
+"""
+
+import asyncio
+import json
+import math
+from .aws_async import run_sync
+from .trace_cache import TraceCache
+from datetime import datetime, timedelta
+from loguru import logger
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+
+# Length of one time slice, and X-Ray requests in flight at once
+SLICE_SECONDS = 1800
+MAX_CONCURRENCY = 4
+
+# Trace ids BatchGetTraces accepts per request
+BATCH_GET_TRACES_SIZE = 5
+
+# Blocking fetch of one page of summaries between two times, continuing from a
+# NextToken; returns the page and the token of the following one, or None
+PageFetcher = Callable[
+    [datetime, datetime, Optional[str]], Tuple[List[Dict[str, Any]], Optional[str]]
+]
+
+
+def split_window(
+    start_time: datetime, end_time: datetime, slice_seconds: int = SLICE_SECONDS
+) -> List[Tuple[datetime, datetime]]:
+    """Split ``start_time``..``end_time`` into consecutive slices of at most ``slice_seconds``."""
+    slices = []
+    cursor = start_time
+    step = timedelta(seconds=slice_seconds)
+    while cursor < end_time:
+        slices.append((cursor, min(cursor + step, end_time)))
+        cursor += step
+    return slices or [(start_time, end_time)]
+
+
+class _Slice:
+    __slots__ = ('start', 'end', 'limit', 'traces', 'next_token', 'exhausted')
+
+    def __init__(self, start: datetime, end: datetime, limit: int):
+        self.start = start
+        self.end = end
+        self.limit = limit
+        self.traces: List[Dict[str, Any]] = []
+        self.next_token: Optional[str] = None
+        self.exhausted = False
+
+    @property
+    def has_more(self) -> bool:
+        """Whether a larger limit would add traces, buffered or on later pages."""
+        return len(self.traces) > self.limit or not self.exhausted
+
+
+async def iter_trace_summaries(
+    fetch_page: PageFetcher,
+    start_time: datetime,
+    end_time: datetime,
+    max_traces: int = 100,
+    slice_seconds: int = SLICE_SECONDS,
+    max_concurrency: int = MAX_CONCURRENCY,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield up to ``max_traces`` trace summaries sampled evenly across the window.
+
+    Slices are paged through concurrently, at most ``max_concurrency`` pages
+    at a time, until they hold their share of the limit. When sparse slices
+    leave part of the limit unused, the slices that filled their share get
+    the unused part split between them and continue from their last page,
+    until the limit is reached or no slice has more traces. Summaries are
+    yielded in time order, each slice once it can no longer grow; pending
+    fetches are cancelled when the caller stops early.
+
+    Args:
+        fetch_page: Blocking call returning one page of summaries between two
+            times and the NextToken of the following page
+        start_time: Start of the window
+        end_time: End of the window
+        max_traces: Maximum number of summaries yielded
+        slice_seconds: Length of one slice
+        max_concurrency: Maximum number of pages fetched at once
+
+    Raises:
+        Exception: Whatever ``fetch_page`` raises
+    """
+    windows = split_window(start_time, end_time, slice_seconds)
+    share = max(1, math.ceil(max_traces / len(windows)))
+    slices = [_Slice(window_start, window_end, share) for window_start, window_end in windows]
+    semaphore = asyncio.Semaphore(max_concurrency)
+    requests = 0
+
+    async def fill(part: _Slice):
+        nonlocal requests
+        while len(part.traces) < part.limit and not part.exhausted:
+            async with semaphore:
+                page, part.next_token = await run_sync(
+                    fetch_page, part.start, part.end, part.next_token
+                )
+            requests += 1
+            part.traces.extend(page)
+            part.exhausted = not part.next_token
+
+    yielded: Set[str] = set()
+    ready = 0
+
+    def take(part: _Slice) -> List[Dict[str, Any]]:
+        # New summaries of a final slice, within max_traces
+        traces = []
+        for trace in part.traces[: part.limit]:
+            trace_id = trace.get('Id')
+            if trace_id in yielded or len(yielded) >= max_traces:
+                continue
+            yielded.add(trace_id)
+            traces.append(trace)
+        return traces
+
+    pending = list(range(len(slices)))
+    tasks: Dict[int, 'asyncio.Future[None]'] = {}
+    found = 0
+    try:
+        while True:
+            tasks = {index: asyncio.ensure_future(fill(slices[index])) for index in pending}
+            for task in tasks.values():
+                await task
+                # Hand out leading slices whose fetches are done and that cannot grow
+                while ready < len(slices) and not slices[ready].has_more:
+                    if ready in tasks and not tasks[ready].done():
+                        break
+                    for trace in take(slices[ready]):
+                        yield trace
+                    ready += 1
+
+            seen = {trace.get('Id') for part in slices for trace in part.traces[: part.limit]}
+            spare = max_traces - len(seen)
+            full = [index for index, part in enumerate(slices) if part.has_more]
+            if spare <= 0 or not full or len(seen) <= found:
+                break
+            found = len(seen)
+            extra = math.ceil(spare / len(full))
+            for index in full:
+                slices[index].limit += extra
+            pending = full
+
+        for part in slices[ready:]:
+            for trace in take(part):
+                yield trace
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        logger.debug(
+            f'Retrieved {len(yielded)} traces from {len(slices)} slices in {requests} requests'
+        )
+
+
+def _segment_documents(trace: Dict[str, Any]) -> List[Dict[str, Any]]:
+    documents = []
+    for segment in trace.get('Segments', []):
+        try:
+            documents.append(json.loads(segment['Document']))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return documents
+
+
+def is_complete(trace: Dict[str, Any]) -> bool:
+    """Whether every segment of ``trace`` has ended, so the trace can no longer change."""
+    documents = _segment_documents(trace)
+    return len(documents) == len(trace.get('Segments', [])) and not any(
+        document.get('in_progress') for document in documents
+    )
+
+
+def _collect_exceptions(
+    document: Dict[str, Any], segment_name: str, exceptions: List[Dict[str, Any]]
+):
+    cause = document.get('cause')
+    if isinstance(cause, dict):
+        for exception in cause.get('exceptions', []):
+            exceptions.append(
+                {
+                    'Segment': segment_name,
+                    'Type': exception.get('type'),
+                    'Message': exception.get('message'),
+                    'Stack': [
+                        f'{frame.get("label")} ({frame.get("path")}:{frame.get("line")})'
+                        for frame in exception.get('stack', [])[:3]
+                    ],
+                }
+            )
+    for subsegment in document.get('subsegments', []):
+        _collect_exceptions(subsegment, segment_name, exceptions)
+
+
+def summarize_trace(trace: Dict[str, Any], max_exceptions: int = 3) -> Dict[str, Any]:
+    """Reduce a ``BatchGetTraces`` trace to segment timings and exceptions.
+
+    Args:
+        trace: Trace as returned by BatchGetTraces, with JSON segment documents
+        max_exceptions: Maximum number of distinct exceptions included
+
+    Returns:
+        Dictionary with the trace Id and Duration, its segments ordered by start
+        time, and the first distinct exceptions with the top of their stacks
+    """
+    documents = sorted(_segment_documents(trace), key=lambda d: d.get('start_time') or 0)
+    segments = []
+    exceptions: List[Dict[str, Any]] = []
+    for document in documents:
+        name = document.get('name')
+        segment: Dict[str, Any] = {'Name': name, 'Origin': document.get('origin')}
+        if document.get('start_time') is not None and document.get('end_time') is not None:
+            segment['Duration'] = round(document['end_time'] - document['start_time'], 3)
+        for flag in ('error', 'fault', 'throttle'):
+            if document.get(flag):
+                segment[flag.capitalize()] = True
+        status = document.get('http', {}).get('response', {}).get('status')
+        if status is not None:
+            segment['HttpStatus'] = status
+        segments.append(segment)
+        _collect_exceptions(document, name, exceptions)
+
+    distinct = list({(e['Type'], e['Message']): e for e in reversed(exceptions)}.values())
+    distinct.reverse()
+    return {
+        'Id': trace.get('Id'),
+        'Duration': trace.get('Duration'),
+        'Segments': segments,
+        'Exceptions': distinct[:max_exceptions],
+    }
+
+
+class TraceDetailFetcher:
+    """Fetches full traces with concurrent ``BatchGetTraces`` requests behind a TraceCache."""
+
+    def __init__(
+        self,
+        batch_get_traces: Callable[..., Dict[str, Any]],
+        cache: Optional[TraceCache] = None,
+        max_concurrency: int = MAX_CONCURRENCY,
+    ):
+        """Initialize the fetcher.
+
+        Args:
+            batch_get_traces: Blocking ``BatchGetTraces`` call
+            cache: Cache of complete traces; None disables caching
+            max_concurrency: Maximum number of requests in flight at once
+        """
+        self._batch_get_traces = batch_get_traces
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.requests_made = 0
+
+    async def fetch(self, trace_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Return the full traces of ``trace_ids`` by id, from the cache where possible.
+
+        Traces X-Ray did not return are missing from the result.
+
+        Raises:
+            Exception: Whatever ``BatchGetTraces`` raises
+        """
+        trace_ids = list(dict.fromkeys(trace_ids))
+        traces: Dict[str, Dict[str, Any]] = {}
+        if self.cache is not None:
+            traces = await run_sync(self._read_cache, trace_ids)
+
+        missing = [trace_id for trace_id in trace_ids if trace_id not in traces]
+        batches = [
+            missing[i : i + BATCH_GET_TRACES_SIZE]
+            for i in range(0, len(missing), BATCH_GET_TRACES_SIZE)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_batch(batch: List[str]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self._fetch_batch(batch)
+
+        fetched = [
+            trace
+            for batch_traces in await asyncio.gather(*(fetch_batch(b) for b in batches))
+            for trace in batch_traces
+        ]
+        for trace in fetched:
+            traces[trace['Id']] = trace
+        if self.cache is not None and fetched:
+            await run_sync(self._write_cache, [trace for trace in fetched if is_complete(trace)])
+
+        logger.debug(
+            f'Fetched {len(trace_ids)} traces, {len(trace_ids) - len(missing)} from cache, '
+            f'{len(fetched)} with {len(batches)} BatchGetTraces batches'
+        )
+        return {trace_id: traces[trace_id] for trace_id in trace_ids if trace_id in traces}
+
+    async def _fetch_batch(self, trace_ids: List[str]) -> List[Dict[str, Any]]:
+        traces = []
+        kwargs: Dict[str, Any] = {'TraceIds': trace_ids}
+        while True:
+            response = await run_sync(self._batch_get_traces, **kwargs)
+            self.requests_made += 1
+            traces.extend(response.get('Traces', []))
+            next_token = response.get('NextToken')
+            if not next_token:
+                return traces
+            kwargs['NextToken'] = next_token
+
+    def _read_cache(self, trace_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        traces = {}
+        for trace_id in trace_ids:
+            trace = self.cache.get(trace_id)
+            if trace is not None:
+                traces[trace_id] = trace
+        return traces
+
+    def _write_cache(self, traces: List[Dict[str, Any]]):
+        for trace in traces:
+            try:
+                self.cache.put(trace['Id'], trace)
+            except OSError as e:
+                logger.warning(f'Failed to cache trace {trace["Id"]}: {e}')
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Benchmark list_slis over many services.
+
+Compares the original behaviour (one service at a time, two new boto3
+clients, one SLO listing and one GetMetricData call per service) with the
+two batched engines, both after one paged SLO sweep grouped by service:
+"metrics" (BreachedCount queries of the whole fleet in GetMetricData
+requests of up to 500) and "budget_report" (budget status of up to 50 SLOs
+per BatchGetServiceLevelObjectiveBudgetReport request). AWS clients are
+replaced with stand-ins whose construction and calls block for fixed
+latencies.
+
+Usage:
+    python scripts/benchmark_list_slis.py [--services 100 500] [--latency 0.05]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+os.environ.setdefault('AWS_REGION', 'us-east-1')
+
+from awslabs.cloudwatch_appsignals_mcp_server import server, sli_report_client  # noqa: E402
+from awslabs.cloudwatch_appsignals_mcp_server.sli_report_client import (  # noqa: E402
+    AWSConfig,
+    SLIReportClient,
+)
+
+
+class SlowClient:
+    """Application Signals and CloudWatch stand-in with fixed per-call latency."""
+
+    def __init__(self, latency: float, services: int = 0):
+        """Initialize with a per-call latency in seconds and a fleet size."""
+        self.latency = latency
+        self.services = services
+        self.metric_calls = 0
+        self.slo_calls = 0
+        self.budget_report_calls = 0
+
+    def list_services(self, **kwargs):
+        """Return the whole fleet in one page."""
+        return {
+            'ServiceSummaries': [
+                {'KeyAttributes': {'Name': f'svc-{i}', 'Type': 'Service', 'Environment': 'prod'}}
+                for i in range(self.services)
+            ]
+        }
+
+    def list_service_level_objectives(self, **kwargs):
+        """Return two SLOs per service after blocking, for one service or a page of all."""
+        time.sleep(self.latency)
+        self.slo_calls += 1
+        if 'KeyAttributes' in kwargs:
+            return {'SloSummaries': self._slos(kwargs['KeyAttributes'])}
+
+        slos = [
+            slo
+            for service in self.list_services()['ServiceSummaries']
+            for slo in self._slos(service['KeyAttributes'])
+        ]
+        start = int(kwargs.get('NextToken', 0))
+        response = {'SloSummaries': slos[start : start + kwargs['MaxResults']]}
+        if start + kwargs['MaxResults'] < len(slos):
+            response['NextToken'] = str(start + kwargs['MaxResults'])
+        return response
+
+    @staticmethod
+    def _slos(key_attributes):
+        name = key_attributes['Name']
+        return [
+            {
+                'Name': f'{name}-{kind}',
+                'Arn': f'arn:slo/{name}-{kind}',
+                'KeyAttributes': key_attributes,
+            }
+            for kind in ('latency', 'availability')
+        ]
+
+    def get_metric_data(self, **kwargs):
+        """Return one healthy value per query after blocking."""
+        time.sleep(self.latency)
+        self.metric_calls += 1
+        return {
+            'MetricDataResults': [
+                {'Id': query['Id'], 'Timestamps': [datetime.now(timezone.utc)], 'Values': [0.0]}
+                for query in kwargs['MetricDataQueries']
+            ]
+        }
+
+    def batch_get_service_level_objective_budget_report(self, **kwargs):
+        """Return a healthy budget report per SLO after blocking."""
+        time.sleep(self.latency)
+        self.budget_report_calls += 1
+        return {
+            'Reports': [
+                {'Arn': slo_id, 'BudgetStatus': 'OK', 'Attainment': 99.99}
+                for slo_id in kwargs['SloIds']
+            ],
+            'Errors': [],
+        }
+
+    def calls(self) -> int:
+        """Return the number of AWS calls made so far."""
+        return self.slo_calls + self.metric_calls + self.budget_report_calls
+
+
+def batched(client, count: int, engine: str):
+    """Run list_slis with ``engine`` against ``client``; return the elapsed seconds."""
+    server.service_catalog.invalidate()
+    server.slo_inventory.invalidate()
+    with (
+        patch.object(server, 'appsignals_client', client),
+        patch.object(server, 'cloudwatch_client', client),
+        patch.object(server, 'SLI_ENGINE', engine),
+        patch.object(
+            server, 'check_transaction_search_enabled', lambda region: (True, 'Logs', 'ACTIVE')
+        ),
+    ):
+        started = time.perf_counter()
+        result = asyncio.run(server.list_slis(hours=24))
+        elapsed = time.perf_counter() - started
+    assert f'Total Services: {count}' in result, result[:500]
+    return elapsed
+
+
+def sequential_baseline(services, hours: int, client_factory):
+    """Original list_slis loop: one service at a time, new clients per service."""
+    with patch.object(sli_report_client.boto3, 'client', client_factory):
+        for service in services:
+            config = AWSConfig(
+                period_in_hours=hours,
+                service_name=service['KeyAttributes']['Name'],
+                key_attributes=service['KeyAttributes'],
+            )
+            SLIReportClient(config).generate_sli_report()
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--services', type=int, nargs='+', default=[100, 500])
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per AWS call')
+    parser.add_argument(
+        '--client-cost', type=float, default=0.02, help='Seconds to construct one boto3 client'
+    )
+    args = parser.parse_args()
+
+    def client_factory(*_args, **_kwargs):
+        time.sleep(args.client_cost)
+        return SlowClient(args.latency)
+
+    print(f'AWS call latency {args.latency}s, client construction {args.client_cost}s')
+    for count in args.services:
+        client = SlowClient(args.latency, count)
+        services = client.list_services()['ServiceSummaries']
+
+        started = time.perf_counter()
+        sequential_baseline(services, 24, client_factory)
+        sequential = time.perf_counter() - started
+
+        print(f'{count:>5} services: sequential {sequential:7.2f}s ({2 * count} AWS calls)')
+        for engine in ('metrics', 'budget_report'):
+            client = SlowClient(args.latency, count)
+            elapsed = batched(client, count, engine)
+            print(
+                f'{"":>15}{engine:<14}{elapsed:6.2f}s ({client.calls()} AWS calls)  '
+                f'{sequential / elapsed:5.1f}x faster'
+            )
+
+
+if __name__ == '__main__':
+    main()
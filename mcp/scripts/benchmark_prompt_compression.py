@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark DynamoDB capacity savings from compressed prompt attributes.
+
+Builds realistic investigation transcripts of 50-300 KB (the same log format
+AsyncTaskMonitor._update_investigation appends each iteration), encodes them
+with attribute_codec, and reports item size, read/write capacity units per
+access and encode/decode time.
+
+Usage:
+    python scripts/benchmark_prompt_compression.py
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from awslabs.cloudwatch_appsignals_mcp_server.attribute_codec import (  # noqa: E402
+    decode_text,
+    encode_text,
+)
+
+
+SERVICES = ['checkout', 'payments', 'inventory', 'customers-service-java', 'visits-api']
+METRICS = ['p99_latency', 'error_rate', 'fault_rate', 'cpu_usage', 'memory_usage', 'gc_pause']
+ACTIONS = [
+    'Analyzing CloudWatch metrics for latency spikes',
+    'Querying X-Ray traces for faulted requests',
+    'Checking downstream dependency health',
+    'Comparing deployment timeline with error onset',
+    'Inspecting database connection pool saturation',
+]
+
+
+def build_transcript(target_bytes: int, seed: int) -> str:
+    """Build an investigation prompt of roughly ``target_bytes`` bytes."""
+    rng = random.Random(seed)
+    parts = [
+        f'Question: Why is {rng.choice(SERVICES)} breaching its latency SLO?\n\n'
+        'Created: 2025-06-01T10:00:00\n\nInitial Context:\n'
+        '- service: checkout\n- region: us-east-1\n\nInvestigation Log:\n'
+    ]
+    size = len(parts[0])
+    minute = 0
+    while size < target_bytes:
+        minute += 1
+        entry = f'\n\n--- 2025-06-01T{10 + minute // 60 % 14:02d}:{minute % 60:02d}:00 ---\n'
+        entry += 'Status: continuing\n'
+        entry += f'Action: {rng.choice(ACTIONS)} on {rng.choice(SERVICES)}\n'
+        entry += 'Findings:\n'
+        for metric in rng.sample(METRICS, 4):
+            entry += f'- {metric}: {rng.uniform(0, 3000):.1f}\n'
+        entry += (
+            f'- trace_id: 1-{rng.getrandbits(32):08x}-{rng.getrandbits(96):024x}\n'
+            f'- exception: java.net.SocketTimeoutException at '
+            f'com.example.{rng.choice(SERVICES).replace("-", "")}.Client.call'
+            f'(Client.java:{rng.randint(10, 400)})\n'
+        )
+        parts.append(entry)
+        size += len(entry)
+    return ''.join(parts)
+
+
+def capacity_units(item_bytes: int):
+    """Return (strongly consistent RCU, WCU) for one read/write of an item."""
+    return math.ceil(item_bytes / 4096), math.ceil(item_bytes / 1024)
+
+
+def main():
+    """Run the benchmark over a range of transcript sizes."""
+    print(
+        f'{"size":>8} {"stored":>8} {"ratio":>6} {"RCU":>9} {"WCU":>11} '
+        f'{"encode":>9} {"decode":>9}'
+    )
+    total_before = [0, 0]
+    total_after = [0, 0]
+    for kb in (50, 100, 150, 200, 250, 300):
+        text = build_transcript(kb * 1024, seed=kb)
+        raw_size = len(text.encode('utf-8'))
+
+        started = time.perf_counter()
+        encoded = encode_text(text)
+        encode_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        assert decode_text(encoded) == text
+        decode_ms = (time.perf_counter() - started) * 1000
+
+        stored_size = len(encoded)
+        rcu_before, wcu_before = capacity_units(raw_size)
+        rcu_after, wcu_after = capacity_units(stored_size)
+        total_before[0] += rcu_before
+        total_before[1] += wcu_before
+        total_after[0] += rcu_after
+        total_after[1] += wcu_after
+
+        print(
+            f'{raw_size // 1024:>6}KB {stored_size // 1024:>6}KB {raw_size / stored_size:>5.1f}x '
+            f'{rcu_before:>4}->{rcu_after:<4} {wcu_before:>5}->{wcu_after:<5} '
+            f'{encode_ms:>7.2f}ms {decode_ms:>7.2f}ms'
+        )
+
+    print(
+        f'\nTotal per read+write cycle: RCU {total_before[0]} -> {total_after[0]}, '
+        f'WCU {total_before[1]} -> {total_after[1]}'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Benchmark the async monitor's scheduling on a simulated clock.
+
+Runs a full day (by default) of master/deployment polling over thousands of
+investigations against an in-memory job table, using VirtualClock so the run
+takes seconds instead of a day.
+
+Usage:
+    python scripts/benchmark_scheduler_simulation.py --jobs 2000 --hours 24
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from awslabs.cloudwatch_appsignals_mcp_server.async_monitor import AsyncTaskMonitor  # noqa: E402
+from awslabs.cloudwatch_appsignals_mcp_server.clock import VirtualClock  # noqa: E402
+
+
+class InMemoryJobTable:
+    """Minimal stand-in for the DynamoDB Table resource used by the monitor."""
+
+    def __init__(self):
+        """Initialize an empty table."""
+        self.items = {}
+        self.scans = 0
+        self.writes = 0
+
+    def put_item(self, Item):
+        """Store an item, replacing any existing one with the same key."""
+        self.writes += 1
+        self.items[Item['job_id']] = dict(Item)
+
+    def get_item(self, Key):
+        """Return a copy of the item for ``Key`` if present."""
+        item = self.items.get(Key['job_id'])
+        return {'Item': dict(item)} if item else {}
+
+    def scan(self, FilterExpression=None, ExpressionAttributeValues=None, **kwargs):
+        """Return items whose status matches the scan's single filter value."""
+        self.scans += 1
+        wanted = list((ExpressionAttributeValues or {}).values())
+        items = [
+            dict(item)
+            for item in self.items.values()
+            if not wanted or item.get('status') == wanted[0]
+        ]
+        return {'Items': items}
+
+
+class SimulatedMonitor(AsyncTaskMonitor):
+    """Monitor whose simulated LLM concludes after a fixed number of iterations."""
+
+    def __init__(self, iterations_to_complete: int, **kwargs):
+        """Initialize the monitor with the number of iterations per investigation."""
+        super().__init__(**kwargs)
+        self.iterations_to_complete = iterations_to_complete
+        self.llm_calls = 0
+
+    async def _simulate_llm_investigation(self, job_id, prompt, iteration, context=None):
+        self.llm_calls += 1
+        done = prompt.count('\n--- ') + 1 >= self.iterations_to_complete
+        token = 'COMPLETE' if done else 'CONTINUING'
+        return self._parse_llm_response(
+            f'[STATUS:{token}]\n[ACTION:Simulated step]\n[FINDING:step={self.llm_calls}]'
+            + ('\n[ANSWER:Simulated conclusion]' if done else '')
+        )
+
+
+async def run(jobs: int, hours: float, iterations: int, arrival_minutes: float) -> dict:
+    """Create jobs on a schedule and run the monitor for ``hours`` of simulated time.
+
+    Returns:
+        Number of jobs per final status
+    """
+    clock = VirtualClock()
+    table = InMemoryJobTable()
+    monitor = SimulatedMonitor(iterations_to_complete=iterations, clock=clock, table=table)
+
+    async def arrivals():
+        # Spread job creation over the first ``arrival_minutes`` of the run
+        gap = arrival_minutes * 60 / max(jobs, 1)
+        for i in range(jobs):
+            monitor.create_investigation(
+                question=f'Why is service-{i % 50} slow?',
+                initial_context={'service': f'service-{i % 50}'},
+                job_id=f'investigation-{i}',
+            )
+            if gap:
+                await clock.sleep(gap)
+
+    clock.spawn(arrivals())
+
+    started = time.perf_counter()
+    stats = await monitor.simulate(hours * 3600)
+    elapsed = time.perf_counter() - started
+
+    statuses = {}
+    for item in table.items.values():
+        statuses[item['status']] = statuses.get(item['status'], 0) + 1
+
+    print(f'Simulated {hours:g}h with {jobs} jobs in {elapsed:.2f}s wall time')
+    for job_id, job_stats in stats.items():
+        print(
+            f'  {job_id}: runs={job_stats["runs"]:.0f} skipped={job_stats["skipped"]:.0f} '
+            f'busy={job_stats["busy_seconds"]:.0f}s'
+        )
+    print(f'  LLM calls: {monitor.llm_calls}')
+    print(f'  Table scans: {table.scans}, writes: {table.writes}')
+    print(f'  Final job statuses: {statuses}')
+    return statuses
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--iterations', type=int, default=4, help='Iterations per investigation')
+    parser.add_argument(
+        '--arrival-minutes', type=float, default=600, help='Window over which jobs are created'
+    )
+    args = parser.parse_args()
+
+    from loguru import logger
+
+    logger.remove()
+    asyncio.run(run(args.jobs, args.hours, args.iterations, args.arrival_minutes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Benchmark memory held by list_slis for a large fleet.
+
+Measures the structures a fleet evaluation keeps for 10k SLOs (two per
+service) with tracemalloc:
+
+- the SLO inventory built from ListServiceLevelObjectives pages, which is
+  cached between calls, against the previous list of raw summaries;
+- the BreachedCount series returned by MetricQueryEngine, against the
+  previous list-based series; list_slis asks for one period per window, so
+  one datapoint per SLO, other point counts show longer series;
+- the peak of a whole FleetSLIEvaluator.evaluate() run with stubbed clients.
+
+Usage:
+    python scripts/benchmark_sli_memory.py [--slos 10000] [--points 1 24]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from awslabs.cloudwatch_appsignals_mcp_server.fleet_sli import FleetSLIEvaluator  # noqa: E402
+from awslabs.cloudwatch_appsignals_mcp_server.metric_query_engine import (  # noqa: E402
+    MetricQuery,
+    MetricQueryEngine,
+    query_id,
+)
+from awslabs.cloudwatch_appsignals_mcp_server.slo_inventory import (  # noqa: E402
+    SLOInventory,
+    SLOSnapshot,
+    service_key,
+)
+
+
+END = datetime(2024, 5, 2, tzinfo=timezone.utc)
+START = END - timedelta(hours=24)
+
+
+@dataclass
+class LegacySLOSnapshot:
+    """Previous inventory holding every raw summary, grouped by service."""
+
+    slos: List[Dict[str, Any]]
+    by_service: Dict[Any, List[Dict[str, Any]]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        """Group the summaries by service."""
+        for slo in self.slos:
+            self.by_service.setdefault(service_key(slo['KeyAttributes']), []).append(slo)
+
+
+@dataclass
+class LegacyMetricSeries:
+    """Previous series representation holding Python lists."""
+
+    query: MetricQuery
+    timestamps: List[datetime] = field(default_factory=list)
+    values: List[float] = field(default_factory=list)
+    status: str = 'Complete'
+
+
+def slo_summary(i: int) -> Dict[str, Any]:
+    """Return the ListServiceLevelObjectives summary of the ``i``-th SLO, two per service."""
+    service = f'svc-{i // 2}'
+    name = f'{service}-slo-{i % 2}'
+    return {
+        'Arn': f'arn:aws:application-signals:us-east-1:123456789012:slo/{name}',
+        'Name': name,
+        'KeyAttributes': {'Name': service, 'Type': 'Service', 'Environment': 'prod'},
+        'OperationName': 'GET /orders',
+        'CreatedTime': datetime(2024, 1, 1, tzinfo=timezone.utc),
+        'EvaluationType': 'PeriodBased',
+        'MetricSourceType': 'ServiceOperation',
+    }
+
+
+def slo_summaries(slos: int) -> List[Dict[str, Any]]:
+    """Return the summaries of ``slos`` SLOs."""
+    return [slo_summary(i) for i in range(slos)]
+
+
+def list_service_level_objectives(slos: int):
+    """Return a stub ListServiceLevelObjectives paging through ``slos`` summaries."""
+
+    def call(**kwargs):
+        start = int(kwargs.get('NextToken', 0))
+        page = [slo_summary(i) for i in range(start, min(start + kwargs['MaxResults'], slos))]
+        response: Dict[str, Any] = {'SloSummaries': page}
+        if start + len(page) < slos:
+            response['NextToken'] = str(start + len(page))
+        return response
+
+    return call
+
+
+def get_metric_data(points: int):
+    """Return a stub GetMetricData answering every query with ``points`` datapoints."""
+    step = (END - START) / points
+
+    def call(**kwargs):
+        return {
+            'MetricDataResults': [
+                {
+                    'Id': query['Id'],
+                    # Fresh datetimes per result, as botocore parses them
+                    'Timestamps': [START + step * p for p in range(points)],
+                    'Values': [float((i + p) % 3 == 0) for p in range(points)],
+                    'StatusCode': 'Complete',
+                }
+                for i, query in enumerate(kwargs['MetricDataQueries'])
+            ]
+        }
+
+    return call
+
+
+def breached_count_queries(slos: int) -> List[MetricQuery]:
+    """Return the BreachedCount queries FleetSLIEvaluator builds for ``slos`` SLOs."""
+    return [
+        MetricQuery(
+            id=query_id(i),
+            namespace='AWS/ApplicationSignals',
+            metric_name='BreachedCount',
+            stat='Maximum',
+            period=86400,
+            dimensions=({'Name': 'SloName', 'Value': f'svc-{i // 2}-slo-{i % 2}'},),
+        )
+        for i in range(slos)
+    ]
+
+
+def retained(build) -> int:
+    """Return the bytes still allocated by the value ``build()`` returns."""
+    tracemalloc.start()
+    data = build()
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current
+
+
+def peak(build) -> int:
+    """Return the peak bytes allocated while running ``build()``."""
+    tracemalloc.start()
+    build()
+    _current, highest = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return highest
+
+
+def fetch_series(slos: int, points: int, legacy: bool):
+    """Fetch the BreachedCount series of ``slos`` SLOs, optionally as legacy series."""
+    engine = MetricQueryEngine(get_metric_data(points))
+    series = asyncio.run(engine.fetch(breached_count_queries(slos), START, END))
+    if legacy:
+        # Rebuild the previous list-based series from fresh datetimes, then drop the compact ones
+        step = (END - START) / points
+        series = {
+            key: LegacyMetricSeries(
+                result.query, [START + step * p for p in range(points)], result.values
+            )
+            for key, result in series.items()
+        }
+    return series
+
+
+def evaluate(slos: int):
+    """Run a whole fleet evaluation against stubbed clients."""
+    inventory = SLOInventory(list_service_level_objectives(slos))
+    evaluator = FleetSLIEvaluator(inventory, MetricQueryEngine(get_metric_data(1)))
+    services = [
+        {'KeyAttributes': {'Name': f'svc-{i}', 'Type': 'Service', 'Environment': 'prod'}}
+        for i in range(slos // 2)
+    ]
+    asyncio.run(evaluator.evaluate(services, 24))
+
+
+def report(label: str, before: int, after: int):
+    """Print one comparison line."""
+    print(
+        f'{label:<36} legacy {before / 2**20:8.1f} MiB  '
+        f'compact {after / 2**20:8.1f} MiB  {before / after:4.1f}x smaller'
+    )
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--slos', type=int, default=10000)
+    parser.add_argument('--points', type=int, nargs='+', default=[1, 24])
+    args = parser.parse_args()
+
+    report(
+        f'{args.slos} SLOs inventory',
+        retained(lambda: LegacySLOSnapshot(slo_summaries(args.slos))),
+        retained(lambda: SLOSnapshot(slo_summaries(args.slos))),
+    )
+    for points in args.points:
+        report(
+            f'{args.slos} SLOs x {points:>4} points series',
+            retained(lambda: fetch_series(args.slos, points, legacy=True)),
+            retained(lambda: fetch_series(args.slos, points, legacy=False)),
+        )
+    highest = peak(lambda: evaluate(args.slos))
+    print(f'{args.slos} SLOs evaluate peak {highest / 2**20:8.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
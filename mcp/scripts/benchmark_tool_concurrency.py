@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Benchmark concurrent MCP tool calls against slow AWS APIs.
+
+Replaces the server's boto3 clients with stand-ins whose calls block for a
+fixed latency, then runs N copies of a tool concurrently. With AWS calls
+offloaded to the thread pool, N parallel calls finish in roughly the time of
+one; when calls block the event loop they take N times as long. The service
+catalog and service detail caches are bypassed, so every call reaches the
+client instead of sharing one cached or in-flight lookup.
+
+Usage:
+    python scripts/benchmark_tool_concurrency.py [--latency 0.25] [--calls 1 8 32]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+os.environ.setdefault('AWS_REGION', 'us-east-1')
+
+from awslabs.cloudwatch_appsignals_mcp_server import server  # noqa: E402
+
+
+class SlowAppSignalsClient:
+    """Application Signals stand-in whose calls block like a slow network request."""
+
+    def __init__(self, latency: float):
+        """Initialize with a fixed per-call latency in seconds."""
+        self.latency = latency
+        self.calls = 0
+
+    def list_services(self, **kwargs):
+        """Return one service after blocking for the configured latency."""
+        self.calls += 1
+        time.sleep(self.latency)
+        return {
+            'ServiceSummaries': [
+                {
+                    'KeyAttributes': {'Name': 'checkout', 'Type': 'Service'},
+                    'AttributeMaps': [{'Platform': 'EKS'}],
+                }
+            ]
+        }
+
+    def get_service(self, **kwargs):
+        """Return service details after blocking for the configured latency."""
+        self.calls += 1
+        time.sleep(self.latency)
+        return {
+            'Service': {
+                'KeyAttributes': {'Name': 'checkout', 'Type': 'Service'},
+                'AttributeMaps': [],
+                'MetricReferences': [],
+                'LogGroupReferences': [],
+            },
+            'StartTime': datetime.now(timezone.utc),
+            'EndTime': datetime.now(timezone.utc),
+        }
+
+
+async def uncached(key, loader, max_staleness=None):
+    """Stand-in for AsyncTTLCache.get that loads on every lookup."""
+    return await loader()
+
+
+async def run_tool(tool, calls: int) -> float:
+    """Run ``calls`` concurrent invocations of ``tool`` and return the wall time."""
+    started = time.perf_counter()
+    results = await asyncio.gather(*(tool() for _ in range(calls)))
+    elapsed = time.perf_counter() - started
+    assert all('checkout' in result for result in results), results[0]
+    return elapsed
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.25, help='Seconds per AWS call')
+    parser.add_argument('--calls', type=int, nargs='+', default=[1, 8, 32])
+    args = parser.parse_args()
+
+    client = SlowAppSignalsClient(args.latency)
+    tools = {
+        'list_monitored_services (1 AWS call)': server.list_monitored_services,
+        'get_service_detail (2 AWS calls)': lambda: server.get_service_detail('checkout'),
+    }
+    with (
+        patch.object(server, 'appsignals_client', client),
+        patch.object(server.service_catalog._cache, 'get', uncached),
+        patch.object(server.service_detail_cache._cache, 'get', uncached),
+    ):
+        for name, tool in tools.items():
+            print(name)
+            baseline = None
+            for calls in args.calls:
+                client.calls = 0
+                elapsed = asyncio.run(run_tool(tool, calls))
+                baseline = baseline or elapsed
+                print(
+                    f'  {calls:>4} concurrent calls: {elapsed:6.2f}s ({elapsed / baseline:4.1f}x one call, '
+                    f'{client.calls} AWS calls)'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -54,11 +54,18 @@ def create_minimal_async_jobs_table():
         # Wait for table to be created
         table.wait_until_exists()
 
+        # Archived jobs are expired from the hot table via TTL on expires_at
+        dynamodb.meta.client.update_time_to_live(
+            TableName=table_name,
+            TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'expires_at'},
+        )
+
         print(f'✅ Table {table_name} created successfully!')
         print(f'   Schema:')
         print(f'   - job_id: Partition key (String)')
         print(f'   - status: Regular attribute (String)')
         print(f'   - context: Regular attribute (Map/JSON)')
+        print('   - expires_at: TTL attribute (set when a job is archived)')
         print(f'   Billing: PAY_PER_REQUEST (on-demand)')
 
     except Exception as e:
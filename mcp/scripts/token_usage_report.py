@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Report LLM token usage of async investigations by investigation type.
+
+Scans the async job table for the cumulative token counts recorded on each
+job and prints the investigation types ordered by total tokens spent.
+
+Usage:
+    python scripts/token_usage_report.py [--region us-east-1] [--table appsignals-async-jobs] [--top 20]
+"""
+
+import argparse
+import os
+import sys
+
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from awslabs.cloudwatch_appsignals_mcp_server.async_monitor import AsyncTaskMonitor  # noqa: E402
+from awslabs.cloudwatch_appsignals_mcp_server.token_accounting import (  # noqa: E402
+    format_token_report,
+)
+
+
+def main():
+    """Print the token usage report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--region', default=os.environ.get('AWS_REGION', 'us-east-1'))
+    parser.add_argument('--table', default='appsignals-async-jobs')
+    parser.add_argument(
+        '--top', type=int, default=None, help='Only show the N most expensive types'
+    )
+    args = parser.parse_args()
+
+    monitor = AsyncTaskMonitor(region=args.region, table_name=args.table)
+    rows = monitor.token_report()
+    if not rows:
+        print('No investigations found')
+        return
+    print(format_token_report(rows, top=args.top))
+
+
+if __name__ == '__main__':
+    main()
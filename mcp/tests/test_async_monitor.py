@@ -0,0 +1,584 @@
+"""Tests for the async task monitor."""
+
+import asyncio
+import pytest
+from awslabs.cloudwatch_appsignals_mcp_server import async_monitor
+from awslabs.cloudwatch_appsignals_mcp_server.async_monitor import AsyncTaskMonitor
+from awslabs.cloudwatch_appsignals_mcp_server.attribute_codec import decode_item, encode_item
+from awslabs.cloudwatch_appsignals_mcp_server.clock import (
+    SystemClock,
+    VirtualClock,
+    VirtualScheduler,
+)
+from awslabs.cloudwatch_appsignals_mcp_server.job_archive import JobArchive
+from awslabs.cloudwatch_appsignals_mcp_server.llm_router import LLMRouter, LLMTier
+from awslabs.cloudwatch_appsignals_mcp_server.token_accounting import TokenBudget
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+
+@pytest.fixture
+def mock_table():
+    """Mock DynamoDB table with no jobs."""
+    table = MagicMock()
+    table.scan.return_value = {'Items': []}
+    return table
+
+
+class TestVirtualClock:
+    """Test cases for VirtualClock."""
+
+    def test_starts_at_given_time(self):
+        """Test the clock reports the configured start time."""
+        clock = VirtualClock(start=datetime(2025, 6, 1, 12, 0))
+        assert clock.now() == datetime(2025, 6, 1, 12, 0)
+        assert clock.monotonic() == 0.0
+
+    @pytest.mark.asyncio
+    async def test_sleep_wakes_at_virtual_deadline(self):
+        """Test sleeping coroutines wake once the clock reaches their deadline."""
+        clock = VirtualClock()
+        woke_at = []
+
+        async def sleeper(delay):
+            await clock.sleep(delay)
+            woke_at.append(clock.monotonic())
+
+        clock.spawn(sleeper(30))
+        clock.spawn(sleeper(10))
+
+        await clock.run_for(20)
+        assert woke_at == [10]
+
+        await clock.run_for(20)
+        assert woke_at == [10, 30]
+        assert clock.monotonic() == 40
+
+    @pytest.mark.asyncio
+    async def test_cancelled_timer_does_not_fire(self):
+        """Test cancelled timers are skipped."""
+        clock = VirtualClock()
+        fired = []
+        timer = clock.call_later(5, lambda: fired.append(True))
+        timer.cancel()
+
+        await clock.run_for(10)
+        assert fired == []
+
+
+class TestVirtualScheduler:
+    """Test cases for VirtualScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_interval_job_runs_once_per_interval(self):
+        """Test an interval job fires every interval of simulated time."""
+        clock = VirtualClock()
+        scheduler = VirtualScheduler(clock)
+        job = AsyncMockCounter()
+        scheduler.add_job(job, 'interval', seconds=60, id='counter')
+        scheduler.start()
+
+        await clock.run_for(3600)
+
+        assert job.calls == 60
+        assert scheduler.job_stats()['counter']['runs'] == 60
+
+    @pytest.mark.asyncio
+    async def test_overlapping_runs_are_skipped(self):
+        """Test a job still running when its next run falls due is not started twice."""
+        clock = VirtualClock()
+        scheduler = VirtualScheduler(clock)
+
+        async def slow_job():
+            await clock.sleep(25)
+
+        scheduler.add_job(slow_job, 'interval', seconds=10, id='slow')
+        scheduler.start()
+
+        await clock.run_for(100)
+
+        stats = scheduler.job_stats()['slow']
+        assert stats['skipped'] > 0
+        assert stats['busy_seconds'] == stats['runs'] * 25
+
+    def test_rejects_non_interval_trigger(self):
+        """Test only interval triggers are supported."""
+        scheduler = VirtualScheduler(VirtualClock())
+        with pytest.raises(ValueError):
+            scheduler.add_job(AsyncMockCounter(), 'cron', seconds=10)
+
+    @pytest.mark.asyncio
+    async def test_shutdown_stops_jobs(self):
+        """Test no jobs fire after shutdown."""
+        clock = VirtualClock()
+        scheduler = VirtualScheduler(clock)
+        job = AsyncMockCounter()
+        scheduler.add_job(job, 'interval', seconds=10, id='counter')
+        scheduler.start()
+
+        await clock.run_for(30)
+        scheduler.shutdown()
+        await clock.run_for(30)
+
+        assert job.calls == 3
+
+
+class TestAsyncTaskMonitorSimulation:
+    """Test cases for running the monitor on simulated time."""
+
+    def test_defaults_to_system_clock(self, mock_table):
+        """Test the monitor uses the host clock unless told otherwise."""
+        monitor = AsyncTaskMonitor(table=mock_table)
+        assert isinstance(monitor.clock, SystemClock)
+
+    @pytest.mark.asyncio
+    async def test_simulate_requires_virtual_clock(self, mock_table):
+        """Test simulate refuses to run on the system clock."""
+        monitor = AsyncTaskMonitor(table=mock_table)
+        with pytest.raises(RuntimeError):
+            await monitor.simulate(60)
+
+    @pytest.mark.asyncio
+    async def test_simulate_one_hour_of_polling(self, mock_table):
+        """Test an hour of simulated polling runs both pollers on schedule."""
+        monitor = AsyncTaskMonitor(table=mock_table, clock=VirtualClock())
+
+        stats = await monitor.simulate(3600)
+
+        assert stats['master_poller']['runs'] == 60
+        assert stats['deployment_poller']['runs'] == 360
+        assert mock_table.scan.call_count == 420
+
+    @pytest.mark.asyncio
+    async def test_simulated_timestamps_use_virtual_clock(self, mock_table):
+        """Test job timestamps come from the monitor's clock."""
+        clock = VirtualClock(start=datetime(2025, 3, 1))
+        monitor = AsyncTaskMonitor(table=mock_table, clock=clock)
+        await clock.run_for(90)
+
+        monitor.create_investigation('Why?', {'service': 'svc'}, job_id='job-1')
+
+        item = mock_table.put_item.call_args.kwargs['Item']
+        assert item['updated_at'] == '2025-03-01T00:01:30'
+
+    @pytest.mark.asyncio
+    async def test_periodic_job_without_job_polling(self, mock_table):
+        """Test a monitor without job polling only runs its periodic jobs, first one at start."""
+        clock = VirtualClock()
+        monitor = AsyncTaskMonitor(table=mock_table, clock=clock, job_polling=False)
+        runs = []
+
+        async def refresh():
+            runs.append(clock.monotonic())
+
+        monitor.add_periodic_job('refresh', refresh, 300, run_now=True)
+        stats = await monitor.simulate(900)
+
+        assert set(stats) == {'refresh'}
+        assert stats['refresh']['runs'] == 3
+        assert len(runs) == 4
+        mock_table.scan.assert_not_called()
+
+    def test_snapshot_items_use_their_own_status(self, mock_table):
+        """Test snapshots are stored under a status the job pollers never scan for."""
+        monitor = AsyncTaskMonitor(table=mock_table)
+
+        monitor.put_snapshot('sli-snapshot-24h', '{"reports": []}')
+
+        item = mock_table.put_item.call_args.kwargs['Item']
+        assert item['status'] == 'snapshot'
+        mock_table.get_item.return_value = {'Item': item}
+        assert monitor.get_snapshot('sli-snapshot-24h') == '{"reports": []}'
+        mock_table.get_item.return_value = {'Item': {'job_id': 'job-1', 'status': 'open'}}
+        assert monitor.get_snapshot('job-1') is None
+
+
+class TestAsyncTaskMonitorPromptEncoding:
+    """Test cases for compressed prompt storage."""
+
+    def test_large_prompt_round_trips_through_table(self, mock_table):
+        """Test large prompts are written as Binary and read back as text."""
+        monitor = AsyncTaskMonitor(table=mock_table)
+        job_id = monitor.create_investigation('Why?', {'log': 'x' * 10000})
+
+        stored = mock_table.put_item.call_args.kwargs['Item']
+        assert isinstance(stored['prompt'], bytes)
+        assert isinstance(monitor.active_tasks[job_id]['prompt'], str)
+
+        mock_table.get_item.return_value = {'Item': dict(stored)}
+        assert monitor.get_task(job_id)['prompt'].endswith('Investigation Log:\n')
+
+
+class TestAsyncTaskMonitorDeploymentPolling:
+    """Test cases for the deployment notification poller."""
+
+    @pytest.mark.asyncio
+    async def test_prompts_decoded_once(self, mock_table, monkeypatch):
+        """Test each completed prompt is decoded once and archived jobs not at all."""
+        mock_table.scan.return_value = {
+            'Items': [
+                encode_item(
+                    {'job_id': 'deploy', 'status': 'complete', 'prompt': 'Why did deploy fail?'}
+                ),
+                encode_item(
+                    {'job_id': 'other', 'status': 'complete', 'prompt': 'Why is it slow?'}
+                ),
+                {'job_id': 'old', 'status': 'complete', 'archived_at': '2025-01-01T00:00:00'},
+            ]
+        }
+        decoded = []
+
+        def counting_decode(item):
+            decoded.append(item['job_id'])
+            return decode_item(item)
+
+        monkeypatch.setattr(async_monitor, 'decode_item', counting_decode)
+        monitor = AsyncTaskMonitor(table=mock_table)
+        monitor._queue_notification = MagicMock()
+
+        for _ in range(3):
+            await monitor._poll_deployment_status()
+
+        assert decoded == ['deploy', 'other']
+        monitor._queue_notification.assert_called_once()
+        assert monitor._queue_notification.call_args.args[1] == 'deploy'
+
+
+class TestAsyncTaskMonitorLLMRouting:
+    """Test cases for routing iterations between LLM tiers."""
+
+    @pytest.fixture
+    def monitor(self, mock_table, monkeypatch):
+        """Monitor with real LLM calls enabled and a fast and strong tier."""
+        monkeypatch.setenv('USE_REAL_LLM', 'true')
+        router = LLMRouter(
+            strong=LLMTier('strong', cli='q', model='big'),
+            fast=LLMTier('fast', cli='q', model='small'),
+        )
+        return AsyncTaskMonitor(table=mock_table, llm_router=router)
+
+    def test_count_iterations(self):
+        """Test iterations are counted from the log entry markers."""
+        prompt = 'Question\n\nInvestigation Log:\n\n--- t1 ---\nA\n\n--- t2 ---\nB\n'
+        assert AsyncTaskMonitor._count_iterations(prompt) == 2
+        assert AsyncTaskMonitor._count_iterations('Question') == 0
+
+    @pytest.mark.asyncio
+    async def test_confident_fast_answer_is_kept(self, monitor):
+        """Test an intermediate iteration answered confidently stays on the fast tier."""
+        calls = []
+
+        async def run(prompt, tier):
+            calls.append(tier.name)
+            return '[STATUS:CONTINUING]\n[FINDING:cpu=95%]'
+
+        monitor._run_llm_cli = run
+        result = await monitor._simulate_llm_investigation('job-1', 'Question', 0)
+
+        assert calls == ['fast']
+        assert result['findings'] == {'cpu': '95%'}
+        assert monitor.llm_router.stats()['fast']['calls'] == 1
+
+    @pytest.mark.asyncio
+    async def test_intermediate_iteration_of_real_prompt_uses_fast_tier(self, monitor):
+        """Test routing ignores the root-cause wording of the appended instructions."""
+        context = 'Question: why slow?\n\nInvestigation Log:\n\n--- t1 ---\nAction: Checked CPU\n'
+        prompts = []
+
+        async def run(prompt, tier):
+            prompts.append((prompt, tier.name))
+            return '[STATUS:CONTINUING]\n[FINDING:cpu=95%]'
+
+        monitor._run_llm_cli = run
+        await monitor._process_investigation('job-1', {'job_id': 'job-1', 'prompt': context})
+
+        assert prompts == [(monitor._build_investigation_prompt(context), 'fast')]
+        assert 'root cause' in prompts[0][0]
+
+    @pytest.mark.asyncio
+    async def test_fast_conclusion_escalates_to_strong(self, monitor):
+        """Test a fast-tier conclusion is redone on the strong tier."""
+        calls = []
+
+        async def run(prompt, tier):
+            calls.append(tier.name)
+            return '[STATUS:COMPLETE]\n[FINDING:root_cause=db]\n[ANSWER:The database]'
+
+        monitor._run_llm_cli = run
+        result = await monitor._simulate_llm_investigation('job-1', 'Question', 1)
+
+        assert calls == ['fast', 'strong']
+        assert result['status'] == 'complete'
+        assert monitor.llm_router.stats()['fast']['escalations'] == 1
+
+    @pytest.mark.asyncio
+    async def test_late_iteration_goes_straight_to_strong(self, monitor):
+        """Test iterations past the conclusion threshold skip the fast tier."""
+        calls = []
+
+        async def run(prompt, tier):
+            calls.append(tier.name)
+            return '[STATUS:CONTINUING]\n[FINDING:cpu=95%]'
+
+        monitor._run_llm_cli = run
+        await monitor._simulate_llm_investigation('job-1', 'Question', 3)
+
+        assert calls == ['strong']
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_falls_back_without_calling_cli(self, monitor):
+        """Test calls are shed to the simulation while the tier's breaker is open."""
+        calls = []
+
+        async def run(prompt, tier):
+            calls.append(tier.name)
+            raise RuntimeError('cli failed')
+
+        monitor._run_llm_cli = run
+        for _ in range(6):
+            result = await monitor._simulate_llm_investigation('job-1', 'Question', 3)
+
+        assert len(calls) == 5
+        assert result['answer'].startswith('The deployment issue')
+        stats = monitor.llm_stats()['resilience']['strong']
+        assert stats['breaker_state'] == 'open'
+        assert stats['shed'] == 1
+
+
+class TestAsyncTaskMonitorTokenAccounting:
+    """Test cases for per-job token usage and budgets."""
+
+    @pytest.fixture
+    def job_table(self):
+        """Mock table backed by a dict of items."""
+        items = {}
+        table = MagicMock()
+        table.put_item.side_effect = lambda Item: items.__setitem__(Item['job_id'], dict(Item))
+        table.get_item.side_effect = lambda Key: (
+            {'Item': dict(items[Key['job_id']])} if Key['job_id'] in items else {}
+        )
+        table.scan.side_effect = lambda **kwargs: {'Items': [dict(i) for i in items.values()]}
+        table.items = items
+        return table
+
+    @pytest.mark.asyncio
+    async def test_usage_accumulates_on_job(self, job_table):
+        """Test each iteration adds its prompt and response tokens to the job."""
+        monitor = AsyncTaskMonitor(table=job_table)
+        job_id = monitor.create_investigation(
+            'Why?', {'service': 'svc'}, investigation_type='latency'
+        )
+
+        for _ in range(2):
+            await monitor._process_investigation(job_id, monitor.get_task(job_id))
+
+        job = job_table.items[job_id]
+        assert job['llm_calls'] == 2
+        assert job['prompt_tokens'] > 0
+        assert job['response_tokens'] > 0
+        report = monitor.token_report()
+        assert report[0]['investigation_type'] == 'latency'
+        assert report[0]['total_tokens'] == job['prompt_tokens'] + job['response_tokens']
+        scan_kwargs = job_table.scan.call_args.kwargs
+        assert scan_kwargs['FilterExpression'] == '#s <> :snapshot'
+        assert scan_kwargs['ExpressionAttributeValues'] == {':snapshot': 'snapshot'}
+
+    @pytest.mark.asyncio
+    async def test_job_budget_stops_investigation(self, job_table):
+        """Test an investigation that cannot fit its budget is closed without an LLM call."""
+        monitor = AsyncTaskMonitor(
+            table=job_table, token_budget=TokenBudget(SystemClock(), job_budget=50)
+        )
+        job_id = monitor.create_investigation('Why?', {'service': 'svc'})
+        monitor._simulate_llm_investigation = MagicMock()
+
+        await monitor._process_investigation(job_id, monitor.get_task(job_id))
+
+        job = job_table.items[job_id]
+        assert job['status'] == 'complete'
+        assert 'Status: stopped' in job['prompt']
+        monitor._simulate_llm_investigation.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_global_budget_defers_investigation(self, job_table):
+        """Test a spent global budget leaves the job open and untouched."""
+        budget = TokenBudget(SystemClock(), global_budget=10)
+        budget.record(10)
+        monitor = AsyncTaskMonitor(table=job_table, token_budget=budget)
+        job_id = monitor.create_investigation('Why?', {'service': 'svc'})
+
+        await monitor._process_investigation(job_id, monitor.get_task(job_id))
+
+        assert job_table.items[job_id]['status'] == 'open'
+        assert 'llm_calls' not in job_table.items[job_id]
+
+
+class SlowLLMMonitor(AsyncTaskMonitor):
+    """Monitor whose simulated LLM call takes ``llm_seconds`` of clock time."""
+
+    def __init__(self, llm_seconds, **kwargs):
+        """Initialize the monitor with a fixed LLM latency."""
+        super().__init__(**kwargs)
+        self.llm_seconds = llm_seconds
+
+    async def _simulate_llm_investigation(self, job_id, prompt, iteration, context=None):
+        await self.clock.sleep(self.llm_seconds)
+        return self._parse_llm_response('[STATUS:CONTINUING]\n[ACTION:Checking metrics]')
+
+
+@pytest.fixture
+def open_job_table():
+    """Mock DynamoDB table holding a single open investigation."""
+    job = {'job_id': 'job-1', 'status': 'open', 'prompt': 'Question: why slow?'}
+    table = MagicMock()
+    table.scan.return_value = {'Items': [dict(job)]}
+    table.get_item.side_effect = lambda Key: {'Item': dict(job)}
+    return table
+
+
+class TestAsyncTaskMonitorDrain:
+    """Test cases for draining in-flight work on shutdown."""
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_in_flight_iteration(self, open_job_table):
+        """Test an iteration that finishes before the deadline writes its result."""
+        clock = VirtualClock()
+        monitor = SlowLLMMonitor(llm_seconds=20, table=open_job_table, clock=clock)
+        await monitor.simulate(60)
+        assert 'job-1' in monitor._in_flight
+
+        drain = clock.spawn(monitor.drain(timeout=30))
+        await clock.run_for(40)
+
+        assert drain.result() == {'completed': 1, 'released': 0, 'notifications_flushed': 0}
+        open_job_table.put_item.assert_called_once()
+        assert monitor._in_flight == {}
+
+    @pytest.mark.asyncio
+    async def test_drain_releases_iteration_past_deadline(self, open_job_table):
+        """Test an iteration still running at the deadline is cancelled without writing."""
+        clock = VirtualClock()
+        monitor = SlowLLMMonitor(llm_seconds=120, table=open_job_table, clock=clock)
+        await monitor.simulate(60)
+
+        drain = clock.spawn(monitor.drain(timeout=5))
+        await clock.run_for(10)
+
+        assert drain.result()['released'] == 1
+        open_job_table.put_item.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_drain_stops_claiming_new_work(self, open_job_table):
+        """Test no polls run once the monitor has drained."""
+        clock = VirtualClock()
+        monitor = SlowLLMMonitor(llm_seconds=1, table=open_job_table, clock=clock)
+        await monitor.simulate(61)
+
+        drain = clock.spawn(monitor.drain(timeout=5))
+        await clock.run_for(5)
+        assert drain.done()
+        scans = open_job_table.scan.call_count
+
+        await clock.run_for(600)
+        assert open_job_table.scan.call_count == scans
+
+    @pytest.mark.asyncio
+    async def test_drain_flushes_queued_notifications(self, mock_table):
+        """Test queued Slack notifications are sent before the drain returns."""
+        clock = VirtualClock()
+        monitor = AsyncTaskMonitor(table=mock_table, clock=clock)
+        sent = []
+
+        async def slow_send(message, job_id=None):
+            await clock.sleep(3)
+            sent.append(job_id)
+
+        monitor.send_slack_notification = slow_send
+        monitor._queue_notification('Deployment Successful', 'job-1')
+
+        drain = clock.spawn(monitor.drain(timeout=1))
+        await clock.run_for(10)
+
+        assert sent == ['job-1']
+        assert drain.result()['notifications_flushed'] == 1
+
+
+class TestAsyncTaskMonitorArchive:
+    """Test cases for archiving completed jobs out of the hot table."""
+
+    @pytest.mark.asyncio
+    async def test_archives_old_completed_jobs(self, mock_table, tmp_path):
+        """Test old completed jobs are archived, stripped and given a TTL."""
+        job = {
+            'job_id': 'job-1',
+            'status': 'complete',
+            'prompt': 'Question: why slow?',
+            'updated_at': '2025-01-01T00:00:00',
+        }
+        mock_table.scan.return_value = {'Items': [dict(job)]}
+        archive = JobArchive(str(tmp_path))
+        clock = VirtualClock(start=datetime(2025, 2, 1))
+        monitor = AsyncTaskMonitor(table=mock_table, clock=clock, archive=archive)
+
+        assert await monitor.archive_completed_jobs() == 1
+
+        assert archive.get('job-1') == job
+        scan_kwargs = mock_table.scan.call_args.kwargs
+        assert scan_kwargs['ExpressionAttributeValues'][':cutoff'] == '2025-01-25T00:00:00'
+        update_kwargs = mock_table.update_item.call_args.kwargs
+        assert 'REMOVE prompt' in update_kwargs['UpdateExpression']
+        assert update_kwargs['ExpressionAttributeValues'][':ttl'] == int(
+            datetime(2025, 2, 2, tzinfo=timezone.utc).timestamp()
+        )
+
+    @pytest.mark.asyncio
+    async def test_archive_is_noop_without_archive(self, mock_table):
+        """Test nothing is scanned when no archive is configured."""
+        monitor = AsyncTaskMonitor(table=mock_table)
+        assert await monitor.archive_completed_jobs() == 0
+        mock_table.scan.assert_not_called()
+
+    def test_get_task_falls_back_to_archive(self, mock_table, tmp_path):
+        """Test archived jobs are served from the archive once stripped or expired."""
+        archive = JobArchive(str(tmp_path))
+        archive.write_segment([{'job_id': 'job-1', 'status': 'complete', 'prompt': 'full'}])
+        monitor = AsyncTaskMonitor(table=mock_table, archive=archive)
+
+        mock_table.get_item.return_value = {
+            'Item': {'job_id': 'job-1', 'status': 'complete', 'archived_at': '2025-02-01'}
+        }
+        assert monitor.get_task('job-1')['prompt'] == 'full'
+
+        mock_table.get_item.return_value = {}
+        assert monitor.get_task('job-1')['prompt'] == 'full'
+        assert monitor.get_task('job-2') is None
+
+    def test_update_restores_archived_job(self, mock_table, tmp_path):
+        """Test updating an archived job writes it back without its TTL."""
+        archive = JobArchive(str(tmp_path))
+        archive.write_segment(
+            [{'job_id': 'job-1', 'status': 'complete', 'prompt': 'full', 'archived_at': 'x'}]
+        )
+        mock_table.get_item.return_value = {}
+        monitor = AsyncTaskMonitor(table=mock_table, archive=archive)
+
+        assert monitor.update_task('job-1', {'status': 'open'})
+
+        item = mock_table.put_item.call_args.kwargs['Item']
+        assert item['status'] == 'open'
+        assert item['prompt'] == 'full'
+        assert 'archived_at' not in item
+
+
+class AsyncMockCounter:
+    """Awaitable job that counts its invocations."""
+
+    def __init__(self):
+        """Initialize the counter."""
+        self.calls = 0
+        self.__name__ = 'counter'
+
+    async def __call__(self):
+        """Record one invocation."""
+        self.calls += 1
+        await asyncio.sleep(0)
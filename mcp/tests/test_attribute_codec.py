@@ -0,0 +1,81 @@
+"""Tests for compressed text attribute encoding."""
+
+import pytest
+from awslabs.cloudwatch_appsignals_mcp_server.attribute_codec import (
+    CODEC_MAGIC,
+    CODEC_VERSION,
+    CODEC_ZLIB,
+    decode_item,
+    decode_text,
+    encode_item,
+    encode_text,
+)
+from boto3.dynamodb.types import Binary
+
+
+LARGE_PROMPT = 'Status: continuing\nAction: Analyzing metrics\n' * 500
+
+
+class TestEncodeText:
+    """Test cases for encode_text/decode_text."""
+
+    def test_small_text_stays_string(self):
+        """Test text below the threshold is stored unchanged."""
+        assert encode_text('short prompt', threshold=1024) == 'short prompt'
+
+    def test_large_text_is_compressed_with_header(self):
+        """Test large text becomes header-prefixed compressed bytes."""
+        encoded = encode_text(LARGE_PROMPT, threshold=1024)
+
+        assert isinstance(encoded, bytes)
+        assert encoded.startswith(CODEC_MAGIC + bytes((CODEC_VERSION, CODEC_ZLIB)))
+        assert len(encoded) < len(LARGE_PROMPT) / 10
+
+    def test_incompressible_text_stays_string(self):
+        """Test text that wouldn't shrink is stored unchanged."""
+        assert encode_text('abc', threshold=1) == 'abc'
+
+    def test_round_trip(self):
+        """Test decoding restores the original text, including non-ASCII."""
+        text = LARGE_PROMPT + '✅ latency p99 ↑ 2500ms'
+        assert decode_text(encode_text(text, threshold=1024)) == text
+
+    def test_decode_string_fast_path(self):
+        """Test plain strings decode to themselves."""
+        assert decode_text('plain') == 'plain'
+
+    def test_decode_boto3_binary(self):
+        """Test values wrapped in boto3's Binary type are decoded."""
+        encoded = encode_text(LARGE_PROMPT, threshold=1024)
+        assert decode_text(Binary(encoded)) == LARGE_PROMPT
+
+    def test_decode_rejects_unknown_header(self):
+        """Test bytes without the codec header are rejected."""
+        with pytest.raises(ValueError, match='header'):
+            decode_text(b'not-compressed')
+
+    def test_decode_rejects_unknown_version(self):
+        """Test a newer codec version is rejected rather than misread."""
+        encoded = bytearray(encode_text(LARGE_PROMPT, threshold=1024))
+        encoded[len(CODEC_MAGIC)] = CODEC_VERSION + 1
+        with pytest.raises(ValueError, match='version'):
+            decode_text(bytes(encoded))
+
+
+class TestEncodeItem:
+    """Test cases for item-level encoding."""
+
+    def test_only_prompt_is_encoded(self):
+        """Test item encoding compresses the prompt and leaves other attributes alone."""
+        item = {'job_id': 'job-1', 'status': 'open', 'prompt': LARGE_PROMPT}
+
+        encoded = encode_item(item, threshold=1024)
+
+        assert isinstance(encoded['prompt'], bytes)
+        assert encoded['status'] == 'open'
+        assert item['prompt'] == LARGE_PROMPT
+
+    def test_decode_item_round_trip(self):
+        """Test decode_item restores an encoded item."""
+        item = {'job_id': 'job-1', 'prompt': LARGE_PROMPT}
+        assert decode_item(encode_item(item, threshold=1024)) == item
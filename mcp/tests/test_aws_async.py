@@ -0,0 +1,62 @@
+"""Tests for the async AWS call offloading layer."""
+
+import asyncio
+import pytest
+import threading
+import time
+from awslabs.cloudwatch_appsignals_mcp_server import aws_async
+from awslabs.cloudwatch_appsignals_mcp_server.aws_async import (
+    client_config,
+    get_executor,
+    run_sync,
+    shutdown_executor,
+)
+
+
+class TestRunSync:
+    """Test cases for run_sync."""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_the_event_loop_thread(self):
+        """Test the call runs on a pool thread and its result is returned."""
+        loop_thread = threading.get_ident()
+
+        def call(value, scale=1):
+            return value * scale, threading.get_ident()
+
+        result, thread = await run_sync(call, 2, scale=3)
+
+        assert result == 6
+        assert thread != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate(self):
+        """Test exceptions raised by the call reach the awaiting coroutine."""
+
+        def fail():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError, match='boom'):
+            await run_sync(fail)
+
+    @pytest.mark.asyncio
+    async def test_blocking_calls_overlap(self):
+        """Test concurrent blocking calls complete in about the time of one."""
+        started = time.perf_counter()
+        await asyncio.gather(*(run_sync(time.sleep, 0.2) for _ in range(8)))
+        assert time.perf_counter() - started < 0.2 * 4
+
+
+class TestExecutor:
+    """Test cases for the shared thread pool."""
+
+    def test_pool_and_connection_pool_share_size(self):
+        """Test the botocore connection pool matches the worker count."""
+        assert client_config().max_pool_connections == aws_async.AWS_MAX_CONCURRENCY
+        assert get_executor()._max_workers == aws_async.AWS_MAX_CONCURRENCY
+
+    def test_shutdown_recreates_pool(self):
+        """Test a shut-down pool is replaced on next use."""
+        executor = get_executor()
+        shutdown_executor()
+        assert get_executor() is not executor
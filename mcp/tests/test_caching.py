@@ -0,0 +1,123 @@
+"""Tests for the async TTL cache."""
+
+import asyncio
+import pytest
+from awslabs.cloudwatch_appsignals_mcp_server.caching import AsyncTTLCache
+
+
+class FakeClock:
+    """Callable monotonic clock advanced by the test."""
+
+    def __init__(self):
+        """Start at time zero."""
+        self.time = 0.0
+
+    def __call__(self):
+        """Return the current fake time."""
+        return self.time
+
+
+class Loader:
+    """Async loader returning an incrementing value, optionally after a delay."""
+
+    def __init__(self, delay=0.0):
+        """Initialize the loader."""
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        """Return the number of calls made so far."""
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.calls
+
+
+class TestAsyncTTLCache:
+    """Test cases for AsyncTTLCache."""
+
+    @pytest.mark.asyncio
+    async def test_hit_within_ttl(self):
+        """Test a fresh entry is served without reloading."""
+        clock, loader = FakeClock(), Loader()
+        cache = AsyncTTLCache(ttl=10, clock=clock)
+
+        assert await cache.get('k', loader) == 1
+        clock.time = 10
+        assert await cache.get('k', loader) == 1
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_reloads_inline(self):
+        """Test an entry past its TTL is reloaded when stale serving is off."""
+        clock, loader = FakeClock(), Loader()
+        cache = AsyncTTLCache(ttl=10, clock=clock)
+
+        await cache.get('k', loader)
+        clock.time = 11
+        assert await cache.get('k', loader) == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_while_refreshing(self):
+        """Test a stale entry is returned immediately and refreshed in the background."""
+        clock, loader = FakeClock(), Loader()
+        cache = AsyncTTLCache(ttl=10, stale_ttl=60, clock=clock)
+
+        await cache.get('k', loader)
+        clock.time = 30
+        assert await cache.get('k', loader) == 1
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert await cache.get('k', loader) == 2
+        assert cache.stats()['refreshes'] == 1
+
+    @pytest.mark.asyncio
+    async def test_single_flight(self):
+        """Test concurrent misses for one key share a single load."""
+        loader = Loader(delay=0.01)
+        cache = AsyncTTLCache(ttl=10)
+
+        results = await asyncio.gather(*(cache.get('k', loader) for _ in range(10)))
+
+        assert results == [1] * 10
+        assert loader.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_max_staleness_overrides_ttl(self):
+        """Test callers can demand fresher data than the TTL."""
+        clock, loader = FakeClock(), Loader()
+        cache = AsyncTTLCache(ttl=60, clock=clock)
+
+        await cache.get('k', loader)
+        clock.time = 5
+        assert await cache.get('k', loader, max_staleness=10) == 1
+        assert await cache.get('k', loader, max_staleness=0) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """Test a failed load propagates and the next call retries."""
+        cache = AsyncTTLCache(ttl=10)
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError('boom')
+            return 'ok'
+
+        with pytest.raises(RuntimeError):
+            await cache.get('k', flaky)
+        assert await cache.get('k', flaky) == 'ok'
+        assert cache.stats()['errors'] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_and_lru_eviction(self):
+        """Test invalidation drops entries and max_entries evicts the oldest key."""
+        cache = AsyncTTLCache(ttl=10, max_entries=2)
+        for key in ('a', 'b', 'c'):
+            await cache.get(key, Loader())
+
+        assert cache.peek('a') is None
+        cache.invalidate('b')
+        assert cache.peek('b') is None
+        assert cache.peek('c') == 1
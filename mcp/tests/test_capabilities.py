@@ -0,0 +1,90 @@
+"""Tests for the account-level capability registry."""
+
+import asyncio
+import pytest
+from awslabs.cloudwatch_appsignals_mcp_server.capabilities import CapabilityRegistry
+from unittest.mock import MagicMock
+
+
+class TestCapabilityRegistry:
+    """Test cases for CapabilityRegistry."""
+
+    @pytest.mark.asyncio
+    async def test_result_cached_until_invalidated(self):
+        """Test a capability is checked once per TTL and again after invalidation."""
+        check = MagicMock(return_value=(True, 'CloudWatchLogs', 'ACTIVE'))
+        registry = CapabilityRegistry(ttl=3600)
+        registry.register('transaction_search', check)
+
+        assert await registry.get('transaction_search') == (True, 'CloudWatchLogs', 'ACTIVE')
+        await registry.get('transaction_search')
+        assert check.call_count == 1
+
+        registry.invalidate('transaction_search')
+        await registry.get('transaction_search')
+        assert check.call_count == 2
+
+        await registry.get('transaction_search', max_staleness=0)
+        assert check.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_results_kept_per_argument(self):
+        """Test a check taking arguments is cached separately per value and invalidated as one."""
+        check = MagicMock(side_effect=lambda region='us-east-1': region)
+        registry = CapabilityRegistry(ttl=3600)
+        registry.register('transaction_search', check)
+
+        assert await registry.get('transaction_search') == 'us-east-1'
+        assert await registry.get('transaction_search', 'eu-west-1') == 'eu-west-1'
+        assert await registry.get('transaction_search', 'eu-west-1') == 'eu-west-1'
+        assert check.call_count == 2
+
+        registry.invalidate('transaction_search')
+        await registry.get('transaction_search')
+        await registry.get('transaction_search', 'eu-west-1')
+        assert check.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_expired_result_refreshed_in_background(self):
+        """Test an expired result is served while it is re-checked in the background."""
+        check = MagicMock(side_effect=['old', 'new'])
+        registry = CapabilityRegistry(ttl=0, stale_ttl=60)
+        registry.register('setting', check)
+
+        assert await registry.get('setting') == 'old'
+        assert await registry.get('setting') == 'old'
+        await asyncio.sleep(0.1)
+
+        assert await registry.get('setting') == 'new'
+        assert check.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        """Test a failed check raises and is retried on the next lookup."""
+        check = MagicMock(side_effect=[RuntimeError('throttled'), 'ok'])
+        registry = CapabilityRegistry(ttl=3600)
+        registry.register('setting', check)
+
+        with pytest.raises(RuntimeError):
+            await registry.get('setting')
+        assert await registry.get('setting') == 'ok'
+
+    @pytest.mark.asyncio
+    async def test_warm_checks_every_capability(self):
+        """Test warming checks all capabilities and tolerates failures."""
+        working = MagicMock(return_value='ok')
+        registry = CapabilityRegistry(ttl=3600)
+        registry.register('working', working)
+        registry.register('broken', MagicMock(side_effect=RuntimeError('denied')))
+
+        await registry.warm()
+
+        working.assert_called_once()
+        assert await registry.get('working') == 'ok'
+        assert registry.stats()['hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_capability(self):
+        """Test looking up an unregistered capability raises KeyError."""
+        with pytest.raises(KeyError):
+            await CapabilityRegistry(ttl=60).get('missing')
@@ -0,0 +1,250 @@
+"""Tests for fleet-wide SLI evaluation."""
+
+import pytest
+from awslabs.cloudwatch_appsignals_mcp_server.fleet_sli import (
+    BudgetReportSLIEvaluator,
+    FleetSLIEvaluator,
+)
+from awslabs.cloudwatch_appsignals_mcp_server.metric_query_engine import MetricQueryEngine
+from awslabs.cloudwatch_appsignals_mcp_server.slo_inventory import SLOInventory
+from unittest.mock import MagicMock
+
+
+def _services(count):
+    return [{'KeyAttributes': {'Name': f'svc-{i}', 'Type': 'Service'}} for i in range(count)]
+
+
+def _inventory(services, slos_per_service):
+    """SLO inventory holding ``slos_per_service`` SLOs for each service."""
+    slos = [
+        {'Name': f'{s["KeyAttributes"]["Name"]}/slo-{i}', 'KeyAttributes': s['KeyAttributes']}
+        for s in services
+        for i in range(slos_per_service)
+    ]
+    return SLOInventory(MagicMock(return_value={'SloSummaries': slos}))
+
+
+def _breached_count_client(breached):
+    """Mock GetMetricData returning 1 for SLOs in ``breached`` and 0 otherwise."""
+
+    def get_metric_data(**kwargs):
+        return {
+            'MetricDataResults': [
+                {
+                    'Id': query['Id'],
+                    'Timestamps': [kwargs['StartTime'], kwargs['EndTime']],
+                    'Values': [
+                        0.0,
+                        1.0
+                        if query['MetricStat']['Metric']['Dimensions'][0]['Value'] in breached
+                        else 0.0,
+                    ],
+                }
+                for query in kwargs['MetricDataQueries']
+            ]
+        }
+
+    return MagicMock(side_effect=get_metric_data)
+
+
+def _budget_report_client(breached, errors=()):
+    """Mock BatchGetServiceLevelObjectiveBudgetReport breaching SLOs in ``breached``."""
+
+    def batch_get_budget_report(**kwargs):
+        return {
+            'Timestamp': kwargs['Timestamp'],
+            'Reports': [
+                {
+                    'Name': slo_id,
+                    'EvaluationType': 'PeriodBased',
+                    'BudgetStatus': 'BREACHED' if slo_id in breached else 'OK',
+                    'Attainment': 98.0 if slo_id in breached else 99.99,
+                }
+                for slo_id in kwargs['SloIds']
+                if slo_id not in errors
+            ],
+            'Errors': [
+                {
+                    'Name': slo_id,
+                    'Arn': '',
+                    'ErrorCode': 'ResourceNotFound',
+                    'ErrorMessage': 'SLO not found',
+                }
+                for slo_id in kwargs['SloIds']
+                if slo_id in errors
+            ],
+        }
+
+    return MagicMock(side_effect=batch_get_budget_report)
+
+
+class TestFleetSLIEvaluator:
+    """Test cases for FleetSLIEvaluator."""
+
+    @pytest.mark.asyncio
+    async def test_batches_all_slos(self):
+        """Test the SLOs of every service share GetMetricData requests of up to 500 queries."""
+        get_metric_data = _breached_count_client({'svc-3/slo-1'})
+        services = _services(300)
+        evaluator = FleetSLIEvaluator(_inventory(services, 4), MetricQueryEngine(get_metric_data))
+
+        reports = await evaluator.evaluate(services, hours=24)
+
+        assert get_metric_data.call_count == 3
+        assert len(reports) == 300
+        assert reports[3].sli_status == 'CRITICAL'
+        assert reports[3].breached_slo_names == ['svc-3/slo-1']
+        assert reports[3].ok_slo_count == 3
+        assert reports[0].sli_status == 'OK'
+        assert reports[0].total_slo_count == 4
+
+    @pytest.mark.asyncio
+    async def test_query_shape(self):
+        """Test each SLO is queried as its BreachedCount maximum over the whole period."""
+        get_metric_data = _breached_count_client(set())
+        services = _services(1)
+        evaluator = FleetSLIEvaluator(_inventory(services, 1), MetricQueryEngine(get_metric_data))
+
+        await evaluator.evaluate(services, hours=48)
+
+        query = get_metric_data.call_args.kwargs['MetricDataQueries'][0]
+        assert query['MetricStat']['Metric']['MetricName'] == 'BreachedCount'
+        assert query['MetricStat']['Metric']['Dimensions'] == [
+            {'Name': 'SloName', 'Value': 'svc-0/slo-0'}
+        ]
+        assert query['MetricStat']['Stat'] == 'Maximum'
+        assert query['MetricStat']['Period'] == 24 * 3600
+
+    @pytest.mark.asyncio
+    async def test_service_without_slos(self):
+        """Test services without SLOs are OK and need no metric request."""
+        get_metric_data = MagicMock()
+        services = _services(2)
+        evaluator = FleetSLIEvaluator(_inventory(services, 0), MetricQueryEngine(get_metric_data))
+
+        reports = await evaluator.evaluate(services, hours=24)
+
+        get_metric_data.assert_not_called()
+        assert [r.sli_status for r in reports] == ['OK', 'OK']
+        assert reports[0].total_slo_count == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_queries_leave_service_without_status(self):
+        """Test services with a failed BreachedCount query report no status."""
+        services = _services(2)
+
+        def get_metric_data(**kwargs):
+            return {
+                'MetricDataResults': [
+                    {'Id': 'm0', 'Timestamps': [], 'Values': [], 'StatusCode': 'Complete'},
+                    {'Id': 'm1', 'Timestamps': [], 'Values': [], 'StatusCode': 'InternalError'},
+                ]
+            }
+
+        evaluator = FleetSLIEvaluator(
+            _inventory(services, 1), MetricQueryEngine(MagicMock(side_effect=get_metric_data))
+        )
+
+        reports = await evaluator.evaluate(services, hours=24)
+
+        assert reports[0].sli_status == 'OK'
+        assert reports[1] is None
+
+    @pytest.mark.asyncio
+    async def test_slo_listing_failure(self):
+        """Test a failed SLO sweep leaves every service without a status."""
+        evaluator = FleetSLIEvaluator(
+            SLOInventory(MagicMock(side_effect=Exception('throttled'))),
+            MetricQueryEngine(MagicMock()),
+        )
+
+        assert await evaluator.evaluate(_services(2), hours=24) == [None, None]
+
+    @pytest.mark.asyncio
+    async def test_metric_failure(self):
+        """Test a failed metric request leaves every service without a status."""
+        services = _services(2)
+        evaluator = FleetSLIEvaluator(
+            _inventory(services, 1), MetricQueryEngine(MagicMock(side_effect=Exception('denied')))
+        )
+
+        assert await evaluator.evaluate(services, hours=24) == [None, None]
+
+
+class TestBudgetReportSLIEvaluator:
+    """Test cases for BudgetReportSLIEvaluator."""
+
+    @pytest.mark.asyncio
+    async def test_batches_all_slos(self):
+        """Test the SLOs of every service share budget report requests of up to 50 SLOs."""
+        batch_get_budget_report = _budget_report_client({'svc-3/slo-1'})
+        services = _services(30)
+        evaluator = BudgetReportSLIEvaluator(_inventory(services, 4), batch_get_budget_report)
+
+        reports = await evaluator.evaluate(services, hours=24)
+
+        calls = batch_get_budget_report.call_args_list
+        assert sorted(len(c.kwargs['SloIds']) for c in calls) == [20, 50, 50]
+        assert evaluator.requests_made == 3
+        assert reports[3].sli_status == 'CRITICAL'
+        assert reports[3].breached_slo_names == ['svc-3/slo-1']
+        assert reports[3].ok_slo_count == 3
+        assert reports[0].sli_status == 'OK'
+        assert reports[0].total_slo_count == 4
+
+    @pytest.mark.asyncio
+    async def test_requests_by_arn(self):
+        """Test SLOs are requested and matched by ARN when the summary has one."""
+        services = _services(1)
+        slo = {
+            'Name': 'slo-a',
+            'Arn': 'arn:aws:application-signals:us-east-1:123:slo/slo-a',
+            'KeyAttributes': services[0]['KeyAttributes'],
+        }
+        batch_get_budget_report = MagicMock(
+            return_value={'Reports': [{'Arn': slo['Arn'], 'BudgetStatus': 'BREACHED'}]}
+        )
+        evaluator = BudgetReportSLIEvaluator(
+            SLOInventory(MagicMock(return_value={'SloSummaries': [slo]})),
+            batch_get_budget_report,
+        )
+
+        reports = await evaluator.evaluate(services, hours=24)
+
+        assert batch_get_budget_report.call_args.kwargs['SloIds'] == [slo['Arn']]
+        assert reports[0].breached_slo_names == ['slo-a']
+
+    @pytest.mark.asyncio
+    async def test_service_without_slos(self):
+        """Test services without SLOs are OK and need no budget report request."""
+        batch_get_budget_report = MagicMock()
+        services = _services(2)
+        evaluator = BudgetReportSLIEvaluator(_inventory(services, 0), batch_get_budget_report)
+
+        reports = await evaluator.evaluate(services, hours=24)
+
+        batch_get_budget_report.assert_not_called()
+        assert [r.sli_status for r in reports] == ['OK', 'OK']
+
+    @pytest.mark.asyncio
+    async def test_report_errors_leave_service_without_status(self):
+        """Test services with an SLO listed in Errors report no status."""
+        services = _services(2)
+        evaluator = BudgetReportSLIEvaluator(
+            _inventory(services, 2), _budget_report_client(set(), errors={'svc-1/slo-0'})
+        )
+
+        reports = await evaluator.evaluate(services, hours=24)
+
+        assert reports[0].sli_status == 'OK'
+        assert reports[1] is None
+
+    @pytest.mark.asyncio
+    async def test_request_failure(self):
+        """Test a failed budget report request leaves every service without a status."""
+        services = _services(2)
+        evaluator = BudgetReportSLIEvaluator(
+            _inventory(services, 1), MagicMock(side_effect=Exception('denied'))
+        )
+
+        assert await evaluator.evaluate(services, hours=24) == [None, None]
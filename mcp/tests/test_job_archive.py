@@ -0,0 +1,89 @@
+"""Tests for the completed-job archive."""
+
+import gzip
+import io
+import json
+from awslabs.cloudwatch_appsignals_mcp_server.job_archive import JobArchive
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+
+def _job(job_id, prompt='Question: why slow?'):
+    return {
+        'job_id': job_id,
+        'status': 'complete',
+        'prompt': prompt,
+        'updated_at': '2025-01-01T00:00:00',
+    }
+
+
+class TestLocalJobArchive:
+    """Test cases for archives in a local directory."""
+
+    def test_write_and_read_back(self, tmp_path):
+        """Test archived items are readable by job_id."""
+        archive = JobArchive(str(tmp_path))
+        archive.write_segment([_job('job-1'), _job('job-2', prompt='other')])
+
+        assert archive.get('job-2') == _job('job-2', prompt='other')
+        assert 'job-1' in archive
+        assert archive.get('missing') is None
+
+    def test_segments_are_gzip_jsonl(self, tmp_path):
+        """Test segments are compressed JSON lines with a sidecar index."""
+        archive = JobArchive(str(tmp_path))
+        segment = archive.write_segment([_job('job-1'), _job('job-2')])
+
+        lines = gzip.decompress((tmp_path / f'{segment}.jsonl.gz').read_bytes()).splitlines()
+        assert [json.loads(line)['job_id'] for line in lines] == ['job-1', 'job-2']
+        assert json.loads((tmp_path / f'{segment}.idx.json').read_text()) == {
+            'job-1': 0,
+            'job-2': 1,
+        }
+
+    def test_decimals_are_serialized(self, tmp_path):
+        """Test DynamoDB Decimal values survive archival."""
+        archive = JobArchive(str(tmp_path))
+        item = dict(_job('job-1'), tokens=Decimal('42'), score=Decimal('0.5'))
+        archive.write_segment([item])
+
+        restored = archive.get('job-1')
+        assert restored['tokens'] == 42
+        assert restored['score'] == 0.5
+
+    def test_sees_segments_written_by_another_instance(self, tmp_path):
+        """Test a lookup miss reloads indexes written since the last load."""
+        reader = JobArchive(str(tmp_path))
+        assert reader.get('job-1') is None
+
+        JobArchive(str(tmp_path)).write_segment([_job('job-1')])
+
+        assert reader.get('job-1')['job_id'] == 'job-1'
+
+    def test_empty_batch_writes_nothing(self, tmp_path):
+        """Test writing no items creates no segment."""
+        archive = JobArchive(str(tmp_path))
+        assert archive.write_segment([]) is None
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestS3JobArchive:
+    """Test cases for archives under an S3 prefix."""
+
+    def test_write_and_read_back(self):
+        """Test segments round-trip through the S3 client."""
+        objects = {}
+        s3_client = MagicMock()
+        s3_client.put_object.side_effect = lambda Bucket, Key, Body: objects.__setitem__(Key, Body)
+        s3_client.get_object.side_effect = lambda Bucket, Key: {'Body': io.BytesIO(objects[Key])}
+        s3_client.list_objects_v2.side_effect = lambda **kwargs: {
+            'Contents': [{'Key': key} for key in objects],
+            'IsTruncated': False,
+        }
+
+        JobArchive('s3://bucket/jobs', s3_client=s3_client).write_segment([_job('job-1')])
+        reader = JobArchive('s3://bucket/jobs', s3_client=s3_client)
+
+        assert reader.get('job-1') == _job('job-1')
+        assert all(key.startswith('jobs/segment-') for key in objects)
+        s3_client.list_objects_v2.assert_called_with(Bucket='bucket', Prefix='jobs/')
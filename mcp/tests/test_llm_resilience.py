@@ -0,0 +1,167 @@
+"""Tests for LLM call deadlines, hedging and circuit breaking."""
+
+import asyncio
+import pytest
+from awslabs.cloudwatch_appsignals_mcp_server.clock import SystemClock
+from awslabs.cloudwatch_appsignals_mcp_server.llm_resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    ResilientCaller,
+)
+
+
+class FakeClock:
+    """Clock whose monotonic time is set by the test."""
+
+    def __init__(self):
+        """Start at time zero."""
+        self.time = 0.0
+
+    def monotonic(self):
+        """Return the current fake time."""
+        return self.time
+
+
+class TestLatencyTracker:
+    """Test cases for the latency window."""
+
+    def test_percentile_needs_min_samples(self):
+        """Test no percentile is reported until enough samples exist."""
+        tracker = LatencyTracker(min_samples=3)
+        tracker.add(1.0)
+        assert tracker.percentile(95) is None
+
+    def test_percentile(self):
+        """Test the percentile is taken over the window."""
+        tracker = LatencyTracker(window=100, min_samples=1)
+        for latency in range(1, 101):
+            tracker.add(float(latency))
+        assert tracker.percentile(95) == 95.0
+
+
+class TestCircuitBreaker:
+    """Test cases for the error-rate circuit breaker."""
+
+    def test_opens_on_error_rate(self):
+        """Test the breaker opens once the failure ratio reaches the threshold."""
+        breaker = CircuitBreaker(FakeClock(), error_rate=0.5, min_calls=4)
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+    def test_half_open_trial(self):
+        """Test one trial call is allowed after the reset period and success closes it."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(clock, min_calls=1, reset_seconds=60)
+        breaker.record_failure()
+        clock.time = 61
+
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self):
+        """Test a failed trial call re-opens the breaker."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(clock, min_calls=1, reset_seconds=60)
+        breaker.record_failure()
+        clock.time = 61
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+
+class TestResilientCaller:
+    """Test cases for deadline and hedging behavior."""
+
+    @pytest.mark.asyncio
+    async def test_success(self):
+        """Test a successful call returns its result and is counted."""
+        caller = ResilientCaller(SystemClock(), timeout=1)
+
+        async def call():
+            return 'ok'
+
+        assert await caller.call(call) == 'ok'
+        assert caller.stats()['successes'] == 1
+
+    @pytest.mark.asyncio
+    async def test_deadline_cancels_call(self):
+        """Test a hung call is cancelled at the deadline."""
+        caller = ResilientCaller(SystemClock(), timeout=0.05)
+        cancelled = asyncio.Event()
+
+        async def hang():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(asyncio.TimeoutError):
+            await caller.call(hang)
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
+        assert caller.stats()['timeouts'] == 1
+
+    @pytest.mark.asyncio
+    async def test_hedged_attempt_wins(self):
+        """Test a second attempt starts after the p95 delay and the faster one wins."""
+        caller = ResilientCaller(SystemClock(), timeout=5, hedge=True)
+        for _ in range(10):
+            caller.latency.add(0.01)
+        delays = [10, 0]
+
+        async def call():
+            await asyncio.sleep(delays.pop(0))
+            return 'ok'
+
+        assert await asyncio.wait_for(caller.call(call), 2) == 'ok'
+        stats = caller.stats()
+        assert stats['hedged'] == 1
+        assert stats['hedge_wins'] == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_open_breaker_and_shed(self):
+        """Test repeated failures open the breaker and later calls are shed."""
+        breaker = CircuitBreaker(SystemClock(), min_calls=2, reset_seconds=60)
+        caller = ResilientCaller(SystemClock(), timeout=1, breaker=breaker)
+
+        async def fail():
+            raise RuntimeError('cli failed')
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await caller.call(fail)
+        with pytest.raises(CircuitOpenError):
+            await caller.call(fail)
+
+        stats = caller.stats()
+        assert stats['failures'] == 2
+        assert stats['shed'] == 1
+        assert stats['breaker_state'] == 'open'
+
+    @pytest.mark.asyncio
+    async def test_cancelled_trial_releases_breaker(self):
+        """Test a half-open trial that is cancelled lets the next call through."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(clock, min_calls=1, reset_seconds=60)
+        breaker.record_failure()
+        clock.time = 61
+        caller = ResilientCaller(SystemClock(), timeout=5, breaker=breaker)
+
+        trial = asyncio.ensure_future(caller.call(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
@@ -0,0 +1,108 @@
+"""Tests for LLM tier routing."""
+
+import pytest
+from awslabs.cloudwatch_appsignals_mcp_server.llm_router import LLMRouter, LLMTier
+
+
+@pytest.fixture
+def router():
+    """Router with a fast and a strong tier."""
+    return LLMRouter(
+        strong=LLMTier('strong', cli='q', model='big', cost_per_1k_tokens=1.0),
+        fast=LLMTier('fast', cli='q', model='small', cost_per_1k_tokens=0.1),
+        conclusion_iteration=3,
+        large_prompt_chars=1000,
+    )
+
+
+class TestSelect:
+    """Test cases for tier selection."""
+
+    def test_intermediate_iterations_use_fast_tier(self, router):
+        """Test early iterations of small prompts go to the fast tier."""
+        assert router.select(0, 100, expect_conclusion=False) is router.fast
+        assert router.select(2, 100, expect_conclusion=False) is router.fast
+
+    def test_late_iterations_use_strong_tier(self, router):
+        """Test iterations from conclusion_iteration on go to the strong tier."""
+        assert router.select(3, 100, expect_conclusion=False) is router.strong
+
+    def test_conclusions_and_large_prompts_use_strong_tier(self, router):
+        """Test expected conclusions and large prompts go to the strong tier."""
+        assert router.select(0, 100, expect_conclusion=True) is router.strong
+        assert router.select(0, 5000, expect_conclusion=False) is router.strong
+
+    def test_single_tier_always_strong(self):
+        """Test a router without a fast tier sends everything to strong."""
+        router = LLMRouter(strong=LLMTier('strong', cli='q'))
+        assert router.select(0, 10, expect_conclusion=False) is router.strong
+
+    def test_expects_conclusion_reads_latest_entry(self):
+        """Test only the latest log entry is checked for conclusion hints."""
+        prompt = 'Question: root cause?\n\n--- t1 ---\nFindings:\n- root_cause: db\n'
+        assert LLMRouter.expects_conclusion(prompt)
+        assert not LLMRouter.expects_conclusion(prompt + '\n\n--- t2 ---\nAction: more\n')
+        assert not LLMRouter.expects_conclusion('Question: root cause?')
+
+
+class TestEscalation:
+    """Test cases for escalating fast-tier answers."""
+
+    def test_strong_tier_never_escalates(self, router):
+        """Test strong-tier answers are final."""
+        assert not router.should_escalate(router.strong, {'status': 'complete'})
+
+    def test_fast_conclusion_escalates(self, router):
+        """Test a fast-tier conclusion is confirmed by the strong tier."""
+        response = {'status': 'complete', 'findings': {'root_cause': 'db'}}
+        assert router.should_escalate(router.fast, response)
+
+    def test_unsure_fast_answers_escalate(self, router):
+        """Test missing findings, low confidence and hedging escalate."""
+        assert router.should_escalate(router.fast, {'status': 'continuing', 'findings': {}})
+        low = {'status': 'continuing', 'findings': {'confidence': '40%'}}
+        assert router.should_escalate(router.fast, low)
+        ok = {'status': 'continuing', 'findings': {'cpu': '90%'}}
+        assert router.should_escalate(router.fast, ok, 'It is unclear what causes this')
+        assert not router.should_escalate(router.fast, ok, 'CPU is saturated')
+
+
+class TestStats:
+    """Test cases for per-tier latency and cost accounting."""
+
+    def test_record_accumulates_per_tier(self, router):
+        """Test latency, tokens and cost are tracked per tier."""
+        router.record(router.fast, 1.0, prompt_tokens=1000, response_tokens=100)
+        router.record(router.fast, 3.0, prompt_tokens=1000, ok=False)
+        router.record_escalation(router.fast)
+        router.record(router.strong, 10.0, prompt_tokens=1000)
+
+        stats = router.stats()
+        assert stats['fast']['calls'] == 2
+        assert stats['fast']['failures'] == 1
+        assert stats['fast']['escalations'] == 1
+        assert stats['fast']['avg_latency'] == 2.0
+        assert stats['fast']['total_tokens'] == 2100
+        assert stats['fast']['total_cost'] == pytest.approx(0.21)
+        assert stats['strong']['total_cost'] == pytest.approx(1.0)
+
+
+class TestFromEnv:
+    """Test cases for environment configuration."""
+
+    def test_fast_tier_disabled_by_default(self, monkeypatch):
+        """Test only the strong tier exists unless a fast tier is configured."""
+        for name in ('LLM_CLI', 'LLM_MODEL', 'LLM_FAST_CLI', 'LLM_FAST_MODEL'):
+            monkeypatch.delenv(name, raising=False)
+        router = LLMRouter.from_env()
+        assert router.fast is None
+        assert router.strong.cli == 'q'
+
+    def test_fast_tier_from_env(self, monkeypatch):
+        """Test LLM_FAST_MODEL enables a fast tier on the strong tier's CLI."""
+        monkeypatch.setenv('LLM_CLI', 'mycli')
+        monkeypatch.setenv('LLM_MODEL', 'big')
+        monkeypatch.setenv('LLM_FAST_MODEL', 'small')
+        router = LLMRouter.from_env()
+        assert (router.fast.cli, router.fast.model) == ('mycli', 'small')
+        assert router.strong.model == 'big'
@@ -0,0 +1,184 @@
+"""Tests for the incremental metric window cache."""
+
+import pytest
+from awslabs.cloudwatch_appsignals_mcp_server.metric_cache import (
+    MetricWindowCache,
+    merge_ranges,
+    metric_key,
+    subtract_ranges,
+)
+from datetime import datetime, timedelta, timezone
+
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _t(minutes):
+    return T0 + timedelta(minutes=minutes)
+
+
+class FakeClock:
+    """Settable UTC clock."""
+
+    def __init__(self, now):
+        """Start the clock at ``now``."""
+        self.now = now
+
+    def __call__(self):
+        """Return the current time."""
+        return self.now
+
+
+class RecordingFetcher:
+    """Fetcher returning one datapoint per step from the range start, recording the ranges."""
+
+    def __init__(self, step=timedelta(minutes=1)):
+        """Initialize with no recorded ranges."""
+        self.step = step
+        self.ranges = []
+
+    async def __call__(self, start, end):
+        """Return datapoints for ``start``..``end``."""
+        self.ranges.append((start, end))
+        points = []
+        timestamp = start
+        while timestamp < end:
+            points.append({'Timestamp': timestamp, 'Average': float(timestamp.minute)})
+            timestamp += self.step
+        return points
+
+
+class TestRanges:
+    """Test cases for range helpers."""
+
+    def test_subtract_ranges(self):
+        """Test uncovered head, gap and tail are returned."""
+        covered = [(_t(10), _t(20)), (_t(30), _t(40))]
+
+        assert subtract_ranges(_t(0), _t(50), covered) == [
+            (_t(0), _t(10)),
+            (_t(20), _t(30)),
+            (_t(40), _t(50)),
+        ]
+        assert subtract_ranges(_t(12), _t(18), covered) == []
+
+    def test_merge_ranges(self):
+        """Test overlapping and touching ranges merge."""
+        ranges = [(_t(5), _t(10)), (_t(0), _t(5)), (_t(20), _t(30)), (_t(25), _t(35))]
+
+        assert merge_ranges(ranges) == [(_t(0), _t(10)), (_t(20), _t(35))]
+
+    def test_metric_key_ignores_dimension_order(self):
+        """Test dimension order does not change the key."""
+        a = [{'Name': 'Service', 'Value': 's'}, {'Name': 'Environment', 'Value': 'e'}]
+        assert metric_key('ns', 'Latency', a, ('Average',)) == metric_key(
+            'ns', 'Latency', list(reversed(a)), ('Average',)
+        )
+
+
+class TestMetricWindowCache:
+    """Test cases for MetricWindowCache."""
+
+    @pytest.mark.asyncio
+    async def test_sliding_window_fetches_only_tail(self):
+        """Test a repeated "last hour" query only fetches what changed."""
+        clock = FakeClock(_t(60))
+        cache = MetricWindowCache(settle_seconds=300, clock=clock)
+        fetch = RecordingFetcher()
+
+        first = await cache.get('m', 60, _t(0), _t(60), fetch)
+        assert len(first) == 60
+        assert fetch.ranges == [(_t(0), _t(60))]
+
+        clock.now = _t(70)
+        second = await cache.get('m', 60, _t(10), _t(70), fetch)
+
+        # Buckets within the settle window of the first fetch are fetched again
+        assert fetch.ranges[1] == (_t(55), _t(70))
+        assert len(second) == 60
+        assert second[0]['Timestamp'] == _t(10)
+        assert second[-1]['Timestamp'] == _t(69)
+        assert cache.stats()['partial_hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_unaligned_window_matches_fresh_fetch(self):
+        """Test a window repeated at a time off the period grid adds no offset buckets."""
+        clock = FakeClock(_t(147))
+        cache = MetricWindowCache(clock=clock)
+        fetch = RecordingFetcher(step=timedelta(minutes=5))
+
+        await cache.get('m', 300, _t(27), _t(147), fetch)
+        clock.now = _t(154)
+        repeated = await cache.get('m', 300, _t(34), _t(154), fetch)
+        fresh = await MetricWindowCache(clock=clock).get(
+            'm', 300, _t(34), _t(154), RecordingFetcher(step=timedelta(minutes=5))
+        )
+
+        assert repeated == fresh
+        assert [point['Timestamp'] for point in repeated] == [_t(m) for m in range(35, 155, 5)]
+        assert all(start.minute % 5 == 0 for start, _end in fetch.ranges)
+
+    @pytest.mark.asyncio
+    async def test_settled_window_is_a_hit(self):
+        """Test a window entirely in the settled past is served without fetching."""
+        clock = FakeClock(_t(120))
+        cache = MetricWindowCache(clock=clock)
+        fetch = RecordingFetcher()
+
+        await cache.get('m', 60, _t(0), _t(60), fetch)
+        result = await cache.get('m', 60, _t(0), _t(60), fetch)
+
+        assert len(fetch.ranges) == 1
+        assert len(result) == 60
+        assert cache.stats()['hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_gap_is_filled(self):
+        """Test a gap between cached windows is fetched on its own."""
+        clock = FakeClock(_t(240))
+        cache = MetricWindowCache(clock=clock)
+        fetch = RecordingFetcher()
+
+        await cache.get('m', 60, _t(0), _t(30), fetch)
+        await cache.get('m', 60, _t(60), _t(90), fetch)
+        await cache.get('m', 60, _t(0), _t(90), fetch)
+
+        assert fetch.ranges[-1] == (_t(30), _t(60))
+
+    @pytest.mark.asyncio
+    async def test_periods_cached_separately(self):
+        """Test the same metric at another period is a separate series."""
+        cache = MetricWindowCache(clock=FakeClock(_t(240)))
+        fetch = RecordingFetcher()
+
+        await cache.get('m', 60, _t(0), _t(60), fetch)
+        await cache.get('m', 300, _t(0), _t(60), fetch)
+
+        assert len(fetch.ranges) == 2
+        assert cache.stats()['series'] == 2
+
+    @pytest.mark.asyncio
+    async def test_old_buckets_evicted(self):
+        """Test datapoints older than max_age are dropped."""
+        clock = FakeClock(_t(60))
+        cache = MetricWindowCache(max_age=timedelta(minutes=30), clock=clock)
+        fetch = RecordingFetcher()
+
+        await cache.get('m', 60, _t(0), _t(60), fetch)
+        clock.now = _t(100)
+        result = await cache.get('m', 60, _t(0), _t(100), fetch)
+
+        assert result[0]['Timestamp'] == _t(70)
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_series_evicted(self):
+        """Test the series count is bounded."""
+        cache = MetricWindowCache(max_series=2, clock=FakeClock(_t(240)))
+        fetch = RecordingFetcher()
+
+        for key in ('a', 'b', 'c'):
+            await cache.get(key, 60, _t(0), _t(10), fetch)
+        await cache.get('a', 60, _t(0), _t(10), fetch)
+
+        assert cache.stats()['series'] == 2
+        assert len(fetch.ranges) == 4
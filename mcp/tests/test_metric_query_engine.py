@@ -0,0 +1,277 @@
+"""Tests for the batched GetMetricData engine."""
+
+import asyncio
+import pytest
+from awslabs.cloudwatch_appsignals_mcp_server.metric_query_engine import (
+    MetricQuery,
+    MetricQueryEngine,
+    MetricSeries,
+    QueryBatcher,
+    get_metric_statistics_chunked,
+    query_id,
+    split_time_range,
+)
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END = START + timedelta(hours=1)
+
+
+def _queries(count):
+    return [
+        MetricQuery(
+            id=query_id(i),
+            namespace='ApplicationSignals',
+            metric_name='Latency',
+            stat='Average',
+            period=60,
+            dimensions=({'Name': 'Service', 'Value': f'svc-{i}'},),
+        )
+        for i in range(count)
+    ]
+
+
+def _echo_client():
+    """Mock GetMetricData returning one datapoint per query."""
+
+    def get_metric_data(**kwargs):
+        return {
+            'MetricDataResults': [
+                {
+                    'Id': query['Id'],
+                    'Timestamps': [START],
+                    'Values': [1.0],
+                    'StatusCode': 'Complete',
+                }
+                for query in kwargs['MetricDataQueries']
+            ]
+        }
+
+    return MagicMock(side_effect=get_metric_data)
+
+
+class TestSplitTimeRange:
+    """Test cases for split_time_range."""
+
+    def test_short_window_is_not_split(self):
+        """Test a window within the datapoint limit stays whole."""
+        assert split_time_range(START, END, 60) == [(START, END)]
+
+    def test_week_at_one_minute(self):
+        """Test a week at 1-minute resolution splits into consecutive 1-day windows."""
+        end = START + timedelta(hours=168)
+        windows = split_time_range(START, end, 60)
+
+        assert len(windows) == 7
+        assert windows[0] == (START, START + timedelta(days=1))
+        assert windows[-1][1] == end
+        assert all(a[1] == b[0] for a, b in zip(windows, windows[1:]))
+
+    def test_partial_last_window(self):
+        """Test the last window is shortened to the end of the range."""
+        end = START + timedelta(hours=25)
+        windows = split_time_range(START, end, 60)
+
+        assert windows[-1] == (START + timedelta(days=1), end)
+
+
+class TestGetMetricStatisticsChunked:
+    """Test cases for get_metric_statistics_chunked."""
+
+    @pytest.mark.asyncio
+    async def test_stitches_windows_in_order(self):
+        """Test datapoints from every window come back once each, in time order."""
+
+        def get_metric_statistics(**kwargs):
+            # Newest first, plus a duplicate of the window start
+            start = kwargs['StartTime']
+            return {
+                'Datapoints': [
+                    {'Timestamp': start + timedelta(hours=1), 'Average': 2.0},
+                    {'Timestamp': start, 'Average': 1.0},
+                    {'Timestamp': start, 'Average': 1.0},
+                ]
+            }
+
+        client = MagicMock(side_effect=get_metric_statistics)
+        end = START + timedelta(days=3)
+
+        datapoints = await get_metric_statistics_chunked(
+            client, START, end, 60, Namespace='AWS/X', MetricName='Latency'
+        )
+
+        assert client.call_count == 3
+        assert {c.kwargs['Period'] for c in client.call_args_list} == {60}
+        assert client.call_args.kwargs['MetricName'] == 'Latency'
+        timestamps = [dp['Timestamp'] for dp in datapoints]
+        assert len(timestamps) == 6
+        assert timestamps == sorted(timestamps)
+
+
+class TestMetricQuery:
+    """Test cases for MetricQuery."""
+
+    def test_to_request(self):
+        """Test the MetricDataQuery structure."""
+        query = MetricQuery('m0', 'AWS/X', 'Fault', 'p99', 300, label='fault p99')
+        request = query.to_request()
+
+        assert request['Id'] == 'm0'
+        assert request['Label'] == 'fault p99'
+        assert request['MetricStat']['Stat'] == 'p99'
+        assert request['MetricStat']['Period'] == 300
+        assert request['MetricStat']['Metric'] == {
+            'Namespace': 'AWS/X',
+            'MetricName': 'Fault',
+            'Dimensions': [],
+        }
+
+
+class TestMetricSeries:
+    """Test cases for MetricSeries."""
+
+    def test_compact_storage(self):
+        """Test datapoints are held in arrays and read back unchanged, timezone included."""
+        tz = timezone(timedelta(hours=-7))
+        timestamps = [START.astimezone(tz) + timedelta(minutes=i) for i in range(3)]
+        series = MetricSeries(_queries(1)[0], timestamps, [1.0, 2.0, 3.0])
+
+        assert not hasattr(series, '__dict__')
+        assert series.timestamps == timestamps
+        assert series.timestamps[0].utcoffset() == timedelta(hours=-7)
+        assert series.values == [1.0, 2.0, 3.0]
+        assert series.latest == 3.0
+        assert len(series) == 3
+
+    def test_extend_and_sort(self):
+        """Test out-of-order sub-windows are sorted with one value per timestamp."""
+        series = MetricSeries(_queries(1)[0])
+        assert series.latest is None
+
+        series.extend([START + timedelta(minutes=1), START], [2.0, 1.0])
+        series.extend([START + timedelta(minutes=1)], [5.0])
+        series.sort()
+
+        assert series.timestamps == [START, START + timedelta(minutes=1)]
+        assert series.values == [1.0, 5.0]
+        assert series == MetricSeries(series.query, series.timestamps, [1.0, 5.0])
+
+
+class TestMetricQueryEngine:
+    """Test cases for MetricQueryEngine."""
+
+    @pytest.mark.asyncio
+    async def test_splits_into_requests_of_500(self):
+        """Test more than 500 queries are spread over several requests."""
+        client = _echo_client()
+        engine = MetricQueryEngine(client)
+
+        series = await engine.fetch(_queries(1200), START, END)
+
+        assert len(series) == 1200
+        assert client.call_count == 3
+        sizes = sorted(len(c.kwargs['MetricDataQueries']) for c in client.call_args_list)
+        assert sizes == [200, 500, 500]
+        assert engine.requests_made == 3
+        assert all(s.values == [1.0] for s in series.values())
+
+    @pytest.mark.asyncio
+    async def test_follows_next_token(self):
+        """Test paged results are merged per query Id."""
+        t1, t2 = START, START + timedelta(minutes=1)
+        client = MagicMock(
+            side_effect=[
+                {
+                    'MetricDataResults': [
+                        {
+                            'Id': 'm0',
+                            'Timestamps': [t2],
+                            'Values': [2.0],
+                            'StatusCode': 'PartialData',
+                        }
+                    ],
+                    'NextToken': 'page-2',
+                },
+                {
+                    'MetricDataResults': [
+                        {'Id': 'm0', 'Timestamps': [t1], 'Values': [1.0], 'StatusCode': 'Complete'}
+                    ]
+                },
+            ]
+        )
+        engine = MetricQueryEngine(client)
+
+        series = await engine.fetch(_queries(1), START, END)
+
+        assert client.call_count == 2
+        assert client.call_args.kwargs['NextToken'] == 'page-2'
+        assert series['m0'].timestamps == [t1, t2]
+        assert series['m0'].values == [1.0, 2.0]
+        assert series['m0'].status == 'Complete'
+
+    @pytest.mark.asyncio
+    async def test_long_window_not_split(self):
+        """Test windows over 1440 periods go out as one GetMetricData request."""
+        client = _echo_client()
+        engine = MetricQueryEngine(client)
+        end = START + timedelta(days=2)
+
+        await engine.fetch(_queries(1), START, end)
+
+        assert client.call_count == 1
+        assert client.call_args.kwargs['StartTime'] == START
+        assert client.call_args.kwargs['EndTime'] == end
+
+    @pytest.mark.asyncio
+    async def test_missing_results_are_empty(self):
+        """Test queries without results come back as empty series."""
+        client = MagicMock(return_value={'MetricDataResults': []})
+        engine = MetricQueryEngine(client)
+
+        series = await engine.fetch(_queries(2), START, END)
+
+        assert len(series['m0']) == 0
+        assert len(series['m1']) == 0
+
+    @pytest.mark.asyncio
+    async def test_duplicate_ids_rejected(self):
+        """Test query Ids must be unique."""
+        engine = MetricQueryEngine(MagicMock())
+        queries = _queries(1) * 2
+
+        with pytest.raises(ValueError):
+            await engine.fetch(queries, START, END)
+
+
+class TestQueryBatcher:
+    """Test cases for QueryBatcher."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_request(self):
+        """Test queries of concurrent callers go out together and come back under their own Ids."""
+        client = _echo_client()
+        batcher = QueryBatcher(MetricQueryEngine(client))
+        first, second = _queries(2), _queries(3)
+
+        results = await asyncio.gather(
+            batcher.fetch(first, START, END), batcher.fetch(second, START, END)
+        )
+
+        assert client.call_count == 1
+        assert len(client.call_args.kwargs['MetricDataQueries']) == 5
+        assert [list(result) for result in results] == [['m0', 'm1'], ['m0', 'm1', 'm2']]
+        assert results[1]['m2'].query.dimensions == second[2].dimensions
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test a failed batch raises in every caller."""
+        batcher = QueryBatcher(MetricQueryEngine(MagicMock(side_effect=RuntimeError('throttled'))))
+
+        results = await asyncio.gather(
+            batcher.fetch(_queries(1), START, END),
+            batcher.fetch(_queries(1), START, END),
+            return_exceptions=True,
+        )
+        assert [str(result) for result in results] == ['throttled', 'throttled']
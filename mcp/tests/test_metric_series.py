@@ -0,0 +1,99 @@
+"""Tests for metric series statistics and downsampling."""
+
+import pytest
+from awslabs.cloudwatch_appsignals_mcp_server import metric_series
+from awslabs.cloudwatch_appsignals_mcp_server.metric_series import (
+    downsample,
+    lttb_indices,
+    summarize,
+)
+from datetime import datetime, timedelta, timezone
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _timestamps(count, minutes=1):
+    return [START + timedelta(minutes=minutes * i) for i in range(count)]
+
+
+class TestSummarize:
+    """Test cases for summarize."""
+
+    def test_empty_series(self):
+        """Test an empty series has no summary."""
+        assert summarize([], []) is None
+
+    def test_statistics(self):
+        """Test min/max/mean/latest and interpolated percentiles."""
+        values = [float(v) for v in range(1, 11)]
+        summary = summarize(_timestamps(10), values)
+
+        assert summary.count == 10
+        assert summary.latest == 10.0
+        assert summary.mean == 5.5
+        assert summary.minimum == 1.0
+        assert summary.maximum == 10.0
+        assert summary.p50 == pytest.approx(5.5)
+        assert summary.p90 == pytest.approx(9.1)
+        assert summary.p99 == pytest.approx(9.91)
+
+    def test_trend_per_hour(self):
+        """Test the slope is expressed per hour."""
+        # +1 per minute is +60 per hour
+        summary = summarize(_timestamps(30), [float(i) for i in range(30)])
+        assert summary.slope_per_hour == pytest.approx(60.0)
+
+    def test_single_point_has_flat_trend(self):
+        """Test a single datapoint has no trend."""
+        summary = summarize(_timestamps(1), [4.0])
+        assert summary.slope_per_hour == 0.0
+        assert summary.p99 == 4.0
+
+    def test_pure_python_fallback(self, monkeypatch):
+        """Test the fallback without NumPy gives the same results."""
+        values = [3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0]
+        expected = summarize(_timestamps(8), values)
+
+        monkeypatch.setattr(metric_series, 'np', None)
+        summary = summarize(_timestamps(8), values)
+
+        assert summary.mean == pytest.approx(expected.mean)
+        assert summary.p90 == pytest.approx(expected.p90)
+        assert summary.slope_per_hour == pytest.approx(expected.slope_per_hour)
+
+
+class TestLTTB:
+    """Test cases for LTTB downsampling."""
+
+    def test_short_series_unchanged(self):
+        """Test series within the budget are returned whole."""
+        assert lttb_indices([0, 1, 2], [5, 6, 7], 10) == [0, 1, 2]
+
+    def test_keeps_endpoints_and_budget(self):
+        """Test the first and last points are kept and the budget is respected."""
+        x = list(range(10080))
+        y = [float(i % 37) for i in x]
+        indices = lttb_indices(x, y, 100)
+
+        assert len(indices) == 100
+        assert indices[0] == 0
+        assert indices[-1] == 10079
+        assert indices == sorted(set(indices))
+
+    def test_keeps_spike(self):
+        """Test a single spike in a flat week of minutes survives downsampling."""
+        timestamps = _timestamps(10080)
+        values = [1.0] * 10080
+        values[5000] = 500.0
+
+        kept_timestamps, kept_values = downsample(timestamps, values, 50)
+
+        assert len(kept_values) == 50
+        assert 500.0 in kept_values
+        assert timestamps[5000] in kept_timestamps
+
+    def test_threshold_too_small(self):
+        """Test budgets below three points are rejected."""
+        with pytest.raises(ValueError):
+            lttb_indices([0, 1, 2, 3], [0, 1, 2, 3], 2)
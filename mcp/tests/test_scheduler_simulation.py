@@ -0,0 +1,28 @@
+"""Smoke test for the scheduler simulation benchmark."""
+
+import importlib.util
+import os
+import pytest
+
+
+SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'scripts', 'benchmark_scheduler_simulation.py'
+)
+
+
+@pytest.fixture
+def simulation():
+    """Load the benchmark script as a module."""
+    spec = importlib.util.spec_from_file_location('benchmark_scheduler_simulation', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.asyncio
+async def test_simulated_investigations_complete(simulation, capsys):
+    """Test a short simulation runs every investigation to its conclusion."""
+    statuses = await simulation.run(jobs=5, hours=2, iterations=2, arrival_minutes=1)
+
+    assert statuses == {'complete': 5}
+    assert 'LLM calls: 10' in capsys.readouterr().out
@@ -1,27 +1,38 @@
 """Tests for CloudWatch Application Signals MCP Server."""
 
+import asyncio
 import json
 import pytest
 from awslabs.cloudwatch_appsignals_mcp_server.server import (
+    capabilities,
     check_transaction_search_enabled,
     get_service_detail,
     get_slo,
     get_trace_summaries_paginated,
+    list_events,
     list_monitored_services,
     list_slis,
     main,
+    metric_window_cache,
     query_sampled_traces,
     query_service_metrics,
     remove_null_values,
     search_transaction_spans,
+    service_catalog,
+    service_detail_cache,
+    sli_snapshots,
+    slo_inventory,
+    trace_details,
+    transaction_search_status,
 )
+from awslabs.cloudwatch_appsignals_mcp_server.trace_cache import TraceCache
 from botocore.exceptions import ClientError
 from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
 
 @pytest.fixture(autouse=True)
-def mock_aws_clients():
+def mock_aws_clients(tmp_path):
     """Mock all AWS clients to prevent real API calls during tests."""
     # Create mock clients
     mock_logs_client = MagicMock()
@@ -29,6 +40,15 @@ def mock_aws_clients():
     mock_cloudwatch_client = MagicMock()
     mock_xray_client = MagicMock()
 
+    # Start every test with empty service caches
+    service_catalog.invalidate()
+    service_detail_cache.invalidate()
+    metric_window_cache.invalidate()
+    slo_inventory.invalidate()
+    sli_snapshots.invalidate()
+    capabilities.invalidate()
+    trace_details.cache = TraceCache(str(tmp_path / 'traces'))
+
     # Patch the clients at module level
     with patch('awslabs.cloudwatch_appsignals_mcp_server.server.logs_client', mock_logs_client):
         with patch(
@@ -52,8 +72,14 @@ def mock_aws_clients():
 
 @pytest.fixture
 def mock_mcp():
-    """Mock the FastMCP instance."""
-    with patch('awslabs.cloudwatch_appsignals_mcp_server.server.mcp') as mock:
+    """Mock the FastMCP instance and the snapshot scheduler main() starts."""
+    with (
+        patch('awslabs.cloudwatch_appsignals_mcp_server.server.mcp') as mock,
+        patch('awslabs.cloudwatch_appsignals_mcp_server.server.AsyncTaskMonitor'),
+        patch.object(sli_snapshots, 'monitor', None),
+        patch.object(sli_snapshots, '_scheduled_compute', None),
+        patch.object(capabilities, 'warm', AsyncMock()),
+    ):
         yield mock
 
 
@@ -93,6 +119,83 @@ async def test_list_monitored_services_empty(mock_aws_clients):
     assert result == 'No services found in Application Signals.'
 
 
+@pytest.mark.asyncio
+async def test_list_monitored_services_paginates(mock_aws_clients):
+    """Test services beyond the first ListServices page are listed."""
+    pages = [
+        {
+            'ServiceSummaries': [{'KeyAttributes': {'Name': 'svc-first', 'Type': 'Service'}}],
+            'NextToken': 'page-2',
+        },
+        {'ServiceSummaries': [{'KeyAttributes': {'Name': 'svc-last', 'Type': 'Service'}}]},
+    ]
+    mock_aws_clients['appsignals_client'].list_services.side_effect = pages
+
+    result = await list_monitored_services()
+
+    assert 'Application Signals Services (2 total)' in result
+    assert 'svc-last' in result
+    assert (
+        mock_aws_clients['appsignals_client'].list_services.call_args.kwargs['NextToken']
+        == 'page-2'
+    )
+
+
+@pytest.mark.asyncio
+async def test_service_lookups_share_catalog(mock_aws_clients):
+    """Test tools resolve services through one cached ListServices sweep."""
+    mock_aws_clients['appsignals_client'].list_services.return_value = {
+        'ServiceSummaries': [{'KeyAttributes': {'Name': 'test-service', 'Type': 'Service'}}]
+    }
+    mock_aws_clients['appsignals_client'].get_service.return_value = {
+        'Service': {'KeyAttributes': {'Name': 'test-service'}, 'MetricReferences': []}
+    }
+
+    await list_monitored_services()
+    await get_service_detail('test-service')
+    await get_service_detail('test-service')
+
+    assert mock_aws_clients['appsignals_client'].list_services.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_service_detail_shared_between_tools(mock_aws_clients):
+    """Test get_service_detail and query_service_metrics share one GetService call."""
+    mock_aws_clients['appsignals_client'].list_services.return_value = {
+        'ServiceSummaries': [{'KeyAttributes': {'Name': 'test-service', 'Type': 'Service'}}]
+    }
+    mock_aws_clients['appsignals_client'].get_service.return_value = {
+        'Service': {
+            'KeyAttributes': {'Name': 'test-service'},
+            'MetricReferences': [
+                {
+                    'Namespace': 'AWS/ApplicationSignals',
+                    'MetricName': 'Latency',
+                    'MetricType': 'LATENCY',
+                    'Dimensions': [],
+                }
+            ],
+        }
+    }
+    mock_aws_clients['cloudwatch_client'].get_metric_statistics.return_value = {'Datapoints': []}
+
+    hits_before = service_detail_cache.stats()['hits']
+
+    await get_service_detail('test-service')
+    await query_service_metrics(
+        service_name='test-service',
+        metric_name='Latency',
+        statistic='Average',
+        extended_statistic='p99',
+        hours=1,
+        period=None,
+        max_points=None,
+    )
+
+    assert mock_aws_clients['appsignals_client'].get_service.call_count == 1
+    assert service_detail_cache.stats()['hits'] == hits_before + 1
+
+
 @pytest.mark.asyncio
 async def test_get_service_detail_success(mock_aws_clients):
     """Test successful retrieval of service details."""
@@ -184,6 +287,8 @@ async def test_query_service_metrics_success(mock_aws_clients):
         statistic='Average',
         extended_statistic='p99',
         hours=1,
+        period=None,
+        max_points=None,
     )
 
     assert 'Metrics for test-service - Latency' in result
@@ -191,6 +296,60 @@ async def test_query_service_metrics_success(mock_aws_clients):
     assert 'p99 Statistics:' in result
 
 
+@pytest.mark.asyncio
+async def test_query_service_metrics_batches_multiple_metrics(mock_aws_clients):
+    """Test comma-separated metric names are fetched with one GetMetricData request."""
+    dimensions = [{'Name': 'Service', 'Value': 'test-service'}]
+    mock_aws_clients['appsignals_client'].list_services.return_value = {
+        'ServiceSummaries': [{'KeyAttributes': {'Name': 'test-service', 'Type': 'Service'}}]
+    }
+    mock_aws_clients['appsignals_client'].get_service.return_value = {
+        'Service': {
+            'MetricReferences': [
+                {'Namespace': 'ApplicationSignals', 'MetricName': name, 'Dimensions': dimensions}
+                for name in ('Latency', 'Error', 'Fault')
+            ]
+        }
+    }
+    now = datetime.now(timezone.utc)
+
+    def get_metric_data(**kwargs):
+        return {
+            'MetricDataResults': [
+                {'Id': query['Id'], 'Timestamps': [now], 'Values': [float(i)]}
+                for i, query in enumerate(kwargs['MetricDataQueries'])
+            ]
+        }
+
+    mock_aws_clients['cloudwatch_client'].get_metric_data.side_effect = get_metric_data
+
+    result = await query_service_metrics(
+        service_name='test-service',
+        metric_name='Latency, Fault, Missing',
+        statistic='Average',
+        extended_statistic='p99',
+        hours=1,
+        period=None,
+        max_points=None,
+    )
+
+    mock_aws_clients['cloudwatch_client'].get_metric_data.assert_called_once()
+    mock_aws_clients['cloudwatch_client'].get_metric_statistics.assert_not_called()
+    queries = mock_aws_clients['cloudwatch_client'].get_metric_data.call_args.kwargs[
+        'MetricDataQueries'
+    ]
+    assert [q['MetricStat']['Metric']['MetricName'] for q in queries] == [
+        'Latency',
+        'Latency',
+        'Fault',
+        'Fault',
+    ]
+    assert 'Metrics for test-service - Latency' in result
+    assert 'Metrics for test-service - Fault' in result
+    assert 'p99 Statistics:' in result
+    assert "Metrics not found for service 'test-service': Missing" in result
+
+
 @pytest.mark.asyncio
 async def test_query_service_metrics_list_available(mock_aws_clients):
     """Test listing available metrics when no specific metric is requested."""
@@ -226,6 +385,8 @@ async def test_query_service_metrics_list_available(mock_aws_clients):
         statistic='Average',
         extended_statistic='p99',
         hours=1,
+        period=None,
+        max_points=None,
     )
 
     assert "Available metrics for service 'test-service'" in result
@@ -372,36 +533,278 @@ async def test_list_slis_success(mock_aws_clients):
         ]
     }
 
-    # Mock SLIReportClient
     with patch(
-        'awslabs.cloudwatch_appsignals_mcp_server.server.SLIReportClient'
-    ) as mock_sli_client:
-        with patch(
-            'awslabs.cloudwatch_appsignals_mcp_server.server.check_transaction_search_enabled'
-        ) as mock_check:
-            mock_aws_clients[
-                'appsignals_client'
-            ].list_services.return_value = mock_services_response
-            mock_check.return_value = (True, 'CloudWatchLogs', 'ACTIVE')
+        'awslabs.cloudwatch_appsignals_mcp_server.server.check_transaction_search_enabled'
+    ) as mock_check:
+        mock_aws_clients['appsignals_client'].list_services.return_value = mock_services_response
+        mock_check.return_value = (True, 'CloudWatchLogs', 'ACTIVE')
+
+        # Three SLOs, one of them breached
+        key_attributes = mock_services_response['ServiceSummaries'][0]['KeyAttributes']
+        mock_aws_clients['appsignals_client'].list_service_level_objectives.return_value = {
+            'SloSummaries': [
+                {'Name': name, 'KeyAttributes': key_attributes}
+                for name in ('test-slo', 'ok-slo-1', 'ok-slo-2')
+            ]
+        }
+        mock_aws_clients['cloudwatch_client'].get_metric_data.return_value = {
+            'MetricDataResults': [
+                {'Id': 'm0', 'Timestamps': [datetime.now(timezone.utc)], 'Values': [1.0]},
+                {'Id': 'm1', 'Timestamps': [datetime.now(timezone.utc)], 'Values': [0.0]},
+                {'Id': 'm2', 'Timestamps': [], 'Values': []},
+            ]
+        }
+
+        result = await list_slis(hours=24, force_refresh=False, diff=False, since_generation=None)
+
+        assert 'SLI Status Report - Last 24 hours' in result
+        assert 'Transaction Search: ENABLED' in result
+        assert 'BREACHED SERVICES:' in result
+        assert 'test-service' in result
+        assert 'test-slo' in result
+
+
+@pytest.mark.asyncio
+async def test_list_slis_serves_snapshot(mock_aws_clients):
+    """Test list_slis answers from the latest snapshot until a refresh is forced."""
+    key_attributes = {'Name': 'test-service', 'Type': 'Service', 'Environment': 'prod'}
+    appsignals = mock_aws_clients['appsignals_client']
+    appsignals.list_services.return_value = {
+        'ServiceSummaries': [{'KeyAttributes': key_attributes}]
+    }
+    appsignals.list_service_level_objectives.return_value = {
+        'SloSummaries': [{'Name': 'test-slo', 'KeyAttributes': key_attributes}]
+    }
+    get_metric_data = mock_aws_clients['cloudwatch_client'].get_metric_data
+    get_metric_data.return_value = {
+        'MetricDataResults': [
+            {'Id': 'm0', 'Timestamps': [datetime.now(timezone.utc)], 'Values': [0.0]}
+        ]
+    }
+
+    with patch(
+        'awslabs.cloudwatch_appsignals_mcp_server.server.check_transaction_search_enabled',
+        return_value=(True, 'CloudWatchLogs', 'ACTIVE'),
+    ):
+        first = await list_slis(hours=24, force_refresh=False, diff=False, since_generation=None)
+        assert 'Snapshot generated' not in first
+        assert 'HEALTHY SERVICES:' in first
+
+        # The SLO breaches, but the snapshot is still served without AWS calls
+        get_metric_data.return_value = {
+            'MetricDataResults': [
+                {'Id': 'm0', 'Timestamps': [datetime.now(timezone.utc)], 'Values': [1.0]}
+            ]
+        }
+        cached = await list_slis(hours=24, force_refresh=False, diff=False, since_generation=None)
+        assert get_metric_data.call_count == 1
+        assert 'Snapshot generated' in cached
+        assert 'BREACHED SERVICES:' not in cached
+
+        refreshed = await list_slis(
+            hours=24, force_refresh=True, diff=False, since_generation=None
+        )
+        assert get_metric_data.call_count == 2
+        assert 'Snapshot generated' not in refreshed
+        assert 'BREACHED SERVICES:' in refreshed
+
+        # Other look-back periods have their own snapshot
+        await list_slis(hours=6, force_refresh=False, diff=False, since_generation=None)
+        assert get_metric_data.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_list_slis_diff_mode(mock_aws_clients):
+    """Test diff mode returns only services that changed since the session's last report."""
+    services = [
+        {'KeyAttributes': {'Name': f'svc-{i}', 'Type': 'Service', 'Environment': 'prod'}}
+        for i in range(3)
+    ]
+    appsignals = mock_aws_clients['appsignals_client']
+    appsignals.list_services.return_value = {'ServiceSummaries': services}
+    appsignals.list_service_level_objectives.return_value = {
+        'SloSummaries': [
+            {'Name': f'{s["KeyAttributes"]["Name"]}-slo', 'KeyAttributes': s['KeyAttributes']}
+            for s in services
+        ]
+    }
+    breached = set()
+
+    def get_metric_data(**kwargs):
+        return {
+            'MetricDataResults': [
+                {
+                    'Id': query['Id'],
+                    'Timestamps': [kwargs['EndTime']],
+                    'Values': [
+                        1.0
+                        if query['MetricStat']['Metric']['Dimensions'][0]['Value'] in breached
+                        else 0.0
+                    ],
+                }
+                for query in kwargs['MetricDataQueries']
+            ]
+        }
+
+    mock_aws_clients['cloudwatch_client'].get_metric_data.side_effect = get_metric_data
+    session, other_session = MagicMock(), MagicMock()
+
+    with patch(
+        'awslabs.cloudwatch_appsignals_mcp_server.server.check_transaction_search_enabled',
+        return_value=(True, 'CloudWatchLogs', 'ACTIVE'),
+    ):
+        # Without an earlier report the full report is returned
+        first = await list_slis(
+            hours=24, force_refresh=False, diff=True, since_generation=None, ctx=session
+        )
+        assert 'full report follows' in first
+        generation = int(first.split('Generation: ')[1].split()[0])
+
+        breached.add('svc-1-slo')
+        changed = await list_slis(
+            hours=24, force_refresh=True, diff=True, since_generation=None, ctx=session
+        )
+        assert f'changes since {generation}' in changed
+        assert '1 service(s) changed' in changed
+        assert '• svc-1 (prod): OK → BREACHED' in changed
+        assert 'Newly breached SLOs: svc-1-slo' in changed
+        assert 'svc-0' not in changed
+        assert 'HEALTHY SERVICES' not in changed
+
+        # Nothing changed since this session's last report
+        unchanged = await list_slis(
+            hours=24, force_refresh=False, diff=True, since_generation=None, ctx=session
+        )
+        assert 'No SLI changes.' in unchanged
+
+        # Another session can still diff against an explicit generation
+        explicit = await list_slis(
+            hours=24,
+            force_refresh=False,
+            diff=False,
+            since_generation=generation,
+            ctx=other_session,
+        )
+        assert '• svc-1 (prod): OK → BREACHED' in explicit
+
+        missing = await list_slis(
+            hours=24, force_refresh=False, diff=False, since_generation=1, ctx=other_session
+        )
+        assert 'Generation 1 is no longer available; full report follows' in missing
+        assert 'BREACHED SERVICES:' in missing
+
+
+@pytest.mark.asyncio
+async def test_list_slis_batches_breached_count_queries(mock_aws_clients):
+    """Test SLOs of all services are evaluated in as few GetMetricData calls as possible."""
+    services = [
+        {'KeyAttributes': {'Name': f'svc-{i}', 'Type': 'Service', 'Environment': 'prod'}}
+        for i in range(120)
+    ]
+    mock_aws_clients['appsignals_client'].list_services.return_value = {
+        'ServiceSummaries': services
+    }
+
+    # All 600 SLOs in pages of 50
+    slos = [
+        {'Name': f'{s["KeyAttributes"]["Name"]}-slo-{i}', 'KeyAttributes': s['KeyAttributes']}
+        for s in services
+        for i in range(5)
+    ]
+
+    def list_service_level_objectives(**kwargs):
+        start = int(kwargs.get('NextToken', 0))
+        response = {'SloSummaries': slos[start : start + kwargs['MaxResults']]}
+        if start + kwargs['MaxResults'] < len(slos):
+            response['NextToken'] = str(start + kwargs['MaxResults'])
+        return response
+
+    def get_metric_data(**kwargs):
+        # Only svc-7's first SLO is breached
+        results = []
+        for query in kwargs['MetricDataQueries']:
+            slo = query['MetricStat']['Metric']['Dimensions'][0]['Value']
+            value = 1.0 if slo == 'svc-7-slo-0' else 0.0
+            results.append(
+                {'Id': query['Id'], 'Timestamps': [kwargs['EndTime']], 'Values': [value]}
+            )
+        return {'MetricDataResults': results}
+
+    mock_aws_clients[
+        'appsignals_client'
+    ].list_service_level_objectives.side_effect = list_service_level_objectives
+    mock_aws_clients['cloudwatch_client'].get_metric_data.side_effect = get_metric_data
 
-            # Mock SLI report
-            mock_report = MagicMock()
-            mock_report.breached_slo_count = 1
-            mock_report.breached_slo_names = ['test-slo']
-            mock_report.ok_slo_count = 2
-            mock_report.total_slo_count = 3
-            mock_report.sli_status = 'BREACHED'
-            mock_report.start_time = datetime.now(timezone.utc) - timedelta(hours=24)
-            mock_report.end_time = datetime.now(timezone.utc)
+    with patch(
+        'awslabs.cloudwatch_appsignals_mcp_server.server.check_transaction_search_enabled',
+        return_value=(True, 'CloudWatchLogs', 'ACTIVE'),
+    ):
+        result = await list_slis(hours=24, force_refresh=False, diff=False, since_generation=None)
 
-            mock_sli_client.return_value.generate_sli_report.return_value = mock_report
+    # One paged SLO sweep instead of a call per service
+    slo_calls = mock_aws_clients['appsignals_client'].list_service_level_objectives.call_args_list
+    assert len(slo_calls) == 12
+    assert all('KeyAttributes' not in c.kwargs for c in slo_calls)
 
-            result = await list_slis(hours=24)
+    # 600 SLOs fit in two requests of at most 500 queries
+    calls = mock_aws_clients['cloudwatch_client'].get_metric_data.call_args_list
+    assert len(calls) == 2
+    assert sorted(len(c.kwargs['MetricDataQueries']) for c in calls) == [100, 500]
+    assert '• Total Services: 120' in result
+    assert 'svc-7' in result.split('BREACHED SERVICES:')[1].split('HEALTHY SERVICES:')[0]
+    assert 'svc-7-slo-0' in result
 
-            assert 'SLI Status Report - Last 24 hours' in result
-            assert 'Transaction Search: ENABLED' in result
-            assert 'BREACHED SERVICES:' in result
-            assert 'test-service' in result
+
+@pytest.mark.asyncio
+async def test_list_slis_budget_report_engine(mock_aws_clients):
+    """Test list_slis reads budget status in batches of 50 SLOs with the budget_report engine."""
+    services = [
+        {'KeyAttributes': {'Name': f'svc-{i}', 'Type': 'Service', 'Environment': 'prod'}}
+        for i in range(30)
+    ]
+    mock_aws_clients['appsignals_client'].list_services.return_value = {
+        'ServiceSummaries': services
+    }
+    mock_aws_clients['appsignals_client'].list_service_level_objectives.return_value = {
+        'SloSummaries': [
+            {'Name': f'{s["KeyAttributes"]["Name"]}-slo-{i}', 'KeyAttributes': s['KeyAttributes']}
+            for s in services
+            for i in range(3)
+        ]
+    }
+
+    def batch_get_budget_report(**kwargs):
+        return {
+            'Reports': [
+                {
+                    'Name': slo_id,
+                    'BudgetStatus': 'BREACHED' if slo_id == 'svc-7-slo-0' else 'OK',
+                }
+                for slo_id in kwargs['SloIds']
+            ],
+            'Errors': [],
+        }
+
+    appsignals = mock_aws_clients['appsignals_client']
+    appsignals.batch_get_service_level_objective_budget_report.side_effect = (
+        batch_get_budget_report
+    )
+
+    with (
+        patch('awslabs.cloudwatch_appsignals_mcp_server.server.SLI_ENGINE', 'budget_report'),
+        patch(
+            'awslabs.cloudwatch_appsignals_mcp_server.server.check_transaction_search_enabled',
+            return_value=(True, 'CloudWatchLogs', 'ACTIVE'),
+        ),
+    ):
+        result = await list_slis(hours=24, force_refresh=False, diff=False, since_generation=None)
+
+    calls = appsignals.batch_get_service_level_objective_budget_report.call_args_list
+    assert sorted(len(c.kwargs['SloIds']) for c in calls) == [40, 50]
+    mock_aws_clients['cloudwatch_client'].get_metric_data.assert_not_called()
+    assert '• Total Services: 30' in result
+    assert 'svc-7' in result.split('BREACHED SERVICES:')[1].split('HEALTHY SERVICES:')[0]
+    assert 'svc-7-slo-0' in result
 
 
 @pytest.mark.asyncio
@@ -430,18 +833,20 @@ async def test_query_sampled_traces_success(mock_aws_clients):
     ]
 
     with patch(
-        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_paginated'
+        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_page'
     ) as mock_get_traces:
         with patch(
             'awslabs.cloudwatch_appsignals_mcp_server.server.check_transaction_search_enabled'
         ) as mock_check:
-            mock_get_traces.return_value = mock_traces
+            mock_get_traces.return_value = (mock_traces, None)
             mock_check.return_value = (False, 'XRay', 'INACTIVE')
 
             result_json = await query_sampled_traces(
                 start_time='2024-01-01T00:00:00Z',
                 end_time='2024-01-01T01:00:00Z',
                 filter_expression='service("test-service"){fault = true}',
+                detail_traces=0,
+                output='raw',
             )
 
             result = json.loads(result_json)
@@ -457,6 +862,8 @@ async def test_query_sampled_traces_time_window_too_large(mock_aws_clients):
         start_time='2024-01-01T00:00:00Z',
         end_time='2024-01-02T00:00:00Z',  # 24 hours > 6 hours max
         filter_expression='service("test-service")',
+        detail_traces=0,
+        output='raw',
     )
 
     result = json.loads(result_json)
@@ -541,6 +948,94 @@ def test_check_transaction_search_enabled_error(mock_aws_clients):
     assert status == 'Error'
 
 
+@pytest.mark.asyncio
+async def test_transaction_search_status_is_cached(mock_aws_clients):
+    """Test the Transaction Search status is checked once, then served from the registry."""
+    get_destination = mock_aws_clients['xray_client'].get_trace_segment_destination
+    get_destination.return_value = {'Destination': 'CloudWatchLogs', 'Status': 'ACTIVE'}
+
+    for _ in range(3):
+        assert await transaction_search_status() == (True, 'CloudWatchLogs', 'ACTIVE')
+    assert get_destination.call_count == 1
+
+    capabilities.invalidate()
+    await transaction_search_status()
+    assert get_destination.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_transaction_search_status_per_region(mock_aws_clients):
+    """Test another region is checked with its own client and cached apart."""
+    get_destination = mock_aws_clients['xray_client'].get_trace_segment_destination
+    get_destination.return_value = {'Destination': 'CloudWatchLogs', 'Status': 'ACTIVE'}
+    regional_client = MagicMock()
+    regional_client.get_trace_segment_destination.return_value = {
+        'Destination': 'XRay',
+        'Status': 'ACTIVE',
+    }
+
+    with (
+        patch('awslabs.cloudwatch_appsignals_mcp_server.server.AWS_REGION', 'us-east-1'),
+        patch('awslabs.cloudwatch_appsignals_mcp_server.server._regional_xray_clients', {}),
+        patch(
+            'awslabs.cloudwatch_appsignals_mcp_server.server.boto3.client',
+            return_value=regional_client,
+        ) as mock_client,
+    ):
+        assert await transaction_search_status() == (True, 'CloudWatchLogs', 'ACTIVE')
+        for _ in range(2):
+            assert await transaction_search_status(region='eu-west-1') == (
+                False,
+                'XRay',
+                'ACTIVE',
+            )
+
+    assert get_destination.call_count == 1
+    assert regional_client.get_trace_segment_destination.call_count == 1
+    assert mock_client.call_args.kwargs['region_name'] == 'eu-west-1'
+
+
+@pytest.mark.asyncio
+async def test_transaction_search_status_errors_not_cached(mock_aws_clients):
+    """Test a failed check reports an error once and is retried on the next call."""
+    get_destination = mock_aws_clients['xray_client'].get_trace_segment_destination
+    get_destination.side_effect = [
+        Exception('API Error'),
+        {'Destination': 'CloudWatchLogs', 'Status': 'ACTIVE'},
+    ]
+
+    assert await transaction_search_status() == (False, 'Unknown', 'Error')
+    assert await transaction_search_status() == (True, 'CloudWatchLogs', 'ACTIVE')
+
+
+@pytest.mark.asyncio
+async def test_search_transaction_spans_rechecks_cached_disabled_status(mock_aws_clients):
+    """Test a cached disabled status is re-checked before search_transaction_spans refuses."""
+    get_destination = mock_aws_clients['xray_client'].get_trace_segment_destination
+    get_destination.return_value = {'Destination': 'XRay', 'Status': 'ACTIVE'}
+    assert (await transaction_search_status())[0] is False
+
+    # Enabled since the cached check
+    get_destination.return_value = {'Destination': 'CloudWatchLogs', 'Status': 'ACTIVE'}
+    mock_aws_clients['logs_client'].start_query.return_value = {'queryId': 'q-1'}
+    mock_aws_clients['logs_client'].get_query_results.return_value = {
+        'status': 'Complete',
+        'results': [],
+    }
+
+    result = await search_transaction_spans(
+        log_group_name='',
+        start_time='2024-01-01T00:00:00+00:00',
+        end_time='2024-01-01T01:00:00+00:00',
+        query_string='fields @timestamp',
+        limit=None,
+        max_timeout=30,
+    )
+
+    assert result['status'] == 'Complete'
+    assert get_destination.call_count == 2
+
+
 def test_remove_null_values():
     """Test remove_null_values function."""
     # Test with mix of None and non-None values
@@ -674,6 +1169,8 @@ async def test_query_service_metrics_no_datapoints(mock_aws_clients):
         statistic='Average',
         extended_statistic='p99',
         hours=1,
+        period=None,
+        max_points=None,
     )
 
     assert 'No data points found' in result
@@ -724,6 +1221,55 @@ def test_main_normal_execution(mock_mcp):
     mock_mcp.run.assert_called_once_with(transport='stdio')
 
 
+def test_main_schedules_sli_snapshot(mock_mcp):
+    """Test main() refreshes the SLI snapshot on a monitor that does not poll jobs."""
+    with patch(
+        'awslabs.cloudwatch_appsignals_mcp_server.server.AsyncTaskMonitor'
+    ) as monitor_class:
+        main()
+
+    assert monitor_class.call_args.kwargs['job_polling'] is False
+    monitor = monitor_class.return_value
+    job_id, _func, seconds = monitor.add_periodic_job.call_args.args
+    assert job_id == 'sli_snapshot'
+    assert seconds == sli_snapshots.interval
+    monitor.start.assert_called_once()
+    monitor.stop.assert_called_once_with(drain=False)
+
+
+def test_scheduled_sli_snapshot_uses_own_caches(mock_aws_clients, mock_mcp):
+    """Test the scheduled refresh, run on another event loop, leaves the tools' caches alone."""
+    appsignals = mock_aws_clients['appsignals_client']
+    appsignals.list_services.return_value = {
+        'ServiceSummaries': [
+            {'KeyAttributes': {'Name': 'svc', 'Type': 'Service', 'Environment': 'prod'}}
+        ]
+    }
+    appsignals.list_service_level_objectives.return_value = {'SloSummaries': []}
+    with patch(
+        'awslabs.cloudwatch_appsignals_mcp_server.server.AsyncTaskMonitor'
+    ) as monitor_class:
+        main()
+    _job_id, scheduled_refresh, _seconds = (
+        monitor_class.return_value.add_periodic_job.call_args.args
+    )
+
+    catalog_misses = service_catalog.stats()['misses']
+    inventory_misses = slo_inventory.stats()['misses']
+
+    asyncio.run(scheduled_refresh())
+
+    appsignals.list_services.assert_called_once()
+    assert (
+        sli_snapshots._snapshots[sli_snapshots.hours].reports[0]['ReferenceId']['KeyAttributes'][
+            'Name'
+        ]
+        == 'svc'
+    )
+    assert service_catalog.stats()['misses'] == catalog_misses
+    assert slo_inventory.stats()['misses'] == inventory_misses
+
+
 def test_main_keyboard_interrupt(mock_mcp):
     """Test KeyboardInterrupt handling in main function."""
     mock_mcp.run.side_effect = KeyboardInterrupt()
@@ -782,7 +1328,7 @@ async def test_get_slo_period_based(mock_aws_clients):
 
 @pytest.mark.asyncio
 async def test_list_slis_with_error_in_sli_client(mock_aws_clients):
-    """Test list_slis when SLIReportClient throws error for some services."""
+    """Test list_slis when the SLI status of some services cannot be determined."""
     mock_services_response = {
         'ServiceSummaries': [
             {
@@ -802,38 +1348,40 @@ async def test_list_slis_with_error_in_sli_client(mock_aws_clients):
         ]
     }
 
+    slos = [
+        {'Name': f'{s["KeyAttributes"]["Name"]}-slo-{i}', 'KeyAttributes': s['KeyAttributes']}
+        for s in mock_services_response['ServiceSummaries']
+        for i in range(3)
+    ]
+
     with patch(
-        'awslabs.cloudwatch_appsignals_mcp_server.server.SLIReportClient'
-    ) as mock_sli_client:
-        with patch(
-            'awslabs.cloudwatch_appsignals_mcp_server.server.check_transaction_search_enabled'
-        ) as mock_check:
-            mock_aws_clients[
-                'appsignals_client'
-            ].list_services.return_value = mock_services_response
-            mock_check.return_value = (False, 'XRay', 'INACTIVE')
+        'awslabs.cloudwatch_appsignals_mcp_server.server.check_transaction_search_enabled'
+    ) as mock_check:
+        mock_aws_clients['appsignals_client'].list_services.return_value = mock_services_response
+        mock_check.return_value = (False, 'XRay', 'INACTIVE')
 
-            # First service succeeds, second fails
-            mock_report = MagicMock()
-            mock_report.breached_slo_count = 0
-            mock_report.ok_slo_count = 3
-            mock_report.total_slo_count = 3
-            mock_report.sli_status = 'OK'
-            mock_report.start_time = datetime.now(timezone.utc) - timedelta(hours=24)
-            mock_report.end_time = datetime.now(timezone.utc)
-
-            mock_sli_client.return_value.generate_sli_report.side_effect = [
-                mock_report,
-                Exception('Failed to get SLI report'),
+        # First service succeeds, queries of the second fail
+        mock_aws_clients['appsignals_client'].list_service_level_objectives.return_value = {
+            'SloSummaries': slos
+        }
+        mock_aws_clients['cloudwatch_client'].get_metric_data.return_value = {
+            'MetricDataResults': [
+                {'Id': f'm{i}', 'Timestamps': [datetime.now(timezone.utc)], 'Values': [0.0]}
+                for i in range(3)
             ]
+            + [
+                {'Id': f'm{i}', 'Timestamps': [], 'Values': [], 'StatusCode': 'InternalError'}
+                for i in range(3, 6)
+            ]
+        }
 
-            result = await list_slis(hours=24)
+        result = await list_slis(hours=24, force_refresh=False, diff=False, since_generation=None)
 
-            assert 'Transaction Search: NOT ENABLED' in result
-            assert 'HEALTHY SERVICES:' in result
-            assert 'INSUFFICIENT DATA:' in result
-            assert 'test-service-1' in result
-            assert 'test-service-2' in result
+        assert 'Transaction Search: NOT ENABLED' in result
+        assert 'HEALTHY SERVICES:' in result
+        assert 'INSUFFICIENT DATA:' in result
+        assert 'test-service-1' in result
+        assert 'test-service-2' in result
 
 
 @pytest.mark.asyncio
@@ -849,6 +1397,8 @@ async def test_query_service_metrics_service_not_found(mock_aws_clients):
         statistic='Average',
         extended_statistic='p99',
         hours=1,
+        period=None,
+        max_points=None,
     )
 
     assert "Service 'nonexistent-service' not found" in result
@@ -874,6 +1424,8 @@ async def test_query_service_metrics_no_metrics(mock_aws_clients):
         statistic='Average',
         extended_statistic='p99',
         hours=1,
+        period=None,
+        max_points=None,
     )
 
     assert "No metrics found for service 'test-service'" in result
@@ -909,6 +1461,8 @@ async def test_query_service_metrics_metric_not_found(mock_aws_clients):
         statistic='Average',
         extended_statistic='p99',
         hours=1,
+        period=None,
+        max_points=None,
     )
 
     assert "Metric 'Latency' not found" in result
@@ -934,6 +1488,8 @@ async def test_query_service_metrics_client_error(mock_aws_clients):
         statistic='Average',
         extended_statistic='p99',
         hours=1,
+        period=None,
+        max_points=None,
     )
 
     assert 'AWS Error: User is not authorized' in result
@@ -1017,7 +1573,7 @@ async def test_list_slis_no_services(mock_aws_clients):
     """Test list_slis when no services exist."""
     mock_aws_clients['appsignals_client'].list_services.return_value = {'ServiceSummaries': []}
 
-    result = await list_slis(hours=24)
+    result = await list_slis(hours=24, force_refresh=False, diff=False, since_generation=None)
 
     assert 'No services found in Application Signals.' in result
 
@@ -1095,6 +1651,8 @@ async def test_query_service_metrics_different_periods(mock_aws_clients):
             statistic='Average',
             extended_statistic='p99',
             hours=hours,
+            period=None,
+            max_points=None,
         )
 
         # Verify the period was set correctly
@@ -1102,6 +1660,198 @@ async def test_query_service_metrics_different_periods(mock_aws_clients):
         assert call_args['Period'] == expected_period
 
 
+@pytest.mark.asyncio
+async def test_query_service_metrics_long_window_chunked(mock_aws_clients):
+    """Test a week at 1-minute period is fetched in 1440-datapoint windows."""
+    mock_aws_clients['appsignals_client'].list_services.return_value = {
+        'ServiceSummaries': [{'KeyAttributes': {'Name': 'test-service', 'Type': 'Service'}}]
+    }
+    mock_aws_clients['appsignals_client'].get_service.return_value = {
+        'Service': {
+            'MetricReferences': [
+                {'Namespace': 'AWS/ApplicationSignals', 'MetricName': 'Latency', 'Dimensions': []}
+            ]
+        }
+    }
+    mock_aws_clients['cloudwatch_client'].get_metric_statistics.side_effect = lambda **kwargs: {
+        'Datapoints': [{'Timestamp': kwargs['StartTime'], 'Average': 100.0}]
+    }
+
+    result = await query_service_metrics(
+        service_name='test-service',
+        metric_name='Latency',
+        statistic='Average',
+        extended_statistic='p99',
+        hours=168,
+        period=60,
+        max_points=None,
+    )
+
+    calls = mock_aws_clients['cloudwatch_client'].get_metric_statistics.call_args_list
+    assert len(calls) == 7
+    assert all(c.kwargs['Period'] == 60 for c in calls)
+    assert 'Period: 60 seconds' in result
+    assert '• Data Points: 7' in result
+
+
+@pytest.mark.asyncio
+async def test_query_service_metrics_downsampled_series(mock_aws_clients):
+    """Test max_points shows the whole series downsampled with spikes kept."""
+    mock_aws_clients['appsignals_client'].list_services.return_value = {
+        'ServiceSummaries': [{'KeyAttributes': {'Name': 'test-service', 'Type': 'Service'}}]
+    }
+    mock_aws_clients['appsignals_client'].get_service.return_value = {
+        'Service': {
+            'MetricReferences': [
+                {'Namespace': 'AWS/ApplicationSignals', 'MetricName': 'Latency', 'Dimensions': []}
+            ]
+        }
+    }
+    # Hourly buckets on the hour, the last one containing now
+    start = (datetime.now(timezone.utc) - timedelta(hours=167)).replace(
+        minute=0, second=0, microsecond=0
+    )
+    datapoints = [
+        {'Timestamp': start + timedelta(hours=i), 'Average': 10.0, 'p99': 20.0} for i in range(168)
+    ]
+    datapoints[40]['Average'] = 900.0
+    mock_aws_clients['cloudwatch_client'].get_metric_statistics.return_value = {
+        'Datapoints': datapoints
+    }
+
+    result = await query_service_metrics(
+        service_name='test-service',
+        metric_name='Latency',
+        statistic='Average',
+        extended_statistic='p99',
+        hours=168,
+        period=None,
+        max_points=20,
+    )
+
+    assert 'Series (20 of 168 points, shape-preserving):' in result
+    assert 'Average: 900.00' in result
+    assert 'Recent Values:' not in result
+    assert 'Average Statistics:' in result
+    assert '• Maximum: 900.00' in result
+
+
+@pytest.mark.asyncio
+async def test_query_service_metrics_multiple_metrics_cached(mock_aws_clients):
+    """Test repeating a settled multi-metric query is served from the window cache."""
+    mock_aws_clients['appsignals_client'].list_services.return_value = {
+        'ServiceSummaries': [{'KeyAttributes': {'Name': 'test-service', 'Type': 'Service'}}]
+    }
+    mock_aws_clients['appsignals_client'].get_service.return_value = {
+        'Service': {
+            'MetricReferences': [
+                {'Namespace': 'ApplicationSignals', 'MetricName': name, 'Dimensions': []}
+                for name in ('Latency', 'Fault')
+            ]
+        }
+    }
+    get_metric_data = mock_aws_clients['cloudwatch_client'].get_metric_data
+    get_metric_data.side_effect = lambda **kwargs: {
+        'MetricDataResults': [
+            {'Id': query['Id'], 'Timestamps': [kwargs['StartTime']], 'Values': [1.0]}
+            for query in kwargs['MetricDataQueries']
+        ]
+    }
+
+    now = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    # The same settled window twice: the second query needs no new datapoints
+    with (
+        patch('awslabs.cloudwatch_appsignals_mcp_server.server.datetime', FrozenDatetime),
+        patch.object(metric_window_cache, 'clock', lambda: now + timedelta(days=1)),
+    ):
+        results = [
+            await query_service_metrics(
+                service_name='test-service',
+                metric_name='Latency,Fault',
+                statistic='Average',
+                extended_statistic='p99',
+                hours=1,
+                period=None,
+                max_points=None,
+            )
+            for _ in range(2)
+        ]
+
+    get_metric_data.assert_called_once()
+    assert len(get_metric_data.call_args.kwargs['MetricDataQueries']) == 4
+    assert results[0] == results[1]
+    assert 'Metrics for test-service - Fault' in results[1]
+
+
+@pytest.mark.asyncio
+async def test_query_service_metrics_repeated_query_fetches_tail(mock_aws_clients):
+    """Test repeating a query only fetches the newest, unsettled minutes."""
+    mock_aws_clients['appsignals_client'].list_services.return_value = {
+        'ServiceSummaries': [{'KeyAttributes': {'Name': 'test-service', 'Type': 'Service'}}]
+    }
+    mock_aws_clients['appsignals_client'].get_service.return_value = {
+        'Service': {
+            'MetricReferences': [
+                {'Namespace': 'AWS/ApplicationSignals', 'MetricName': 'Latency', 'Dimensions': []}
+            ]
+        }
+    }
+    mock_aws_clients['cloudwatch_client'].get_metric_statistics.side_effect = lambda **kwargs: {
+        'Datapoints': [{'Timestamp': kwargs['StartTime'], 'Average': 100.0}]
+    }
+
+    for _ in range(2):
+        await query_service_metrics(
+            service_name='test-service',
+            metric_name='Latency',
+            statistic='Average',
+            extended_statistic='p99',
+            hours=24,
+            period=None,
+            max_points=None,
+        )
+
+    calls = mock_aws_clients['cloudwatch_client'].get_metric_statistics.call_args_list
+    assert len(calls) == 2
+    first, second = calls[0].kwargs, calls[1].kwargs
+    assert second['EndTime'] - second['StartTime'] <= timedelta(minutes=15)
+    assert second['StartTime'] > first['StartTime']
+
+
+@pytest.mark.asyncio
+async def test_query_service_metrics_invalid_period(mock_aws_clients):
+    """Test periods that are not a multiple of 60 seconds are rejected."""
+    mock_aws_clients['appsignals_client'].list_services.return_value = {
+        'ServiceSummaries': [{'KeyAttributes': {'Name': 'test-service', 'Type': 'Service'}}]
+    }
+    mock_aws_clients['appsignals_client'].get_service.return_value = {
+        'Service': {
+            'MetricReferences': [
+                {'Namespace': 'AWS/ApplicationSignals', 'MetricName': 'Latency', 'Dimensions': []}
+            ]
+        }
+    }
+
+    result = await query_service_metrics(
+        service_name='test-service',
+        metric_name='Latency',
+        statistic='Average',
+        extended_statistic='p99',
+        hours=1,
+        period=90,
+        max_points=None,
+    )
+
+    assert 'Invalid period 90' in result
+    mock_aws_clients['cloudwatch_client'].get_metric_statistics.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_query_service_metrics_general_exception(mock_aws_clients):
     """Test query service metrics with unexpected exception."""
@@ -1113,6 +1863,8 @@ async def test_query_service_metrics_general_exception(mock_aws_clients):
         statistic='Average',
         extended_statistic='p99',
         hours=1,
+        period=None,
+        max_points=None,
     )
 
     assert 'Error: Unexpected error' in result
@@ -1447,7 +2199,7 @@ async def test_list_slis_general_exception(mock_aws_clients):
         'Service unavailable'
     )
 
-    result = await list_slis(hours=24)
+    result = await list_slis(hours=24, force_refresh=False, diff=False, since_generation=None)
 
     assert 'Error getting SLI status: Service unavailable' in result
 
@@ -1483,9 +2235,9 @@ async def test_query_sampled_traces_with_defaults(mock_aws_clients):
     }
 
     with patch(
-        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_paginated'
-    ) as mock_paginated:
-        mock_paginated.return_value = mock_trace_response['TraceSummaries']
+        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_page'
+    ) as mock_page:
+        mock_page.return_value = (mock_trace_response['TraceSummaries'], None)
 
         # Call without start_time and end_time to test defaults
         result_json = await query_sampled_traces(
@@ -1493,16 +2245,20 @@ async def test_query_sampled_traces_with_defaults(mock_aws_clients):
             start_time=None,
             end_time=None,
             region='us-east-1',
+            detail_traces=0,
+            output='raw',
         )
 
         result = json.loads(result_json)
         assert result['TraceCount'] == 1
         assert result['TraceSummaries'][0]['HasError'] is True
 
-        # Verify the time window was set to 3 hours
-        call_args = mock_paginated.call_args[0]
-        time_diff = call_args[2] - call_args[1]  # end_time - start_time
+        # Verify the time window was set to 3 hours, fetched in half-hour slices
+        calls = [call[0] for call in mock_page.call_args_list]
+        assert len(calls) == 6
+        time_diff = calls[-1][2] - calls[0][1]  # end_time - start_time
         assert 2.9 < time_diff.total_seconds() / 3600 < 3.1  # Approximately 3 hours
+        assert all(call[4] is None for call in calls)  # One page per slice
 
 
 @pytest.mark.asyncio
@@ -1525,14 +2281,16 @@ async def test_query_sampled_traces_with_annotations(mock_aws_clients):
     }
 
     with patch(
-        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_paginated'
-    ) as mock_paginated:
-        mock_paginated.return_value = [mock_trace]
+        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_page'
+    ) as mock_page:
+        mock_page.return_value = ([mock_trace], None)
 
         result_json = await query_sampled_traces(
             start_time='2024-01-01T00:00:00Z',
             end_time='2024-01-01T01:00:00Z',
             filter_expression='service("test")',
+            detail_traces=0,
+            output='raw',
         )
 
         result = json.loads(result_json)
@@ -1548,6 +2306,97 @@ async def test_query_sampled_traces_with_annotations(mock_aws_clients):
         assert len(trace_summary['Users']) == 2
 
 
+@pytest.mark.asyncio
+async def test_query_sampled_traces_with_details(mock_aws_clients):
+    """Test the most relevant traces are enriched from BatchGetTraces and cached."""
+    summaries = [
+        {'Id': 'slow', 'Duration': 9.0},
+        {'Id': 'fault', 'Duration': 0.5, 'HasFault': True},
+        {'Id': 'fast', 'Duration': 0.1},
+    ]
+    document = {
+        'name': 'checkout',
+        'start_time': 100.0,
+        'end_time': 100.5,
+        'fault': True,
+        'cause': {'exceptions': [{'type': 'TimeoutError', 'message': 'db timed out'}]},
+    }
+    mock_aws_clients['xray_client'].batch_get_traces.return_value = {
+        'Traces': [
+            {'Id': 'fault', 'Duration': 0.5, 'Segments': [{'Document': json.dumps(document)}]},
+            {'Id': 'slow', 'Duration': 9.0, 'Segments': []},
+        ]
+    }
+
+    with patch(
+        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_page'
+    ) as mock_page:
+        mock_page.return_value = (summaries, None)
+        for _ in range(2):
+            result = json.loads(
+                await query_sampled_traces(
+                    start_time='2024-01-01T00:00:00Z',
+                    end_time='2024-01-01T01:00:00Z',
+                    filter_expression='service("checkout")',
+                    detail_traces=2,
+                    output='raw',
+                )
+            )
+
+    mock_aws_clients['xray_client'].batch_get_traces.assert_called_once_with(
+        TraceIds=['fault', 'slow']
+    )
+    by_id = {trace['Id']: trace for trace in result['TraceSummaries']}
+    details = by_id['fault']['Details']
+    assert details['Segments'] == [
+        {'Name': 'checkout', 'Origin': None, 'Duration': 0.5, 'Fault': True}
+    ]
+    assert details['Exceptions'][0]['Type'] == 'TimeoutError'
+    assert by_id['slow']['Details']['Segments'] == []
+    assert 'Details' not in by_id['fast']
+
+
+@pytest.mark.asyncio
+async def test_query_sampled_traces_aggregated(mock_aws_clients):
+    """Test traces are returned as groups by default and unknown output modes are rejected."""
+    traces = [
+        {'Id': f'fault-{i}', 'Duration': 1.0 + i, 'HasFault': True, 'Http': {'HttpStatus': 500}}
+        for i in range(3)
+    ] + [{'Id': 'ok-0', 'Duration': 0.1, 'Http': {'HttpStatus': 200}}]
+
+    with patch(
+        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_page'
+    ) as mock_page:
+        mock_page.return_value = (traces, None)
+        result_json = await query_sampled_traces(
+            start_time='2024-01-01T00:00:00Z',
+            end_time='2024-01-01T01:00:00Z',
+            filter_expression='service("checkout")',
+            detail_traces=0,
+            output='aggregate',
+        )
+        invalid = json.loads(
+            await query_sampled_traces(
+                start_time='2024-01-01T00:00:00Z',
+                end_time='2024-01-01T01:00:00Z',
+                filter_expression='service("checkout")',
+                detail_traces=0,
+                output='table',
+            )
+        )
+
+    result = json.loads(result_json)
+    assert 'TraceSummaries' not in result
+    assert result['TraceCount'] == 4
+    assert result['GroupCount'] == 2
+    fault_group = result['Groups'][0]
+    assert fault_group['Outcome'] == 'fault'
+    assert fault_group['Count'] == 3
+    assert fault_group['ExemplarTraceIds'] == ['fault-2', 'fault-1', 'fault-0']
+    assert fault_group['Duration']['p50'] == 2.0
+    assert 'Unknown output' in invalid['error']
+
+
 @pytest.mark.asyncio
 async def test_query_sampled_traces_with_fault_causes(mock_aws_clients):
     """Test query_sampled_traces with fault root causes."""
@@ -1565,12 +2414,15 @@ async def test_query_sampled_traces_with_fault_causes(mock_aws_clients):
     }
 
     with patch(
-        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_paginated'
-    ) as mock_paginated:
-        mock_paginated.return_value = [mock_trace]
+        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_page'
+    ) as mock_page:
+        mock_page.return_value = ([mock_trace], None)
 
         result_json = await query_sampled_traces(
-            start_time='2024-01-01T00:00:00Z', end_time='2024-01-01T01:00:00Z'
+            start_time='2024-01-01T00:00:00Z',
+            end_time='2024-01-01T01:00:00Z',
+            detail_traces=0,
+            output='raw',
         )
 
         result = json.loads(result_json)
@@ -1585,12 +2437,15 @@ async def test_query_sampled_traces_with_fault_causes(mock_aws_clients):
 async def test_query_sampled_traces_general_exception(mock_aws_clients):
     """Test query_sampled_traces with general exception."""
     with patch(
-        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_paginated'
-    ) as mock_paginated:
-        mock_paginated.side_effect = Exception('Trace query failed')
+        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_page'
+    ) as mock_page:
+        mock_page.side_effect = Exception('Trace query failed')
 
         result_json = await query_sampled_traces(
-            start_time='2024-01-01T00:00:00Z', end_time='2024-01-01T01:00:00Z'
+            start_time='2024-01-01T00:00:00Z',
+            end_time='2024-01-01T01:00:00Z',
+            detail_traces=0,
+            output='raw',
         )
 
         result = json.loads(result_json)
@@ -1612,12 +2467,15 @@ async def test_query_sampled_traces_datetime_conversion(mock_aws_clients):
     }
 
     with patch(
-        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_paginated'
-    ) as mock_paginated:
-        mock_paginated.return_value = [mock_trace]
+        'awslabs.cloudwatch_appsignals_mcp_server.server.get_trace_summaries_page'
+    ) as mock_page:
+        mock_page.return_value = ([mock_trace], None)
 
         result_json = await query_sampled_traces(
-            start_time='2024-01-01T00:00:00Z', end_time='2024-01-01T01:00:00Z'
+            start_time='2024-01-01T00:00:00Z',
+            end_time='2024-01-01T01:00:00Z',
+            detail_traces=0,
+            output='raw',
         )
 
         # Should not raise JSON serialization error
@@ -1631,6 +2489,35 @@ async def test_query_sampled_traces_datetime_conversion(mock_aws_clients):
         assert 'EndTime' not in trace_summary
 
 
+@pytest.mark.asyncio
+async def test_list_events_skips_snapshots(mock_aws_clients):
+    """Test SLI snapshots stored in the jobs table are filtered out of the event list."""
+    dynamodb = MagicMock()
+    dynamodb.scan.return_value = {
+        'Items': [
+            {
+                'job_id': {'S': 'job-1'},
+                'status': {'S': 'open'},
+                'updated_at': {'S': '2024-01-01T00:00:00'},
+                'prompt': {'S': 'Why is latency high?'},
+            }
+        ]
+    }
+
+    with patch('awslabs.cloudwatch_appsignals_mcp_server.server.dynamodb_client', dynamodb):
+        result = await list_events(status='open', limit=50)
+
+    assert 'job-1' in result
+    scan_params = dynamodb.scan.call_args.kwargs
+    assert scan_params['FilterExpression'] == (
+        '#status <> :snapshot_val AND #status = :status_val'
+    )
+    assert scan_params['ExpressionAttributeValues'] == {
+        ':snapshot_val': {'S': 'snapshot'},
+        ':status_val': {'S': 'open'},
+    }
+
+
 def test_main_success(mock_aws_clients):
     """Test main function normal execution."""
     with patch('awslabs.cloudwatch_appsignals_mcp_server.server.mcp') as mock_mcp:
@@ -0,0 +1,137 @@
+"""Tests for the shared service catalog."""
+
+import asyncio
+import pytest
+import time
+from awslabs.cloudwatch_appsignals_mcp_server.service_catalog import (
+    ServiceCatalog,
+    ServiceDetailCache,
+)
+from unittest.mock import MagicMock
+
+
+def _service(name):
+    return {'KeyAttributes': {'Name': name, 'Type': 'Service', 'Environment': 'eks:prod'}}
+
+
+def _paged_client(total, page_size=100):
+    """Mock ListServices returning ``total`` services in pages."""
+    names = [f'svc-{i}' for i in range(total)]
+
+    def list_services(**kwargs):
+        start = int(kwargs.get('NextToken', 0))
+        page = names[start : start + page_size]
+        response = {'ServiceSummaries': [_service(name) for name in page]}
+        if start + page_size < total:
+            response['NextToken'] = str(start + page_size)
+        return response
+
+    return MagicMock(side_effect=list_services)
+
+
+class TestServiceCatalog:
+    """Test cases for ServiceCatalog."""
+
+    @pytest.mark.asyncio
+    async def test_pages_through_all_services(self):
+        """Test fleets larger than one page are listed completely."""
+        list_services = _paged_client(250)
+        catalog = ServiceCatalog(list_services)
+
+        services = await catalog.services()
+
+        assert len(services) == 250
+        assert list_services.call_count == 3
+        assert list_services.call_args.kwargs['NextToken'] == '200'
+        assert list_services.call_args.kwargs['MaxResults'] == 100
+
+    @pytest.mark.asyncio
+    async def test_name_index(self):
+        """Test services are resolved by name from the index."""
+        catalog = ServiceCatalog(_paged_client(150))
+        snapshot = await catalog.snapshot()
+
+        assert snapshot.find('svc-149') == _service('svc-149')
+        assert snapshot.key_attributes('svc-3')['Name'] == 'svc-3'
+        assert await catalog.find('missing') is None
+
+    @pytest.mark.asyncio
+    async def test_cached_per_lookback_window(self):
+        """Test repeated lookups are served from cache, separately per window."""
+        list_services = _paged_client(10)
+        catalog = ServiceCatalog(list_services, ttl=300)
+
+        await catalog.services(24)
+        await catalog.find('svc-1', 24)
+        assert list_services.call_count == 1
+
+        await catalog.services(3)
+        assert list_services.call_count == 2
+        assert catalog.stats()['hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self):
+        """Test invalidation forces the next lookup to reload."""
+        list_services = _paged_client(10)
+        catalog = ServiceCatalog(list_services)
+
+        await catalog.services()
+        catalog.invalidate()
+        await catalog.services()
+
+        assert list_services.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_repeated_token_stops_paging(self):
+        """Test a NextToken that repeats does not loop forever."""
+        list_services = MagicMock(
+            return_value={'ServiceSummaries': [_service('a')], 'NextToken': 'same'}
+        )
+        catalog = ServiceCatalog(list_services)
+
+        assert len(await catalog.services()) == 2
+        assert list_services.call_count == 2
+
+
+class TestServiceDetailCache:
+    """Test cases for ServiceDetailCache."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(self):
+        """Test concurrent lookups of one service make a single GetService call."""
+        get_service = MagicMock(
+            side_effect=lambda **kwargs: (time.sleep(0.05), {'Service': {}})[1]
+        )
+        cache = ServiceDetailCache(get_service)
+        key = {'Name': 'svc', 'Type': 'Service'}
+
+        results = await asyncio.gather(*(cache.get(dict(key)) for _ in range(5)))
+
+        assert all(result == {'Service': {}} for result in results)
+        assert get_service.call_count == 1
+        assert get_service.call_args.kwargs['KeyAttributes'] == key
+
+    @pytest.mark.asyncio
+    async def test_short_windows_share_entry(self):
+        """Test lookback windows under a day share the day-long entry."""
+        get_service = MagicMock(return_value={'Service': {}})
+        cache = ServiceDetailCache(get_service)
+
+        await cache.get({'Name': 'svc'}, lookback_hours=1)
+        await cache.get({'Name': 'svc'}, lookback_hours=24)
+        await cache.get({'Name': 'svc'}, lookback_hours=168)
+
+        assert get_service.call_count == 2
+        assert cache.stats()['hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_max_staleness(self):
+        """Test max_staleness=0 bypasses a cached response."""
+        get_service = MagicMock(return_value={'Service': {}})
+        cache = ServiceDetailCache(get_service, ttl=900)
+
+        await cache.get({'Name': 'svc'})
+        await cache.get({'Name': 'svc'}, max_staleness=0)
+
+        assert get_service.call_count == 2
+        assert cache.stats()['misses'] == 2
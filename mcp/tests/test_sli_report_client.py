@@ -78,6 +78,7 @@ class TestSLOSummary:
         assert summary.key_attributes == {'Name': 'TestService', 'Type': 'Service'}
         assert summary.operation_name == 'GetItem'
         assert summary.created_time == created_time
+        assert not hasattr(summary, '__dict__')
 
 
 class TestMetricDataResult:
@@ -93,6 +94,32 @@ class TestMetricDataResult:
         assert result.timestamps == timestamps
         assert result.values == values
 
+    def test_metric_data_result_array_storage(self):
+        """Test datapoints are held in compact arrays and rebuilt exactly on access."""
+        start = datetime(2024, 5, 1, 12, 0, 0, 123457, tzinfo=timezone.utc)
+        timestamps = [start + timedelta(minutes=i) for i in range(3)]
+
+        result = MetricDataResult(timestamps=timestamps, values=[0.5, 1, 2.25])
+
+        assert not hasattr(result, '__dict__')
+        assert result._timestamps.typecode == 'q'
+        assert result._values.typecode == 'd'
+        assert len(result) == 3
+        assert result.timestamps == timestamps
+        assert result.timestamps[0].tzinfo == timezone.utc
+        assert result.values == [0.5, 1.0, 2.25]
+        assert result == MetricDataResult(timestamps=timestamps, values=[0.5, 1.0, 2.25])
+
+    def test_metric_data_result_naive_and_empty(self):
+        """Test naive timestamps stay naive and empty results stay empty."""
+        naive = [datetime(2024, 5, 1, 12, 0), datetime(2024, 5, 1, 13, 0)]
+
+        assert MetricDataResult(timestamps=naive, values=[1.0, 2.0]).timestamps == naive
+        empty = MetricDataResult(timestamps=[], values=[])
+        assert len(empty) == 0
+        assert empty.timestamps == []
+        assert empty.values == []
+
 
 class TestSLIReport:
     """Test cases for SLIReport class."""
@@ -126,6 +153,11 @@ class TestSLIReport:
         returned_names.append('new-slo')
         assert len(report.breached_slo_names) == 2  # Original list unchanged
 
+        # Changing the list passed in does not change the report
+        breached_names.append('later-slo')
+        assert report.breached_slo_names == ['slo-1', 'slo-2']
+        assert not hasattr(report, '__dict__')
+
 
 class TestSLIReportClient:
     """Test cases for SLIReportClient class."""
@@ -168,6 +200,16 @@ class TestSLIReportClient:
         assert calls[1][0][0] == 'cloudwatch'
         assert calls[1][1]['region_name'] == 'us-west-2'
 
+    def test_init_with_shared_clients(self, mock_aws_clients):
+        """Test SLIReportClient reuses injected clients instead of creating new ones."""
+        signals, cloudwatch = MagicMock(), MagicMock()
+
+        client = SLIReportClient(AWSConfig(), signals_client=signals, cloudwatch_client=cloudwatch)
+
+        assert client.signals_client is signals
+        assert client.cloudwatch_client is cloudwatch
+        mock_aws_clients['mock_client'].assert_not_called()
+
     def test_init_failure(self, mock_aws_clients):
         """Test SLIReportClient initialization failure."""
         mock_aws_clients['mock_client'].side_effect = Exception('Failed to connect')
@@ -214,6 +256,20 @@ class TestSLIReportClient:
         assert summaries[1].name == 'slo-2'
         assert summaries[1].operation_name == 'N/A'  # Default when not provided
 
+    def test_get_slo_summaries_follows_next_token(self, mock_aws_clients):
+        """Test SLO summaries spread over several pages are all returned."""
+        client = SLIReportClient(AWSConfig(service_name='TestService'))
+        mock_aws_clients['signals_client'].list_service_level_objectives.side_effect = [
+            {'SloSummaries': [{'Name': 'slo-1', 'Arn': 'arn-1'}], 'NextToken': 'page-2'},
+            {'SloSummaries': [{'Name': 'slo-2', 'Arn': 'arn-2'}]},
+        ]
+
+        summaries = client.get_slo_summaries()
+
+        assert [summary.name for summary in summaries] == ['slo-1', 'slo-2']
+        calls = mock_aws_clients['signals_client'].list_service_level_objectives.call_args_list
+        assert calls[1].kwargs['NextToken'] == 'page-2'
+
     def test_get_slo_summaries_client_error(self, mock_aws_clients):
         """Test get_slo_summaries with ClientError."""
         config = AWSConfig()
@@ -0,0 +1,224 @@
+"""Tests for precomputed fleet SLI snapshots."""
+
+import pytest
+from awslabs.cloudwatch_appsignals_mcp_server.async_monitor import AsyncTaskMonitor
+from awslabs.cloudwatch_appsignals_mcp_server.sli_snapshot import (
+    SLISnapshot,
+    SLISnapshotStore,
+    diff_snapshots,
+)
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+
+def _report(name, status='OK', breached=()):
+    return {
+        'SliStatus': status,
+        'BreachedSloNames': list(breached),
+        'ReferenceId': {'KeyAttributes': {'Name': name, 'Type': 'Service'}},
+    }
+
+
+def _snapshot(hours=24, age=0.0, reports=None):
+    generated_at = datetime.now(timezone.utc) - timedelta(seconds=age)
+    return SLISnapshot(
+        hours=hours,
+        generated_at=generated_at,
+        start_time=generated_at - timedelta(hours=hours),
+        end_time=generated_at,
+        reports=reports if reports is not None else [_report('svc')],
+    )
+
+
+class _Compute:
+    """Counts fleet evaluations and returns a fresh snapshot each time."""
+
+    def __init__(self):
+        """Start with no evaluations."""
+        self.calls = []
+
+    async def __call__(self, hours):
+        """Return a snapshot over ``hours`` hours."""
+        self.calls.append(hours)
+        return _snapshot(hours)
+
+
+@pytest.fixture
+def job_table():
+    """In-memory stand-in for the DynamoDB job table."""
+    items = {}
+    table = MagicMock()
+    table.put_item.side_effect = lambda Item: items.__setitem__(Item['job_id'], dict(Item))
+    table.get_item.side_effect = lambda Key: (
+        {'Item': dict(items[Key['job_id']])} if Key['job_id'] in items else {}
+    )
+    table.items = items
+    return table
+
+
+class TestSLISnapshot:
+    """Test cases for SLISnapshot."""
+
+    def test_json_round_trip(self):
+        """Test snapshots survive serialization for the job table."""
+        snapshot = _snapshot()
+        assert SLISnapshot.from_json(snapshot.to_json()) == snapshot
+
+    def test_age(self):
+        """Test the age is measured from the generation time."""
+        assert _snapshot(age=90).age() == pytest.approx(90, abs=5)
+
+
+class TestDiffSnapshots:
+    """Test cases for diff_snapshots."""
+
+    def test_reports_changed_services_only(self):
+        """Test status changes, breached set changes and added/removed services are reported."""
+        before = _snapshot(
+            age=60,
+            reports=[
+                _report('steady'),
+                _report('degrading'),
+                _report('shifting', 'BREACHED', ['a']),
+                _report('gone'),
+            ],
+        )
+        after = _snapshot(
+            reports=[
+                _report('steady'),
+                _report('degrading', 'BREACHED', ['x']),
+                _report('shifting', 'BREACHED', ['b']),
+                _report('new', 'INSUFFICIENT_DATA'),
+            ],
+        )
+
+        changes = {c.key_attributes['Name']: c for c in diff_snapshots(before, after)}
+
+        assert set(changes) == {'degrading', 'shifting', 'new', 'gone'}
+        assert changes['degrading'].newly_breached == ['x']
+        assert changes['shifting'].newly_breached == ['b']
+        assert changes['shifting'].recovered == ['a']
+        assert changes['new'].before is None
+        assert changes['gone'].after is None
+
+    def test_breached_order_is_not_a_change(self):
+        """Test the same breached SLOs in another order are not a change."""
+        before = _snapshot(age=60, reports=[_report('svc', 'BREACHED', ['a', 'b'])])
+        after = _snapshot(reports=[_report('svc', 'BREACHED', ['b', 'a'])])
+
+        assert diff_snapshots(before, after) == []
+
+
+class TestSLISnapshotStore:
+    """Test cases for SLISnapshotStore."""
+
+    @pytest.mark.asyncio
+    async def test_serves_recent_snapshot(self):
+        """Test a refreshed snapshot is served for its period until it is too old."""
+        store = SLISnapshotStore(_Compute(), hours=24, interval=300)
+        assert await store.latest(24) is None
+
+        snapshot = await store.refresh()
+
+        assert await store.latest(24) is snapshot
+        assert await store.latest(6) is None
+        store.put(_snapshot(age=601))
+        assert await store.latest(24) is snapshot
+
+        store.invalidate()
+        store.put(_snapshot(age=601))
+        assert await store.latest(24) is None
+
+    @pytest.mark.asyncio
+    async def test_back_to_back_refreshes_get_distinct_generations(self):
+        """Test refreshes within the same millisecond still get increasing generations."""
+        generated_at = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+        async def compute(hours):
+            return SLISnapshot(hours, generated_at, generated_at, generated_at, [])
+
+        store = SLISnapshotStore(compute, hours=24, interval=300)
+        first = await store.refresh()
+        second = await store.refresh()
+
+        assert second.generation == first.generation + 1
+        assert store.generation(24, first.generation) is first
+
+    def test_keeps_recent_generations(self):
+        """Test snapshots are found by generation until they fall out of the history."""
+        store = SLISnapshotStore(_Compute(), hours=24, interval=300)
+        snapshots = [
+            _snapshot(age=store.HISTORY_SIZE + 1 - i) for i in range(store.HISTORY_SIZE + 1)
+        ]
+        for snapshot in snapshots:
+            store.put(snapshot)
+
+        assert store.generation(24, snapshots[0].generation) is None
+        assert store.generation(24, snapshots[-1].generation) is snapshots[-1]
+        assert store.generation(6, snapshots[-1].generation) is None
+
+    def test_tracks_generation_seen_per_session(self):
+        """Test each session's last received generation is remembered per period."""
+        store = SLISnapshotStore(_Compute(), hours=24, interval=300)
+        snapshot = _snapshot()
+
+        store.mark_seen('session-1', snapshot)
+        store.mark_seen(None, snapshot)
+
+        assert store.last_seen('session-1', 24) == snapshot.generation
+        assert store.last_seen('session-1', 6) is None
+        assert store.last_seen('session-2', 24) is None
+        assert store.last_seen(None, 24) is None
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        """Test an interval of 0 disables serving snapshots."""
+        store = SLISnapshotStore(_Compute(), interval=0)
+        await store.refresh(24)
+
+        assert not store.enabled
+        assert await store.latest(24) is None
+
+    @pytest.mark.asyncio
+    async def test_persists_to_job_table(self, job_table):
+        """Test snapshots are written with the snapshot status and read back after a restart."""
+        monitor = AsyncTaskMonitor(table=job_table, job_polling=False)
+        store = SLISnapshotStore(_Compute(), hours=24, interval=300)
+        store.schedule(monitor)
+        snapshot = await store.refresh()
+
+        item = job_table.items['sli-snapshot-24h']
+        assert item['status'] == AsyncTaskMonitor.SNAPSHOT_STATUS
+
+        restarted = SLISnapshotStore(_Compute(), hours=24, interval=300)
+        restarted.monitor = monitor
+        assert await restarted.latest(24) == snapshot
+
+    @pytest.mark.asyncio
+    async def test_scheduled_refresh_uses_scheduled_compute(self, job_table):
+        """Test scheduled refreshes evaluate the fleet with the compute given to schedule()."""
+        own, scheduled = _Compute(), _Compute()
+        store = SLISnapshotStore(own, hours=24, interval=300)
+        store.schedule(AsyncTaskMonitor(table=job_table, job_polling=False), compute=scheduled)
+
+        await store._scheduled_refresh()
+        await store.refresh(6)
+
+        assert scheduled.calls == [24]
+        assert own.calls == [6]
+        assert await store.latest(24) is not None
+
+    @pytest.mark.asyncio
+    async def test_scheduled_refresh_logs_failures(self):
+        """Test a failing scheduled refresh keeps the previous snapshot."""
+
+        async def failing(hours):
+            raise RuntimeError('throttled')
+
+        store = SLISnapshotStore(failing, hours=24, interval=300)
+        previous = _snapshot()
+        store.put(previous)
+
+        await store._scheduled_refresh()
+
+        assert await store.latest(24) is previous
@@ -0,0 +1,129 @@
+"""Tests for the SLO inventory."""
+
+import pytest
+from awslabs.cloudwatch_appsignals_mcp_server.slo_inventory import (
+    SLOEntry,
+    SLOInventory,
+    SLOSnapshot,
+)
+from unittest.mock import MagicMock
+
+
+def _slo(name, service):
+    return {
+        'Name': name,
+        'Arn': f'arn:slo/{name}',
+        'KeyAttributes': {'Type': 'Service', 'Name': service, 'Environment': 'eks:prod'},
+    }
+
+
+def _paged_client(slos, page_size=50):
+    """Mock ListServiceLevelObjectives returning ``slos`` in pages."""
+
+    def list_service_level_objectives(**kwargs):
+        start = int(kwargs.get('NextToken', 0))
+        response = {'SloSummaries': slos[start : start + page_size]}
+        if start + page_size < len(slos):
+            response['NextToken'] = str(start + page_size)
+        return response
+
+    return MagicMock(side_effect=list_service_level_objectives)
+
+
+class TestSLOSnapshot:
+    """Test cases for SLOSnapshot."""
+
+    def test_groups_by_service(self):
+        """Test SLOs are grouped by the KeyAttributes of their service."""
+        snapshot = SLOSnapshot(
+            [_slo('a', 'checkout'), _slo('b', 'payments'), _slo('c', 'checkout')]
+        )
+        checkout = {'Name': 'checkout', 'Type': 'Service', 'Environment': 'eks:prod'}
+
+        assert [slo.name for slo in snapshot.for_service(checkout)] == ['a', 'c']
+        assert snapshot.for_service(dict(checkout, Environment='eks:dev')) == []
+
+    def test_key_attribute_order_and_extras_ignored(self):
+        """Test lookups match on Type, Name and Environment only."""
+        snapshot = SLOSnapshot([_slo('a', 'checkout')])
+        key_attributes = {
+            'Environment': 'eks:prod',
+            'Name': 'checkout',
+            'Type': 'Service',
+            'AwsAccountId': '123456789012',
+        }
+
+        assert len(snapshot.for_service(key_attributes)) == 1
+
+    def test_keeps_name_and_arn_only(self):
+        """Test indexed SLOs are slotted records instead of the raw summaries."""
+        snapshot = SLOSnapshot([dict(_slo('a', 'checkout'), CreatedTime='2024-01-01')])
+        checkout = {'Name': 'checkout', 'Type': 'Service', 'Environment': 'eks:prod'}
+
+        assert snapshot.for_service(checkout) == [SLOEntry('a', 'arn:slo/a')]
+        assert not hasattr(snapshot.for_service(checkout)[0], '__dict__')
+
+    def test_accounts_kept_apart(self):
+        """Test same-named services of different linked accounts keep their own SLOs."""
+        summaries = [_slo('a', 'checkout'), _slo('b', 'checkout'), _slo('c', 'checkout')]
+        summaries[0]['KeyAttributes']['AwsAccountId'] = '111111111111'
+        summaries[1]['KeyAttributes']['AwsAccountId'] = '222222222222'
+        snapshot = SLOSnapshot(summaries)
+        checkout = {'Name': 'checkout', 'Type': 'Service', 'Environment': 'eks:prod'}
+
+        first = dict(checkout, AwsAccountId='111111111111')
+        assert [slo.name for slo in snapshot.for_service(first)] == ['a', 'c']
+        second = dict(checkout, AwsAccountId='222222222222')
+        assert [slo.name for slo in snapshot.for_service(second)] == ['b', 'c']
+        assert [slo.name for slo in snapshot.for_service(checkout)] == ['a', 'b', 'c']
+
+    def test_slos_without_service_are_skipped(self):
+        """Test SLOs without KeyAttributes are kept but not indexed."""
+        snapshot = SLOSnapshot([{'Name': 'standalone', 'Arn': 'arn:slo/standalone'}])
+
+        assert snapshot.count == 1
+        assert snapshot.by_service == {}
+
+
+class TestSLOInventory:
+    """Test cases for SLOInventory."""
+
+    @pytest.mark.asyncio
+    async def test_single_paged_sweep(self):
+        """Test every page is fetched once, without per-service filters."""
+        slos = [_slo(f'slo-{i}', f'svc-{i % 40}') for i in range(120)]
+        list_slos = _paged_client(slos)
+        inventory = SLOInventory(list_slos)
+
+        snapshot = await inventory.snapshot()
+
+        assert snapshot.count == 120
+        assert len(snapshot.by_service) == 40
+        assert list_slos.call_count == 3
+        assert 'KeyAttributes' not in list_slos.call_args.kwargs
+        assert list_slos.call_args.kwargs['MaxResults'] == 50
+
+    @pytest.mark.asyncio
+    async def test_per_service_lookups_are_cached(self):
+        """Test repeated per-service lookups reuse one sweep."""
+        list_slos = _paged_client([_slo('a', 'checkout'), _slo('b', 'payments')])
+        inventory = SLOInventory(list_slos, ttl=300)
+        key = {'Type': 'Service', 'Name': 'payments', 'Environment': 'eks:prod'}
+
+        for _ in range(5):
+            assert [slo.name for slo in await inventory.for_service(key)] == ['b']
+
+        assert list_slos.call_count == 1
+        inventory.invalidate()
+        await inventory.snapshot()
+        assert list_slos.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_repeated_token_stops(self):
+        """Test a NextToken that repeats does not loop forever."""
+        list_slos = MagicMock(return_value={'SloSummaries': [], 'NextToken': 'same'})
+        inventory = SLOInventory(list_slos)
+
+        await inventory.snapshot()
+
+        assert list_slos.call_count == 2
@@ -0,0 +1,116 @@
+"""Tests for token estimation, budgets and usage reports."""
+
+from awslabs.cloudwatch_appsignals_mcp_server.token_accounting import (
+    BUDGET_COMPACT,
+    BUDGET_DEFER,
+    BUDGET_OK,
+    BUDGET_STOP,
+    TokenBudget,
+    aggregate_token_usage,
+    compact_prompt,
+    estimate_tokens,
+    format_token_report,
+)
+
+
+class FakeClock:
+    """Clock whose monotonic time is set by the test."""
+
+    def __init__(self):
+        """Start at time zero."""
+        self.time = 0.0
+
+    def monotonic(self):
+        """Return the current fake time."""
+        return self.time
+
+
+def _prompt(iterations):
+    prompt = 'Question: why slow?\n\nInitial Context:\n- service: checkout\n\nInvestigation Log:\n'
+    for i in range(iterations):
+        prompt += f'\n\n--- t{i} ---\nStatus: continuing\nAction: step {i}\n'
+        prompt += f'Findings:\n- metric_{i % 2}: value_{i}\n- detail: ' + 'x' * 200 + '\n'
+    return prompt
+
+
+class TestEstimateTokens:
+    """Test cases for the token estimator."""
+
+    def test_ascii_text(self):
+        """Test ASCII text is estimated at about four characters per token."""
+        assert estimate_tokens('') == 0
+        assert estimate_tokens('x' * 400) == 100
+
+    def test_non_ascii_text(self):
+        """Test non-ASCII characters count as a token each."""
+        assert estimate_tokens('延迟' + 'x' * 8) == 4
+
+
+class TestCompactPrompt:
+    """Test cases for prompt compaction."""
+
+    def test_keeps_header_recent_entries_and_latest_findings(self):
+        """Test older entries collapse into their latest findings."""
+        compacted = compact_prompt(_prompt(5), keep_entries=2)
+
+        assert compacted.startswith('Question: why slow?')
+        assert 'compacted 3 earlier iterations' in compacted
+        assert '- metric_0: value_2' in compacted
+        assert 'Action: step 0' not in compacted
+        assert compacted.endswith(_prompt(5)[_prompt(5).index('\n\n--- t3') :])
+        assert len(compacted) < len(_prompt(5))
+
+    def test_short_prompt_unchanged(self):
+        """Test prompts with few entries are not compacted."""
+        assert compact_prompt(_prompt(2), keep_entries=2) == _prompt(2)
+
+
+class TestTokenBudget:
+    """Test cases for budget decisions."""
+
+    def test_unlimited_by_default(self):
+        """Test no budget means every iteration may run."""
+        assert TokenBudget(FakeClock()).check({}, _prompt(50)) == BUDGET_OK
+
+    def test_compact_then_stop(self):
+        """Test an overrunning job is compacted while that fits, then stopped."""
+        budget = TokenBudget(FakeClock(), job_budget=1000)
+        prompt = _prompt(10)
+
+        assert budget.check({'prompt_tokens': 0}, prompt) == BUDGET_OK
+        assert budget.check({'prompt_tokens': 400}, prompt) == BUDGET_COMPACT
+        assert budget.check({'prompt_tokens': 990}, prompt) == BUDGET_STOP
+
+    def test_global_budget_defers_within_window(self):
+        """Test spent global budget defers work until usage leaves the window."""
+        clock = FakeClock()
+        budget = TokenBudget(clock, global_budget=100, window_seconds=60)
+        budget.record(100)
+        assert budget.check({}, 'prompt') == BUDGET_DEFER
+
+        clock.time = 61
+        assert budget.check({}, 'prompt') == BUDGET_OK
+        assert budget.window_usage() == 0
+
+
+class TestTokenReport:
+    """Test cases for aggregate usage reports."""
+
+    def test_aggregates_by_type_most_expensive_first(self):
+        """Test usage is summed per investigation type and sorted by total."""
+        rows = aggregate_token_usage(
+            [
+                {'investigation_type': 'latency', 'prompt_tokens': 100, 'response_tokens': 10},
+                {'investigation_type': 'latency', 'prompt_tokens': 300, 'response_tokens': 30},
+                {'investigation_type': 'errors', 'prompt_tokens': 50, 'llm_calls': 2},
+                {'prompt_tokens': 1000, 'response_tokens': 5},
+            ]
+        )
+
+        assert [row['investigation_type'] for row in rows] == ['event', 'latency', 'errors']
+        latency = rows[1]
+        assert latency['jobs'] == 2
+        assert latency['total_tokens'] == 440
+        assert latency['avg_job_tokens'] == 220
+        assert latency['max_job_tokens'] == 330
+        assert 'latency' in format_token_report(rows)
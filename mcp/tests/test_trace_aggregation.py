@@ -0,0 +1,94 @@
+"""Tests for local trace aggregation."""
+
+from awslabs.cloudwatch_appsignals_mcp_server.trace_aggregation import (
+    aggregate_traces,
+    group_key,
+)
+
+
+def root_cause(service, exception=None):
+    """Return a FaultRootCauses entry blaming ``service``."""
+    entity = {'Name': service, 'Exceptions': [{'Name': exception}] if exception else []}
+    return [
+        {
+            'Services': [
+                {'Name': 'frontend', 'EntityPath': []},
+                {'Name': service, 'EntityPath': [entity]},
+            ]
+        }
+    ]
+
+
+class TestGroupKey:
+    """Test cases for group_key."""
+
+    def test_fault_with_root_cause(self):
+        """Test the operation annotation, outcome, status and root cause make up the key."""
+        trace = {
+            'HasFault': True,
+            'HasError': True,
+            'Http': {'HttpStatus': 503},
+            'Annotations': {
+                'aws.local.operation': [
+                    {'AnnotationValue': {'StringValue': 'POST /orders'}, 'ServiceIds': []}
+                ]
+            },
+            'FaultRootCauses': root_cause('inventory', 'TimeoutError'),
+        }
+        assert group_key(trace) == ('POST /orders', 'fault', 503, 'inventory', 'TimeoutError')
+
+    def test_fallbacks(self):
+        """Test the entry point names the operation and a root cause without exceptions still names a service."""
+        trace = {
+            'HasThrottle': True,
+            'EntryPoint': {'Name': 'api'},
+            'ErrorRootCauses': [{'Services': [{'Name': 'frontend'}, {'Name': 'dynamodb'}]}],
+        }
+        assert group_key(trace) == ('api', 'throttle', None, 'dynamodb', None)
+        assert group_key({}) == (None, 'ok', None, None, None)
+
+
+class TestAggregateTraces:
+    """Test cases for aggregate_traces."""
+
+    def test_groups_ranked_with_percentiles_and_exemplars(self):
+        """Test failing groups rank first, then by size, with percentiles and slowest exemplars."""
+        traces = [{'Id': f'ok-{i}', 'Duration': 0.1} for i in range(5)]
+        traces += [
+            {
+                'Id': f'fault-{i}',
+                'Duration': float(i + 1),
+                'HasFault': True,
+                'FaultRootCauses': root_cause('db', 'TimeoutError'),
+            }
+            for i in range(4)
+        ]
+
+        result = aggregate_traces(traces, exemplars=2)
+
+        assert result['GroupCount'] == 2
+        assert result['OtherTraceCount'] == 0
+        fault, ok = result['Groups']
+        assert fault == {
+            'Outcome': 'fault',
+            'RootCauseService': 'db',
+            'ExceptionType': 'TimeoutError',
+            'Count': 4,
+            'Duration': {'p50': 2.5, 'p90': 3.7, 'p99': 3.97, 'max': 4.0},
+            'ExemplarTraceIds': ['fault-3', 'fault-2'],
+        }
+        assert ok['Count'] == 5
+
+    def test_top_n(self):
+        """Test groups beyond top_n are only counted."""
+        traces = [
+            {'Id': f'{status}-{i}', 'Http': {'HttpStatus': status}}
+            for status in (200, 201, 204)
+            for i in range(status - 199)
+        ]
+        result = aggregate_traces(traces, top_n=2)
+
+        assert [group['HttpStatus'] for group in result['Groups']] == [204, 201]
+        assert result['GroupCount'] == 3
+        assert result['OtherTraceCount'] == 1
+        assert 'Duration' not in result['Groups'][0]
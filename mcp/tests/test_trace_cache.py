@@ -0,0 +1,60 @@
+"""Tests for the on-disk trace cache."""
+
+import os
+from awslabs.cloudwatch_appsignals_mcp_server.trace_cache import TraceCache
+
+
+def make_trace(trace_id, size=0):
+    """Return a minimal trace, padded with ``size`` bytes of incompressible data."""
+    return {'Id': trace_id, 'Segments': [{'Document': os.urandom(size).hex()}]}
+
+
+class TestTraceCache:
+    """Test cases for TraceCache."""
+
+    def test_round_trip_and_persistence(self, tmp_path):
+        """Test a stored trace is returned, also by a new cache over the same directory."""
+        cache = TraceCache(str(tmp_path), max_bytes=2**20)
+        trace = make_trace('1-abc-def')
+        assert cache.get('1-abc-def') is None
+
+        cache.put('1-abc-def', trace)
+        assert cache.get('1-abc-def') == trace
+        assert '1-abc-def' in cache
+
+        reopened = TraceCache(str(tmp_path), max_bytes=2**20)
+        assert reopened.get('1-abc-def') == trace
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test the least recently read trace is evicted when the size bound is exceeded."""
+        cache = TraceCache(str(tmp_path), max_bytes=2500)
+        cache.put('a', make_trace('a', 1000))
+        cache.put('b', make_trace('b', 1000))
+        cache.get('a')
+        cache.put('c', make_trace('c', 1000))
+
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+        assert cache.stats()['bytes'] <= 2500
+
+    def test_unreadable_file_dropped(self, tmp_path):
+        """Test a corrupted cache file counts as a miss and is removed."""
+        cache = TraceCache(str(tmp_path), max_bytes=2**20)
+        cache.put('a', make_trace('a'))
+        path = cache._path(cache._name('a'))
+        with open(path, 'wb') as f:
+            f.write(b'not gzip')
+
+        assert cache.get('a') is None
+        assert not os.path.exists(path)
+        assert 'a' not in cache
+
+    def test_clear(self, tmp_path):
+        """Test clear() deletes every cached trace."""
+        cache = TraceCache(str(tmp_path), max_bytes=2**20)
+        cache.put('a', make_trace('a'))
+        cache.clear()
+        assert cache.stats() == {'hits': 0, 'misses': 0, 'traces': 0, 'bytes': 0}
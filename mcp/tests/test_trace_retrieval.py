@@ -0,0 +1,336 @@
+"""Tests for concurrent, time-sliced trace retrieval."""
+
+import json
+import pytest
+import threading
+import time
+from awslabs.cloudwatch_appsignals_mcp_server.trace_cache import TraceCache
+from awslabs.cloudwatch_appsignals_mcp_server.trace_retrieval import (
+    TraceDetailFetcher,
+    is_complete,
+    iter_trace_summaries,
+    split_window,
+    summarize_trace,
+)
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+
+START = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def page_of(traces, next_token, page_size):
+    """Return the page of ``traces`` at ``next_token`` and the token of the following one."""
+    offset = int(next_token or 0)
+    following = offset + page_size
+    return traces[offset:following], str(following) if following < len(traces) else None
+
+
+def make_fetcher(per_minute=10, page_size=10, delay=0.0):
+    """Return a page fetcher producing ``per_minute`` traces for every minute it is asked about."""
+    calls = []
+    state = {'active': 0, 'peak': 0}
+    lock = threading.Lock()
+
+    def fetch(start, end, next_token):
+        with lock:
+            calls.append((start, end, next_token))
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        time.sleep(delay)
+        traces = []
+        minute = start
+        while minute < end:
+            for i in range(per_minute):
+                traces.append({'Id': f'{minute:%H%M}-{i}', 'StartTime': minute})
+            minute += timedelta(minutes=1)
+        with lock:
+            state['active'] -= 1
+        return page_of(traces, next_token, page_size)
+
+    return fetch, calls, state
+
+
+class TestSplitWindow:
+    """Test cases for split_window."""
+
+    def test_splits_into_consecutive_slices(self):
+        """Test the slices are contiguous and the last one is clipped to the window end."""
+        slices = split_window(START, START + timedelta(minutes=70), slice_seconds=1800)
+        assert slices == [
+            (START, START + timedelta(minutes=30)),
+            (START + timedelta(minutes=30), START + timedelta(minutes=60)),
+            (START + timedelta(minutes=60), START + timedelta(minutes=70)),
+        ]
+
+    def test_empty_window(self):
+        """Test an empty window still produces one slice."""
+        assert split_window(START, START) == [(START, START)]
+
+
+class TestIterTraceSummaries:
+    """Test cases for iter_trace_summaries."""
+
+    @pytest.mark.asyncio
+    async def test_samples_evenly_across_window(self):
+        """Test every slice contributes an equal share, in time order."""
+        fetch, calls, _state = make_fetcher()
+        traces = [
+            trace
+            async for trace in iter_trace_summaries(
+                fetch, START, START + timedelta(hours=3), max_traces=60
+            )
+        ]
+
+        assert len(traces) == 60
+        assert [next_token for _start, _end, next_token in calls] == [None] * 6
+        hours = {trace['StartTime'].hour for trace in traces}
+        assert hours == {12, 13, 14}
+        assert [trace['StartTime'] for trace in traces] == sorted(
+            trace['StartTime'] for trace in traces
+        )
+
+    @pytest.mark.asyncio
+    async def test_redistributes_unused_share(self):
+        """Test share left by sparse slices goes to the slices that filled theirs."""
+        calls = []
+
+        def fetch(start, end, next_token):
+            calls.append((start, next_token))
+            traces = []
+            minute = start
+            while minute < end:
+                # One trace per half hour before 14:00, ten per minute after
+                per_minute = 10 if minute.hour >= 14 else int(minute.minute % 30 == 0)
+                for i in range(per_minute):
+                    traces.append({'Id': f'{minute:%H%M}-{i}', 'StartTime': minute})
+                minute += timedelta(minutes=1)
+            return page_of(traces, next_token, 10)
+
+        traces = [
+            trace
+            async for trace in iter_trace_summaries(
+                fetch, START, START + timedelta(hours=3), max_traces=60
+            )
+        ]
+
+        assert len(traces) == 60
+        assert [trace['StartTime'].hour for trace in traces[:4]] == [12, 12, 13, 13]
+        assert [trace['StartTime'] for trace in traces] == sorted(
+            trace['StartTime'] for trace in traces
+        )
+        # Busy slices continue from their last page instead of starting over
+        busy = START + timedelta(hours=2)
+        for start in (busy, busy + timedelta(minutes=30)):
+            assert [token for s, token in calls if s == start] == [None, '10', '20']
+        assert [token for start, token in calls if start < busy] == [None] * 4
+
+    @pytest.mark.asyncio
+    async def test_streams_final_slices(self):
+        """Test a slice is yielded before later slices are fetched once it cannot grow."""
+        first_yielded = threading.Event()
+
+        def fetch(start, end, next_token):
+            if start > START:
+                assert first_yielded.wait(timeout=5)
+            return [{'Id': f'{start:%H%M}'}], None
+
+        traces = []
+        async for trace in iter_trace_summaries(
+            fetch, START, START + timedelta(hours=2), max_traces=10, max_concurrency=1
+        ):
+            traces.append(trace['Id'])
+            first_yielded.set()
+        assert traces == ['1200', '1230', '1300', '1330']
+
+    @pytest.mark.asyncio
+    async def test_deduplicates_by_id(self):
+        """Test a trace returned by two slices is yielded once."""
+
+        def fetch(start, end, next_token):
+            return [{'Id': 'shared'}, {'Id': f'{start:%H%M}'}], None
+
+        traces = [
+            trace
+            async for trace in iter_trace_summaries(
+                fetch, START, START + timedelta(hours=1), max_traces=10
+            )
+        ]
+        assert [trace['Id'] for trace in traces] == ['shared', '1200', '1230']
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self):
+        """Test slices are fetched concurrently, but never more than max_concurrency at once."""
+        fetch, calls, state = make_fetcher(delay=0.05)
+        traces = [
+            trace
+            async for trace in iter_trace_summaries(
+                fetch,
+                START,
+                START + timedelta(hours=6),
+                max_traces=120,
+                max_concurrency=3,
+            )
+        ]
+
+        assert len(traces) == 120
+        assert len(calls) == 12
+        assert state['peak'] == 3
+
+    @pytest.mark.asyncio
+    async def test_stops_at_max_traces(self):
+        """Test rounding up the per-slice share never yields more than max_traces."""
+        fetch, _calls, _state = make_fetcher()
+        traces = [
+            trace
+            async for trace in iter_trace_summaries(
+                fetch, START, START + timedelta(hours=3), max_traces=100
+            )
+        ]
+        assert len(traces) == 100
+
+    @pytest.mark.asyncio
+    async def test_propagates_fetch_errors(self):
+        """Test an error of any slice reaches the caller."""
+
+        def fetch(start, end, next_token):
+            if start > START:
+                raise RuntimeError('throttled')
+            return [{'Id': 'first'}], None
+
+        with pytest.raises(RuntimeError, match='throttled'):
+            async for _trace in iter_trace_summaries(
+                fetch, START, START + timedelta(hours=1), max_traces=10
+            ):
+                pass
+
+
+def full_trace(trace_id, in_progress=False):
+    """Return a BatchGetTraces trace with one segment."""
+    document = {'id': 'seg', 'name': 'api', 'start_time': 1.0, 'end_time': 1.25}
+    if in_progress:
+        document['in_progress'] = True
+    return {'Id': trace_id, 'Duration': 0.25, 'Segments': [{'Document': json.dumps(document)}]}
+
+
+class TestTraceDetailFetcher:
+    """Test cases for TraceDetailFetcher."""
+
+    @pytest.mark.asyncio
+    async def test_batches_of_five(self):
+        """Test ids are requested five per call and returned in the order asked."""
+        batch_get_traces = MagicMock(
+            side_effect=lambda TraceIds: {'Traces': [full_trace(i) for i in TraceIds]}
+        )
+        fetcher = TraceDetailFetcher(batch_get_traces)
+        ids = [f'1-{i}' for i in range(12)]
+
+        traces = await fetcher.fetch(ids + ids[:2])
+
+        assert list(traces) == ids
+        sizes = sorted(len(call.kwargs['TraceIds']) for call in batch_get_traces.call_args_list)
+        assert sizes == [2, 5, 5]
+        assert fetcher.requests_made == 3
+
+    @pytest.mark.asyncio
+    async def test_follows_next_token(self):
+        """Test a batch is paged through with NextToken."""
+        batch_get_traces = MagicMock(
+            side_effect=[
+                {'Traces': [full_trace('a')], 'NextToken': 'more'},
+                {'Traces': [full_trace('b')]},
+            ]
+        )
+        fetcher = TraceDetailFetcher(batch_get_traces)
+
+        assert list(await fetcher.fetch(['a', 'b'])) == ['a', 'b']
+        assert batch_get_traces.call_args_list[1].kwargs == {
+            'TraceIds': ['a', 'b'],
+            'NextToken': 'more',
+        }
+
+    @pytest.mark.asyncio
+    async def test_complete_traces_cached(self, tmp_path):
+        """Test complete traces are served from the cache, in-progress ones are refetched."""
+        batch_get_traces = MagicMock(
+            side_effect=lambda TraceIds: {
+                'Traces': [full_trace(i, in_progress=i == 'open') for i in TraceIds]
+            }
+        )
+        fetcher = TraceDetailFetcher(batch_get_traces, TraceCache(str(tmp_path)))
+
+        await fetcher.fetch(['done', 'open'])
+        traces = await fetcher.fetch(['done', 'open'])
+
+        assert list(traces) == ['done', 'open']
+        assert batch_get_traces.call_args_list[1].kwargs == {'TraceIds': ['open']}
+
+    @pytest.mark.asyncio
+    async def test_propagates_errors(self):
+        """Test BatchGetTraces errors reach the caller."""
+        fetcher = TraceDetailFetcher(MagicMock(side_effect=RuntimeError('throttled')))
+        with pytest.raises(RuntimeError, match='throttled'):
+            await fetcher.fetch(['a'])
+
+
+class TestSummarizeTrace:
+    """Test cases for summarize_trace and is_complete."""
+
+    def test_segments_and_exceptions(self):
+        """Test segments are ordered by start time and exceptions of subsegments collected."""
+        exception = {
+            'type': 'ValueError',
+            'message': 'bad id',
+            'stack': [{'label': 'parse', 'path': 'app.py', 'line': 10}],
+        }
+        downstream = {
+            'name': 'db',
+            'start_time': 2.0,
+            'end_time': 2.5,
+            'error': True,
+            'subsegments': [{'name': 'query', 'cause': {'exceptions': [exception]}}],
+        }
+        frontend = {
+            'name': 'api',
+            'origin': 'AWS::EKS::Container',
+            'start_time': 1.0,
+            'end_time': 3.0,
+            'fault': True,
+            'http': {'response': {'status': 500}},
+            'cause': {'exceptions': [exception]},
+        }
+        trace = {
+            'Id': '1-abc',
+            'Duration': 2.0,
+            'Segments': [
+                {'Document': json.dumps(downstream)},
+                {'Document': json.dumps(frontend)},
+            ],
+        }
+
+        summary = summarize_trace(trace)
+
+        assert summary['Segments'] == [
+            {
+                'Name': 'api',
+                'Origin': 'AWS::EKS::Container',
+                'Duration': 2.0,
+                'Fault': True,
+                'HttpStatus': 500,
+            },
+            {'Name': 'db', 'Origin': None, 'Duration': 0.5, 'Error': True},
+        ]
+        assert summary['Exceptions'] == [
+            {
+                'Segment': 'api',
+                'Type': 'ValueError',
+                'Message': 'bad id',
+                'Stack': ['parse (app.py:10)'],
+            }
+        ]
+
+    def test_is_complete(self):
+        """Test traces with in-progress or unreadable segments are not complete."""
+        assert is_complete(full_trace('a'))
+        assert not is_complete(full_trace('a', in_progress=True))
+        assert not is_complete({'Id': 'a', 'Segments': [{'Document': '{'}]})